@@ -0,0 +1,70 @@
+"""Add analytics daily rollups
+
+Revision ID: 5e1d2c9a7b34
+Revises: b558f51620b4
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5e1d2c9a7b34"
+down_revision = "b558f51620b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_message_daily_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("persona_id", sa.Integer(), nullable=True),
+        sa.Column("alternate_assistant_id", sa.Integer(), nullable=True),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("like_count", sa.Integer(), nullable=False),
+        sa.Column("dislike_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_chat_message_daily_rollup_date",
+        "chat_message_daily_rollup",
+        ["date"],
+    )
+    op.create_table(
+        "onyxbot_daily_rollup",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("session_count", sa.Integer(), nullable=False),
+        sa.Column("negative_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("date"),
+    )
+    # the rollups (and the analytics of the days not rolled up yet) select by day.
+    # chat_message is large and written to constantly, so the index is built without
+    # locking it (which can't happen inside the migration's transaction)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_message_time_sent",
+            "chat_message",
+            ["time_sent"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_message_time_sent",
+            table_name="chat_message",
+            postgresql_concurrently=True,
+        )
+    op.drop_table("onyxbot_daily_rollup")
+    op.drop_index(
+        "ix_chat_message_daily_rollup_date", table_name="chat_message_daily_rollup"
+    )
+    op.drop_table("chat_message_daily_rollup")
@@ -0,0 +1,177 @@
+"""Add KG user allowed documents
+
+Revision ID: 8f3b6d0e2a41
+Revises: 5e1d2c9a7b34
+Create Date: 2026-10-18 14:02:17.504926
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+from onyx.configs.app_configs import DB_READONLY_PASSWORD
+from onyx.configs.app_configs import DB_READONLY_USER
+from shared_configs.configs import MULTI_TENANT
+
+
+# revision identifiers, used by Alembic.
+revision = "8f3b6d0e2a41"
+down_revision = "5e1d2c9a7b34"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "kg_user_allowed_document",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("document_id", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["document_id"], ["document.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "document_id"),
+    )
+    op.create_index(
+        "ix_kg_user_allowed_document_document_id",
+        "kg_user_allowed_document",
+        ["document_id"],
+    )
+    op.create_table(
+        "kg_public_allowed_document",
+        sa.Column("document_id", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["document.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("document_id"),
+    )
+    op.create_table(
+        "kg_public_allowed_documents_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("acl_fingerprint", sa.String(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "kg_user_allowed_documents_state",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("acl_fingerprint", sa.String(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # the documents to refresh are found through the recently updated entities
+    op.create_index("ix_kg_entity_time_updated", "kg_entity", ["time_updated"])
+
+    # The user whose documents the KG views show to a connection. Only written by the
+    # regular user, nothing is granted on it to the readonly user running the
+    # generated KG SQL, and the views read it with the privileges of their owner.
+    op.create_table(
+        "kg_views_user",
+        sa.Column("backend_pid", sa.Integer(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("backend_pid"),
+    )
+
+    # The views the generated KG SQL runs against. They only show the public documents
+    # and the allowed documents of the user recorded in kg_views_user for the backend
+    # pid of the connection reading them, and nothing if there is none.
+    op.execute(
+        """
+        CREATE VIEW kg_relationships_with_access AS
+        SELECT kgr.id_name as relationship,
+               kgr.source_node as source_entity,
+               kgr.target_node as target_entity,
+               kgr.source_node_type as source_entity_type,
+               kgr.target_node_type as target_entity_type,
+               kgr.type as relationship_description,
+               kgr.relationship_type_id_name as relationship_type,
+               kgr.source_document as source_document,
+               d.doc_updated_at as source_date,
+               se.attributes as source_entity_attributes,
+               te.attributes as target_entity_attributes
+        FROM kg_relationship kgr
+        JOIN kg_views_user vu on vu.backend_pid = pg_backend_pid()
+        JOIN document d on d.id = kgr.source_document
+        JOIN kg_entity se on se.id_name = kgr.source_node
+        JOIN kg_entity te on te.id_name = kgr.target_node
+        WHERE EXISTS (
+            SELECT 1 FROM kg_public_allowed_document pd
+            WHERE pd.document_id = kgr.source_document
+        ) OR EXISTS (
+            SELECT 1 FROM kg_user_allowed_document ad
+            WHERE ad.document_id = kgr.source_document AND ad.user_id = vu.user_id
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE VIEW kg_entities_with_access AS
+        SELECT kge.id_name as entity,
+               kge.entity_type_id_name as entity_type,
+               kge.attributes as entity_attributes,
+               kge.document_id as source_document,
+               d.doc_updated_at as source_date
+        FROM kg_entity kge
+        JOIN kg_views_user vu on vu.backend_pid = pg_backend_pid()
+        JOIN document d on d.id = kge.document_id
+        WHERE EXISTS (
+            SELECT 1 FROM kg_public_allowed_document pd
+            WHERE pd.document_id = kge.document_id
+        ) OR EXISTS (
+            SELECT 1 FROM kg_user_allowed_document ad
+            WHERE ad.document_id = kge.document_id AND ad.user_id = vu.user_id
+        )
+        """
+    )
+
+    # The readonly user runs the generated KG SQL, so it must be able to read the
+    # views. It is created here if it doesn't exist yet (as in 495cb26ce93e), since
+    # that migration skipped all grants when it didn't. For multi-tenant, it is
+    # created in the alembic_tenants migration.
+    if not MULTI_TENANT:
+        if not (DB_READONLY_USER and DB_READONLY_PASSWORD):
+            raise Exception("DB_READONLY_USER or DB_READONLY_PASSWORD is not set")
+
+        op.execute(
+            sa.text(
+                f"""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT FROM pg_catalog.pg_roles WHERE rolname = '{DB_READONLY_USER}') THEN
+                        EXECUTE format('CREATE USER %I WITH PASSWORD %L', '{DB_READONLY_USER}', '{DB_READONLY_PASSWORD}');
+                        EXECUTE format('REVOKE ALL ON DATABASE %I FROM %I', current_database(), '{DB_READONLY_USER}');
+                        EXECUTE format('GRANT CONNECT ON DATABASE %I TO %I', current_database(), '{DB_READONLY_USER}');
+                    END IF;
+                END
+                $$;
+                """
+            )
+        )
+
+    op.execute(
+        sa.text(
+            f"""
+            DO $$
+            BEGIN
+                EXECUTE format('GRANT USAGE ON SCHEMA %I TO %I', current_schema(), '{DB_READONLY_USER}');
+                EXECUTE format('GRANT SELECT ON kg_relationships_with_access TO %I', '{DB_READONLY_USER}');
+                EXECUTE format('GRANT SELECT ON kg_entities_with_access TO %I', '{DB_READONLY_USER}');
+            END
+            $$;
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS kg_entities_with_access")
+    op.execute("DROP VIEW IF EXISTS kg_relationships_with_access")
+    op.drop_index("ix_kg_entity_time_updated", table_name="kg_entity")
+    op.drop_table("kg_user_allowed_documents_state")
+    op.drop_table("kg_views_user")
+    op.drop_table("kg_public_allowed_documents_state")
+    op.drop_table("kg_public_allowed_document")
+    op.drop_index(
+        "ix_kg_user_allowed_document_document_id",
+        table_name="kg_user_allowed_document",
+    )
+    op.drop_table("kg_user_allowed_document")
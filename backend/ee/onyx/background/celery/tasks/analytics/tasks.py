@@ -0,0 +1,77 @@
+import datetime
+import time
+
+from celery import shared_task
+from celery import Task
+from celery.exceptions import SoftTimeLimitExceeded
+from redis.lock import Lock as RedisLock
+
+from ee.onyx.configs.app_configs import ANALYTICS_ROLLUP_BATCH_DAYS
+from ee.onyx.db.analytics import fetch_days_to_roll_up
+from ee.onyx.db.analytics import roll_up_analytics
+from ee.onyx.db.analytics import store_analytics_rolled_up_until
+from onyx.background.celery.apps.app_base import task_logger
+from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.configs.constants import OnyxRedisLocks
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_pool import redis_lock_dump
+from shared_configs.utils import batch_list
+
+
+@shared_task(
+    name=OnyxCeleryTask.ANALYTICS_ROLLUP_TASK,
+    ignore_result=True,
+    soft_time_limit=JOB_TIMEOUT,
+    bind=True,
+)
+def analytics_rollup_task(self: Task, *, tenant_id: str) -> None:
+    """Brings the daily analytics rollups up to date, up to (excluding) today.
+    The first run backfills all of the history."""
+    time_start = time.monotonic()
+
+    redis_client = get_redis_client()
+    lock_beat: RedisLock = redis_client.lock(
+        OnyxRedisLocks.ANALYTICS_ROLLUP_LOCK,
+        timeout=CELERY_GENERIC_BEAT_LOCK_TIMEOUT,
+    )
+
+    # these tasks should never overlap
+    if not lock_beat.acquire(blocking=False):
+        return
+
+    num_days = 0
+    try:
+        with get_session_with_current_tenant() as db_session:
+            today = datetime.datetime.now(tz=datetime.timezone.utc).date()
+            days = fetch_days_to_roll_up(db_session, today)
+            for batch in batch_list(days, ANALYTICS_ROLLUP_BATCH_DAYS):
+                end_day = batch[-1] + datetime.timedelta(days=1)
+                roll_up_analytics(db_session, batch[0], end_day)
+                store_analytics_rolled_up_until(end_day)
+                num_days += len(batch)
+                lock_beat.reacquire()
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            "Soft time limit exceeded, task is being terminated gracefully."
+        )
+    except Exception:
+        task_logger.exception(
+            f"Unexpected exception during analytics rollup: {tenant_id=}"
+        )
+    finally:
+        if lock_beat.owned():
+            lock_beat.release()
+        else:
+            task_logger.error(
+                f"analytics_rollup_task - Lock not owned on completion: {tenant_id=}"
+            )
+            redis_lock_dump(lock_beat, redis_client)
+
+    time_elapsed = time.monotonic() - time_start
+    task_logger.info(
+        f"analytics_rollup_task finished: {tenant_id=} days={num_days} "
+        f"elapsed={time_elapsed:.2f}"
+    )
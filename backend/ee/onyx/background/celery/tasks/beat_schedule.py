@@ -1,6 +1,7 @@
 from datetime import timedelta
 from typing import Any
 
+from ee.onyx.configs.app_configs import ANALYTICS_ROLLUP_TASK_FREQUENCY_IN_MINUTES
 from ee.onyx.configs.app_configs import CHECK_TTL_MANAGEMENT_TASK_FREQUENCY_IN_HOURS
 from onyx.background.celery.tasks.beat_schedule import (
     beat_cloud_tasks as base_beat_system_tasks,
@@ -21,6 +22,15 @@ from shared_configs.configs import MULTI_TENANT
 ee_beat_system_tasks: list[dict] = []
 
 ee_beat_task_templates: list[dict] = [
+    {
+        "name": "analytics-rollup",
+        "task": OnyxCeleryTask.ANALYTICS_ROLLUP_TASK,
+        "schedule": timedelta(minutes=ANALYTICS_ROLLUP_TASK_FREQUENCY_IN_MINUTES),
+        "options": {
+            "priority": OnyxCeleryPriority.LOW,
+            "expires": BEAT_EXPIRES_DEFAULT,
+        },
+    },
     {
         "name": "autogenerate-usage-report",
         "task": OnyxCeleryTask.AUTOGENERATE_USAGE_REPORT_TASK,
@@ -55,6 +65,15 @@ ee_tasks_to_schedule: list[dict] = []
 
 if not MULTI_TENANT:
     ee_tasks_to_schedule = [
+        {
+            "name": "analytics-rollup",
+            "task": OnyxCeleryTask.ANALYTICS_ROLLUP_TASK,
+            "schedule": timedelta(minutes=ANALYTICS_ROLLUP_TASK_FREQUENCY_IN_MINUTES),
+            "options": {
+                "priority": OnyxCeleryPriority.LOW,
+                "expires": BEAT_EXPIRES_DEFAULT,
+            },
+        },
         {
             "name": "autogenerate-usage-report",
             "task": OnyxCeleryTask.AUTOGENERATE_USAGE_REPORT_TASK,
@@ -22,7 +22,7 @@ from tenacity import stop_after_delay
 from tenacity import wait_random_exponential
 
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
-from ee.onyx.db.document import upsert_document_external_perms
+from ee.onyx.db.document import bulk_upsert_document_external_perms__no_commit
 from ee.onyx.external_permissions.sync_params import get_source_perm_sync_config
 from onyx.access.models import DocExternalAccess
 from onyx.background.celery.apps.app_base import task_logger
@@ -58,7 +58,7 @@ from onyx.db.enums import SyncType
 from onyx.db.models import ConnectorCredentialPair
 from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
-from onyx.db.users import batch_add_ext_perm_user_if_not_exists
+from onyx.db.users import batch_add_ext_perm_users_if_not_exists__no_commit
 from onyx.db.utils import DocumentRow
 from onyx.db.utils import is_retryable_sqlalchemy_error
 from onyx.db.utils import SortOrder
@@ -532,17 +532,14 @@ def connector_permission_sync_generator_task(
                 f"RedisConnector.permissions.generate_tasks starting. cc_pair={cc_pair_id}"
             )
 
-            tasks_generated = 0
-            for doc_external_access in document_external_accesses:
-                redis_connector.permissions.update_db(
-                    lock=lock,
-                    new_permissions=[doc_external_access],
-                    source_string=source_type,
-                    connector_id=cc_pair.connector.id,
-                    credential_id=cc_pair.credential.id,
-                    task_logger=task_logger,
-                )
-                tasks_generated += 1
+            tasks_generated = redis_connector.permissions.update_db(
+                lock=lock,
+                new_permissions=document_external_accesses,
+                source_string=source_type,
+                connector_id=cc_pair.connector.id,
+                credential_id=cc_pair.credential.id,
+                task_logger=task_logger,
+            )
 
             task_logger.info(
                 f"RedisConnector.permissions.generate_tasks finished. "
@@ -574,7 +571,6 @@ def connector_permission_sync_generator_task(
     )
 
 
-# NOTE(rkuo): this should probably move to the db layer
 @retry(
     retry=retry_if_exception(is_retryable_sqlalchemy_error),
     wait=wait_random_exponential(
@@ -582,62 +578,56 @@ def connector_permission_sync_generator_task(
     ),
     stop=stop_after_delay(DOCUMENT_PERMISSIONS_UPDATE_STOP_AFTER),
 )
-def document_update_permissions(
+def document_update_permissions_batch(
     tenant_id: str,
-    permissions: DocExternalAccess,
+    permissions: list[DocExternalAccess],
     source_type_str: str,
     connector_id: int,
     credential_id: int,
-) -> bool:
+) -> int:
+    """Writes the permissions of a batch of documents in a single transaction.
+    Documents whose permissions did not change since the last sync are skipped.
+    Returns the number of documents whose permissions changed."""
     start = time.monotonic()
 
-    doc_id = permissions.doc_id
-    external_access = permissions.external_access
+    with get_session_with_tenant(tenant_id=tenant_id) as db_session:
+        changed, new_doc_ids = bulk_upsert_document_external_perms__no_commit(
+            db_session=db_session,
+            doc_external_accesses=permissions,
+            source_type=DocumentSource(source_type_str),
+        )
 
-    try:
-        with get_session_with_tenant(tenant_id=tenant_id) as db_session:
-            # Add the users to the DB if they don't exist
-            batch_add_ext_perm_user_if_not_exists(
-                db_session=db_session,
-                emails=list(external_access.external_user_emails),
-                continue_on_error=True,
-            )
-            # Then upsert the document's external permissions
-            created_new_doc = upsert_document_external_perms(
+        # Add the users to the DB if they don't exist
+        batch_add_ext_perm_users_if_not_exists__no_commit(
+            db_session=db_session,
+            emails=(
+                email
+                for access in changed
+                for email in access.external_access.external_user_emails
+            ),
+        )
+
+        # new documents need to be associated with the cc_pair
+        if new_doc_ids:
+            upsert_document_by_connector_credential_pair(
                 db_session=db_session,
-                doc_id=doc_id,
-                external_access=external_access,
-                source_type=DocumentSource(source_type_str),
+                connector_id=connector_id,
+                credential_id=credential_id,
+                document_ids=new_doc_ids,
             )
 
-            if created_new_doc:
-                # If a new document was created, we associate it with the cc_pair
-                upsert_document_by_connector_credential_pair(
-                    db_session=db_session,
-                    connector_id=connector_id,
-                    credential_id=credential_id,
-                    document_ids=[doc_id],
-                )
-
-            elapsed = time.monotonic() - start
-            task_logger.info(
-                f"connector_id={connector_id} "
-                f"doc={doc_id} "
-                f"action=update_permissions "
-                f"elapsed={elapsed:.2f}"
-            )
-    except Exception as e:
-        task_logger.exception(
-            f"document_update_permissions exceptioned: "
-            f"connector_id={connector_id} doc_id={doc_id}"
-        )
-        raise e
-    finally:
-        task_logger.info(
-            f"document_update_permissions completed: connector_id={connector_id} doc={doc_id}"
-        )
+        db_session.commit()
 
-    return True
+    elapsed = time.monotonic() - start
+    task_logger.info(
+        f"connector_id={connector_id} "
+        f"docs={len(permissions)} "
+        f"changed={len(changed)} "
+        f"new={len(new_doc_ids)} "
+        f"action=update_permissions_batch "
+        f"elapsed={elapsed:.2f}"
+    )
+    return len(changed)
 
 
 def validate_permission_sync_fences(
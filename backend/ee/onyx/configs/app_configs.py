@@ -116,12 +116,40 @@ SHAREPOINT_PERMISSION_GROUP_SYNC_FREQUENCY = int(
 )
 
 
+#####
+# Post Query Censoring
+#####
+# Access decisions fetched from the source at query time (e.g. Salesforce record
+# access) are reused for this many seconds per (user, object). 0 disables the cache.
+CENSORING_ACCESS_CACHE_TTL_SECONDS = int(
+    os.environ.get("CENSORING_ACCESS_CACHE_TTL_SECONDS") or 60
+)
+CENSORING_ACCESS_CACHE_SIZE = int(
+    os.environ.get("CENSORING_ACCESS_CACHE_SIZE") or 100_000
+)
+
+
 ####
 # Celery Job Frequency
 ####
 CHECK_TTL_MANAGEMENT_TASK_FREQUENCY_IN_HOURS = float(
     os.environ.get("CHECK_TTL_MANAGEMENT_TASK_FREQUENCY_IN_HOURS") or 1
 )  # float for easier testing
+ANALYTICS_ROLLUP_TASK_FREQUENCY_IN_MINUTES = float(
+    os.environ.get("ANALYTICS_ROLLUP_TASK_FREQUENCY_IN_MINUTES") or 60
+)
+
+
+#####
+# Analytics
+#####
+# Feedback can be given on older messages, so the daily rollups of this many past days
+# are recomputed on every run of the rollup task
+ANALYTICS_ROLLUP_RECOMPUTE_DAYS = int(
+    os.environ.get("ANALYTICS_ROLLUP_RECOMPUTE_DAYS") or 7
+)
+# Days rolled up per transaction, mostly relevant for the initial backfill
+ANALYTICS_ROLLUP_BATCH_DAYS = int(os.environ.get("ANALYTICS_ROLLUP_BATCH_DAYS") or 30)
 
 
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
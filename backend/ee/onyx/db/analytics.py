@@ -1,23 +1,222 @@
 import datetime
 from collections.abc import Sequence
+from typing import cast as typing_cast
 from uuid import UUID
 
 from sqlalchemy import and_
 from sqlalchemy import case
-from sqlalchemy import cast
-from sqlalchemy import Date
+from sqlalchemy import ColumnElement
+from sqlalchemy import delete
 from sqlalchemy import func
+from sqlalchemy import insert
 from sqlalchemy import or_
+from sqlalchemy import Select
 from sqlalchemy import select
+from sqlalchemy import union_all
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.orm import Session
 
+from ee.onyx.configs.app_configs import ANALYTICS_ROLLUP_RECOMPUTE_DAYS
+from onyx.configs.constants import KV_ANALYTICS_ROLLED_UP_UNTIL_KEY
 from onyx.configs.constants import MessageType
 from onyx.db.models import ChatMessage
+from onyx.db.models import ChatMessageDailyRollup
 from onyx.db.models import ChatMessageFeedback
 from onyx.db.models import ChatSession
+from onyx.db.models import OnyxbotDailyRollup
 from onyx.db.models import Persona
 from onyx.db.models import User
 from onyx.db.models import UserRole
+from onyx.key_value_store.factory import get_kv_store
+from onyx.key_value_store.interface import KvKeyNotFoundError
+
+_ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+"""
+Daily rollups
+"""
+# The analytics of the days up to "rolled up until" are read from the daily rollup
+# tables (maintained by the analytics rollup task), only the rest of the requested
+# time range is aggregated from the chat messages.
+
+
+def fetch_analytics_rolled_up_until() -> datetime.date | None:
+    try:
+        return datetime.date.fromisoformat(
+            typing_cast(str, get_kv_store().load(KV_ANALYTICS_ROLLED_UP_UNTIL_KEY))
+        )
+    except KvKeyNotFoundError:
+        return None
+
+
+def store_analytics_rolled_up_until(day: datetime.date) -> None:
+    get_kv_store().store(KV_ANALYTICS_ROLLED_UP_UNTIL_KEY, day.isoformat())
+
+
+def _midnight(day: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(
+        day, datetime.time.min, tzinfo=datetime.timezone.utc
+    )
+
+
+def _to_utc(time: datetime.datetime) -> datetime.datetime:
+    """Naive times are taken to be in UTC"""
+    if time.tzinfo is None:
+        return time.replace(tzinfo=datetime.timezone.utc)
+    return time.astimezone(datetime.timezone.utc)
+
+
+def _utc_date(time_column: InstrumentedAttribute[datetime.datetime]) -> ColumnElement:
+    """The UTC day of a timestamp column, independent of the session's time zone"""
+    return func.date(func.timezone("UTC", time_column))
+
+
+def _split_time_range(start: datetime.datetime, end: datetime.datetime) -> tuple[
+    list[tuple[datetime.datetime, datetime.datetime]],
+    tuple[datetime.date, datetime.date] | None,
+]:
+    """Splits [start, end] into the whole days which can be read from the rollups
+    (first day, last day exclusive) and the time ranges (both ends inclusive) which
+    have to be aggregated from the chat messages."""
+    start = _to_utc(start)
+    end = _to_utc(end)
+    rolled_up_until = fetch_analytics_rolled_up_until()
+
+    first_day = start.date()
+    if start != _midnight(first_day):
+        first_day += datetime.timedelta(days=1)
+    end_day = (end + _ONE_MICROSECOND).date()
+    if rolled_up_until is None or min(rolled_up_until, end_day) <= first_day:
+        return [(start, end)], None
+    end_day = min(rolled_up_until, end_day)
+
+    time_ranges = []
+    if start < _midnight(first_day):
+        time_ranges.append((start, _midnight(first_day) - _ONE_MICROSECOND))
+    if _midnight(end_day) <= end:
+        time_ranges.append((_midnight(end_day), end))
+    return time_ranges, (first_day, end_day)
+
+
+def fetch_days_to_roll_up(
+    db_session: Session, today: datetime.date
+) -> list[datetime.date]:
+    rolled_up_until = fetch_analytics_rolled_up_until()
+    if rolled_up_until is None:
+        first_message_time = db_session.scalar(select(func.min(ChatMessage.time_sent)))
+        first_day = _to_utc(first_message_time).date() if first_message_time else today
+    else:
+        first_day = min(rolled_up_until, today) - datetime.timedelta(
+            days=ANALYTICS_ROLLUP_RECOMPUTE_DAYS
+        )
+
+    return [
+        first_day + datetime.timedelta(days=i) for i in range((today - first_day).days)
+    ]
+
+
+def roll_up_analytics(
+    db_session: Session, first_day: datetime.date, end_day: datetime.date
+) -> None:
+    """(Re)computes the daily rollups of the days in [first_day, end_day)"""
+    start = _midnight(first_day)
+    end = _midnight(end_day) - _ONE_MICROSECOND
+
+    db_session.execute(
+        delete(ChatMessageDailyRollup).where(
+            ChatMessageDailyRollup.date >= first_day,
+            ChatMessageDailyRollup.date < end_day,
+        )
+    )
+    db_session.execute(
+        delete(OnyxbotDailyRollup).where(
+            OnyxbotDailyRollup.date >= first_day,
+            OnyxbotDailyRollup.date < end_day,
+        )
+    )
+
+    message_date = _utc_date(ChatMessage.time_sent)
+    db_session.execute(
+        insert(ChatMessageDailyRollup).from_select(
+            [
+                ChatMessageDailyRollup.date,
+                ChatMessageDailyRollup.user_id,
+                ChatMessageDailyRollup.persona_id,
+                ChatMessageDailyRollup.alternate_assistant_id,
+                ChatMessageDailyRollup.message_count,
+                ChatMessageDailyRollup.like_count,
+                ChatMessageDailyRollup.dislike_count,
+            ],
+            select(
+                message_date,
+                ChatSession.user_id,
+                ChatSession.persona_id,
+                ChatMessage.alternate_assistant_id,
+                func.count(func.distinct(ChatMessage.id)),
+                _like_count(),
+                _dislike_count(),
+            )
+            .join(ChatSession, ChatSession.id == ChatMessage.chat_session_id)
+            .join(
+                ChatMessageFeedback,
+                ChatMessageFeedback.chat_message_id == ChatMessage.id,
+                isouter=True,
+            )
+            .where(
+                ChatMessage.time_sent >= start,
+                ChatMessage.time_sent <= end,
+                ChatMessage.message_type == MessageType.ASSISTANT,
+            )
+            .group_by(
+                message_date,
+                ChatSession.user_id,
+                ChatSession.persona_id,
+                ChatMessage.alternate_assistant_id,
+            ),
+        )
+    )
+
+    onyxbot_analytics = _fetch_onyxbot_analytics_from_messages(start, end, db_session)
+    if onyxbot_analytics:
+        db_session.execute(
+            insert(OnyxbotDailyRollup),
+            [
+                {
+                    "date": date,
+                    "session_count": session_count,
+                    "negative_count": negative_count,
+                }
+                for session_count, negative_count, date in onyxbot_analytics
+            ],
+        )
+
+    db_session.commit()
+
+
+def _rolled_up_days_filter(
+    rolled_up_days: tuple[datetime.date, datetime.date],
+) -> ColumnElement[bool]:
+    first_day, end_day = rolled_up_days
+    return and_(
+        ChatMessageDailyRollup.date >= first_day,
+        ChatMessageDailyRollup.date < end_day,
+    )
+
+
+"""
+Analytics
+"""
+
+
+def _like_count() -> ColumnElement[int]:
+    return func.sum(case((ChatMessageFeedback.is_positive, 1), else_=0))
+
+
+def _dislike_count() -> ColumnElement[int]:
+    return func.sum(
+        case((ChatMessageFeedback.is_positive == False, 1), else_=0)  # noqa: E712
+    )
 
 
 def fetch_query_analytics(
@@ -25,34 +224,46 @@ def fetch_query_analytics(
     end: datetime.datetime,
     db_session: Session,
 ) -> Sequence[tuple[int, int, int, datetime.date]]:
-    stmt = (
-        select(
-            func.count(ChatMessage.id),
-            func.sum(case((ChatMessageFeedback.is_positive, 1), else_=0)),
-            func.sum(
-                case(
-                    (ChatMessageFeedback.is_positive == False, 1), else_=0  # noqa: E712
-                )
-            ),
-            cast(ChatMessage.time_sent, Date),
-        )
-        .join(
-            ChatMessageFeedback,
-            ChatMessageFeedback.chat_message_id == ChatMessage.id,
-            isouter=True,
+    time_ranges, rolled_up_days = _split_time_range(start, end)
+
+    rows: list[tuple[int, int, int, datetime.date]] = []
+    for range_start, range_end in time_ranges:
+        message_date = _utc_date(ChatMessage.time_sent)
+        stmt = (
+            select(
+                func.count(func.distinct(ChatMessage.id)),
+                _like_count(),
+                _dislike_count(),
+                message_date,
+            )
+            .join(
+                ChatMessageFeedback,
+                ChatMessageFeedback.chat_message_id == ChatMessage.id,
+                isouter=True,
+            )
+            .where(
+                ChatMessage.time_sent >= range_start,
+                ChatMessage.time_sent <= range_end,
+                ChatMessage.message_type == MessageType.ASSISTANT,
+            )
+            .group_by(message_date)
         )
-        .where(
-            ChatMessage.time_sent >= start,
-        )
-        .where(
-            ChatMessage.time_sent <= end,
+        rows.extend(tuple(row) for row in db_session.execute(stmt).all())  # type: ignore
+
+    if rolled_up_days:
+        rollup_stmt = (
+            select(
+                func.sum(ChatMessageDailyRollup.message_count),
+                func.sum(ChatMessageDailyRollup.like_count),
+                func.sum(ChatMessageDailyRollup.dislike_count),
+                ChatMessageDailyRollup.date,
+            )
+            .where(_rolled_up_days_filter(rolled_up_days))
+            .group_by(ChatMessageDailyRollup.date)
         )
-        .where(ChatMessage.message_type == MessageType.ASSISTANT)
-        .group_by(cast(ChatMessage.time_sent, Date))
-        .order_by(cast(ChatMessage.time_sent, Date))
-    )
+        rows.extend(tuple(row) for row in db_session.execute(rollup_stmt).all())  # type: ignore
 
-    return db_session.execute(stmt).all()  # type: ignore
+    return sorted(rows, key=lambda row: row[3])
 
 
 def fetch_per_user_query_analytics(
@@ -60,31 +271,49 @@ def fetch_per_user_query_analytics(
     end: datetime.datetime,
     db_session: Session,
 ) -> Sequence[tuple[int, int, int, datetime.date, UUID]]:
-    stmt = (
-        select(
-            func.count(ChatMessage.id),
-            func.sum(case((ChatMessageFeedback.is_positive, 1), else_=0)),
-            func.sum(
-                case(
-                    (ChatMessageFeedback.is_positive == False, 1), else_=0  # noqa: E712
-                )
-            ),
-            cast(ChatMessage.time_sent, Date),
-            ChatSession.user_id,
+    time_ranges, rolled_up_days = _split_time_range(start, end)
+
+    rows: list[tuple[int, int, int, datetime.date, UUID]] = []
+    for range_start, range_end in time_ranges:
+        message_date = _utc_date(ChatMessage.time_sent)
+        stmt = (
+            select(
+                func.count(func.distinct(ChatMessage.id)),
+                _like_count(),
+                _dislike_count(),
+                message_date,
+                ChatSession.user_id,
+            )
+            .join(ChatSession, ChatSession.id == ChatMessage.chat_session_id)
+            .join(
+                ChatMessageFeedback,
+                ChatMessageFeedback.chat_message_id == ChatMessage.id,
+                isouter=True,
+            )
+            .where(
+                ChatMessage.time_sent >= range_start,
+                ChatMessage.time_sent <= range_end,
+                ChatMessage.message_type == MessageType.ASSISTANT,
+            )
+            .group_by(message_date, ChatSession.user_id)
         )
-        .join(ChatSession, ChatSession.id == ChatMessage.chat_session_id)
-        .where(
-            ChatMessage.time_sent >= start,
-        )
-        .where(
-            ChatMessage.time_sent <= end,
+        rows.extend(tuple(row) for row in db_session.execute(stmt).all())  # type: ignore
+
+    if rolled_up_days:
+        rollup_stmt = (
+            select(
+                func.sum(ChatMessageDailyRollup.message_count),
+                func.sum(ChatMessageDailyRollup.like_count),
+                func.sum(ChatMessageDailyRollup.dislike_count),
+                ChatMessageDailyRollup.date,
+                ChatMessageDailyRollup.user_id,
+            )
+            .where(_rolled_up_days_filter(rolled_up_days))
+            .group_by(ChatMessageDailyRollup.date, ChatMessageDailyRollup.user_id)
         )
-        .where(ChatMessage.message_type == MessageType.ASSISTANT)
-        .group_by(cast(ChatMessage.time_sent, Date), ChatSession.user_id)
-        .order_by(cast(ChatMessage.time_sent, Date), ChatSession.user_id)
-    )
+        rows.extend(tuple(row) for row in db_session.execute(rollup_stmt).all())  # type: ignore
 
-    return db_session.execute(stmt).all()  # type: ignore
+    return sorted(rows, key=lambda row: (row[3], str(row[4])))
 
 
 def fetch_onyxbot_analytics(
@@ -98,6 +327,35 @@ def fetch_onyxbot_analytics(
     Number of instances of Negative feedback OR Needing additional help
         (only counting the last feedback)
     """
+    time_ranges, rolled_up_days = _split_time_range(start, end)
+
+    rows: list[tuple[int, int, datetime.date]] = []
+    for range_start, range_end in time_ranges:
+        rows.extend(
+            _fetch_onyxbot_analytics_from_messages(range_start, range_end, db_session)
+        )
+
+    if rolled_up_days:
+        first_day, end_day = rolled_up_days
+        rollup_stmt = select(
+            OnyxbotDailyRollup.session_count,
+            OnyxbotDailyRollup.negative_count,
+            OnyxbotDailyRollup.date,
+        ).where(
+            OnyxbotDailyRollup.date >= first_day,
+            OnyxbotDailyRollup.date < end_day,
+        )
+        rows.extend(tuple(row) for row in db_session.execute(rollup_stmt).all())  # type: ignore
+
+    return sorted(rows, key=lambda row: row[2])
+
+
+def _fetch_onyxbot_analytics_from_messages(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    db_session: Session,
+) -> Sequence[tuple[int, int, datetime.date]]:
+    """See fetch_onyxbot_analytics, ignoring the rollups"""
     # Get every chat session in the time range which is a Onyxbot flow
     # along with the first Assistant message which is the response to the user question.
     # Generally there should not be more than one AI message per chat session of this type
@@ -147,7 +405,7 @@ def fetch_onyxbot_analytics(
                     else_=0,
                 )
             ).label("negative_answer"),
-            cast(ChatSession.time_created, Date).label("session_date"),
+            _utc_date(ChatSession.time_created).label("session_date"),
         )
         .join(
             subquery_first_ai_response,
@@ -168,44 +426,95 @@ def fetch_onyxbot_analytics(
             ChatMessageFeedback,
             ChatMessageFeedback.id == subquery_last_feedback.c.max_feedback_id,
         )
-        .group_by(cast(ChatSession.time_created, Date))
-        .order_by(cast(ChatSession.time_created, Date))
+        .group_by(_utc_date(ChatSession.time_created))
+        .order_by(_utc_date(ChatSession.time_created))
         .all()
     )
 
     return [tuple(row) for row in results]
 
 
-def fetch_persona_message_analytics(
+def _persona_filter(persona_id: int) -> ColumnElement[bool]:
+    return or_(
+        ChatMessage.alternate_assistant_id == persona_id,
+        ChatSession.persona_id == persona_id,
+    )
+
+
+def _rolled_up_persona_filter(persona_id: int) -> ColumnElement[bool]:
+    return or_(
+        ChatMessageDailyRollup.alternate_assistant_id == persona_id,
+        ChatMessageDailyRollup.persona_id == persona_id,
+    )
+
+
+def _fetch_persona_daily_counts(
     db_session: Session,
     persona_id: int,
     start: datetime.datetime,
     end: datetime.datetime,
+    unique_users: bool,
 ) -> list[tuple[int, datetime.date]]:
-    """Gets the daily message counts for a specific persona within the given time range."""
-    query = (
-        select(
-            func.count(ChatMessage.id),
-            cast(ChatMessage.time_sent, Date),
+    """Daily message counts (or unique user counts) of a persona"""
+    time_ranges, rolled_up_days = _split_time_range(start, end)
+
+    rows: list[tuple[int, datetime.date]] = []
+    for range_start, range_end in time_ranges:
+        message_date = _utc_date(ChatMessage.time_sent)
+        query = (
+            select(
+                (
+                    func.count(func.distinct(ChatSession.user_id))
+                    if unique_users
+                    else func.count(ChatMessage.id)
+                ),
+                message_date,
+            )
+            .join(
+                ChatSession,
+                ChatMessage.chat_session_id == ChatSession.id,
+            )
+            .where(
+                _persona_filter(persona_id),
+                ChatMessage.time_sent >= range_start,
+                ChatMessage.time_sent <= range_end,
+                ChatMessage.message_type == MessageType.ASSISTANT,
+            )
+            .group_by(message_date)
         )
-        .join(
-            ChatSession,
-            ChatMessage.chat_session_id == ChatSession.id,
+        rows.extend(tuple(row) for row in db_session.execute(query).all())  # type: ignore
+
+    if rolled_up_days:
+        rollup_query = (
+            select(
+                (
+                    func.count(func.distinct(ChatMessageDailyRollup.user_id))
+                    if unique_users
+                    else func.sum(ChatMessageDailyRollup.message_count)
+                ),
+                ChatMessageDailyRollup.date,
+            )
+            .where(
+                _rolled_up_persona_filter(persona_id),
+                _rolled_up_days_filter(rolled_up_days),
+            )
+            .group_by(ChatMessageDailyRollup.date)
         )
-        .where(
-            or_(
-                ChatMessage.alternate_assistant_id == persona_id,
-                ChatSession.persona_id == persona_id,
-            ),
-            ChatMessage.time_sent >= start,
-            ChatMessage.time_sent <= end,
-            ChatMessage.message_type == MessageType.ASSISTANT,
-        )
-        .group_by(cast(ChatMessage.time_sent, Date))
-        .order_by(cast(ChatMessage.time_sent, Date))
-    )
+        rows.extend(tuple(row) for row in db_session.execute(rollup_query).all())  # type: ignore
+
+    return sorted(rows, key=lambda row: row[1])
 
-    return [tuple(row) for row in db_session.execute(query).all()]
+
+def fetch_persona_message_analytics(
+    db_session: Session,
+    persona_id: int,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> list[tuple[int, datetime.date]]:
+    """Gets the daily message counts for a specific persona within the given time range."""
+    return _fetch_persona_daily_counts(
+        db_session, persona_id, start, end, unique_users=False
+    )
 
 
 def fetch_persona_unique_users(
@@ -215,30 +524,10 @@ def fetch_persona_unique_users(
     end: datetime.datetime,
 ) -> list[tuple[int, datetime.date]]:
     """Gets the daily unique user counts for a specific persona within the given time range."""
-    query = (
-        select(
-            func.count(func.distinct(ChatSession.user_id)),
-            cast(ChatMessage.time_sent, Date),
-        )
-        .join(
-            ChatSession,
-            ChatMessage.chat_session_id == ChatSession.id,
-        )
-        .where(
-            or_(
-                ChatMessage.alternate_assistant_id == persona_id,
-                ChatSession.persona_id == persona_id,
-            ),
-            ChatMessage.time_sent >= start,
-            ChatMessage.time_sent <= end,
-            ChatMessage.message_type == MessageType.ASSISTANT,
-        )
-        .group_by(cast(ChatMessage.time_sent, Date))
-        .order_by(cast(ChatMessage.time_sent, Date))
+    return _fetch_persona_daily_counts(
+        db_session, persona_id, start, end, unique_users=True
     )
 
-    return [tuple(row) for row in db_session.execute(query).all()]
-
 
 def fetch_assistant_message_analytics(
     db_session: Session,
@@ -249,30 +538,10 @@ def fetch_assistant_message_analytics(
     """
     Gets the daily message counts for a specific assistant in the given time range.
     """
-    query = (
-        select(
-            func.count(ChatMessage.id),
-            cast(ChatMessage.time_sent, Date),
-        )
-        .join(
-            ChatSession,
-            ChatMessage.chat_session_id == ChatSession.id,
-        )
-        .where(
-            or_(
-                ChatMessage.alternate_assistant_id == assistant_id,
-                ChatSession.persona_id == assistant_id,
-            ),
-            ChatMessage.time_sent >= start,
-            ChatMessage.time_sent <= end,
-            ChatMessage.message_type == MessageType.ASSISTANT,
-        )
-        .group_by(cast(ChatMessage.time_sent, Date))
-        .order_by(cast(ChatMessage.time_sent, Date))
+    return _fetch_persona_daily_counts(
+        db_session, assistant_id, start, end, unique_users=False
     )
 
-    return [tuple(row) for row in db_session.execute(query).all()]
-
 
 def fetch_assistant_unique_users(
     db_session: Session,
@@ -283,30 +552,10 @@ def fetch_assistant_unique_users(
     """
     Gets the daily unique user counts for a specific assistant in the given time range.
     """
-    query = (
-        select(
-            func.count(func.distinct(ChatSession.user_id)),
-            cast(ChatMessage.time_sent, Date),
-        )
-        .join(
-            ChatSession,
-            ChatMessage.chat_session_id == ChatSession.id,
-        )
-        .where(
-            or_(
-                ChatMessage.alternate_assistant_id == assistant_id,
-                ChatSession.persona_id == assistant_id,
-            ),
-            ChatMessage.time_sent >= start,
-            ChatMessage.time_sent <= end,
-            ChatMessage.message_type == MessageType.ASSISTANT,
-        )
-        .group_by(cast(ChatMessage.time_sent, Date))
-        .order_by(cast(ChatMessage.time_sent, Date))
+    return _fetch_persona_daily_counts(
+        db_session, assistant_id, start, end, unique_users=True
     )
 
-    return [tuple(row) for row in db_session.execute(query).all()]
-
 
 def fetch_assistant_unique_users_total(
     db_session: Session,
@@ -318,23 +567,35 @@ def fetch_assistant_unique_users_total(
     Gets the total number of distinct users who have sent or received messages from
     the specified assistant in the given time range.
     """
-    query = (
-        select(func.count(func.distinct(ChatSession.user_id)))
+    time_ranges, rolled_up_days = _split_time_range(start, end)
+
+    user_id_queries: list[Select] = [
+        select(ChatSession.user_id.label("user_id"))
         .select_from(ChatMessage)
         .join(
             ChatSession,
             ChatMessage.chat_session_id == ChatSession.id,
         )
         .where(
-            or_(
-                ChatMessage.alternate_assistant_id == assistant_id,
-                ChatSession.persona_id == assistant_id,
-            ),
-            ChatMessage.time_sent >= start,
-            ChatMessage.time_sent <= end,
+            _persona_filter(assistant_id),
+            ChatMessage.time_sent >= range_start,
+            ChatMessage.time_sent <= range_end,
             ChatMessage.message_type == MessageType.ASSISTANT,
         )
-    )
+        for range_start, range_end in time_ranges
+    ]
+    if rolled_up_days:
+        user_id_queries.append(
+            select(ChatMessageDailyRollup.user_id.label("user_id")).where(
+                _rolled_up_persona_filter(assistant_id),
+                _rolled_up_days_filter(rolled_up_days),
+            )
+        )
+
+    user_ids = (
+        user_id_queries[0] if len(user_id_queries) == 1 else union_all(*user_id_queries)
+    ).subquery()
+    query = select(func.count(func.distinct(user_ids.c.user_id)))
 
     result = db_session.execute(query).scalar()
     return result if result else 0
@@ -1,9 +1,14 @@
+from collections.abc import Iterable
+from collections.abc import Sequence
 from datetime import datetime
 from datetime import timezone
+from typing import Any
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from onyx.access.models import DocExternalAccess
 from onyx.access.models import ExternalAccess
 from onyx.access.utils import build_ext_group_name_for_onyx
 from onyx.configs.constants import DocumentSource
@@ -101,3 +106,96 @@ def upsert_document_external_perms(
         db_session.commit()
 
     return False
+
+
+def _external_perms_fingerprint(
+    external_user_emails: Iterable[str],
+    external_user_group_ids: Iterable[str],
+    is_public: bool,
+) -> tuple[frozenset[str], frozenset[str], bool]:
+    return (
+        frozenset(external_user_emails),
+        frozenset(external_user_group_ids),
+        is_public,
+    )
+
+
+def bulk_upsert_document_external_perms__no_commit(
+    db_session: Session,
+    doc_external_accesses: Sequence[DocExternalAccess],
+    source_type: DocumentSource,
+) -> tuple[list[DocExternalAccess], list[str]]:
+    """Set based version of upsert_document_external_perms for a batch of documents.
+
+    Reads the stored permissions of the whole batch with one query, skips documents
+    whose permissions fingerprint has not changed and writes the rest with a single
+    INSERT ... ON CONFLICT DO UPDATE. Documents that don't exist yet are created so
+    that the permissions are already there once they get indexed.
+
+    Returns the changed doc accesses and the IDs of the newly created documents.
+    NOTE: this will replace any existing external access, it will not do a union"""
+    # if a document shows up more than once, the last permissions win
+    accesses_by_id = {access.doc_id: access for access in doc_external_accesses}
+    if not accesses_by_id:
+        return [], []
+
+    existing_fingerprints = {
+        doc_id: _external_perms_fingerprint(emails or [], group_ids or [], is_public)
+        for doc_id, emails, group_ids, is_public in db_session.execute(
+            select(
+                DbDocument.id,
+                DbDocument.external_user_emails,
+                DbDocument.external_user_group_ids,
+                DbDocument.is_public,
+            ).where(DbDocument.id.in_(accesses_by_id.keys()))
+        )
+    }
+
+    changed: list[DocExternalAccess] = []
+    rows: list[dict[str, Any]] = []
+    for doc_id, access in accesses_by_id.items():
+        prefixed_external_groups = {
+            build_ext_group_name_for_onyx(ext_group_name=group_id, source=source_type)
+            for group_id in access.external_access.external_user_group_ids
+        }
+        fingerprint = _external_perms_fingerprint(
+            access.external_access.external_user_emails,
+            prefixed_external_groups,
+            access.external_access.is_public,
+        )
+        if existing_fingerprints.get(doc_id) == fingerprint:
+            continue
+
+        changed.append(access)
+        rows.append(
+            {
+                "id": doc_id,
+                "semantic_id": "",
+                "external_user_emails": sorted(
+                    access.external_access.external_user_emails
+                ),
+                "external_user_group_ids": sorted(prefixed_external_groups),
+                "is_public": access.external_access.is_public,
+            }
+        )
+
+    if not rows:
+        return [], []
+
+    insert_stmt = insert(DbDocument).values(rows)
+    # the upsert function in the indexing pipeline does not overwrite the permissions
+    # fields and this one only touches the permissions fields of existing documents
+    db_session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[DbDocument.id],
+            set_={
+                "external_user_emails": insert_stmt.excluded.external_user_emails,
+                "external_user_group_ids": insert_stmt.excluded.external_user_group_ids,
+                "is_public": insert_stmt.excluded.is_public,
+                "last_modified": datetime.now(timezone.utc),
+            },
+        )
+    )
+
+    new_doc_ids = [row["id"] for row in rows if row["id"] not in existing_fingerprints]
+    return changed, new_doc_ids
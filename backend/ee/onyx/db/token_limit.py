@@ -1,4 +1,5 @@
 from collections.abc import Sequence
+from uuid import UUID
 
 from sqlalchemy import exists
 from sqlalchemy import Row
@@ -130,3 +131,15 @@ def fetch_user_group_token_rate_limits_for_user(
         stmt = stmt.order_by(TokenRateLimit.created_at.desc())
 
     return db_session.scalars(stmt).all()
+
+
+def fetch_user_group_ids_for_token_usage(
+    db_session: Session, user_id: UUID
+) -> list[int]:
+    return list(
+        db_session.scalars(
+            select(User__UserGroup.user_group_id).where(
+                User__UserGroup.user_id == user_id
+            )
+        ).all()
+    )
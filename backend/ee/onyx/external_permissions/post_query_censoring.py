@@ -1,11 +1,15 @@
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
+from ee.onyx.external_permissions.perm_sync_types import CensoringFuncType
 from ee.onyx.external_permissions.sync_params import get_all_censoring_enabled_sources
 from ee.onyx.external_permissions.sync_params import get_source_perm_sync_config
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.pipeline import InferenceChunk
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.models import User
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import get_config_snapshot
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
@@ -21,14 +25,36 @@ def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     indexed that chunk is not sync. This was done to avoid getting the cc_pair
     for every single chunk.
     """
-    all_censoring_enabled_sources = get_all_censoring_enabled_sources()
-    with get_session_with_current_tenant() as db_session:
-        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
-        return {
-            cc_pair.connector.source
-            for cc_pair in enabled_sync_connectors
-            if cc_pair.connector.source in all_censoring_enabled_sources
-        }
+
+    def _load() -> set[DocumentSource]:
+        all_censoring_enabled_sources = get_all_censoring_enabled_sources()
+        with get_session_with_current_tenant() as db_session:
+            enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
+            return {
+                cc_pair.connector.source
+                for cc_pair in enabled_sync_connectors
+                if cc_pair.connector.source in all_censoring_enabled_sources
+            }
+
+    return get_config_snapshot(ConfigSnapshotKind.CENSORING_SOURCES, None, _load)
+
+
+def _censor_chunks_for_source(
+    source: DocumentSource,
+    censor_chunks_for_source: CensoringFuncType,
+    chunks_for_source: list[InferenceChunk],
+    user_email: str,
+) -> list[InferenceChunk] | None:
+    """Returns None if censoring failed, in which case none of the chunks of the source
+    may be shown."""
+    try:
+        return censor_chunks_for_source(chunks_for_source, user_email)
+    except Exception as e:
+        logger.exception(
+            f"Failed to censor chunks for source {source} so throwing out all"
+            f" chunks for this source and continuing: {e}"
+        )
+        return None
 
 
 # NOTE: This is only called if ee is enabled.
@@ -57,23 +83,31 @@ def _post_query_chunk_censoring(
             final_chunk_dict[chunk.unique_id] = chunk
 
     # For each source, filter out the chunks using the permission
-    # check function for that source
-    # TODO: Use a threadpool/multiprocessing to process the sources in parallel
-    for source, chunks_for_source in chunks_to_process.items():
+    # check function for that source. Sources are independent (and their checks
+    # usually wait on an external API), so they are censored in parallel.
+    censor_funcs: dict[DocumentSource, CensoringFuncType] = {}
+    for source in chunks_to_process:
         sync_config = get_source_perm_sync_config(source)
         if sync_config is None or sync_config.censoring_config is None:
             raise ValueError(f"No sync config found for {source}")
+        censor_funcs[source] = sync_config.censoring_config.chunk_censoring_func
 
-        censor_chunks_for_source = sync_config.censoring_config.chunk_censoring_func
-        try:
-            censored_chunks = censor_chunks_for_source(chunks_for_source, user.email)
-        except Exception as e:
-            logger.exception(
-                f"Failed to censor chunks for source {source} so throwing out all"
-                f" chunks for this source and continuing: {e}"
-            )
-            continue
+    censoring_calls = [
+        (
+            _censor_chunks_for_source,
+            (source, censor_funcs[source], chunks_for_source, user.email),
+        )
+        for source, chunks_for_source in chunks_to_process.items()
+    ]
+    if len(censoring_calls) > 1:
+        censored_chunks_per_source = run_functions_tuples_in_parallel(censoring_calls)
+    else:
+        # no need for a thread when there is only one source to censor
+        censored_chunks_per_source = [func(*args) for func, args in censoring_calls]
 
+    for censored_chunks in censored_chunks_per_source:
+        if censored_chunks is None:
+            continue
         for censored_chunk in censored_chunks:
             final_chunk_dict[censored_chunk.unique_id] = censored_chunk
 
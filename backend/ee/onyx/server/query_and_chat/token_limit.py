@@ -1,7 +1,6 @@
 from collections import defaultdict
 from collections.abc import Sequence
 from datetime import datetime
-from itertools import groupby
 from typing import Dict
 from typing import List
 from typing import Tuple
@@ -22,6 +21,8 @@ from onyx.db.models import User
 from onyx.db.models import User__UserGroup
 from onyx.db.models import UserGroup
 from onyx.db.token_limit import fetch_all_user_token_rate_limits
+from onyx.redis.redis_token_usage import fetch_token_usage
+from onyx.redis.redis_token_usage import TokenUsageScope
 from onyx.server.query_and_chat.token_limit import _get_cutoff_time
 from onyx.server.query_and_chat.token_limit import _is_rate_limited
 from onyx.server.query_and_chat.token_limit import _user_is_rate_limited_by_global
@@ -60,7 +61,16 @@ def _user_is_rate_limited(user_id: UUID) -> None:
 
         if user_rate_limits:
             user_cutoff_time = _get_cutoff_time(user_rate_limits)
-            user_usage = _fetch_user_usage(user_id, user_cutoff_time, db_session)
+            user_usage = fetch_token_usage(
+                TokenUsageScope.USER,
+                [str(user_id)],
+                user_cutoff_time,
+                lambda scope_ids: {
+                    str(user_id): _fetch_user_usage(
+                        user_id, user_cutoff_time, db_session
+                    )
+                },
+            )[str(user_id)]
 
             if _is_rate_limited(user_rate_limits, user_usage):
                 raise HTTPException(
@@ -73,7 +83,8 @@ def _fetch_user_usage(
     user_id: UUID, cutoff_time: datetime, db_session: Session
 ) -> Sequence[tuple[datetime, int]]:
     """
-    Fetch user usage within the cutoff time, grouped by minute
+    Fetch user usage within the cutoff time, grouped by minute.
+    Used to reconcile the token usage counters in Redis.
     """
     result = db_session.execute(
         select(
@@ -105,14 +116,23 @@ def _user_is_rate_limited_by_group(user_id: UUID) -> None:
                 [e for sublist in group_rate_limits.values() for e in sublist]
             )
 
-            user_group_ids = list(group_rate_limits.keys())
-            group_usage = _fetch_user_group_usage(
-                user_group_ids, group_cutoff_time, db_session
+            group_usage = fetch_token_usage(
+                TokenUsageScope.USER_GROUP,
+                [str(user_group_id) for user_group_id in group_rate_limits],
+                group_cutoff_time,
+                lambda scope_ids: {
+                    str(user_group_id): usage
+                    for user_group_id, usage in _fetch_user_group_usage(
+                        [int(scope_id) for scope_id in scope_ids],
+                        group_cutoff_time,
+                        db_session,
+                    ).items()
+                },
             )
 
             has_at_least_one_untriggered_limit = False
             for user_group_id, rate_limits in group_rate_limits.items():
-                usage = group_usage.get(user_group_id, [])
+                usage = group_usage.get(str(user_group_id), [])
 
                 if not _is_rate_limited(rate_limits, usage):
                     has_at_least_one_untriggered_limit = True
@@ -161,7 +181,8 @@ def _fetch_user_group_usage(
     user_group_ids: list[int], cutoff_time: datetime, db_session: Session
 ) -> dict[int, list[Tuple[datetime, int]]]:
     """
-    Fetch user group usage within the cutoff time, grouped by minute
+    Fetch user group usage within the cutoff time, grouped by minute.
+    Used to reconcile the token usage counters in Redis.
     """
     user_group_usage = db_session.execute(
         select(
@@ -176,9 +197,9 @@ def _fetch_user_group_usage(
         .group_by(func.date_trunc("minute", ChatMessage.time_sent), UserGroup.id)
     ).all()
 
-    return {
-        user_group_id: [(usage, time_sent) for time_sent, usage, _ in group_usage]
-        for user_group_id, group_usage in groupby(
-            user_group_usage, key=lambda row: row[2]
-        )
-    }
+    # rows are not ordered by group, so they can't just be grouped with groupby
+    usage_by_group: dict[int, list[Tuple[datetime, int]]] = defaultdict(list)
+    for token_count, time_sent, user_group_id in user_group_usage:
+        usage_by_group[user_group_id].append((time_sent, token_count))
+
+    return usage_by_group
@@ -43,6 +43,8 @@ from onyx.llm.llm_provider_options import ANTHROPIC_VISIBLE_MODEL_NAMES
 from onyx.llm.llm_provider_options import OPEN_AI_MODEL_NAMES
 from onyx.llm.llm_provider_options import OPEN_AI_VISIBLE_MODEL_NAMES
 from onyx.llm.llm_provider_options import OPENAI_PROVIDER_NAME
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import invalidate_config_snapshot
 from onyx.server.manage.embedding.models import CloudEmbeddingProviderCreationRequest
 from onyx.server.manage.llm.models import LLMProviderUpsertRequest
 from onyx.server.manage.llm.models import ModelConfigurationUpsertRequest
@@ -353,6 +355,7 @@ def configure_default_api_keys(db_session: Session) -> None:
                 current_search_settings.query_prefix = ""
                 current_search_settings.passage_prefix = ""
                 db_session.commit()
+                invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
             else:
                 raise RuntimeError(
                     "No search settings specified, DB is not in a valid state"
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Generic
+from typing import TypeVar
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+K = TypeVar("K", bound=Hashable)
+C = TypeVar("C")
+
+
+@dataclass
+class _PoolEntry(Generic[C]):
+    client: C
+    last_used: float
+    in_use: int = 0
+
+
+class AsyncClientPool(Generic[K, C]):
+    """Keeps long lived clients around between requests so that their connection pools
+    (and TLS sessions) are reused. Clients that have not been used for max_idle_seconds
+    are closed, as are the least recently used idle clients once there are more than
+    max_size of them. Clients are never closed while a request is using them.
+
+    Asyncio primitives and httpx clients are bound to the event loop they were created
+    on, so the pool starts over if it is used from a different loop."""
+
+    def __init__(
+        self,
+        close_client: Callable[[C], Awaitable[None]],
+        max_idle_seconds: float,
+        max_size: int,
+    ) -> None:
+        self.close_client = close_client
+        self.max_idle_seconds = max_idle_seconds
+        self.max_size = max_size
+        self._entries: dict[K, _PoolEntry[C]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        entries, self._entries = self._entries, {}
+        self._loop = loop
+        # the connections of these clients belonged to the previous loop, closing
+        # them may fail but still releases whatever isn't bound to it
+        for entry in entries.values():
+            try:
+                await self.close_client(entry.client)
+            except Exception:
+                logger.debug(
+                    "Failed to close pooled client of a previous event loop",
+                    exc_info=True,
+                )
+
+    @asynccontextmanager
+    async def acquire(self, key: K, create_client: Callable[[], C]) -> AsyncIterator[C]:
+        await self._check_loop()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _PoolEntry(client=create_client(), last_used=time.monotonic())
+            self._entries[key] = entry
+
+        entry.in_use += 1
+        try:
+            await self.evict_idle()
+            yield entry.client
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    async def evict_idle(self) -> None:
+        now = time.monotonic()
+        idle = sorted(
+            (
+                (entry.last_used, key)
+                for key, entry in self._entries.items()
+                if entry.in_use == 0
+            ),
+            key=lambda item: item[0],
+        )
+
+        num_over_capacity = len(self._entries) - self.max_size
+        evicted: list[_PoolEntry[C]] = []
+        for last_used, key in idle:
+            if now - last_used < self.max_idle_seconds and num_over_capacity <= 0:
+                break
+            evicted.append(self._entries.pop(key))
+            num_over_capacity -= 1
+
+        for entry in evicted:
+            try:
+                await self.close_client(entry.client)
+            except Exception:
+                logger.exception("Failed to close pooled client")
+
+    async def aclose(self) -> None:
+        entries, self._entries = self._entries, {}
+        for entry in entries.values():
+            try:
+                await self.close_client(entry.client)
+            except Exception:
+                logger.exception("Failed to close pooled client")
+
+
+class AsyncTokenBucket:
+    """Allows bursts of up to capacity acquisitions, refilled at rate per second.
+    Only meant to be used from a single event loop (no awaits between checking and
+    taking tokens, so no lock is needed)."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._last_refill) * self.rate
+        )
+        self._last_refill = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class RequestLimiter:
+    """Caps the number of concurrent requests and, optionally, the request rate.
+    A max_concurrency or requests_per_second of 0 disables that limit."""
+
+    def __init__(self, max_concurrency: int, requests_per_second: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self._semaphore: asyncio.Semaphore | None = None
+        self._token_bucket: AsyncTokenBucket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        self._loop = loop
+        self._semaphore = (
+            asyncio.Semaphore(self.max_concurrency)
+            if self.max_concurrency > 0
+            else None
+        )
+        self._token_bucket = (
+            AsyncTokenBucket(
+                rate=self.requests_per_second,
+                capacity=max(1.0, self.requests_per_second),
+            )
+            if self.requests_per_second > 0
+            else None
+        )
+
+    @asynccontextmanager
+    async def limit(self) -> AsyncIterator[None]:
+        self._check_loop()
+        if self._token_bucket is not None:
+            await self._token_bucket.acquire()
+
+        if self._semaphore is None:
+            yield
+            return
+
+        async with self._semaphore:
+            yield
@@ -1,6 +1,9 @@
 import asyncio
+import hashlib
 import json
 import time
+from collections.abc import Sequence
+from functools import partial
 from types import TracebackType
 from typing import Any
 from typing import cast
@@ -15,6 +18,7 @@ from cohere import AsyncClient as CohereAsyncClient
 from fastapi import APIRouter
 from fastapi import HTTPException
 from fastapi import Request
+from fastapi import Response
 from google.oauth2 import service_account  # type: ignore
 from litellm import aembedding
 from litellm.exceptions import RateLimitError
@@ -24,19 +28,32 @@ from sentence_transformers import SentenceTransformer  # type: ignore
 from vertexai.language_models import TextEmbeddingInput  # type: ignore
 from vertexai.language_models import TextEmbeddingModel  # type: ignore
 
+from model_server.client_pool import AsyncClientPool
+from model_server.client_pool import RequestLimiter
 from model_server.constants import DEFAULT_COHERE_MODEL
 from model_server.constants import DEFAULT_OPENAI_MODEL
 from model_server.constants import DEFAULT_VERTEX_MODEL
 from model_server.constants import DEFAULT_VOYAGE_MODEL
 from model_server.constants import EmbeddingModelTextType
 from model_server.constants import EmbeddingProvider
+from model_server.micro_batching import MicroBatcher
 from model_server.utils import pass_aws_key
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
+from shared_configs.configs import CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT
+from shared_configs.configs import CLOUD_EMBEDDING_MAX_CONCURRENT_REQUESTS
+from shared_configs.configs import CLOUD_EMBEDDING_MAX_POOLED_CLIENTS
+from shared_configs.configs import CLOUD_EMBEDDING_REQUESTS_PER_SECOND
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import LOCAL_MODEL_BATCH_MAX_WAIT_MS
+from shared_configs.configs import LOCAL_MODEL_MAX_BATCH_SIZE
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
+from shared_configs.embedding_transport import binary_transport_from_headers
+from shared_configs.embedding_transport import EMBEDDING_DTYPE_HEADER
+from shared_configs.embedding_transport import EMBEDDINGS_MEDIA_TYPE
+from shared_configs.embedding_transport import encode_embeddings
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import Embedding
@@ -138,16 +155,24 @@ class CloudEmbedding:
         self._closed = False
         self.sanitized_api_key = api_key[:4] + "********" + api_key[-4:]
 
+        # provider SDK clients are created on first use and then reused for as long
+        # as this object lives (see _CLOUD_EMBEDDING_POOL)
+        self._openai_client: openai.AsyncOpenAI | None = None
+        self._cohere_client: CohereAsyncClient | None = None
+        self._voyage_client: voyageai.AsyncClient | None = None
+
     async def _embed_openai(
         self, texts: list[str], model: str | None, reduced_dimension: int | None
     ) -> list[Embedding]:
         if not model:
             model = DEFAULT_OPENAI_MODEL
 
-        # Use the OpenAI specific timeout for this one
-        client = openai.AsyncOpenAI(
-            api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
-        )
+        if self._openai_client is None:
+            # Use the OpenAI specific timeout for this one
+            self._openai_client = openai.AsyncOpenAI(
+                api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
+            )
+        client = self._openai_client
 
         final_embeddings: list[Embedding] = []
 
@@ -168,7 +193,11 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_COHERE_MODEL
 
-        client = CohereAsyncClient(api_key=self.api_key)
+        if self._cohere_client is None:
+            self._cohere_client = CohereAsyncClient(
+                api_key=self.api_key, httpx_client=self.http_client
+            )
+        client = self._cohere_client
 
         final_embeddings: list[Embedding] = []
         for text_batch in batch_list(texts, _COHERE_MAX_INPUT_LEN):
@@ -189,9 +218,11 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_VOYAGE_MODEL
 
-        client = voyageai.AsyncClient(
-            api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
-        )
+        if self._voyage_client is None:
+            self._voyage_client = voyageai.AsyncClient(
+                api_key=self.api_key, timeout=API_BASED_EMBEDDING_TIMEOUT
+            )
+        client = self._voyage_client
 
         response = await client.embed(
             texts=texts,
@@ -345,9 +376,15 @@ class CloudEmbedding:
 
     async def aclose(self) -> None:
         """Explicitly close the client."""
-        if not self._closed:
+        if self._closed:
+            return
+
+        self._closed = True
+        try:
+            if self._openai_client is not None:
+                await self._openai_client.close()
+        finally:
             await self.http_client.aclose()
-            self._closed = True
 
     async def __aenter__(self) -> "CloudEmbedding":
         return self
@@ -368,6 +405,34 @@ class CloudEmbedding:
             )
 
 
+async def _close_cloud_embedding(cloud_embedding: CloudEmbedding) -> None:
+    await cloud_embedding.aclose()
+
+
+# Keyed by (provider, api key hash, api url, api version)
+_CLOUD_EMBEDDING_POOL: AsyncClientPool[
+    tuple[EmbeddingProvider, str, str | None, str | None], CloudEmbedding
+] = AsyncClientPool(
+    close_client=_close_cloud_embedding,
+    max_idle_seconds=CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT,
+    max_size=CLOUD_EMBEDDING_MAX_POOLED_CLIENTS,
+)
+_PROVIDER_LIMITERS: dict[EmbeddingProvider, RequestLimiter] = {}
+
+
+def _get_provider_limiter(provider: EmbeddingProvider) -> RequestLimiter:
+    if provider not in _PROVIDER_LIMITERS:
+        _PROVIDER_LIMITERS[provider] = RequestLimiter(
+            max_concurrency=CLOUD_EMBEDDING_MAX_CONCURRENT_REQUESTS,
+            requests_per_second=CLOUD_EMBEDDING_REQUESTS_PER_SECOND,
+        )
+    return _PROVIDER_LIMITERS[provider]
+
+
+async def close_cloud_embedding_clients() -> None:
+    await _CLOUD_EMBEDDING_POOL.aclose()
+
+
 def get_embedding_model(
     model_name: str,
     max_context_length: int,
@@ -405,25 +470,60 @@ def get_local_reranking_model(
     return _RERANK_MODEL
 
 
-ENCODING_RETRIES = 3
-ENCODING_RETRY_DELAY = 0.1
+def _encode_batch(
+    model_name: str, options: tuple[int, bool], texts: list[str]
+) -> Sequence[Any]:
+    max_context_length, normalize_embeddings = options
+    model = get_embedding_model(
+        model_name=model_name, max_context_length=max_context_length
+    )
+    return list(
+        model.encode(
+            texts, normalize_embeddings=normalize_embeddings, batch_size=len(texts)
+        )
+    )
 
 
-def _concurrent_embedding(
-    texts: list[str], model: "SentenceTransformer", normalize_embeddings: bool
-) -> Any:
-    """Synchronous wrapper for concurrent_embedding to use with run_in_executor."""
-    for _ in range(ENCODING_RETRIES):
-        try:
-            return model.encode(texts, normalize_embeddings=normalize_embeddings)
-        except RuntimeError as e:
-            # There is a concurrency bug in the SentenceTransformer library that causes
-            # the model to fail to encode texts. It's pretty rare and we want to allow
-            # concurrent embedding, hence we retry (the specific error is
-            # "RuntimeError: Already borrowed" and occurs in the transformers library)
-            logger.error(f"Error encoding texts, retrying: {e}")
-            time.sleep(ENCODING_RETRY_DELAY)
-    return model.encode(texts, normalize_embeddings=normalize_embeddings)
+def _rerank_batch(
+    model_name: str, _: None, pairs: list[tuple[str, str]]
+) -> Sequence[float]:
+    cross_encoder = get_local_reranking_model(model_name)
+    return cross_encoder.predict(pairs, batch_size=len(pairs)).tolist()  # type: ignore
+
+
+# One batcher (and so one thread) per local model, this also avoids the
+# "RuntimeError: Already borrowed" errors the tokenizers raise when a model is
+# used from several threads at once
+_EMBEDDING_BATCHERS: dict[str, MicroBatcher[tuple[int, bool], str, Any]] = {}
+_RERANK_BATCHERS: dict[str, MicroBatcher[None, tuple[str, str], float]] = {}
+
+
+def _get_embedding_batcher(
+    model_name: str,
+) -> MicroBatcher[tuple[int, bool], str, Any]:
+    if model_name not in _EMBEDDING_BATCHERS:
+        _EMBEDDING_BATCHERS[model_name] = MicroBatcher(
+            name=f"embed-{model_name}",
+            process_batch=partial(_encode_batch, model_name),
+            item_length=len,
+            max_batch_size=LOCAL_MODEL_MAX_BATCH_SIZE,
+            max_wait_seconds=LOCAL_MODEL_BATCH_MAX_WAIT_MS / 1000,
+        )
+    return _EMBEDDING_BATCHERS[model_name]
+
+
+def _get_rerank_batcher(
+    model_name: str,
+) -> MicroBatcher[None, tuple[str, str], float]:
+    if model_name not in _RERANK_BATCHERS:
+        _RERANK_BATCHERS[model_name] = MicroBatcher(
+            name=f"rerank-{model_name}",
+            process_batch=partial(_rerank_batch, model_name),
+            item_length=lambda pair: len(pair[0]) + len(pair[1]),
+            max_batch_size=LOCAL_MODEL_MAX_BATCH_SIZE,
+            max_wait_seconds=LOCAL_MODEL_BATCH_MAX_WAIT_MS / 1000,
+        )
+    return _RERANK_BATCHERS[model_name]
 
 
 @simple_log_function_time()
@@ -472,12 +572,21 @@ async def embed_text(
                 "Cloud models take an explicit text type instead."
             )
 
-        async with CloudEmbedding(
-            api_key=api_key,
-            provider=provider_type,
-            api_url=api_url,
-            api_version=api_version,
-        ) as cloud_model:
+        pool_key = (
+            provider_type,
+            hashlib.sha256(api_key.encode()).hexdigest(),
+            api_url,
+            api_version,
+        )
+        async with _CLOUD_EMBEDDING_POOL.acquire(
+            pool_key,
+            lambda: CloudEmbedding(
+                api_key=api_key,
+                provider=provider_type,
+                api_url=api_url,
+                api_version=api_version,
+            ),
+        ) as cloud_model, _get_provider_limiter(provider_type).limit():
             embeddings = await cloud_model.embed(
                 texts=texts,
                 model_name=model_name,
@@ -508,15 +617,10 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
-        )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: _concurrent_embedding(
-                prefixed_texts, local_model, normalize_embeddings
-            ),
+        # Run CPU-bound embedding on the model's own thread, batched together with
+        # other requests that arrive at the same time
+        embeddings_vectors = await _get_embedding_batcher(model_name).submit(
+            (max_context_length, normalize_embeddings), prefixed_texts
         )
         embeddings = [
             embedding if isinstance(embedding, list) else embedding.tolist()
@@ -547,11 +651,8 @@ async def embed_text(
 
 @simple_log_function_time()
 async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
-    cross_encoder = get_local_reranking_model(model_name)
-    # Run CPU-bound reranking in a thread pool
-    return await asyncio.get_event_loop().run_in_executor(
-        None,
-        lambda: cross_encoder.predict([(query, doc) for doc in docs]).tolist(),  # type: ignore
+    return await _get_rerank_batcher(model_name).submit(
+        None, [(query, doc) for doc in docs]
     )
 
 
@@ -626,12 +727,25 @@ async def litellm_rerank(
         ]
 
 
-@router.post("/bi-encoder-embed")
+@router.post("/bi-encoder-embed", response_model=EmbedResponse)
 async def route_bi_encoder_embed(
     request: Request,
     embed_request: EmbedRequest,
-) -> EmbedResponse:
-    return await process_embed_request(embed_request, request.app.state.gpu_type)
+) -> EmbedResponse | Response:
+    embed_response = await process_embed_request(
+        embed_request, request.app.state.gpu_type
+    )
+
+    transport = binary_transport_from_headers(
+        accept=request.headers.get("accept"),
+        requested_dtype=request.headers.get(EMBEDDING_DTYPE_HEADER),
+    )
+    if transport is None:
+        return embed_response
+
+    # skips JSON encoding of the (potentially hundreds of thousands of) floats
+    content, headers = encode_embeddings(embed_response.embeddings, transport)
+    return Response(content=content, media_type=EMBEDDINGS_MEDIA_TYPE, headers=headers)
 
 
 async def process_embed_request(
@@ -0,0 +1,145 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+G = TypeVar("G", bound=Hashable)
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class _BatchJob(Generic[G, T, R]):
+    group_key: G
+    items: list[T]
+    future: Future[list[R]]
+
+
+class MicroBatcher(Generic[G, T, R]):
+    """Coalesces concurrent requests against one model into shared batches.
+
+    All model calls happen on a single owner thread, so the model (and its tokenizer)
+    is never used concurrently. Once a request arrives, the owner thread waits up to
+    max_wait_seconds for more to come in (or until max_batch_size items are queued),
+    then runs everything it collected. Items are only batched together with items
+    of the same group_key (e.g. the same normalization setting) and are sorted by
+    item_length before being cut into batches, so that similarly sized inputs are
+    padded together."""
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[G, list[T]], Sequence[R]],
+        item_length: Callable[[T], int],
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self.name = name
+        self.process_batch = process_batch
+        self.item_length = item_length
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max_wait_seconds
+
+        self._queue: queue.SimpleQueue[_BatchJob[G, T, R]] = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"micro-batcher-{name}", daemon=True
+        )
+        self._thread.start()
+
+    async def submit(self, group_key: G, items: list[T]) -> list[R]:
+        future: Future[list[R]] = Future()
+        self._queue.put(_BatchJob(group_key=group_key, items=items, future=future))
+        return await asyncio.wrap_future(future)
+
+    def _collect_jobs(self) -> list[_BatchJob[G, T, R]]:
+        jobs = [self._queue.get()]
+        num_items = len(jobs[0].items)
+        deadline = time.monotonic() + self.max_wait_seconds
+        while num_items < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                job = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            jobs.append(job)
+            num_items += len(job.items)
+
+        # requests whose caller went away in the meantime are skipped
+        return [job for job in jobs if job.future.set_running_or_notify_cancel()]
+
+    def _process_items(self, group_key: G, items: list[T]) -> list[R]:
+        order = sorted(range(len(items)), key=lambda i: self.item_length(items[i]))
+        results: list[Any] = [None] * len(items)
+        for start in range(0, len(order), self.max_batch_size):
+            indices = order[start : start + self.max_batch_size]
+            outputs = self.process_batch(group_key, [items[i] for i in indices])
+            if len(outputs) != len(indices):
+                raise ValueError(
+                    f"Batch of {len(indices)} inputs produced {len(outputs)} outputs"
+                )
+            for index, output in zip(indices, outputs):
+                results[index] = output
+        return results
+
+    def _process_jobs(self, jobs: list[_BatchJob[G, T, R]]) -> None:
+        jobs_by_group: dict[G, list[_BatchJob[G, T, R]]] = defaultdict(list)
+        for job in jobs:
+            jobs_by_group[job.group_key].append(job)
+
+        for group_key, group_jobs in jobs_by_group.items():
+            items = [item for job in group_jobs for item in job.items]
+            try:
+                results = self._process_items(group_key, items)
+            except Exception as e:
+                if len(group_jobs) == 1:
+                    group_jobs[0].future.set_exception(e)
+                    continue
+
+                # don't fail every request in the batch because of a single one
+                logger.warning(
+                    f"{self.name}: batch of {len(group_jobs)} requests failed, "
+                    f"retrying them one by one: {e}"
+                )
+                for job in group_jobs:
+                    try:
+                        job.future.set_result(self._process_items(group_key, job.items))
+                    except Exception as job_error:
+                        job.future.set_exception(job_error)
+                continue
+
+            offset = 0
+            for job in group_jobs:
+                job.future.set_result(results[offset : offset + len(job.items)])
+                offset += len(job.items)
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._collect_jobs()
+            if not jobs:
+                continue
+
+            try:
+                self._process_jobs(jobs)
+            except Exception as e:
+                # should not happen, but never leave a caller waiting forever
+                logger.exception(f"{self.name}: unexpected batching error")
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(e)
@@ -13,7 +13,6 @@ class KGQuestionEntityExtractionResult(BaseModel):
 
 
 class KGViewNames(BaseModel):
-    allowed_docs_view_name: str
     kg_relationships_view_name: str
     kg_entity_view_name: str
 
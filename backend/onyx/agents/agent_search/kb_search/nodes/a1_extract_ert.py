@@ -26,8 +26,7 @@ from onyx.agents.agent_search.shared_graph_utils.utils import (
 from onyx.configs.kg_configs import KG_ENTITY_EXTRACTION_TIMEOUT
 from onyx.configs.kg_configs import KG_RELATIONSHIP_EXTRACTION_TIMEOUT
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
-from onyx.db.kg_temp_view import create_views
-from onyx.db.kg_temp_view import get_user_view_names
+from onyx.db.kg_allowed_documents import refresh_kg_user_allowed_documents
 from onyx.db.relationships import get_allowed_relationship_type_pairs
 from onyx.kg.utils.extraction_utils import get_entity_types_str
 from onyx.kg.utils.extraction_utils import get_relationship_types_str
@@ -35,7 +34,6 @@ from onyx.prompts.kg_prompts import QUERY_ENTITY_EXTRACTION_PROMPT
 from onyx.prompts.kg_prompts import QUERY_RELATIONSHIP_EXTRACTION_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_with_timeout
-from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -64,6 +62,7 @@ def extract_ert(
     elif graph_config.tooling.search_tool.user is None:
         raise ValueError("User is not set")
     else:
+        user_id = graph_config.tooling.search_tool.user.id
         user_email = graph_config.tooling.search_tool.user.email
         user_name = user_email.split("@")[0] or "unknown"
 
@@ -80,18 +79,10 @@ def extract_ert(
     # Now specify core activities in the step (step 1)
     stream_write_step_activities(writer, _KG_STEP_NR)
 
-    # Create temporary views. TODO: move into parallel step, if ultimately materialized
-    tenant_id = get_current_tenant_id()
-    kg_views = get_user_view_names(user_email, tenant_id)
+    # Bring the documents the user can access up to date, the entity normalization
+    # and the generated SQL only see those
     with get_session_with_current_tenant() as db_session:
-        create_views(
-            db_session,
-            tenant_id=tenant_id,
-            user_email=user_email,
-            allowed_docs_view_name=kg_views.allowed_docs_view_name,
-            kg_relationships_view_name=kg_views.kg_relationships_view_name,
-            kg_entity_view_name=kg_views.kg_entity_view_name,
-        )
+        refresh_kg_user_allowed_documents(db_session, user_id, user_email)
 
     ### get the entities, terms, and filters
 
@@ -252,9 +243,6 @@ Entities: {extracted_entity_string} - \n Relationships: {extracted_relationship_
         extracted_entities_no_attributes=entities_no_attributes,
         extracted_relationships=relationship_extraction_result.relationships,
         time_filter=entity_extraction_result.time_filter,
-        kg_doc_temp_view_name=kg_views.allowed_docs_view_name,
-        kg_rel_temp_view_name=kg_views.kg_relationships_view_name,
-        kg_entity_temp_view_name=kg_views.kg_entity_view_name,
         log_messages=[
             get_langgraph_node_log_string(
                 graph_component="main",
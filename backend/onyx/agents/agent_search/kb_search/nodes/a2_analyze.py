@@ -142,6 +142,11 @@ def analyze(
 
     graph_config = cast(GraphConfig, config["metadata"]["config"])
     question = graph_config.inputs.prompt_builder.raw_user_query
+    if graph_config.tooling.search_tool is None:
+        raise ValueError("Search tool is not set")
+    elif graph_config.tooling.search_tool.user is None:
+        raise ValueError("User is not set")
+    user_id = graph_config.tooling.search_tool.user.id
     entities = (
         state.extracted_entities_no_attributes
     )  # attribute knowledge is not required for this step
@@ -157,7 +162,7 @@ def analyze(
     normalized_entities = normalize_entities(
         entities,
         state.extracted_entities_w_attributes,
-        allowed_docs_temp_view_name=state.kg_doc_temp_view_name,
+        user_id=user_id,
     )
 
     normalized_relationships = normalize_relationships(
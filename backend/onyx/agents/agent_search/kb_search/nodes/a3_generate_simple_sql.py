@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 from typing import Any
 from typing import cast
@@ -26,11 +27,10 @@ from onyx.configs.kg_configs import KG_MAX_DEEP_SEARCH_RESULTS
 from onyx.configs.kg_configs import KG_SQL_GENERATION_MAX_TOKENS
 from onyx.configs.kg_configs import KG_SQL_GENERATION_TIMEOUT
 from onyx.configs.kg_configs import KG_SQL_GENERATION_TIMEOUT_OVERRIDE
-from onyx.configs.kg_configs import KG_TEMP_ALLOWED_DOCS_VIEW_NAME_PREFIX
-from onyx.configs.kg_configs import KG_TEMP_KG_ENTITIES_VIEW_NAME_PREFIX
-from onyx.configs.kg_configs import KG_TEMP_KG_RELATIONSHIPS_VIEW_NAME_PREFIX
-from onyx.db.engine.sql_engine import get_db_readonly_user_session_with_current_tenant
-from onyx.db.kg_temp_view import drop_views
+from onyx.db.kg_allowed_documents import get_kg_view_names
+from onyx.db.kg_allowed_documents import get_kg_views_session
+from onyx.db.kg_allowed_documents import KG_ENTITIES_VIEW_NAME
+from onyx.db.kg_allowed_documents import KG_RELATIONSHIPS_VIEW_NAME
 from onyx.llm.interfaces import LLM
 from onyx.prompts.kg_prompts import ENTITY_SOURCE_DETECTION_PROMPT
 from onyx.prompts.kg_prompts import SIMPLE_ENTITY_SQL_PROMPT
@@ -39,42 +39,45 @@ from onyx.prompts.kg_prompts import SIMPLE_SQL_PROMPT
 from onyx.prompts.kg_prompts import SOURCE_DETECTION_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_with_timeout
+from shared_configs.contextvars import get_current_tenant_id
 
 
 logger = setup_logger()
 
 
 def _raise_error_if_sql_fails_problem_test(
-    sql_statement: str, relationship_view_name: str, entity_view_name: str | None
+    sql_statement: str, relationship_view_name: str, entity_view_name: str
 ) -> bool:
     """
     Check if the SQL statement is valid.
     """
 
-    if entity_view_name is None:
-        raise ValueError("entity_view_name is not set for sql_statement")
-
-    authorized_user_specification = relationship_view_name[
-        len(KG_TEMP_KG_RELATIONSHIPS_VIEW_NAME_PREFIX) :
-    ]
-
     # remove the proper relationship and entity view names
     base_sql_statement = sql_statement.replace(relationship_view_name, " ").replace(
         entity_view_name, " "
     )
 
-    # check whether other non-authorized relationship or entity viewnames are in sql_statement
+    # check whether the views of other tenants are in sql_statement
     if any(
         view_name in base_sql_statement
-        for view_name in [
-            KG_TEMP_ALLOWED_DOCS_VIEW_NAME_PREFIX,
-            KG_TEMP_KG_RELATIONSHIPS_VIEW_NAME_PREFIX,
-            KG_TEMP_KG_ENTITIES_VIEW_NAME_PREFIX,
-        ]
+        for view_name in [KG_RELATIONSHIPS_VIEW_NAME, KG_ENTITIES_VIEW_NAME]
     ):
         raise ValueError(
-            f"SQL statement would attempt to access unauthorized views: {sql_statement} for \
-user specification {authorized_user_specification}"
+            f"SQL statement would attempt to access unauthorized views: {sql_statement}"
+        )
+
+    # only a single query may be run
+    query = base_sql_statement.strip().rstrip(";").upper()
+    if not re.match(r"(SELECT|WITH)\b", query) or ";" in query:
+        raise ValueError(f"SQL statement is not a single query: {sql_statement}")
+
+    # nothing the SQL changes outlives it and the user of the views can't be changed
+    # from within it (see get_kg_views_session), this is only for reporting
+    if re.search(r"\b(SET|RESET)\b", query) or "SET_CONFIG" in re.sub(
+        r'["\s]', "", query
+    ):
+        raise ValueError(
+            f"SQL statement would attempt to change settings: {sql_statement}"
         )
 
     # check whether the sql statement would attempt to do unauthorized operations
@@ -126,7 +129,6 @@ def _get_source_documents(
     sql_statement: str,
     llm: LLM,
     focus: str | None,
-    allowed_docs_view_name: str,
     kg_relationships_view_name: str,
 ) -> str | None:
     """
@@ -195,14 +197,6 @@ def generate_simple_sql(
 
     single_doc_id = state.single_doc_id
 
-    if state.kg_doc_temp_view_name is None:
-        raise ValueError("kg_doc_temp_view_name is not set")
-    if state.kg_rel_temp_view_name is None:
-        raise ValueError("kg_rel_temp_view_name is not set")
-
-    if state.kg_entity_temp_view_name is None:
-        raise ValueError("kg_entity_temp_view_name is not set")
-
     sql_statement_display: str | None = None
 
     ## STEP 3 - articulate goals
@@ -214,6 +208,7 @@ def generate_simple_sql(
     elif graph_config.tooling.search_tool.user is None:
         raise ValueError("User is not set")
     else:
+        user_id = graph_config.tooling.search_tool.user.id
         user_email = graph_config.tooling.search_tool.user.email
         user_name = user_email.split("@")[0]
 
@@ -259,9 +254,9 @@ def generate_simple_sql(
             state.entity_normalization_map
         )
 
-        doc_temp_view = state.kg_doc_temp_view_name
-        rel_temp_view = state.kg_rel_temp_view_name
-        ent_temp_view = state.kg_entity_temp_view_name
+        kg_views = get_kg_view_names(get_current_tenant_id())
+        rel_view = kg_views.kg_relationships_view_name
+        ent_view = kg_views.kg_entity_view_name
 
         if state.query_type == KGRelationshipDetection.NO_RELATIONSHIPS.value:
             simple_sql_prompt = (
@@ -316,8 +311,8 @@ def generate_simple_sql(
             )
             sql_statement = sql_statement.split(";")[0].strip() + ";"
             sql_statement = sql_statement.replace("sql", "").strip()
-            sql_statement = sql_statement.replace("relationship_table", rel_temp_view)
-            sql_statement = sql_statement.replace("entity_table", ent_temp_view)
+            sql_statement = sql_statement.replace("relationship_table", rel_view)
+            sql_statement = sql_statement.replace("entity_table", ent_view)
 
             reasoning = (
                 cleaned_response.split("<reasoning>")[1]
@@ -328,12 +323,6 @@ def generate_simple_sql(
         except Exception as e:
             # TODO: restructure with broader node rework
             logger.error(f"Error in SQL generation: {e}")
-
-            drop_views(
-                allowed_docs_view_name=doc_temp_view,
-                kg_relationships_view_name=rel_temp_view,
-                kg_entity_view_name=ent_temp_view,
-            )
             raise e
 
         if state.query_type == KGRelationshipDetection.RELATIONSHIPS.value:
@@ -374,24 +363,14 @@ def generate_simple_sql(
                 logger.error(
                     f"Error in generating the sql correction: {e}. Original model response: {cleaned_response}"
                 )
-
-                drop_views(
-                    allowed_docs_view_name=doc_temp_view,
-                    kg_relationships_view_name=rel_temp_view,
-                    kg_entity_view_name=ent_temp_view,
-                )
-
                 raise e
 
         # display sql statement with view names replaced by general view names
         sql_statement_display = sql_statement.replace(
-            state.kg_doc_temp_view_name, "<your_allowed_docs_view_name>"
-        )
-        sql_statement_display = sql_statement_display.replace(
-            state.kg_rel_temp_view_name, "<your_relationship_view_name>"
+            rel_view, "<your_relationship_view_name>"
         )
         sql_statement_display = sql_statement_display.replace(
-            state.kg_entity_temp_view_name, "<your_entity_view_name>"
+            ent_view, "<your_entity_view_name>"
         )
 
         logger.debug(f"A3 - sql_statement after correction: {sql_statement_display}")
@@ -408,29 +387,25 @@ def generate_simple_sql(
                 sql_statement,
                 llm=primary_llm,
                 focus=state.query_type,
-                allowed_docs_view_name=doc_temp_view,
-                kg_relationships_view_name=rel_temp_view,
+                kg_relationships_view_name=rel_view,
             )
 
-            if source_documents_sql and ent_temp_view:
+            if source_documents_sql and ent_view:
                 source_documents_sql = source_documents_sql.replace(
-                    "entity_table", ent_temp_view
+                    "entity_table", ent_view
                 )
 
-            if source_documents_sql and rel_temp_view:
+            if source_documents_sql and rel_view:
                 source_documents_sql = source_documents_sql.replace(
-                    "relationship_table", rel_temp_view
+                    "relationship_table", rel_view
                 )
 
             if source_documents_sql:
                 source_documents_sql_display = source_documents_sql.replace(
-                    state.kg_doc_temp_view_name, "<your_allowed_docs_view_name>"
+                    rel_view, "<your_relationship_view_name>"
                 )
                 source_documents_sql_display = source_documents_sql_display.replace(
-                    state.kg_rel_temp_view_name, "<your_relationship_view_name>"
-                )
-                source_documents_sql_display = source_documents_sql_display.replace(
-                    state.kg_entity_temp_view_name, "<your_entity_view_name>"
+                    ent_view, "<your_entity_view_name>"
                 )
             else:
                 source_documents_sql_display = "(No source documents SQL generated)"
@@ -441,11 +416,9 @@ def generate_simple_sql(
         query_results = None
 
         # check sql, just in case
-        _raise_error_if_sql_fails_problem_test(
-            sql_statement, rel_temp_view, ent_temp_view
-        )
+        _raise_error_if_sql_fails_problem_test(sql_statement, rel_view, ent_view)
 
-        with get_db_readonly_user_session_with_current_tenant() as db_session:
+        with get_kg_views_session(user_id) as db_session:
             try:
                 result = db_session.execute(text(sql_statement))
                 # Handle scalar results (like COUNT)
@@ -463,12 +436,6 @@ def generate_simple_sql(
             except Exception as e:
                 # TODO: raise error on frontend
                 logger.error(f"Error executing SQL query: {e}")
-                drop_views(
-                    allowed_docs_view_name=doc_temp_view,
-                    kg_relationships_view_name=rel_temp_view,
-                    kg_entity_view_name=ent_temp_view,
-                )
-
                 raise e
 
         source_document_results = None
@@ -477,11 +444,10 @@ def generate_simple_sql(
 
             # check source document sql, just in case
             _raise_error_if_sql_fails_problem_test(
-                source_documents_sql, rel_temp_view, ent_temp_view
+                source_documents_sql, rel_view, ent_view
             )
 
-            with get_db_readonly_user_session_with_current_tenant() as db_session:
-
+            with get_kg_views_session(user_id) as db_session:
                 try:
                     result = db_session.execute(text(source_documents_sql))
                     rows = result.fetchall()
@@ -492,13 +458,6 @@ def generate_simple_sql(
                     ]
                 except Exception as e:
                     # TODO: raise error on frontend
-
-                    drop_views(
-                        allowed_docs_view_name=doc_temp_view,
-                        kg_relationships_view_name=rel_temp_view,
-                        kg_entity_view_name=ent_temp_view,
-                    )
-
                     logger.error(f"Error executing Individualized SQL query: {e}")
 
         else:
@@ -514,12 +473,6 @@ def generate_simple_sql(
             else:
                 source_document_results = None
 
-        drop_views(
-            allowed_docs_view_name=doc_temp_view,
-            kg_relationships_view_name=rel_temp_view,
-            kg_entity_view_name=ent_temp_view,
-        )
-
         logger.debug(f"A3 - Number of query_results: {len(query_results)}")
 
         # Stream out reasoning and SQL query
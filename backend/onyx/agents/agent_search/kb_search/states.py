@@ -127,9 +127,6 @@ class ERTExtractionUpdate(LoggerUpdate):
     extracted_entities_no_attributes: list[str] = []
     extracted_relationships: list[str] = []
     time_filter: str | None = None
-    kg_doc_temp_view_name: str | None = None
-    kg_rel_temp_view_name: str | None = None
-    kg_entity_temp_view_name: str | None = None
 
 
 class ResultsDataUpdate(LoggerUpdate):
@@ -14,6 +14,7 @@ from celery.signals import worker_shutdown
 import onyx.background.celery.apps.app_base as app_base
 from onyx.configs.constants import POSTGRES_CELERY_WORKER_DOCPROCESSING_APP_NAME
 from onyx.db.engine.sql_engine import SqlEngine
+from onyx.indexing.chunker import shutdown_chunking_pools
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
 
@@ -87,6 +88,7 @@ def on_worker_ready(sender: Any, **kwargs: Any) -> None:
 
 @worker_shutdown.connect
 def on_worker_shutdown(sender: Any, **kwargs: Any) -> None:
+    shutdown_chunking_pools()
     app_base.on_worker_shutdown(sender, **kwargs)
 
 
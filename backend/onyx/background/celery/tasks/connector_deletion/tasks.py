@@ -50,6 +50,8 @@ from onyx.db.sync_record import cleanup_sync_records
 from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
 from onyx.db.tag import delete_orphan_tags__no_commit
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import invalidate_config_snapshot
 from onyx.redis.redis_connector import RedisConnector
 from onyx.redis.redis_connector_delete import RedisConnectorDelete
 from onyx.redis.redis_connector_delete import RedisConnectorDeletePayload
@@ -507,6 +509,9 @@ def monitor_connector_deletion_taskset(
                 )
                 db_session.delete(connector)
             db_session.commit()
+            invalidate_config_snapshot(
+                ConfigSnapshotKind.CENSORING_SOURCES, tenant_id=tenant_id
+            )
 
             update_sync_record_status(
                 db_session=db_session,
@@ -21,10 +21,15 @@ from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
 from onyx.background.celery.celery_utils import extract_ids_from_runnable_connector
+from onyx.background.celery.celery_utils import (
+    iter_id_batches_from_runnable_connector,
+)
 from onyx.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEFAULT
 from onyx.background.celery.tasks.docprocessing.utils import IndexingCallbackBase
 from onyx.configs.app_configs import ALLOW_SIMULTANEOUS_PRUNING
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import PRUNING_STREAMING_DIFF
+from onyx.configs.app_configs import PRUNING_STREAMING_RUN_SIZE
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT
@@ -36,12 +41,16 @@ from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.configs.constants import OnyxRedisSignals
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.interfaces import BaseConnector
 from onyx.connectors.models import InputType
 from onyx.db.connector import mark_ccpair_as_pruned
 from onyx.db.connector_credential_pair import get_connector_credential_pair
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
-from onyx.db.document import get_documents_for_connector_credential_pair
+from onyx.db.document import get_document_ids_for_connector_credential_pair
+from onyx.db.document import (
+    iter_sorted_document_ids_for_connector_credential_pair,
+)
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import SyncStatus
@@ -57,6 +66,8 @@ from onyx.redis.redis_pool import get_redis_client
 from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.server.runtime.onyx_runtime import OnyxRuntime
 from onyx.server.utils import make_short_id
+from onyx.utils.external_sort import sorted_difference
+from onyx.utils.external_sort import SortedStringSpill
 from onyx.utils.logger import format_error_for_logging
 from onyx.utils.logger import LoggerContextVars
 from onyx.utils.logger import pruning_ctx
@@ -525,37 +536,48 @@ def connector_pruning_generator_task(
                 r,
             )
 
-            # a list of docs in the source
-            all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
-                runnable_connector, callback
-            )
-
-            # a list of docs in our local index
-            all_indexed_document_ids = {
-                doc.id
-                for doc in get_documents_for_connector_credential_pair(
+            if PRUNING_STREAMING_DIFF:
+                tasks_generated = _generate_prune_tasks_streaming(
+                    redis_connector=redis_connector,
+                    runnable_connector=runnable_connector,
+                    callback=callback,
+                    celery_app=self.app,
                     db_session=db_session,
                     connector_id=connector_id,
                     credential_id=credential_id,
                 )
-            }
+            else:
+                # a list of docs in the source
+                all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
+                    runnable_connector, callback
+                )
 
-            # generate list of docs to remove (no longer in the source)
-            doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
+                # a list of docs in our local index
+                all_indexed_document_ids = set(
+                    get_document_ids_for_connector_credential_pair(
+                        db_session=db_session,
+                        connector_id=connector_id,
+                        credential_id=credential_id,
+                    )
+                )
 
-            task_logger.info(
-                "Pruning set collected: "
-                f"cc_pair={cc_pair_id} "
-                f"connector_source={cc_pair.connector.source} "
-                f"docs_to_remove={len(doc_ids_to_remove)}"
-            )
+                # generate list of docs to remove (no longer in the source)
+                doc_ids_to_remove = all_indexed_document_ids - all_connector_doc_ids
+
+                task_logger.info(
+                    "Pruning set collected: "
+                    f"cc_pair={cc_pair_id} "
+                    f"connector_source={cc_pair.connector.source} "
+                    f"docs_to_remove={len(doc_ids_to_remove)}"
+                )
+
+                task_logger.info(
+                    f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
+                )
+                tasks_generated = redis_connector.prune.generate_tasks(
+                    doc_ids_to_remove, self.app, db_session, None
+                )
 
-            task_logger.info(
-                f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
-            )
-            tasks_generated = redis_connector.prune.generate_tasks(
-                set(doc_ids_to_remove), self.app, db_session, None
-            )
             if tasks_generated is None:
                 return None
 
@@ -583,6 +605,50 @@ def connector_pruning_generator_task(
     )
 
 
+def _generate_prune_tasks_streaming(
+    redis_connector: RedisConnector,
+    runnable_connector: BaseConnector,
+    callback: PruneCallback,
+    celery_app: Celery,
+    db_session: Session,
+    connector_id: int,
+    credential_id: int,
+) -> int | None:
+    """Same result as diffing the full sets of source and indexed document IDs, with
+    memory bounded by PRUNING_STREAMING_RUN_SIZE. The source IDs are spilled to sorted
+    runs on disk and merged against the indexed IDs, which Postgres streams in the
+    same order."""
+    with SortedStringSpill(run_size=PRUNING_STREAMING_RUN_SIZE) as connector_doc_ids:
+        for doc_batch_ids in iter_id_batches_from_runnable_connector(
+            runnable_connector, callback
+        ):
+            connector_doc_ids.add(doc_batch_ids)
+
+        task_logger.info(
+            "Pruning source IDs collected: "
+            f"cc_pair={redis_connector.cc_pair_id} "
+            f"sorted_runs={connector_doc_ids.num_runs}"
+        )
+
+        # docs in our local index that are no longer in the source
+        doc_ids_to_remove = sorted_difference(
+            iter_sorted_document_ids_for_connector_credential_pair(
+                db_session=db_session,
+                connector_id=connector_id,
+                credential_id=credential_id,
+            ),
+            connector_doc_ids.iter_sorted_unique(),
+        )
+
+        task_logger.info(
+            "RedisConnector.prune.generate_tasks starting (streaming). "
+            f"cc_pair={redis_connector.cc_pair_id}"
+        )
+        return redis_connector.prune.generate_tasks(
+            doc_ids_to_remove, celery_app, db_session, None
+        )
+
+
 """Monitoring pruning utils"""
 
 
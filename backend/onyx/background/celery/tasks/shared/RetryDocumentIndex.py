@@ -4,6 +4,7 @@ from tenacity import retry_if_exception_type
 from tenacity import stop_after_delay
 from tenacity import wait_random_exponential
 
+from onyx.document_index.interfaces import DocumentFieldsUpdate
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.document_index.interfaces import VespaDocumentUserFields
@@ -63,3 +64,16 @@ class RetryDocumentIndex:
             fields=fields,
             user_fields=user_fields,
         )
+
+    @retry(
+        retry=retry_if_exception_type(httpx.ReadTimeout),
+        wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
+        stop=stop_after_delay(STOP_AFTER),
+    )
+    def update_multiple(
+        self,
+        document_updates: list[DocumentFieldsUpdate],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        return self.index.update_multiple(document_updates, tenant_id=tenant_id)
@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
@@ -34,10 +35,13 @@ from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
@@ -50,6 +54,7 @@ from onyx.db.sync_record import cleanup_sync_records
 from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
 from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentFieldsUpdate
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.redis.redis_document_set import RedisDocumentSet
@@ -67,6 +72,10 @@ from onyx.utils.variable_functionality import noop_fallback
 
 logger = setup_logger()
 
+# a batch covers a few hundred documents, so give it more time than a single document
+VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT = 300
+VESPA_METADATA_SYNC_BATCH_TIME_LIMIT = VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT + 15
+
 
 # celery auto associates tasks created inside another task,
 # which bloats the result metadata considerably. trail=False prevents this.
@@ -568,3 +577,135 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         )
 
     return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT,
+    time_limit=VESPA_METADATA_SYNC_BATCH_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Batched version of vespa_metadata_sync_task. The access, document sets, boost
+    and hidden flags of all documents are loaded with set based queries and the
+    Vespa updates for the whole batch are sent in bulk."""
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
+
+            docs = get_documents_by_ids(db_session, document_ids)
+            existing_doc_ids = [doc.id for doc in docs]
+
+            doc_id_to_doc_sets = {
+                document_id: set(doc_set_names)
+                for document_id, doc_set_names in fetch_document_sets_for_documents(
+                    existing_doc_ids, db_session
+                )
+            }
+            doc_id_to_access = get_access_for_documents(
+                document_ids=existing_doc_ids, db_session=db_session
+            )
+
+            document_updates = [
+                DocumentFieldsUpdate(
+                    doc_id=doc.id,
+                    chunk_count=doc.chunk_count,
+                    fields=VespaDocumentFields(
+                        document_sets=doc_id_to_doc_sets.get(doc.id, set()),
+                        access=doc_id_to_access[doc.id],
+                        boost=doc.boost,
+                        hidden=doc.hidden,
+                    ),
+                )
+                for doc in docs
+            ]
+
+            # update Vespa. OK if a doc doesn't exist.
+            doc_id_to_chunks_affected = retry_index.update_multiple(
+                document_updates, tenant_id=tenant_id
+            )
+
+            # update db last. Worst case = we crash right before this and
+            # the sync might repeat again later
+            mark_documents_as_synced(list(doc_id_to_chunks_affected), db_session)
+
+            # documents that failed to update still need to be synced, so they are
+            # picked up again by the next check_for_vespa_sync_task pass
+            num_failed = len(docs) - len(doc_id_to_chunks_affected)
+
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"docs={len(document_ids)} "
+                f"action=sync "
+                f"synced={len(doc_id_to_chunks_affected)} "
+                f"skipped={len(document_ids) - len(docs)} "
+                f"failed={num_failed} "
+                f"chunks={sum(doc_id_to_chunks_affected.values())} "
+                f"elapsed={elapsed:.2f}"
+            )
+            completion_status = (
+                OnyxCeleryTaskCompletionStatus.SUCCEEDED
+                if num_failed == 0
+                else OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+            )
+    except SoftTimeLimitExceeded:
+        task_logger.info(f"SoftTimeLimitExceeded exception. docs={len(document_ids)}")
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        e: Exception = ex
+        if isinstance(ex, RetryError):
+            task_logger.warning(
+                f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+            )
+
+            # only use the inner exception if it is of type Exception
+            e_temp = ex.last_attempt.exception()
+            if isinstance(e_temp, Exception):
+                e = e_temp
+
+        if isinstance(e, httpx.HTTPStatusError):
+            if e.response.status_code == HTTPStatus.BAD_REQUEST:
+                task_logger.exception(
+                    f"Non-retryable HTTPStatusError: "
+                    f"docs={len(document_ids)} "
+                    f"status={e.response.status_code}"
+                )
+            completion_status = OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+        else:
+            task_logger.exception(
+                f"vespa_metadata_sync_batch_task exceptioned: docs={len(document_ids)}"
+            )
+
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_batch_task completed: "
+            f"status={completion_status.value} docs={len(document_ids)}"
+        )
+
+    return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
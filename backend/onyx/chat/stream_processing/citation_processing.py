@@ -12,12 +12,48 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 
-def in_code_block(llm_text: str) -> bool:
-    count = llm_text.count(TRIPLE_BACKTICK)
-    return count % 2 != 0
+class _CodeFenceTracker:
+    """Incrementally counts the triple backticks in the stream, equivalent to
+    `text.count(TRIPLE_BACKTICK)` on the full text so far but with work proportional
+    to the new text only. Backticks are counted per run of consecutive backticks, a run
+    of n backticks contains n // 3 non-overlapping triple backticks."""
+
+    def __init__(self) -> None:
+        self.completed_fences = 0  # fences in runs that have ended
+        self.backtick_run = 0  # length of the run of backticks at the end of the text
+
+    def feed(self, text: str) -> None:
+        if "`" not in text:
+            if text:
+                self.completed_fences += self.backtick_run // len(TRIPLE_BACKTICK)
+                self.backtick_run = 0
+            return
+
+        for char in text:
+            if char == "`":
+                self.backtick_run += 1
+            else:
+                self.completed_fences += self.backtick_run // len(TRIPLE_BACKTICK)
+                self.backtick_run = 0
+
+    @property
+    def in_code_block(self) -> bool:
+        fences = self.completed_fences + self.backtick_run // len(TRIPLE_BACKTICK)
+        return fences % 2 != 0
 
 
 class CitationProcessor:
+    """Streams the LLM answer while replacing citations like '[1]' or '[1, 2]' with
+    links to the cited documents.
+
+    All state is kept incrementally so that the work per token only depends on the size
+    of the token and of the text held back for a potential citation / stop sequence,
+    not on the length of the answer so far:
+    - code fences are tracked by _CodeFenceTracker (citations are not replaced in code)
+    - text that could be the start of a citation ('[', '[1,', ...) is held in curr_segment
+    - text that could be the start of the stop sequence is held in hold
+    """
+
     def __init__(
         self,
         context_docs: list[LlmDoc],
@@ -31,7 +67,7 @@ class CitationProcessor:
         self.max_citation_num = len(context_docs)
         self.stop_stream = stop_stream
 
-        self.llm_out = ""  # entire output so far
+        self.code_fences = _CodeFenceTracker()  # tracks the entire output so far
         self.curr_segment = ""  # tokens held for citation processing
         self.hold = ""  # tokens held for stop token processing
 
@@ -39,13 +75,27 @@ class CitationProcessor:
         self.cited_documents: set[str] = set()  # docs cited in the entire stream
         self.non_citation_count = 0
 
+        # the text after the last '[' of a possible citation:
         # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
-        self.possible_citation_pattern = re.compile(r"(\[+(?:\d+,? ?)*$)")
+        # NOTE: the optional newline mirrors `$`, which also matches before a final newline
+        self.possible_citation_tail_pattern = re.compile(r"(?:\d+,? ?)*\n?")
 
         # group 1: '[[1]]', [[2]], etc.
         # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
         self.citation_pattern = re.compile(r"(\[\[\d+\]\])|(\[\d+(?:, ?\d+)*\])")
 
+    def _possible_citation_found(self) -> bool:
+        """Whether the current segment ends with something that could become a citation.
+        Only the text after the last '[' has to be checked."""
+        last_bracket = self.curr_segment.rfind("[")
+        if last_bracket == -1:
+            return False
+        return bool(
+            self.possible_citation_tail_pattern.fullmatch(
+                self.curr_segment, last_bracket + 1
+            )
+        )
+
     def process_token(
         self, token: str | None
     ) -> Generator[OnyxAnswerPiece | CitationInfo, None, None]:
@@ -65,24 +115,34 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self.code_fences.feed(token)
+        in_code_block = self.code_fences.in_code_block
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
             if self.curr_segment.endswith("`"):
                 pass
-            elif "```" in self.curr_segment:
-                piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
-                    self.curr_segment = self.curr_segment.replace("```", "```plaintext")
+            elif TRIPLE_BACKTICK in self.curr_segment:
+                piece_that_comes_after = self.curr_segment.split(TRIPLE_BACKTICK)[1][0]
+                if piece_that_comes_after == "\n" and in_code_block:
+                    self.curr_segment = self.curr_segment.replace(
+                        TRIPLE_BACKTICK, f"{TRIPLE_BACKTICK}plaintext"
+                    )
+
+        # fast path, nothing that looks like a citation so the segment can be streamed
+        if "[" not in self.curr_segment:
+            self.non_citation_count += len(self.curr_segment)
+            result = self.curr_segment
+            self.curr_segment = ""
+            if result:
+                yield OnyxAnswerPiece(answer_piece=result)
+            return
 
         citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
-        )
+        possible_citation_found = self._possible_citation_found()
 
         result = ""
-        if citation_matches and not in_code_block(self.llm_out):
+        if citation_matches and not in_code_block:
             match_idx = 0
             for match in citation_matches:
                 match_span = match.span()
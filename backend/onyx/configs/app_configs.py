@@ -184,6 +184,13 @@ VESPA_DEPLOYMENT_ZIP = (
 VESPA_CLOUD_CERT_PATH = os.environ.get("VESPA_CLOUD_CERT_PATH")
 VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 
+# Bounds on the number of concurrent operations the Vespa feed client keeps in flight,
+# the actual number is adapted between these based on how fast Vespa accepts writes
+VESPA_FEED_MIN_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MIN_IN_FLIGHT") or 8)
+VESPA_FEED_MAX_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MAX_IN_FLIGHT") or 128)
+# Number of times an operation throttled by Vespa (429/503/504) is retried
+VESPA_FEED_MAX_RETRIES = int(os.environ.get("VESPA_FEED_MAX_RETRIES") or 10)
+
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
@@ -282,6 +289,16 @@ REDIS_POOL_MAX_CONNECTIONS = int(os.environ.get("REDIS_POOL_MAX_CONNECTIONS", 12
 REDIS_SSL_CERT_REQS = os.getenv("REDIS_SSL_CERT_REQS", "none")
 REDIS_SSL_CA_CERTS = os.getenv("REDIS_SSL_CA_CERTS", None)
 
+# The API server keeps slow changing configuration (search settings, LLM providers, ...)
+# in memory, per tenant. Entries are invalidated over Redis pub/sub whenever they are
+# written, the TTL is only a safety net. A TTL of 0 disables the cache.
+CONFIG_SNAPSHOT_CACHE_TTL_SECONDS = int(
+    os.environ.get("CONFIG_SNAPSHOT_CACHE_TTL_SECONDS") or 60
+)
+CONFIG_SNAPSHOT_CACHE_MAX_SIZE = int(
+    os.environ.get("CONFIG_SNAPSHOT_CACHE_MAX_SIZE") or 4096
+)
+
 CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))  # seconds
 
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#broker-pool-limit
@@ -351,6 +368,15 @@ CELERY_WORKER_KG_PROCESSING_CONCURRENCY = int(
 
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 8192
+# The number of documents synced to Vespa by a single metadata sync task
+VESPA_METADATA_SYNC_BATCH_SIZE = int(
+    os.environ.get("VESPA_METADATA_SYNC_BATCH_SIZE") or 256
+)
+# The number of document permissions written to Postgres in a single transaction
+# during permission syncing
+PERMISSION_SYNC_DB_BATCH_SIZE = int(
+    os.environ.get("PERMISSION_SYNC_DB_BATCH_SIZE") or 1000
+)
 
 DB_YIELD_PER_DEFAULT = 64
 
@@ -388,6 +414,30 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Number of pages the web connector fetches at the same time
+WEB_CONNECTOR_MAX_CONCURRENCY = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENCY") or 8
+)
+# Politeness limits, at most this many requests in flight per host and at least this
+# many seconds between the start of two requests to the same host
+WEB_CONNECTOR_MAX_CONCURRENCY_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENCY_PER_HOST") or 4
+)
+WEB_CONNECTOR_HOST_DELAY_SECONDS = float(
+    os.environ.get("WEB_CONNECTOR_HOST_DELAY_SECONDS") or 0
+)
+# Number of headless browsers used for pages that need JavaScript to render
+WEB_CONNECTOR_BROWSER_POOL_SIZE = int(
+    os.environ.get("WEB_CONNECTOR_BROWSER_POOL_SIZE") or 2
+)
+# Fetch pages with plain HTTP first and only render them in a browser if the static
+# HTML doesn't have at least WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH characters of text
+WEB_CONNECTOR_HTTP_FAST_PATH = (
+    os.environ.get("WEB_CONNECTOR_HTTP_FAST_PATH", "True").lower() != "false"
+)
+WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH = int(
+    os.environ.get("WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH") or 200
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -427,6 +477,16 @@ CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD = int(
     os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD", 200_000)
 )
 
+# Number of pages (with their comments and attachments) converted concurrently within
+# each batch of pages returned by the API. 1 converts them one after the other
+CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY") or 4
+)
+# Max number of resolved Confluence user display names / emails kept in memory
+CONFLUENCE_CONNECTOR_USER_CACHE_SIZE = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_USER_CACHE_SIZE") or 10_000
+)
+
 # A JSON-formatted array. Each item in the array should have the following structure:
 # {
 #     "user_id": "1234567890",
@@ -497,6 +557,14 @@ JIRA_CONNECTOR_MAX_TICKET_SIZE = int(
 
 GONG_CONNECTOR_START_TIME = os.environ.get("GONG_CONNECTOR_START_TIME")
 
+# Salesforce CSVs of different object types are parsed by this many threads while the
+# parsed rows are written to the SQLite staging db in batches of this many rows.
+# Parsing holds the GIL, so more threads mostly help when reading the CSVs is slow
+SALESFORCE_CSV_PARSE_WORKERS = int(os.environ.get("SALESFORCE_CSV_PARSE_WORKERS") or 2)
+SALESFORCE_SQLITE_WRITE_BATCH_SIZE = int(
+    os.environ.get("SALESFORCE_SQLITE_WRITE_BATCH_SIZE") or 5000
+)
+
 GITHUB_CONNECTOR_BASE_URL = os.environ.get("GITHUB_CONNECTOR_BASE_URL") or None
 
 GITLAB_CONNECTOR_INCLUDE_CODE_FILES = (
@@ -517,6 +585,18 @@ LINEAR_CLIENT_SECRET = os.getenv("LINEAR_CLIENT_SECRET")
 # Slack specific configs
 SLACK_NUM_THREADS = int(os.getenv("SLACK_NUM_THREADS") or 8)
 MAX_SLACK_QUERY_EXPANSIONS = int(os.environ.get("MAX_SLACK_QUERY_EXPANSIONS", "5"))
+# Federated Slack search caches the contextualized thread texts and chunks it builds,
+# so that follow-up questions mostly only cost the Slack search calls. A size of 0
+# disables the cache.
+SLACK_FEDERATED_CACHE_SIZE = int(os.environ.get("SLACK_FEDERATED_CACHE_SIZE") or 2048)
+SLACK_FEDERATED_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_FEDERATED_CACHE_TTL_SECONDS") or 60 * 60
+)
+# A cached thread is reused as is for this long, afterwards its latest reply is checked
+# with Slack before reusing it
+SLACK_FEDERATED_THREAD_REVALIDATE_SECONDS = int(
+    os.environ.get("SLACK_FEDERATED_THREAD_REVALIDATE_SECONDS") or 60
+)
 
 DASK_JOB_CLIENT_ENABLED = (
     os.environ.get("DASK_JOB_CLIENT_ENABLED", "").lower() == "true"
@@ -537,6 +617,15 @@ ALLOW_SIMULTANEOUS_PRUNING = (
     os.environ.get("ALLOW_SIMULTANEOUS_PRUNING", "").lower() == "true"
 )
 
+# Computes the set of documents to prune by spilling the source's document IDs to
+# sorted runs on disk and merging them against the (sorted) indexed IDs instead of
+# holding both sets in memory. Worker memory then no longer grows with connector size.
+PRUNING_STREAMING_DIFF = os.environ.get("PRUNING_STREAMING_DIFF", "").lower() == "true"
+# Number of document IDs held in memory per sorted run when PRUNING_STREAMING_DIFF is on
+PRUNING_STREAMING_RUN_SIZE = int(
+    os.environ.get("PRUNING_STREAMING_RUN_SIZE") or 100_000
+)
+
 # This is the maximum rate at which documents are queried for a pruning job. 0 disables the limitation.
 MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
@@ -582,6 +671,19 @@ LARGE_CHUNK_RATIO = 4
 # Include the document level metadata in each chunk. If the metadata is too long, then it is thrown out
 # We don't want the metadata to overwhelm the actual contents of the chunk
 SKIP_METADATA_IN_CHUNK = os.environ.get("SKIP_METADATA_IN_CHUNK", "").lower() == "true"
+# Number of processes used to chunk the documents of a batch in parallel, each process
+# keeps its own copy of the tokenizer. 1 chunks the documents serially in-process
+INDEXING_CHUNKER_NUM_PROCESSES = int(
+    os.environ.get("INDEXING_CHUNKER_NUM_PROCESSES") or 1
+)
+# Pipelined docprocessing: split each batch into sub-batches of this many documents and
+# embed the next sub-batch (image summaries, chunking, contextual RAG, embedding) while
+# the current one is written to the document index and Postgres. 0 disables pipelining
+INDEXING_PIPELINE_SUB_BATCH_SIZE = int(
+    os.environ.get("INDEXING_PIPELINE_SUB_BATCH_SIZE") or 0
+)
+# Number of embedded sub-batches that may wait to be written, bounds memory usage
+INDEXING_PIPELINE_MAX_AHEAD = int(os.environ.get("INDEXING_PIPELINE_MAX_AHEAD") or 1)
 # Timeout to wait for job's last update before killing it, in hours
 CLEANUP_INDEXING_JOBS_TIMEOUT = int(
     os.environ.get("CLEANUP_INDEXING_JOBS_TIMEOUT") or 3
@@ -602,6 +704,22 @@ INDEXING_EMBEDDING_MODEL_NUM_THREADS = int(
     os.environ.get("INDEXING_EMBEDDING_MODEL_NUM_THREADS") or 8
 )
 
+# Reuse embeddings of previously seen chunk texts (stored in Redis) so that re-indexing
+# unchanged content does not go back to the model server / embedding provider.
+# Each cached 1024-dim embedding takes ~4KB of Redis memory, size the TTL accordingly.
+ENABLE_INDEXING_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_INDEXING_EMBEDDING_CACHE", "").lower() == "true"
+)
+INDEXING_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("INDEXING_EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60 * 24 * 14
+)  # 14 days
+
+# When re-indexing a document, only re-feed the Vespa chunks whose content changed and
+# apply partial updates to chunks where only ACL / document sets / boost etc. changed
+ENABLE_INCREMENTAL_VESPA_INDEXING = (
+    os.environ.get("ENABLE_INCREMENTAL_VESPA_INDEXING", "").lower() == "true"
+)
+
 # During an indexing attempt, specifies the number of batches which are allowed to
 # exception without aborting the attempt.
 INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
@@ -671,6 +789,21 @@ TOKEN_BUDGET_GLOBALLY_ENABLED = (
     os.environ.get("TOKEN_BUDGET_GLOBALLY_ENABLED", "").lower() == "true"
 )
 
+# Token usage is counted in Redis minute buckets as chat messages are saved, so that
+# token rate limit checks don't have to aggregate the chat message table each time.
+TOKEN_USAGE_REDIS_COUNTERS_ENABLED = (
+    os.environ.get("TOKEN_USAGE_REDIS_COUNTERS_ENABLED", "True").lower() != "false"
+)
+# Rate limits with a longer period than this are checked against Postgres
+TOKEN_USAGE_RETENTION_HOURS = int(
+    os.environ.get("TOKEN_USAGE_RETENTION_HOURS") or 24 * 31
+)
+# How often the counters are rebuilt from the chat messages in Postgres, this corrects
+# for deleted messages, Redis evictions and changes to user group memberships
+TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS = int(
+    os.environ.get("TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS") or 60 * 60
+)
+
 # Defined custom query/answer conditions to validate the query and the LLM answer.
 # Format: list of strings
 CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
@@ -101,6 +101,26 @@ ENABLE_CONNECTOR_CLASSIFIER = os.environ.get("ENABLE_CONNECTOR_CLASSIFIER", Fals
 
 VESPA_SEARCHER_THREADS = int(os.environ.get("VESPA_SEARCHER_THREADS") or 2)
 
+# Number of query embeddings kept in the in-process LRU cache, set to 0 to disable
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE") or 2048)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60
+)
+# Additionally share query embeddings between processes via Redis
+ENABLE_QUERY_EMBEDDING_REDIS_CACHE = (
+    os.environ.get("ENABLE_QUERY_EMBEDDING_REDIS_CACHE", "").lower() == "true"
+)
+
+# Files attached to a chat (and the text extracted from them) are kept in memory so that
+# they aren't loaded again on every turn of the conversation. Bounded by total bytes,
+# split evenly between the file contents and the extracted text. Set to 0 to disable.
+CHAT_FILE_CACHE_MAX_BYTES = int(
+    os.environ.get("CHAT_FILE_CACHE_MAX_BYTES") or 256 * 1024 * 1024
+)
+CHAT_FILE_CACHE_TTL_SECONDS = int(
+    os.environ.get("CHAT_FILE_CACHE_TTL_SECONDS") or 60 * 60
+)
+
 # Whether or not to use the semantic & keyword search expansions for Basic Search
 USE_SEMANTIC_KEYWORD_EXPANSIONS_BASIC_SEARCH = (
     os.environ.get("USE_SEMANTIC_KEYWORD_EXPANSIONS_BASIC_SEARCH", "false").lower()
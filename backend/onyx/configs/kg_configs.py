@@ -32,16 +32,11 @@ KG_SQL_GENERATION_MAX_TOKENS: int = int(
     os.environ.get("KG_SQL_GENERATION_MAX_TOKENS", "1500")
 )
 
-KG_TEMP_ALLOWED_DOCS_VIEW_NAME_PREFIX: str = os.environ.get(
-    "KG_TEMP_ALLOWED_DOCS_VIEW_NAME_PREFIX", "allowed_docs"
-)
-
-KG_TEMP_KG_RELATIONSHIPS_VIEW_NAME_PREFIX: str = os.environ.get(
-    "KG_TEMP_KG_RELATIONSHIPS_VIEW_NAME_PREFIX", "kg_relationships_with_access"
-)
-
-KG_TEMP_KG_ENTITIES_VIEW_NAME_PREFIX: str = os.environ.get(
-    "KG_TEMP_KG_ENTITIES_VIEW_NAME_PREFIX", "kg_entities_with_access"
+# The allowed documents of a user (and the public documents shared by all users) are
+# refreshed incrementally before each KG query, and rebuilt from scratch when they are
+# older than this
+KG_ALLOWED_DOCUMENTS_MAX_AGE_SECONDS: int = int(
+    os.environ.get("KG_ALLOWED_DOCUMENTS_MAX_AGE_SECONDS", "86400")
 )
 
 
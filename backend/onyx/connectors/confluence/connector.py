@@ -1,4 +1,5 @@
 import copy
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -9,6 +10,7 @@ from requests.exceptions import HTTPError
 from typing_extensions import override
 
 from onyx.access.models import ExternalAccess
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_LABELS_TO_SKIP
 from onyx.configs.app_configs import CONFLUENCE_TIMEZONE_OFFSET
 from onyx.configs.app_configs import CONTINUE_ON_CONNECTOR_FAILURE
@@ -50,6 +52,7 @@ from onyx.connectors.models import SlimDocument
 from onyx.connectors.models import TextSection
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 # Potential Improvements
@@ -463,6 +466,31 @@ class ConfluenceConnector(
                 )
         return doc
 
+    def _convert_page(self, page: dict[str, Any]) -> Document | ConnectorFailure:
+        """Builds the full document for a page: its text, comments and attachments."""
+        doc_or_failure = self._convert_page_to_document(page)
+        if isinstance(doc_or_failure, ConnectorFailure):
+            return doc_or_failure
+
+        # Now get attachments for that page:
+        return self._fetch_page_attachments(page, doc_or_failure)
+
+    def _convert_pages(
+        self, pages: list[dict[str, Any]]
+    ) -> Iterator[Document | ConnectorFailure]:
+        """Converts the pages, in order. Up to CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY
+        pages are converted at the same time, each of them waits on its own (rate
+        limited) Confluence calls."""
+        if CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY <= 1 or len(pages) <= 1:
+            for page in pages:
+                yield self._convert_page(page)
+            return
+
+        yield from run_functions_tuples_in_parallel(
+            [(self._convert_page, (page,)) for page in pages],
+            max_workers=CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY,
+        )
+
     def _fetch_document_batches(
         self,
         checkpoint: ConfluenceCheckpoint,
@@ -489,27 +517,30 @@ class ConfluenceConnector(
         def store_next_page_url(next_page_url: str) -> None:
             checkpoint.next_page_url = next_page_url
 
+        # pages are collected until a full page of results is returned, then converted
+        # concurrently
+        pages: list[dict[str, Any]] = []
         for page in self.confluence_client.paginated_page_retrieval(
             cql_url=page_query_url,
             limit=self.batch_size,
             next_page_callback=store_next_page_url,
         ):
-            # Build doc from page
-            doc_or_failure = self._convert_page_to_document(page)
-
-            if isinstance(doc_or_failure, ConnectorFailure):
-                yield doc_or_failure
-                continue
-            # Now get attachments for that page:
-            doc_or_failure = self._fetch_page_attachments(page, doc_or_failure)
-
-            # yield completed document (or failure)
-            yield doc_or_failure
+            pages.append(page)
 
             # Create checkpoint once a full page of results is returned
             if checkpoint.next_page_url and checkpoint.next_page_url != page_query_url:
-                return checkpoint
-
+                # yield completed documents (or failures)
+                doc_or_failure: Document | ConnectorFailure | None = None
+                for doc_or_failure in self._convert_pages(pages):
+                    yield doc_or_failure
+                pages = []
+
+                # as with one page at a time, a failed last page does not end the
+                # checkpoint, the next page that converts successfully does
+                if not isinstance(doc_or_failure, ConnectorFailure):
+                    return checkpoint
+
+        yield from self._convert_pages(pages)
         checkpoint.has_more = False
         return checkpoint
 
@@ -16,6 +16,7 @@ import json
 import time
 from collections.abc import Callable
 from collections.abc import Generator
+from collections.abc import Iterable
 from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
@@ -30,6 +31,7 @@ from atlassian import Confluence  # type:ignore
 from redis import Redis
 from requests import HTTPError
 
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_USER_CACHE_SIZE
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_USER_PROFILES_OVERRIDE
 from onyx.configs.app_configs import OAUTH_CONFLUENCE_CLOUD_CLIENT_ID
 from onyx.configs.app_configs import OAUTH_CONFLUENCE_CLOUD_CLIENT_SECRET
@@ -44,8 +46,10 @@ from onyx.connectors.confluence.utils import update_param_in_path
 from onyx.connectors.interfaces import CredentialsProviderInterface
 from onyx.file_processing.html_utils import format_document_soup
 from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_with_timeout
+from onyx.utils.ttl_lru_cache import TTLLRUCache
 
 logger = setup_logger()
 
@@ -58,8 +62,17 @@ _PROBLEMATIC_EXPANSIONS = "body.storage.value"
 _REPLACEMENT_EXPANSIONS = "body.view.value"
 
 _USER_NOT_FOUND = "Unknown Confluence User"
-_USER_ID_TO_DISPLAY_NAME_CACHE: dict[str, str | None] = {}
-_USER_EMAIL_CACHE: dict[str, str | None] = {}
+# keyed by (confluence url, user id / user name). Only successful lookups are cached,
+# failed ones are retried the next time the user comes up
+_USER_CACHE_TTL_SECONDS = 24 * 60 * 60
+_USER_ID_TO_DISPLAY_NAME_CACHE: TTLLRUCache[tuple[str, str], str] = TTLLRUCache(
+    max_size=CONFLUENCE_CONNECTOR_USER_CACHE_SIZE, ttl=_USER_CACHE_TTL_SECONDS
+)
+_USER_EMAIL_CACHE: TTLLRUCache[tuple[str, str], str] = TTLLRUCache(
+    max_size=CONFLUENCE_CONNECTOR_USER_CACHE_SIZE, ttl=_USER_CACHE_TTL_SECONDS
+)
+# max number of account ids accepted by the cloud bulk user endpoint
+_USER_BULK_LOOKUP_LIMIT = 100
 _DEFAULT_PAGINATION_LIMIT = 1000
 
 
@@ -342,30 +355,25 @@ class OnyxConfluence:
                 # we're relying more on the client to rate limit itself
                 # and applying our own retries in a more specific set of circumstances
                 try:
-                    if credential_provider:
+                    # static credentials never need renewal, skip the lock entirely
+                    if credential_provider and not self.static_credentials:
+                        # the lock only guards the renewal, not the call itself, so
+                        # that concurrent calls are not serialized on it
                         with credential_provider:
                             credentials, renewed = self._renew_credentials()
                             if renewed:
                                 self._confluence = self._initialize_connection_helper(
                                     credentials, **self._kwargs
                                 )
-                            attr = getattr(self._confluence, name, None)
-                            if attr is None:
-                                # The underlying Confluence client doesn't have this attribute
-                                raise AttributeError(
-                                    f"'{type(self).__name__}' object has no attribute '{name}'"
-                                )
 
-                            return attr(*args, **kwargs)
-                    else:
-                        attr = getattr(self._confluence, name, None)
-                        if attr is None:
-                            # The underlying Confluence client doesn't have this attribute
-                            raise AttributeError(
-                                f"'{type(self).__name__}' object has no attribute '{name}'"
-                            )
+                    attr = getattr(self._confluence, name, None)
+                    if attr is None:
+                        # The underlying Confluence client doesn't have this attribute
+                        raise AttributeError(
+                            f"'{type(self).__name__}' object has no attribute '{name}'"
+                        )
 
-                        return attr(*args, **kwargs)
+                    return attr(*args, **kwargs)
 
                 except HTTPError as e:
                     delay_until = _handle_http_error(e, attempt)
@@ -883,8 +891,9 @@ class OnyxConfluence:
 def get_user_email_from_username__server(
     confluence_client: OnyxConfluence, user_name: str
 ) -> str | None:
-    global _USER_EMAIL_CACHE
-    if _USER_EMAIL_CACHE.get(user_name) is None:
+    cache_key = (confluence_client._url, user_name)
+    email = _USER_EMAIL_CACHE.get(cache_key)
+    if email is None:
         try:
             response = confluence_client.get_mobile_parameters(user_name)
             email = response.get("email")
@@ -896,8 +905,9 @@ def get_user_email_from_username__server(
             # We may want to just return a string that indicates failure so we dont
             # keep retrying
             # email = f"FAILED TO GET CONFLUENCE EMAIL FOR {user_name}"
-        _USER_EMAIL_CACHE[user_name] = email
-    return _USER_EMAIL_CACHE[user_name]
+        if email:
+            _USER_EMAIL_CACHE.set(cache_key, email)
+    return email
 
 
 def _get_user(confluence_client: OnyxConfluence, user_id: str) -> str:
@@ -910,8 +920,9 @@ def _get_user(confluence_client: OnyxConfluence, user_id: str) -> str:
     Returns:
         str: The User Display Name. 'Unknown User' if the user is deactivated or not found
     """
-    global _USER_ID_TO_DISPLAY_NAME_CACHE
-    if _USER_ID_TO_DISPLAY_NAME_CACHE.get(user_id) is None:
+    cache_key = (confluence_client._url, user_id)
+    found_display_name = _USER_ID_TO_DISPLAY_NAME_CACHE.get(cache_key)
+    if found_display_name is None:
         try:
             result = confluence_client.get_user_details_by_userkey(user_id)
             found_display_name = result.get("displayName")
@@ -925,9 +936,61 @@ def _get_user(confluence_client: OnyxConfluence, user_id: str) -> str:
             except Exception:
                 found_display_name = None
 
-        _USER_ID_TO_DISPLAY_NAME_CACHE[user_id] = found_display_name
+        if found_display_name:
+            _USER_ID_TO_DISPLAY_NAME_CACHE.set(cache_key, found_display_name)
+
+    return found_display_name or _USER_NOT_FOUND
+
+
+def _get_users(
+    confluence_client: OnyxConfluence, user_ids: Iterable[str]
+) -> dict[str, str]:
+    """Get the Confluence Display Names of many users at once. Users that are not
+    cached yet are looked up in bulk (cloud only), whatever is left is looked up one
+    by one with _get_user.
+
+    Returns:
+        dict[str, str]: user id -> display name, for every given user id
+    """
+    display_names: dict[str, str] = {}
+    unresolved_user_ids: list[str] = []
+    for user_id in dict.fromkeys(user_ids):
+        cached_display_name = _USER_ID_TO_DISPLAY_NAME_CACHE.get(
+            (confluence_client._url, user_id)
+        )
+        if cached_display_name is not None:
+            display_names[user_id] = cached_display_name
+        else:
+            unresolved_user_ids.append(user_id)
+
+    # server has no bulk endpoint (and identifies users by userkey)
+    if unresolved_user_ids and confluence_client._is_cloud:
+        for account_ids in batch_generator(
+            unresolved_user_ids, _USER_BULK_LOOKUP_LIMIT
+        ):
+            try:
+                response = confluence_client.get(
+                    "rest/api/user/bulk",
+                    params={"accountId": account_ids, "limit": len(account_ids)},
+                )
+            except Exception as e:
+                logger.warning(f"Bulk Confluence user lookup failed: {e}")
+                continue
+
+            for user in response.get("results", []):
+                account_id = user.get("accountId")
+                display_name = user.get("displayName")
+                if account_id and display_name:
+                    _USER_ID_TO_DISPLAY_NAME_CACHE.set(
+                        (confluence_client._url, account_id), display_name
+                    )
+                    display_names[account_id] = display_name
+
+    for user_id in unresolved_user_ids:
+        if user_id not in display_names:
+            display_names[user_id] = _get_user(confluence_client, user_id)
 
-    return _USER_ID_TO_DISPLAY_NAME_CACHE.get(user_id) or _USER_NOT_FOUND
+    return display_names
 
 
 def extract_text_from_confluence_html(
@@ -952,6 +1015,7 @@ def extract_text_from_confluence_html(
 
     _remove_macro_stylings(soup=soup)
 
+    user_elements: list[tuple[bs4.Tag, str]] = []
     for user in soup.findAll("ri:user"):
         user_id = (
             user.attrs["ri:account-id"]
@@ -963,8 +1027,15 @@ def extract_text_from_confluence_html(
                 "ri:userkey not found in ri:user element. " f"Found attrs: {user.attrs}"
             )
             continue
-        # Include @ sign for tagging, more clear for LLM
-        user.replaceWith("@" + _get_user(confluence_client, user_id))
+        user_elements.append((user, user_id))
+
+    if user_elements:
+        display_names = _get_users(
+            confluence_client, [user_id for _, user_id in user_elements]
+        )
+        for user, user_id in user_elements:
+            # Include @ sign for tagging, more clear for LLM
+            user.replaceWith("@" + display_names[user_id])
 
     for html_page_reference in soup.findAll("ac:structured-macro"):
         # Here, we only want to process page within page macros
@@ -1,4 +1,3 @@
-import csv
 import gc
 import json
 import os
@@ -331,52 +330,22 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
         total_types = len(object_type_to_csv_path)
         logger.info(f"Starting to process {total_types} object types")
 
-        for i, (object_type, csv_paths) in enumerate(
-            object_type_to_csv_path.items(), 1
+        for object_type, csv_path, new_ids in sf_db.bulk_update_from_csvs(
+            object_type_to_csv_path, remove_ids=remove_ids
         ):
-            logger.info(f"Processing object type {object_type} ({i}/{total_types})")
-            # If path is None, it means it failed to fetch the csv
-            if csv_paths is None:
-                continue
-
-            # Go through each csv path and use it to update the db
-            for csv_path in csv_paths:
-                num_records = 0
-
-                logger.debug(
-                    f"Processing CSV: object_type={object_type} "
-                    f"csv={csv_path} "
-                    f"len={Path(csv_path).stat().st_size} "
-                    f"records={num_records}"
-                )
-
-                with open(csv_path, "r", newline="", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        num_records += 1
-
-                new_ids = sf_db.update_from_csv(
-                    object_type=object_type,
-                    csv_download_path=csv_path,
-                    remove_ids=remove_ids,
-                )
-                for new_id in new_ids:
-                    updated_ids[new_id] = object_type
+            for new_id in new_ids:
+                updated_ids[new_id] = object_type
 
-                sf_db.flush()
-
-                logger.debug(
-                    f"Added {len(new_ids)} new/updated records for {object_type}"
-                )
+            sf_db.flush()
 
-                logger.info(
-                    f"Processed CSV: object_type={object_type} "
-                    f"csv={csv_path} "
-                    f"len={Path(csv_path).stat().st_size} "
-                    f"records={num_records} "
-                    f"db_len={sf_db.file_size}"
-                )
-                os.remove(csv_path)
+            logger.info(
+                f"Processed CSV: object_type={object_type} "
+                f"csv={csv_path} "
+                f"len={Path(csv_path).stat().st_size} "
+                f"records={len(new_ids)} "
+                f"db_len={sf_db.file_size}"
+            )
+            os.remove(csv_path)
 
         return updated_ids
 
@@ -468,55 +437,27 @@ class SalesforceConnector(LoadConnector, PollConnector, SlimConnector):
             total_types = len(object_type_to_csv_paths)
             logger.info(f"Starting to process {total_types} object types")
 
-            for i, (object_type, csv_paths) in enumerate(
-                object_type_to_csv_paths.items(), 1
+            for object_type, csv_path, new_ids in sf_db.bulk_update_from_csvs(
+                object_type_to_csv_paths
             ):
-                logger.info(f"Processing object type {object_type} ({i}/{total_types})")
-                # If path is None, it means it failed to fetch the csv
-                if csv_paths is None:
-                    continue
-
-                # Go through each csv path and use it to update the db
-                for csv_path in csv_paths:
-                    num_records = 0
-                    with open(csv_path, "r", newline="", encoding="utf-8") as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            num_records += 1
-
-                    logger.debug(
-                        f"Processing CSV: object_type={object_type} "
-                        f"csv={csv_path} "
-                        f"len={Path(csv_path).stat().st_size} "
-                        f"records={num_records}"
-                    )
-
-                    # yield an empty list to keep the connector alive
-                    yield docs_to_yield
-
-                    new_ids = sf_db.update_from_csv(
-                        object_type=object_type,
-                        csv_download_path=csv_path,
-                    )
-                    for new_id in new_ids:
-                        changed_ids_to_type[new_id] = object_type
+                for new_id in new_ids:
+                    changed_ids_to_type[new_id] = object_type
 
-                    sf_db.flush()
+                sf_db.flush()
 
-                    logger.debug(
-                        f"Added {len(new_ids)} new/updated records for {object_type}"
-                    )
+                logger.info(
+                    f"Processed CSV: object_type={object_type} "
+                    f"csv={csv_path} "
+                    f"len={Path(csv_path).stat().st_size} "
+                    f"records={len(new_ids)} "
+                    f"db_len={sf_db.file_size}"
+                )
 
-                    logger.info(
-                        f"Processed CSV: object_type={object_type} "
-                        f"csv={csv_path} "
-                        f"len={Path(csv_path).stat().st_size} "
-                        f"records={num_records} "
-                        f"db_len={sf_db.file_size}"
-                    )
+                os.remove(csv_path)
+                gc.collect()
 
-                    os.remove(csv_path)
-                    gc.collect()
+                # yield an empty list to keep the connector alive
+                yield docs_to_yield
 
             gc.collect()
 
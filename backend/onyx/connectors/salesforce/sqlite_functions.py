@@ -1,12 +1,18 @@
 import csv
 import json
 import os
+import queue
 import sqlite3
+import threading
 import time
+from collections import defaultdict
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+from onyx.configs.app_configs import SALESFORCE_CSV_PARSE_WORKERS
+from onyx.configs.app_configs import SALESFORCE_SQLITE_WRITE_BATCH_SIZE
 from onyx.connectors.models import BasicExpertInfo
 from onyx.connectors.salesforce.utils import ACCOUNT_OBJECT_TYPE
 from onyx.connectors.salesforce.utils import NAME_FIELD
@@ -19,6 +25,32 @@ from shared_configs.utils import batch_list
 
 logger = setup_logger()
 
+# Secondary indexes, the bulk load builds them once at the end instead of updating
+# them for every row
+_INDEXES: dict[str, str] = {
+    "idx_object_type": """
+        CREATE INDEX idx_object_type
+        ON salesforce_objects(object_type, id)
+        WHERE object_type IS NOT NULL
+    """,
+    "idx_parent_id": """
+        CREATE INDEX idx_parent_id
+        ON relationships(parent_id, child_id)
+    """,
+    "idx_child_parent": """
+        CREATE INDEX idx_child_parent
+        ON relationships(child_id)
+        WHERE child_id IS NOT NULL
+    """,
+    "idx_relationship_types_lookup": """
+        CREATE INDEX idx_relationship_types_lookup
+        ON relationship_types(parent_type, child_id, parent_id)
+    """,
+}
+
+# (id, json serialized normalized record, parent ids)
+_ParsedRecord = tuple[str, str, set[str]]
+
 
 class OnyxSalesforceSQLite:
     """Notes on context management using 'with self.conn':
@@ -167,49 +199,7 @@ class OnyxSalesforceSQLite:
             """
             )
 
-            # Create indexes if they don't exist (SQLite ignores IF NOT EXISTS for indexes)
-            def create_index_if_not_exists(
-                index_name: str, create_statement: str
-            ) -> None:
-                cursor.execute(
-                    f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index_name}'"
-                )
-                if not cursor.fetchone():
-                    cursor.execute(create_statement)
-
-            create_index_if_not_exists(
-                "idx_object_type",
-                """
-                CREATE INDEX idx_object_type
-                ON salesforce_objects(object_type, id)
-                WHERE object_type IS NOT NULL
-                """,
-            )
-
-            create_index_if_not_exists(
-                "idx_parent_id",
-                """
-                CREATE INDEX idx_parent_id
-                ON relationships(parent_id, child_id)
-                """,
-            )
-
-            create_index_if_not_exists(
-                "idx_child_parent",
-                """
-                CREATE INDEX idx_child_parent
-                ON relationships(child_id)
-                WHERE child_id IS NOT NULL
-                """,
-            )
-
-            create_index_if_not_exists(
-                "idx_relationship_types_lookup",
-                """
-                CREATE INDEX idx_relationship_types_lookup
-                ON relationship_types(parent_type, child_id, parent_id)
-                """,
-            )
+            OnyxSalesforceSQLite._create_indexes(cursor)
 
             elapsed = time.monotonic() - start
             logger.info(f"init_db - create tables and indices: elapsed={elapsed:.2f}")
@@ -237,6 +227,17 @@ class OnyxSalesforceSQLite:
             elapsed = time.monotonic() - start
             logger.info(f"init_db - update_user_email_map: elapsed={elapsed:.2f}")
 
+    @staticmethod
+    def _create_indexes(cursor: sqlite3.Cursor) -> None:
+        # Create indexes if they don't exist (SQLite ignores IF NOT EXISTS for indexes)
+        for index_name, create_statement in _INDEXES.items():
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' AND name=?",
+                (index_name,),
+            )
+            if not cursor.fetchone():
+                cursor.execute(create_statement)
+
     def get_user_id_by_email(self, email: str) -> str | None:
         """Get the Salesforce User ID for a given email address.
 
@@ -516,6 +517,58 @@ class OnyxSalesforceSQLite:
 
         return record, parent_ids
 
+    @staticmethod
+    def _parse_csv(
+        csv_download_path: str, remove_ids: bool, batch_size: int
+    ) -> Iterator[list[_ParsedRecord]]:
+        """Yields the normalized rows of the CSV in batches of batch_size"""
+        # some customers need this to be larger than the default 128KB, go with 16MB
+        csv.field_size_limit(16 * 1024 * 1024)
+
+        with open(csv_download_path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            batch: list[_ParsedRecord] = []
+            for row in reader:
+                if "Id" not in row:
+                    logger.warning(
+                        f"Row {row} does not have an Id field in {csv_download_path}"
+                    )
+                    continue
+
+                normalized_record, parent_ids = OnyxSalesforceSQLite.normalize_record(
+                    row, remove_ids
+                )
+                batch.append((row["Id"], json.dumps(normalized_record), parent_ids))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
+
+    @staticmethod
+    def _write_records(
+        cursor: sqlite3.Cursor,
+        object_type: str,
+        records: list[_ParsedRecord],
+        add_relationship_types: bool = True,
+    ) -> None:
+        # NOTE(rkuo): looks like we take a list and dump it as json into the db
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
+            VALUES (?, ?, ?)
+            """,
+            [(row_id, object_type, data) for row_id, data, _ in records],
+        )
+
+        # later rows of the same id win, like they would when upserting one by one
+        OnyxSalesforceSQLite._update_relationship_tables_bulk(
+            cursor,
+            {row_id: parent_ids for row_id, _, parent_ids in records},
+            add_relationship_types,
+        )
+
     def update_from_csv(
         self, object_type: str, csv_download_path: str, remove_ids: bool = True
     ) -> list[str]:
@@ -523,52 +576,19 @@ class OnyxSalesforceSQLite:
         if self._conn is None:
             raise RuntimeError("Database connection is closed")
 
-        # some customers need this to be larger than the default 128KB, go with 16MB
-        csv.field_size_limit(16 * 1024 * 1024)
-
-        updated_ids = []
+        updated_ids: list[str] = []
 
         with self._conn:
             cursor = self._conn.cursor()
 
-            with open(csv_download_path, "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                uncommitted_rows = 0
-                for row in reader:
-                    if "Id" not in row:
-                        logger.warning(
-                            f"Row {row} does not have an Id field in {csv_download_path}"
-                        )
-                        continue
-
-                    row_id = row["Id"]
-
-                    normalized_record, parent_ids = (
-                        OnyxSalesforceSQLite.normalize_record(row, remove_ids)
-                    )
-                    normalized_record_json_str = json.dumps(normalized_record)
-
-                    # Update main object data
-                    # NOTE(rkuo): looks like we take a list and dump it as json into the db
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO salesforce_objects (id, object_type, data)
-                        VALUES (?, ?, ?)
-                        """,
-                        (row_id, object_type, normalized_record_json_str),
-                    )
-
-                    # Update relationships using the same connection
-                    OnyxSalesforceSQLite._update_relationship_tables(
-                        cursor, row_id, parent_ids
-                    )
-                    updated_ids.append(row_id)
+            for records in OnyxSalesforceSQLite._parse_csv(
+                csv_download_path, remove_ids, SALESFORCE_SQLITE_WRITE_BATCH_SIZE
+            ):
+                OnyxSalesforceSQLite._write_records(cursor, object_type, records)
+                updated_ids.extend(row_id for row_id, _, _ in records)
 
-                    # periodically commit or else memory will balloon
-                    uncommitted_rows += 1
-                    if uncommitted_rows >= 1024:
-                        self._conn.commit()
-                        uncommitted_rows = 0
+                # periodically commit or else memory will balloon
+                self._conn.commit()
 
             # If we're updating User objects, update the email map
             if object_type == USER_OBJECT_TYPE:
@@ -576,6 +596,141 @@ class OnyxSalesforceSQLite:
 
         return updated_ids
 
+    def bulk_update_from_csvs(
+        self,
+        object_type_to_csv_paths: dict[str, list[str] | None],
+        remove_ids: bool = True,
+        num_workers: int = SALESFORCE_CSV_PARSE_WORKERS,
+        batch_size: int = SALESFORCE_SQLITE_WRITE_BATCH_SIZE,
+    ) -> Iterator[tuple[str, str, list[str]]]:
+        """Loads all the downloaded CSVs into the db, the equivalent of calling
+        update_from_csv for each of them.
+
+        The CSVs of different object types are parsed by worker threads while this
+        thread writes the parsed rows with executemany, sqlite releases the GIL while
+        it works so the two overlap. The CSVs of one object type are parsed in order.
+        For the duration of the load the connection trades durability for speed
+        (synchronous=OFF), which is fine for a staging db that is rebuilt from
+        scratch when a sync fails, and the secondary indexes of an empty db are only
+        built once everything is loaded.
+
+        Yields (object_type, csv_path, updated_ids) once a CSV is fully committed."""
+        if self._conn is None:
+            raise RuntimeError("Database connection is closed")
+
+        work = [
+            (object_type, csv_paths)
+            for object_type, csv_paths in object_type_to_csv_paths.items()
+            # If path is None, it means it failed to fetch the csv
+            if csv_paths
+        ]
+        if not work:
+            return
+
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-2000000")  # Use 2GB memory for cache
+
+        defer_indexes = (
+            conn.execute("SELECT 1 FROM salesforce_objects LIMIT 1").fetchone() is None
+        )
+        if defer_indexes:
+            with conn:
+                for index_name in _INDEXES:
+                    conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+        # items are a batch of parsed rows, (object_type, csv_path, None) once a CSV
+        # is done, None once a worker is done or the exception that stopped a worker
+        parsed: queue.Queue[
+            tuple[str, str, list[_ParsedRecord] | None] | BaseException | None
+        ] = queue.Queue(maxsize=2 * num_workers)
+        stop = threading.Event()
+
+        def _put(
+            item: tuple[str, str, list[_ParsedRecord] | None] | BaseException | None,
+        ) -> bool:
+            """Returns False if the load was stopped"""
+            while not stop.is_set():
+                try:
+                    parsed.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _parse_object_type(object_type: str, csv_paths: list[str]) -> None:
+            try:
+                for csv_path in csv_paths:
+                    for records in OnyxSalesforceSQLite._parse_csv(
+                        csv_path, remove_ids, batch_size
+                    ):
+                        if not _put((object_type, csv_path, records)):
+                            return
+                    if not _put((object_type, csv_path, None)):
+                        return
+            except BaseException as e:
+                _put(e)
+                return
+            _put(None)
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(num_workers, len(work))),
+            thread_name_prefix="salesforce_csv_parse",
+        )
+        try:
+            for object_type, csv_paths in work:
+                executor.submit(_parse_object_type, object_type, csv_paths)
+
+            updated_ids_by_csv_path: dict[str, list[str]] = defaultdict(list)
+            num_running = len(work)
+            cursor = conn.cursor()
+            while num_running:
+                item = parsed.get()
+                if item is None:
+                    num_running -= 1
+                    continue
+
+                if isinstance(item, BaseException):
+                    raise item
+
+                object_type, csv_path, records = item
+                if records is not None:
+                    with conn:
+                        OnyxSalesforceSQLite._write_records(
+                            cursor, object_type, records, add_relationship_types=False
+                        )
+                    updated_ids_by_csv_path[csv_path].extend(
+                        row_id for row_id, _, _ in records
+                    )
+                    continue
+
+                # If we're updating User objects, update the email map
+                if object_type == USER_OBJECT_TYPE:
+                    with conn:
+                        OnyxSalesforceSQLite._update_user_email_map(cursor)
+
+                yield object_type, csv_path, updated_ids_by_csv_path.pop(csv_path, [])
+
+            # one pass at the end instead of a lookup per relationship, this also
+            # covers parents that were loaded after their children
+            with conn:
+                OnyxSalesforceSQLite._fill_missing_relationship_types(cursor)
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+            if defer_indexes:
+                start = time.monotonic()
+                with conn:
+                    OnyxSalesforceSQLite._create_indexes(conn.cursor())
+                logger.info(
+                    f"Salesforce bulk load - create indices: "
+                    f"elapsed={time.monotonic() - start:.2f}"
+                )
+            conn.execute("PRAGMA synchronous=NORMAL")
+
     def get_child_ids(self, parent_id: str) -> set[str]:
         """Get all child IDs for a given parent ID."""
         if self._conn is None:
@@ -676,72 +831,98 @@ class OnyxSalesforceSQLite:
             return [row[0] for row in cursor.fetchall()]
 
     @staticmethod
-    def _update_relationship_tables(
-        cursor: sqlite3.Cursor, child_id: str, parent_ids: set[str]
+    def _update_relationship_tables_bulk(
+        cursor: sqlite3.Cursor,
+        parent_ids_by_child_id: dict[str, set[str]],
+        add_relationship_types: bool = True,
     ) -> None:
-        """Given a child id and a set of parent id's, updates the
-        relationships of the child to the parents in the db and removes old relationships.
+        """Given a map of child id to a set of parent id's, updates the
+        relationships of the children to the parents in the db and removes old
+        relationships. Runs a fixed number of statements no matter how many
+        children there are.
 
         Args:
-            conn: The database connection to use (must be in a transaction)
-            child_id: The ID of the child record
-            parent_ids: Set of parent IDs to link to
+            cursor: The cursor to use (must be in a transaction)
+            parent_ids_by_child_id: The parent IDs to link to, by child ID
+            add_relationship_types: If False, the caller fills in relationship_types
+                later with _fill_missing_relationship_types
         """
 
         try:
             # Get existing parent IDs
-            cursor.execute(
-                "SELECT parent_id FROM relationships WHERE child_id = ?", (child_id,)
-            )
-            old_parent_ids = {row[0] for row in cursor.fetchall()}
+            # SQLite typically has a limit of 999 variables
+            old_parent_ids_by_child_id: dict[str, set[str]] = defaultdict(set)
+            for child_ids in batch_list(list(parent_ids_by_child_id), 500):
+                id_placeholders = ",".join(["?" for _ in child_ids])
+                cursor.execute(
+                    f"SELECT child_id, parent_id FROM relationships WHERE child_id IN ({id_placeholders})",
+                    child_ids,
+                )
+                for child_id, parent_id in cursor.fetchall():
+                    old_parent_ids_by_child_id[child_id].add(parent_id)
 
             # Calculate differences
-            parent_ids_to_remove = old_parent_ids - parent_ids
-            parent_ids_to_add = parent_ids - old_parent_ids
+            relationships_to_remove: list[tuple[str, str]] = []
+            relationships_to_add: list[tuple[str, str]] = []
+            for child_id, parent_ids in parent_ids_by_child_id.items():
+                old_parent_ids = old_parent_ids_by_child_id.get(child_id, set())
+                relationships_to_remove.extend(
+                    (child_id, parent_id) for parent_id in old_parent_ids - parent_ids
+                )
+                relationships_to_add.extend(
+                    (child_id, parent_id) for parent_id in parent_ids - old_parent_ids
+                )
 
             # Remove old relationships
-            if parent_ids_to_remove:
+            if relationships_to_remove:
                 cursor.executemany(
                     "DELETE FROM relationships WHERE child_id = ? AND parent_id = ?",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_remove],
+                    relationships_to_remove,
                 )
                 # Also remove from relationship_types
                 cursor.executemany(
                     "DELETE FROM relationship_types WHERE child_id = ? AND parent_id = ?",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_remove],
+                    relationships_to_remove,
                 )
 
             # Add new relationships
-            if parent_ids_to_add:
+            if relationships_to_add:
                 # First add to relationships table
                 cursor.executemany(
                     "INSERT INTO relationships (child_id, parent_id) VALUES (?, ?)",
-                    [(child_id, parent_id) for parent_id in parent_ids_to_add],
+                    relationships_to_add,
                 )
 
-                # Then get the types of the parent objects and add to relationship_types
-                for parent_id in parent_ids_to_add:
-                    cursor.execute(
-                        "SELECT object_type FROM salesforce_objects WHERE id = ?",
-                        (parent_id,),
+                # Then add the ones whose parent we know to relationship_types
+                if add_relationship_types:
+                    cursor.executemany(
+                        """
+                        INSERT OR IGNORE INTO relationship_types (child_id, parent_id, parent_type)
+                        SELECT ?, id, object_type FROM salesforce_objects WHERE id = ?
+                        """,
+                        relationships_to_add,
                     )
-                    result = cursor.fetchone()
-                    if result:
-                        parent_type = result[0]
-                        cursor.execute(
-                            """
-                            INSERT INTO relationship_types (child_id, parent_id, parent_type)
-                            VALUES (?, ?, ?)
-                            """,
-                            (child_id, parent_id, parent_type),
-                        )
 
         except Exception:
             logger.exception(
-                f"Error updating relationship tables: child_id={child_id} parent_ids={parent_ids}"
+                f"Error updating relationship tables: "
+                f"child_ids={list(parent_ids_by_child_id)[:10]}"
             )
             raise
 
+    @staticmethod
+    def _fill_missing_relationship_types(cursor: sqlite3.Cursor) -> None:
+        """Adds the relationship_types rows of all relationships whose parent is
+        known."""
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO relationship_types (child_id, parent_id, parent_type)
+            SELECT r.child_id, r.parent_id, so.object_type
+            FROM relationships r
+            JOIN salesforce_objects so ON so.id = r.parent_id
+            """
+        )
+
     @staticmethod
     def _update_user_email_map(cursor: sqlite3.Cursor) -> None:
         """Update the user_email_map table with current User objects.
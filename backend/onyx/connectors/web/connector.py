@@ -1,17 +1,30 @@
+import hashlib
 import io
 import ipaddress
+import queue
 import random
 import socket
+import threading
 import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
+from email.utils import format_datetime
 from enum import Enum
 from typing import Any
 from typing import cast
 from typing import Tuple
+from typing import TypeVar
 from urllib.parse import urljoin
 from urllib.parse import urlparse
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
 from oauthlib.oauth2 import BackendApplicationClient
@@ -22,6 +35,12 @@ from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_BROWSER_POOL_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_HOST_DELAY_SECONDS
+from onyx.configs.app_configs import WEB_CONNECTOR_HTTP_FAST_PATH
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENCY
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENCY_PER_HOST
+from onyx.configs.app_configs import WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
@@ -33,52 +52,212 @@ from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
 from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import PollConnector
+from onyx.connectors.interfaces import SecondsSinceUnixEpoch
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
 from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
+from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
 from shared_configs.configs import MULTI_TENANT
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
 
+T = TypeVar("T")
+
+
+class HostThrottle:
+    """Politeness limits shared by all crawl workers: at most max_concurrency requests
+    in flight per host and at least min_delay seconds between the start of two
+    requests to the same host."""
+
+    def __init__(self, max_concurrency: int, min_delay: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.BoundedSemaphore(self.max_concurrency)
+            )
+
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_delay
+
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+    def back_off(self, url: str, seconds: float) -> None:
+        """Delays the next request to the host of url, e.g. after a 429"""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._next_start[host] = max(
+                self._next_start.get(host, 0.0), time.monotonic() + seconds
+            )
+
+
+class BrowserPool:
+    """Renders pages in a fixed number of headless browsers. The Playwright sync API is
+    bound to the thread that started it, so every browser is owned by one pool thread
+    and callers hand over their work as a function of the BrowserContext.
+
+    Browsers are only launched once a page needs them, and are restarted after
+    max_pages_per_context pages or an error to keep their memory in check."""
+
+    def __init__(self, size: int, max_pages_per_context: int) -> None:
+        self.size = size
+        self.max_pages_per_context = max_pages_per_context
+        self._jobs: queue.Queue[
+            tuple[Callable[[BrowserContext], Any], Future] | None
+        ] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def render(self, func: Callable[[BrowserContext], T]) -> T:
+        """Runs func in one of the browsers and waits for its result"""
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"web_connector_browser_{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+        future: Future[T] = Future()
+        self._jobs.put((func, future))
+        return future.result()
+
+    def _run(self) -> None:
+        playwright: Playwright | None = None
+        context: BrowserContext | None = None
+        num_pages = 0
+
+        def _stop() -> None:
+            nonlocal playwright, context
+            try:
+                if context:
+                    context.close()
+                if playwright:
+                    playwright.stop()
+            except Exception:
+                logger.exception("Failed to stop Playwright")
+            playwright = None
+            context = None
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+
+                func, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if context is None or num_pages >= self.max_pages_per_context:
+                        _stop()
+                        playwright, context = start_playwright()
+                        num_pages = 0
+
+                    num_pages += 1
+                    future.set_result(func(context))
+                except BaseException as e:
+                    future.set_exception(e)
+                    _stop()
+        finally:
+            _stop()
+
+    def close(self) -> None:
+        with self._lock:
+            for _ in self._threads:
+                self._jobs.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+
+
 class ScrapeSessionContext:
-    """Session level context for scraping"""
+    """Session level context for scraping. The crawl state is only touched by the
+    thread driving the crawl, the clients and pools are shared with the workers."""
 
-    def __init__(self, base_url: str, to_visit: list[str]):
+    def __init__(
+        self,
+        base_url: str,
+        to_visit: list[str],
+        batch_size: int = INDEX_BATCH_SIZE,
+        modified_since: datetime | None = None,
+    ):
         self.base_url = base_url
         self.to_visit = to_visit
+        self.batch_size = batch_size
+        # pages not modified since then are skipped
+        self.modified_since = modified_since
         self.visited_links: set[str] = set()
         self.content_hashes: set[int] = set()
 
         self.doc_batch: list[Document] = []
 
         self.at_least_one_doc: bool = False
+        self.num_not_modified: int = 0
         self.last_error: str | None = None
-        self.needs_retry: bool = False
 
-        self.playwright: Playwright | None = None
-        self.playwright_context: BrowserContext | None = None
+        # changes to the urls remembered for the next recursive crawl
+        self.found_urls: set[str] = set()
+        self.gone_urls: set[str] = set()
+
+        self.host_throttle = HostThrottle(
+            WEB_CONNECTOR_MAX_CONCURRENCY_PER_HOST, WEB_CONNECTOR_HOST_DELAY_SECONDS
+        )
+        self.http_client: httpx.Client | None = None
+        self.browser_pool: BrowserPool | None = None
 
     def initialize(self) -> None:
         self.stop()
-        self.playwright, self.playwright_context = start_playwright()
+        if WEB_CONNECTOR_HTTP_FAST_PATH:
+            self.http_client = build_http_client()
+        self.browser_pool = BrowserPool(
+            WEB_CONNECTOR_BROWSER_POOL_SIZE, max_pages_per_context=self.batch_size
+        )
 
     def stop(self) -> None:
-        if self.playwright_context:
-            self.playwright_context.close()
-            self.playwright_context = None
+        if self.http_client:
+            self.http_client.close()
+            self.http_client = None
 
-        if self.playwright:
-            self.playwright.stop()
-            self.playwright = None
+        if self.browser_pool:
+            self.browser_pool.close()
+            self.browser_pool = None
 
 
 class ScrapeResult:
-    doc: Document | None = None
-    retry: bool = False
+    def __init__(self, url: str) -> None:
+        # the url after redirects
+        self.url = url
+        self.doc: Document | None = None
+        self.retry: bool = False
+        self.error: str | None = None
+        self.not_modified: bool = False
+        # the page doesn't exist (anymore)
+        self.gone: bool = False
+        self.content_hash: int | None = None
+        self.internal_links: set[str] = set()
 
 
 WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
@@ -121,6 +300,11 @@ PDF_MIME_TYPES = [
     "text/x-pdf",
 ]
 
+# Recursive crawls remember the pages they found, so that a later crawl that skips
+# unchanged pages (and therefore their links) still visits everything behind them
+_KNOWN_URLS_KEY_PREFIX = "web_connector_known_urls"
+_KNOWN_URLS_TTL_SECONDS = 30 * 24 * 60 * 60
+
 
 class WEB_CONNECTOR_VALID_SETTINGS(str, Enum):
     # Given a base site, index everything under that path
@@ -244,12 +428,57 @@ def get_internal_links(
     return internal_links
 
 
-def is_pdf_content(response: requests.Response) -> bool:
+def is_pdf_content(response: requests.Response | httpx.Response) -> bool:
     """Check if the response contains PDF content based on content-type header"""
     content_type = response.headers.get("content-type", "").lower()
     return any(pdf_type in content_type for pdf_type in PDF_MIME_TYPES)
 
 
+def _get_oauth_headers() -> dict[str, str]:
+    if not (
+        WEB_CONNECTOR_OAUTH_CLIENT_ID
+        and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
+        and WEB_CONNECTOR_OAUTH_TOKEN_URL
+    ):
+        return {}
+
+    client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
+    oauth = OAuth2Session(client=client)
+    token = oauth.fetch_token(
+        token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
+        client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
+        client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
+    )
+    return {"Authorization": "Bearer {}".format(token["access_token"])}
+
+
+def build_http_client() -> httpx.Client:
+    """Client for the plain HTTP fast path, thread safe and shared by all workers"""
+    headers = {
+        key: value
+        for key, value in DEFAULT_HEADERS.items()
+        # connection specific headers are not allowed in HTTP/2
+        if key != "Connection"
+    }
+    # brotli is not installed
+    headers["Accept-Encoding"] = "gzip, deflate"
+    headers.update(_get_oauth_headers())
+
+    return httpx.Client(
+        http2=True,
+        headers=headers,
+        follow_redirects=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=WEB_CONNECTOR_MAX_CONCURRENCY),
+    )
+
+
+def _get_conditional_headers(modified_since: datetime | None) -> dict[str, str]:
+    if modified_since is None:
+        return {}
+    return {"If-Modified-Since": format_datetime(modified_since, usegmt=True)}
+
+
 def start_playwright() -> Tuple[Playwright, BrowserContext]:
     playwright = sync_playwright().start()
 
@@ -310,21 +539,9 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
     """
     )
 
-    if (
-        WEB_CONNECTOR_OAUTH_CLIENT_ID
-        and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
-        and WEB_CONNECTOR_OAUTH_TOKEN_URL
-    ):
-        client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
-        oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
-            token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
-            client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
-            client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
-        )
-        context.set_extra_http_headers(
-            {"Authorization": "Bearer {}".format(token["access_token"])}
-        )
+    oauth_headers = _get_oauth_headers()
+    if oauth_headers:
+        context.set_extra_http_headers(oauth_headers)
 
     return playwright, context
 
@@ -387,6 +604,83 @@ def _get_datetime_from_last_modified_header(last_modified: str) -> datetime | No
         return None
 
 
+def _get_known_urls_key(base_url: str) -> str:
+    return f"{_KNOWN_URLS_KEY_PREFIX}:{hashlib.sha256(base_url.encode()).hexdigest()}"
+
+
+def _get_known_urls(base_url: str) -> list[str]:
+    try:
+        known_urls = get_redis_client().smembers(_get_known_urls_key(base_url))
+    except Exception:
+        logger.exception(f"Failed to load the known urls of {base_url}")
+        return []
+
+    return [
+        url.decode() if isinstance(url, bytes) else url
+        for url in cast(set[bytes | str], known_urls)
+    ]
+
+
+def _save_known_urls(session_ctx: ScrapeSessionContext) -> None:
+    if not session_ctx.found_urls and not session_ctx.gone_urls:
+        return
+
+    # using pipeline doesn't automatically add the tenant_id prefix
+    key = f"{get_current_tenant_id()}:{_get_known_urls_key(session_ctx.base_url)}"
+    try:
+        pipe = get_redis_client().pipeline()
+        if session_ctx.found_urls:
+            pipe.sadd(key, *session_ctx.found_urls)
+        if session_ctx.gone_urls:
+            pipe.srem(key, *session_ctx.gone_urls)
+        pipe.expire(key, _KNOWN_URLS_TTL_SECONDS)
+        pipe.execute()
+    except Exception:
+        logger.exception(f"Failed to save the known urls of {session_ctx.base_url}")
+        return
+
+    session_ctx.found_urls = set()
+    session_ctx.gone_urls = set()
+
+
+def _build_pdf_document(
+    url: str, content: bytes, last_modified: str | None
+) -> Document:
+    page_text, metadata, images = read_pdf_file(file=io.BytesIO(content))
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=page_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=url.split("/")[-1],
+        metadata=metadata,
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
+def _set_html_document(
+    result: ScrapeResult, parsed_html: ParsedHTML, last_modified: str | None
+) -> None:
+    # Sometimes pages with #! will serve duplicate content
+    # There are also just other ways this can happen
+    result.content_hash = hash((parsed_html.title, parsed_html.cleaned_text))
+    result.doc = Document(
+        id=result.url,
+        sections=[TextSection(link=result.url, text=parsed_html.cleaned_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=parsed_html.title or result.url,
+        metadata={},
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
 def _handle_cookies(context: BrowserContext, url: str) -> None:
     """Handle cookies for the given URL to help with bot detection"""
     try:
@@ -428,7 +722,7 @@ def _handle_cookies(context: BrowserContext, url: str) -> None:
         )
 
 
-class WebConnector(LoadConnector):
+class WebConnector(LoadConnector, PollConnector):
     MAX_RETRIES = 3
 
     def __init__(
@@ -479,62 +773,28 @@ class WebConnector(LoadConnector):
             logger.warning("Unexpected credentials provided for Web Connector")
         return None
 
-    def _do_scrape(
+    def _render_page(
         self,
+        context: BrowserContext,
         index: int,
         initial_url: str,
         session_ctx: ScrapeSessionContext,
     ) -> ScrapeResult:
-        """Returns a ScrapeResult object with a doc and retry flag."""
-
-        if session_ctx.playwright is None:
-            raise RuntimeError("scrape_context.playwright is None")
-
-        if session_ctx.playwright_context is None:
-            raise RuntimeError("scrape_context.playwright_context is None")
-
-        result = ScrapeResult()
+        """Renders the page in a browser of the pool, runs in the thread owning it"""
+        result = ScrapeResult(initial_url)
 
         # Handle cookies for the URL
-        _handle_cookies(session_ctx.playwright_context, initial_url)
-
-        # First do a HEAD request to check content type without downloading the entire content
-        head_response = requests.head(
-            initial_url, headers=DEFAULT_HEADERS, allow_redirects=True
-        )
-        is_pdf = is_pdf_content(head_response)
-
-        if is_pdf or initial_url.lower().endswith(".pdf"):
-            # PDF files are not checked for links
-            response = requests.get(initial_url, headers=DEFAULT_HEADERS)
-            page_text, metadata, images = read_pdf_file(
-                file=io.BytesIO(response.content)
-            )
-            last_modified = response.headers.get("Last-Modified")
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=page_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=initial_url.split("/")[-1],
-                metadata=metadata,
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
-            )
-
-            return result
+        _handle_cookies(context, initial_url)
 
-        page = session_ctx.playwright_context.new_page()
+        page = context.new_page()
         try:
-            # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
-            page_response = page.goto(
-                initial_url,
-                timeout=30000,  # 30 seconds
-                wait_until="domcontentloaded",  # Wait for DOM to be ready
-            )
+            with session_ctx.host_throttle.slot(initial_url):
+                # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
+                page_response = page.goto(
+                    initial_url,
+                    timeout=30000,  # 30 seconds
+                    wait_until="domcontentloaded",  # Wait for DOM to be ready
+                )
 
             last_modified = (
                 page_response.header_value("Last-Modified") if page_response else None
@@ -542,16 +802,7 @@ class WebConnector(LoadConnector):
             final_url = page.url
             if final_url != initial_url:
                 protected_url_check(final_url)
-                initial_url = final_url
-                if initial_url in session_ctx.visited_links:
-                    logger.info(
-                        f"{index}: {initial_url} redirected to {final_url} - already indexed"
-                    )
-                    page.close()
-                    return result
-
-                logger.info(f"{index}: {initial_url} redirected to {final_url}")
-                session_ctx.visited_links.add(initial_url)
+                result.url = final_url
 
             # If we got here, the request was successful
             if self.scroll_before_scraping:
@@ -561,7 +812,7 @@ class WebConnector(LoadConnector):
                     page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
                     # wait for the content to load if we scrolled
                     page.wait_for_load_state("networkidle", timeout=30000)
-                    time.sleep(0.5)  # let javascript run
+                    page.wait_for_timeout(500)  # let javascript run
 
                     new_height = page.evaluate("document.body.scrollHeight")
                     if new_height == previous_height:
@@ -573,16 +824,13 @@ class WebConnector(LoadConnector):
             soup = BeautifulSoup(content, "html.parser")
 
             if self.recursive:
-                internal_links = get_internal_links(
-                    session_ctx.base_url, initial_url, soup
+                result.internal_links = get_internal_links(
+                    session_ctx.base_url, result.url, soup
                 )
-                for link in internal_links:
-                    if link not in session_ctx.visited_links:
-                        session_ctx.to_visit.append(link)
 
             if page_response and str(page_response.status)[0] in ("4", "5"):
-                session_ctx.last_error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
-                logger.info(session_ctx.last_error)
+                result.error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
+                result.gone = page_response.status in (404, 410)
                 result.retry = True
                 return result
 
@@ -609,109 +857,316 @@ class WebConnector(LoadConnector):
                     else:
                         parsed_html.cleaned_text += "\n" + document_text
 
-            # Sometimes pages with #! will serve duplicate content
-            # There are also just other ways this can happen
-            hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
-            if hashed_text in session_ctx.content_hashes:
-                logger.info(
-                    f"{index}: Skipping duplicate title + content for {initial_url}"
-                )
-                return result
-
-            session_ctx.content_hashes.add(hashed_text)
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=parsed_html.cleaned_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=parsed_html.title or initial_url,
-                metadata={},
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
-            )
+            _set_html_document(result, parsed_html, last_modified)
         finally:
             page.close()
 
         return result
 
-    def load_from_state(self) -> GenerateDocumentsOutput:
-        """Traverses through all pages found on the website
-        and converts them into documents"""
+    def _fetch_static(
+        self,
+        http_client: httpx.Client,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult | None:
+        """Fetches the page with plain HTTP, returns None if it has to be rendered in
+        a browser instead."""
+        with session_ctx.host_throttle.slot(initial_url):
+            response = http_client.get(
+                initial_url,
+                headers=_get_conditional_headers(session_ctx.modified_since),
+            )
 
-        if not self.to_visit_list:
-            raise ValueError("No URLs to visit")
+        result = ScrapeResult(str(response.url))
+        if result.url != initial_url:
+            protected_url_check(result.url)
 
-        base_url = self.to_visit_list[0]  # For the recursive case
-        check_internet_connection(base_url)  # make sure we can connect to the base url
+        if response.status_code == 304:
+            result.not_modified = True
+            return result
 
-        session_ctx = ScrapeSessionContext(base_url, self.to_visit_list)
-        session_ctx.initialize()
+        # 401s may be an expired token and 403s are usually bot detection, the
+        # browser gets a fresh token and usually gets around the bot detection
+        if response.status_code in (401, 403):
+            return None
 
-        while session_ctx.to_visit:
-            initial_url = session_ctx.to_visit.pop()
-            if initial_url in session_ctx.visited_links:
-                continue
-            session_ctx.visited_links.add(initial_url)
+        if response.status_code >= 400:
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    session_ctx.host_throttle.back_off(initial_url, int(retry_after))
+
+            result.error = f"Skipped indexing {initial_url} due to HTTP {response.status_code} response"
+            result.gone = response.status_code in (404, 410)
+            result.retry = True
+            return result
+
+        last_modified = response.headers.get("Last-Modified")
+        if is_pdf_content(response) or initial_url.lower().endswith(".pdf"):
+            # PDF files are not checked for links
+            result.url = initial_url
+            result.doc = _build_pdf_document(
+                initial_url, response.content, last_modified
+            )
+            return result
+
+        content_type = response.headers.get("content-type", "").lower()
+        if "html" not in content_type or self.scroll_before_scraping:
+            return None
 
+        soup = BeautifulSoup(response.text, "html.parser")
+        internal_links = (
+            get_internal_links(session_ctx.base_url, result.url, soup)
+            if self.recursive
+            else set()
+        )
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        if (
+            JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text
+            or len(parsed_html.cleaned_text) < WEB_CONNECTOR_MIN_STATIC_TEXT_LENGTH
+        ):
+            return None
+
+        result.internal_links = internal_links
+        _set_html_document(result, parsed_html, last_modified)
+        return result
+
+    def _do_scrape(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult:
+        """Returns a ScrapeResult object with a doc and retry flag. Runs in a crawl
+        worker, so it must not touch the crawl state of the session."""
+
+        if session_ctx.browser_pool is None:
+            raise RuntimeError("scrape_context.browser_pool is None")
+
+        if session_ctx.http_client is not None:
             try:
-                protected_url_check(initial_url)
+                result = self._fetch_static(
+                    session_ctx.http_client, initial_url, session_ctx
+                )
+            except httpx.HTTPError as e:
+                # e.g. servers with a broken HTTP/2 setup, the browser may still work
+                logger.info(f"{index}: Plain HTTP fetch of {initial_url} failed: {e}")
+                result = None
+
+            if result is not None:
+                return result
+        else:
+            # First do a HEAD request to check content type without downloading the entire content
+            with session_ctx.host_throttle.slot(initial_url):
+                head_response = requests.head(
+                    initial_url,
+                    headers={
+                        **DEFAULT_HEADERS,
+                        **_get_conditional_headers(session_ctx.modified_since),
+                    },
+                    allow_redirects=True,
+                )
+
+            if head_response.status_code == 304:
+                result = ScrapeResult(initial_url)
+                result.not_modified = True
+                return result
+
+            if is_pdf_content(head_response) or initial_url.lower().endswith(".pdf"):
+                # PDF files are not checked for links
+                with session_ctx.host_throttle.slot(initial_url):
+                    response = requests.get(initial_url, headers=DEFAULT_HEADERS)
+                result = ScrapeResult(initial_url)
+                result.doc = _build_pdf_document(
+                    initial_url, response.content, response.headers.get("Last-Modified")
+                )
+                return result
+
+        return session_ctx.browser_pool.render(
+            lambda context: self._render_page(context, index, initial_url, session_ctx)
+        )
+
+    def _scrape_with_retries(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult:
+        try:
+            protected_url_check(initial_url)
+        except Exception as e:
+            result = ScrapeResult(initial_url)
+            result.error = f"Invalid URL {initial_url} due to {e}"
+            logger.warning(result.error)
+            return result
+
+        result = ScrapeResult(initial_url)
+        # Add retry mechanism with exponential backoff
+        for retry_count in range(self.MAX_RETRIES):
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
+                )
+                time.sleep(delay)
+
+            try:
+                result = self._do_scrape(index, initial_url, session_ctx)
             except Exception as e:
-                session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
-                logger.warning(session_ctx.last_error)
+                result = ScrapeResult(initial_url)
+                result.error = f"Failed to fetch '{initial_url}': {e}"
+                logger.exception(result.error)
                 continue
 
-            index = len(session_ctx.visited_links)
-            logger.info(f"{index}: Visiting {initial_url}")
+            if result.retry:
+                logger.info(result.error)
+                continue
 
-            # Add retry mechanism with exponential backoff
-            retry_count = 0
+            break  # success / don't retry
 
-            while retry_count < self.MAX_RETRIES:
-                if retry_count > 0:
-                    # Add a random delay between retries (exponential backoff)
-                    delay = min(2**retry_count + random.uniform(0, 1), 10)
-                    logger.info(
-                        f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
-                    )
-                    time.sleep(delay)
+        return result
 
-                try:
-                    result = self._do_scrape(index, initial_url, session_ctx)
-                    if result.retry:
+    def _handle_scrape_result(
+        self,
+        index: int,
+        initial_url: str,
+        result: ScrapeResult,
+        session_ctx: ScrapeSessionContext,
+    ) -> None:
+        if result.error:
+            session_ctx.last_error = result.error
+
+        if result.url != initial_url:
+            if result.url in session_ctx.visited_links:
+                logger.info(
+                    f"{index}: {initial_url} redirected to {result.url} - already indexed"
+                )
+                return
+
+            logger.info(f"{index}: {initial_url} redirected to {result.url}")
+            session_ctx.visited_links.add(result.url)
+
+        for link in result.internal_links:
+            if link not in session_ctx.visited_links:
+                session_ctx.to_visit.append(link)
+
+        if result.gone:
+            session_ctx.gone_urls.add(initial_url)
+        elif result.error is None:
+            session_ctx.found_urls.add(initial_url)
+
+        if result.not_modified:
+            logger.info(f"{index}: {initial_url} not modified, skipping")
+            session_ctx.num_not_modified += 1
+            return
+
+        if result.doc is None:
+            return
+
+        if result.content_hash is not None:
+            if result.content_hash in session_ctx.content_hashes:
+                logger.info(
+                    f"{index}: Skipping duplicate title + content for {result.url}"
+                )
+                return
+            session_ctx.content_hashes.add(result.content_hash)
+
+        session_ctx.doc_batch.append(result.doc)
+
+    def _crawl(self, modified_since: datetime | None) -> GenerateDocumentsOutput:
+        """Visits up to WEB_CONNECTOR_MAX_CONCURRENCY pages at a time. The crawl state
+        lives in this generator, workers only fetch pages and report back."""
+        if not self.to_visit_list:
+            raise ValueError("No URLs to visit")
+
+        base_url = self.to_visit_list[0]  # For the recursive case
+        check_internet_connection(base_url)  # make sure we can connect to the base url
+
+        session_ctx = ScrapeSessionContext(
+            base_url,
+            list(self.to_visit_list),
+            batch_size=self.batch_size,
+            modified_since=modified_since,
+        )
+        if self.recursive and modified_since is not None:
+            # unchanged pages don't give us their links
+            session_ctx.to_visit.extend(_get_known_urls(base_url))
+        session_ctx.initialize()
+
+        executor = ThreadPoolExecutor(
+            max_workers=WEB_CONNECTOR_MAX_CONCURRENCY,
+            thread_name_prefix="web_connector",
+        )
+        in_flight: dict[Future[ScrapeResult], tuple[int, str]] = {}
+        try:
+            while session_ctx.to_visit or in_flight:
+                while (
+                    session_ctx.to_visit
+                    and len(in_flight) < WEB_CONNECTOR_MAX_CONCURRENCY
+                ):
+                    initial_url = session_ctx.to_visit.pop()
+                    if initial_url in session_ctx.visited_links:
                         continue
+                    session_ctx.visited_links.add(initial_url)
 
-                    if result.doc:
-                        session_ctx.doc_batch.append(result.doc)
-                except Exception as e:
-                    session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
-                    logger.exception(session_ctx.last_error)
-                    session_ctx.initialize()
-                    continue
-                finally:
-                    retry_count += 1
+                    index = len(session_ctx.visited_links)
+                    logger.info(f"{index}: Visiting {initial_url}")
+                    future = executor.submit(
+                        self._scrape_with_retries, index, initial_url, session_ctx
+                    )
+                    in_flight[future] = (index, initial_url)
+
+                if not in_flight:
+                    break
 
-                break  # success / don't retry
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, initial_url = in_flight.pop(future)
+                    self._handle_scrape_result(
+                        index, initial_url, future.result(), session_ctx
+                    )
+
+                if len(session_ctx.doc_batch) >= self.batch_size:
+                    if self.recursive:
+                        _save_known_urls(session_ctx)
+                    session_ctx.at_least_one_doc = True
+                    yield session_ctx.doc_batch
+                    session_ctx.doc_batch = []
 
-            if len(session_ctx.doc_batch) >= self.batch_size:
-                session_ctx.initialize()
+            if session_ctx.doc_batch:
+                if self.recursive:
+                    _save_known_urls(session_ctx)
                 session_ctx.at_least_one_doc = True
                 yield session_ctx.doc_batch
                 session_ctx.doc_batch = []
-
-        if session_ctx.doc_batch:
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
             session_ctx.stop()
-            session_ctx.at_least_one_doc = True
-            yield session_ctx.doc_batch
 
-        if not session_ctx.at_least_one_doc:
+        if self.recursive:
+            _save_known_urls(session_ctx)
+
+        if not session_ctx.at_least_one_doc and not session_ctx.num_not_modified:
             if session_ctx.last_error:
                 raise RuntimeError(session_ctx.last_error)
             raise RuntimeError("No valid pages found.")
 
-        session_ctx.stop()
+    def load_from_state(self) -> GenerateDocumentsOutput:
+        """Traverses through all pages found on the website
+        and converts them into documents"""
+        yield from self._crawl(modified_since=None)
+
+    def poll_source(
+        self, start: SecondsSinceUnixEpoch, end: SecondsSinceUnixEpoch
+    ) -> GenerateDocumentsOutput:
+        """Same crawl as load_from_state, but pages the server reports as not modified
+        since start (If-Modified-Since) are skipped. load_from_state is still used for
+        pruning, which needs to see every page."""
+        modified_since = (
+            datetime.fromtimestamp(start, tz=timezone.utc) if start > 0 else None
+        )
+        yield from self._crawl(modified_since=modified_since)
 
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
@@ -1,4 +1,8 @@
+import hashlib
 import re
+import time
+from dataclasses import dataclass
+from dataclasses import replace
 from datetime import datetime
 from datetime import timedelta
 from typing import Any
@@ -10,6 +14,9 @@ from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
 from onyx.configs.app_configs import MAX_SLACK_QUERY_EXPANSIONS
+from onyx.configs.app_configs import SLACK_FEDERATED_CACHE_SIZE
+from onyx.configs.app_configs import SLACK_FEDERATED_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import SLACK_FEDERATED_THREAD_REVALIDATE_SECONDS
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.connectors.models import IndexingDocument
@@ -32,6 +39,8 @@ from onyx.prompts.federated_search import SLACK_QUERY_EXPANSION_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.timing import log_function_time
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -39,6 +48,44 @@ HIGHLIGHT_START_CHAR = "\ue000"
 HIGHLIGHT_END_CHAR = "\ue001"
 
 
+@dataclass(frozen=True)
+class _CachedThreadText:
+    latest_reply: str | None
+    text: str
+    checked_at: float
+
+
+# keyed by sha256 of the access token
+_SLACK_CLIENTS: TTLLRUCache[str, WebClient] = TTLLRUCache(
+    max_size=SLACK_FEDERATED_CACHE_SIZE, ttl=SLACK_FEDERATED_CACHE_TTL_SECONDS
+)
+# (channel id, thread ts, matched message ts) -> contextualized thread text. Only ever
+# looked up with messages returned by the searching user's own Slack search.
+_THREAD_TEXT_CACHE: TTLLRUCache[tuple[str, str, str], _CachedThreadText] = TTLLRUCache(
+    max_size=SLACK_FEDERATED_CACHE_SIZE, ttl=SLACK_FEDERATED_CACHE_TTL_SECONDS
+)
+# (tenant id, Slack user id) -> name
+_USER_NAME_CACHE: TTLLRUCache[tuple[str, str], str] = TTLLRUCache(
+    max_size=SLACK_FEDERATED_CACHE_SIZE, ttl=SLACK_FEDERATED_CACHE_TTL_SECONDS
+)
+# (tenant id, search settings id, contextual rag, document id, content hash) -> chunks
+_CHUNK_CACHE: TTLLRUCache[tuple[str, int, bool, str, str], list[DocAwareChunk]] = (
+    TTLLRUCache(
+        max_size=SLACK_FEDERATED_CACHE_SIZE, ttl=SLACK_FEDERATED_CACHE_TTL_SECONDS
+    )
+)
+
+
+def _get_slack_client(access_token: str) -> WebClient:
+    """Shares one client (and its retry handlers) between all requests of a token."""
+    key = hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+    slack_client = _SLACK_CLIENTS.get(key)
+    if slack_client is None:
+        slack_client = WebClient(token=access_token)
+        _SLACK_CLIENTS.set(key, slack_client)
+    return slack_client
+
+
 def build_slack_queries(query: SearchQuery, llm: LLM) -> list[str]:
     # get time filter
     time_filter = ""
@@ -71,7 +118,7 @@ def query_slack(
     limit: int | None = None,
 ) -> list[SlackMessage]:
     # query slack
-    slack_client = WebClient(token=access_token)
+    slack_client = _get_slack_client(access_token)
     try:
         response = slack_client.search_messages(
             query=query_string, count=limit, highlight=True
@@ -187,40 +234,48 @@ def merge_slack_messages(
     return merged_messages, docid_to_message
 
 
-def get_contextualized_thread_text(message: SlackMessage, access_token: str) -> str:
-    """
-    Retrieves the initial thread message as well as the text following the message
-    and combines them into a single string. If the slack query fails, returns the
-    original message text.
+def _get_user_name(slack_client: WebClient, user_id: str) -> str | None:
+    cache_key = (get_current_tenant_id(), user_id)
+    name = _USER_NAME_CACHE.get(cache_key)
+    if name is not None:
+        return name
 
-    The idea is that the message (the one that actually matched the search), the
-    initial thread message, and the replies to the message are important in answering
-    the user's query.
-    """
-    channel_id = message.channel_id
-    thread_id = message.thread_id
-    message_id = message.message_id
+    try:
+        response = slack_client.users_profile_get(user=user_id)
+        response.validate()
+        profile: dict[str, Any] = response.get("profile", {})
+        name = profile.get("real_name") or profile.get("email")
+    except SlackApiError as e:
+        logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
+        return None
 
-    # if it's not a thread, return the message text
-    if thread_id is None:
-        return message.text
+    if name:
+        _USER_NAME_CACHE.set(cache_key, name)
+    return name
 
-    # get the thread messages
-    slack_client = WebClient(token=access_token)
+
+def _get_thread_latest_reply(
+    slack_client: WebClient, channel_id: str, thread_id: str
+) -> str | None:
+    """Only fetches the parent message, which carries the ts of the latest reply."""
     try:
         response = slack_client.conversations_replies(
-            channel=channel_id,
-            ts=thread_id,
+            channel=channel_id, ts=thread_id, limit=1
         )
         response.validate()
         messages: list[dict[str, Any]] = response.get("messages", [])
     except SlackApiError as e:
         logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
-        return message.text
+        return None
 
-    # make sure we didn't get an empty response or a single message (not a thread)
-    if len(messages) <= 1:
-        return message.text
+    return messages[0].get("latest_reply") if messages else None
+
+
+def _build_contextualized_thread_text(
+    message: SlackMessage, messages: list[dict[str, Any]], slack_client: WebClient
+) -> str:
+    thread_id = message.thread_id
+    message_id = message.message_id
 
     # add the initial thread message
     msg_text = messages[0].get("text", "")
@@ -261,14 +316,7 @@ def get_contextualized_thread_text(message: SlackMessage, access_token: str) ->
     # replace user ids with names in the thread text
     userids: set[str] = set(re.findall(r"<@([A-Z0-9]+)>", thread_text))
     for userid in userids:
-        try:
-            response = slack_client.users_profile_get(user=userid)
-            response.validate()
-            profile: dict[str, Any] = response.get("profile", {})
-            name: str | None = profile.get("real_name") or profile.get("email")
-        except SlackApiError as e:
-            logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
-            continue
+        name = _get_user_name(slack_client, userid)
         if not name:
             continue
         thread_text = thread_text.replace(f"<@{userid}>", name)
@@ -276,6 +324,112 @@ def get_contextualized_thread_text(message: SlackMessage, access_token: str) ->
     return thread_text
 
 
+def get_contextualized_thread_text(message: SlackMessage, access_token: str) -> str:
+    """
+    Retrieves the initial thread message as well as the text following the message
+    and combines them into a single string. If the slack query fails, returns the
+    original message text.
+
+    The idea is that the message (the one that actually matched the search), the
+    initial thread message, and the replies to the message are important in answering
+    the user's query.
+
+    Results are cached. A cached thread is reused as long as its latest reply has not
+    changed, which is only checked again after SLACK_FEDERATED_THREAD_REVALIDATE_SECONDS.
+    """
+    channel_id = message.channel_id
+    thread_id = message.thread_id
+    message_id = message.message_id
+
+    # if it's not a thread, return the message text
+    if thread_id is None:
+        return message.text
+
+    slack_client = _get_slack_client(access_token)
+    cache_key = (channel_id, thread_id, message_id)
+    cached = _THREAD_TEXT_CACHE.get(cache_key)
+    if cached is not None:
+        now = time.monotonic()
+        if now - cached.checked_at < SLACK_FEDERATED_THREAD_REVALIDATE_SECONDS:
+            return cached.text
+
+        latest_reply = _get_thread_latest_reply(slack_client, channel_id, thread_id)
+        if latest_reply is not None and latest_reply == cached.latest_reply:
+            _THREAD_TEXT_CACHE.set(cache_key, replace(cached, checked_at=now))
+            return cached.text
+
+    # get the thread messages
+    try:
+        response = slack_client.conversations_replies(
+            channel=channel_id,
+            ts=thread_id,
+        )
+        response.validate()
+        messages: list[dict[str, Any]] = response.get("messages", [])
+    except SlackApiError as e:
+        logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
+        return message.text
+
+    # make sure we didn't get an empty response or a single message (not a thread)
+    if len(messages) <= 1:
+        return message.text
+
+    thread_text = _build_contextualized_thread_text(message, messages, slack_client)
+    _THREAD_TEXT_CACHE.set(
+        cache_key,
+        _CachedThreadText(
+            latest_reply=messages[0].get("latest_reply"),
+            text=thread_text,
+            checked_at=time.monotonic(),
+        ),
+    )
+    return thread_text
+
+
+def _chunk_with_cache(
+    chunker: Chunker, index_docs: list[IndexingDocument], search_settings_id: int
+) -> list[DocAwareChunk]:
+    """Chunks the documents, reusing the chunks of documents whose content has been
+    chunked before with the same settings. Chunks are returned in document order."""
+
+    tenant_id = get_current_tenant_id()
+
+    def _cache_key(index_doc: IndexingDocument) -> tuple[str, int, bool, str, str]:
+        content = "\n".join(
+            [index_doc.semantic_identifier]
+            + [section.text or "" for section in index_doc.processed_sections]
+        )
+        return (
+            tenant_id,
+            search_settings_id,
+            chunker.enable_contextual_rag,
+            index_doc.id,
+            hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        )
+
+    cache_keys = [_cache_key(index_doc) for index_doc in index_docs]
+    doc_chunks: list[list[DocAwareChunk] | None] = [
+        _CHUNK_CACHE.get(cache_key) for cache_key in cache_keys
+    ]
+
+    uncached_docs = [
+        index_doc for index_doc, chunks in zip(index_docs, doc_chunks) if chunks is None
+    ]
+    if uncached_docs:
+        new_chunks_by_doc: dict[str, list[DocAwareChunk]] = {
+            index_doc.id: [] for index_doc in uncached_docs
+        }
+        for chunk in chunker.chunk(uncached_docs):
+            new_chunks_by_doc[chunk.source_document.id].append(chunk)
+
+        for i, index_doc in enumerate(index_docs):
+            if doc_chunks[i] is None:
+                doc_chunks[i] = new_chunks_by_doc[index_doc.id]
+                _CHUNK_CACHE.set(cache_keys[i], new_chunks_by_doc[index_doc.id])
+
+    return [chunk for chunks in doc_chunks for chunk in chunks or []]
+
+
 def convert_slack_score(slack_score: float) -> float:
     """
     Convert slack score to a score between 0 and 1.
@@ -358,7 +512,7 @@ def slack_retrieval(
         enable_large_chunks=multipass_config.enable_large_chunks,
         enable_contextual_rag=enable_contextual_rag,
     )
-    chunks = chunker.chunk(index_docs)
+    chunks = _chunk_with_cache(chunker, index_docs, search_settings.id)
 
     # prune chunks without any highlighted texts
     relevant_chunks: list[DocAwareChunk] = []
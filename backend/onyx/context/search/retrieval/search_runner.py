@@ -132,8 +132,6 @@ def doc_index_retrieval(
         query.query, db_session
     )
 
-    keyword_embeddings_thread: TimeoutThread[list[Embedding]] | None = None
-    semantic_embeddings_thread: TimeoutThread[list[Embedding]] | None = None
     top_base_chunks_standard_ranking_thread: (
         TimeoutThread[list[InferenceChunkUncleaned]] | None
     ) = None
@@ -167,25 +165,13 @@ def doc_index_retrieval(
         and query.expanded_queries.semantic_expansions
     ):
 
-        keyword_embeddings_thread = run_in_background(
-            get_query_embeddings,
-            query.expanded_queries.keywords_expansions,
-            db_session,
-        )
-
         if query.search_type == SearchType.SEMANTIC:
-            semantic_embeddings_thread = run_in_background(
-                get_query_embeddings,
-                query.expanded_queries.semantic_expansions,
-                db_session,
+            semantic_embeddings = get_query_embeddings(
+                query.expanded_queries.semantic_expansions, db_session
             )
 
-        keyword_embeddings = wait_on_background(keyword_embeddings_thread)
-        if query.search_type == SearchType.SEMANTIC:
-            assert semantic_embeddings_thread is not None
-            semantic_embeddings = wait_on_background(semantic_embeddings_thread)
-
-        # Use original query embedding for keyword retrieval embedding
+        # Use original query embedding for keyword retrieval embedding, so the
+        # keyword expansions don't need to be embedded
         keyword_embeddings = [query_embedding]
 
         # Note: we generally prepped earlier for multiple expansions, but for now we only use one.
@@ -1,5 +1,6 @@
 import string
 from collections.abc import Sequence
+from typing import cast
 from typing import TypeVar
 
 from nltk.corpus import stopwords  # type:ignore
@@ -7,6 +8,9 @@ from nltk.tokenize import word_tokenize  # type:ignore
 from sqlalchemy.orm import Session
 
 from onyx.chat.models import SectionRelevancePiece
+from onyx.configs.chat_configs import ENABLE_QUERY_EMBEDDING_REDIS_CACHE
+from onyx.configs.chat_configs import QUERY_EMBEDDING_CACHE_SIZE
+from onyx.configs.chat_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import SavedSearchDoc
@@ -14,10 +18,19 @@ from onyx.context.search.models import SavedSearchDocWithContent
 from onyx.context.search.models import SearchDoc
 from onyx.db.models import SearchDoc as DBSearchDoc
 from onyx.db.search_settings import get_current_search_settings
+from onyx.natural_language_processing.embedding_cache import (
+    build_embedding_model_key,
+)
+from onyx.natural_language_processing.embedding_cache import (
+    normalize_text_for_embedding_cache,
+)
+from onyx.natural_language_processing.embedding_cache import RedisEmbeddingCache
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.contextvars import get_current_tenant_id
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 
@@ -169,18 +182,92 @@ def remove_stop_words_and_punctuation(keywords: list[str]) -> list[str]:
         return keywords
 
 
+# (tenant id, search settings id, model key, text type, normalized query) -> embedding
+_QUERY_EMBEDDING_CACHE: TTLLRUCache[tuple[str, int, str, str, str], Embedding] = (
+    TTLLRUCache(
+        max_size=QUERY_EMBEDDING_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL_SECONDS
+    )
+)
+
+
 def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
+    """Embeds the queries with the current search settings. Identical queries (e.g. bot
+    retries, paginated searches, repeated agent sub-queries) are served from an
+    in-process LRU cache and optionally from Redis, shared across processes."""
     search_settings = get_current_search_settings(db_session)
-
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
+    tenant_id = get_current_tenant_id()
+    text_type = EmbedTextType.QUERY
+    model_key = build_embedding_model_key(
+        model_name=search_settings.model_name,
+        provider_type=search_settings.provider_type,
+        normalize=search_settings.normalize,
+        query_prefix=search_settings.query_prefix,
+        passage_prefix=search_settings.passage_prefix,
+        reduced_dimension=search_settings.reduced_dimension,
     )
 
-    query_embedding = model.encode(queries, text_type=EmbedTextType.QUERY)
-    return query_embedding
+    def _cache_key(query: str) -> tuple[str, int, str, str, str]:
+        return (
+            tenant_id,
+            search_settings.id,
+            model_key,
+            text_type.value,
+            normalize_text_for_embedding_cache(query),
+        )
+
+    embeddings: list[Embedding | None] = [
+        _QUERY_EMBEDDING_CACHE.get(_cache_key(query)) for query in queries
+    ]
+
+    redis_cache: RedisEmbeddingCache | None = None
+    if ENABLE_QUERY_EMBEDDING_REDIS_CACHE:
+        missing_indices = [i for i, emb in enumerate(embeddings) if emb is None]
+        redis_cache = RedisEmbeddingCache(
+            model_key=f"{search_settings.id}:{model_key}",
+            tenant_id=tenant_id,
+            ttl=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        )
+        redis_embeddings = redis_cache.get_many(
+            [queries[i] for i in missing_indices], text_type
+        )
+        for i, redis_embedding in zip(missing_indices, redis_embeddings):
+            if redis_embedding is not None:
+                embeddings[i] = redis_embedding
+                _QUERY_EMBEDDING_CACHE.set(_cache_key(queries[i]), redis_embedding)
+
+    # only embed each distinct missing query once
+    key_to_query: dict[tuple[str, int, str, str, str], str] = {}
+    for query, embedding in zip(queries, embeddings):
+        if embedding is None:
+            key_to_query.setdefault(_cache_key(query), query)
+
+    if key_to_query:
+        model = EmbeddingModel.from_db_model(
+            search_settings=search_settings,
+            # The below are globally set, this flow always uses the indexing one
+            server_host=MODEL_SERVER_HOST,
+            server_port=MODEL_SERVER_PORT,
+        )
+
+        missing_queries = list(key_to_query.values())
+        new_embeddings = model.encode(missing_queries, text_type=text_type)
+
+        key_to_embedding = dict(zip(key_to_query.keys(), new_embeddings))
+        for key, new_embedding in key_to_embedding.items():
+            _QUERY_EMBEDDING_CACHE.set(key, new_embedding)
+        if redis_cache:
+            redis_cache.set_many(missing_queries, new_embeddings, text_type)
+
+        embeddings = [
+            (
+                embedding
+                if embedding is not None
+                else key_to_embedding[_cache_key(query)]
+            )
+            for query, embedding in zip(queries, embeddings)
+        ]
+
+    return cast(list[Embedding], embeddings)
 
 
 def get_query_embedding(query: str, db_session: Session) -> Embedding:
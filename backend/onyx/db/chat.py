@@ -52,15 +52,26 @@ from onyx.file_store.models import FileDescriptor
 from onyx.file_store.models import InMemoryChatFile
 from onyx.llm.override_models import LLMOverride
 from onyx.llm.override_models import PromptOverride
+from onyx.redis.redis_token_usage import record_token_usage
 from onyx.server.query_and_chat.models import ChatMessageDetail
 from onyx.server.query_and_chat.models import SubQueryDetail
 from onyx.server.query_and_chat.models import SubQuestionDetail
 from onyx.tools.tool_runner import ToolCallFinalResult
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from onyx.utils.variable_functionality import fetch_versioned_implementation
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+# The groups of the users whose messages are counted towards the token rate limits.
+# Usage counted for the wrong groups after a membership change is corrected by the
+# reconciliation of the counters.
+_USER_GROUP_IDS_CACHE: TTLLRUCache[tuple[str, UUID], list[int]] = TTLLRUCache(
+    max_size=10_000, ttl=60
+)
+
 
 def get_chat_session_by_id(
     chat_session_id: UUID,
@@ -654,6 +665,8 @@ def create_new_chat_message(
         if existing_message is None:
             raise ValueError(f"No message found with id {reserved_message_id}")
 
+        # the reserved message may already have been counted
+        token_count_delta = token_count - (existing_message.token_count or 0)
         existing_message.chat_session_id = chat_session_id
         existing_message.parent_message = parent_message.id
         existing_message.message = message
@@ -671,6 +684,7 @@ def create_new_chat_message(
         existing_message.is_agentic = is_agentic
         new_chat_message = existing_message
     else:
+        token_count_delta = token_count
         # Create new message
         new_chat_message = ChatMessage(
             chat_session_id=chat_session_id,
@@ -703,9 +717,35 @@ def create_new_chat_message(
     if commit:
         db_session.commit()
 
+    if token_count_delta:
+        _record_token_usage(chat_session_id, token_count_delta, db_session)
+
     return new_chat_message
 
 
+def _record_token_usage(
+    chat_session_id: UUID, token_count: int, db_session: Session
+) -> None:
+    """Counts the tokens towards the token rate limits of the user (and their groups).
+    Always done, whether rate limits exist is only known to the processes that
+    served the changes to them."""
+    chat_session = db_session.get(ChatSession, chat_session_id)
+    user_id = chat_session.user_id if chat_session else None
+    user_group_ids = _fetch_user_group_ids(db_session, user_id) if user_id else []
+    record_token_usage(token_count, user_id, user_group_ids)
+
+
+def _fetch_user_group_ids(db_session: Session, user_id: UUID) -> list[int]:
+    cache_key = (get_current_tenant_id(), user_id)
+    user_group_ids = _USER_GROUP_IDS_CACHE.get(cache_key)
+    if user_group_ids is None:
+        user_group_ids = fetch_versioned_implementation(
+            "onyx.db.token_limit", "fetch_user_group_ids_for_token_usage"
+        )(db_session, user_id)
+        _USER_GROUP_IDS_CACHE.set(cache_key, user_group_ids)
+    return user_group_ids
+
+
 def set_as_latest_chat_message(
     chat_message: ChatMessage,
     user_id: UUID | None,
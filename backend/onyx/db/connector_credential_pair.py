@@ -33,6 +33,8 @@ from onyx.db.models import User__UserGroup
 from onyx.db.models import UserFile
 from onyx.db.models import UserGroup__ConnectorCredentialPair
 from onyx.db.models import UserRole
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import invalidate_config_snapshot
 from onyx.server.models import StatusResponse
 from onyx.utils.logger import setup_logger
 from onyx.utils.variable_functionality import fetch_ee_implementation_or_noop
@@ -566,6 +568,8 @@ def add_credential_to_connector(
     )
 
     db_session.commit()
+    if access_type == AccessType.SYNC:
+        invalidate_config_snapshot(ConfigSnapshotKind.CENSORING_SOURCES)
 
     return StatusResponse(
         success=True,
@@ -615,6 +619,7 @@ def remove_credential_from_connector(
         )
         db_session.delete(association)
         db_session.commit()
+        invalidate_config_snapshot(ConfigSnapshotKind.CENSORING_SOURCES)
         return StatusResponse(
             success=True,
             message=f"Credential {credential_id} removed from Connector",
@@ -8,6 +8,10 @@ from onyx.configs.constants import FileType
 from onyx.db.models import FileRecord
 
 
+class FileRecordNotFoundError(RuntimeError):
+    """Raised when there is no file record with the given id."""
+
+
 def get_query_history_export_files(
     db_session: Session,
 ) -> list[FileRecord]:
@@ -38,7 +42,9 @@ def get_filerecord_by_file_id(
     filestore = db_session.query(FileRecord).filter_by(file_id=file_id).first()
 
     if not filestore:
-        raise RuntimeError(f"File by id {file_id} does not exist or was deleted")
+        raise FileRecordNotFoundError(
+            f"File by id {file_id} does not exist or was deleted"
+        )
 
     return filestore
 
@@ -0,0 +1,371 @@
+import hashlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from uuid import UUID
+
+from sqlalchemy import and_
+from sqlalchemy import any_
+from sqlalchemy import delete
+from sqlalchemy import literal
+from sqlalchemy import Select
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import union
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import CompoundSelect
+from sqlalchemy.sql.selectable import Subquery
+
+from onyx.agents.agent_search.kb_search.models import KGViewNames
+from onyx.configs.kg_configs import KG_ALLOWED_DOCUMENTS_MAX_AGE_SECONDS
+from onyx.db.engine.sql_engine import get_db_readonly_user_session_with_current_tenant
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.enums import AccessType
+from onyx.db.enums import ConnectorCredentialPairStatus
+from onyx.db.models import ConnectorCredentialPair
+from onyx.db.models import Credential
+from onyx.db.models import Document
+from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import KGEntity
+from onyx.db.models import KGPublicAllowedDocument
+from onyx.db.models import KGPublicAllowedDocumentsState
+from onyx.db.models import KGUserAllowedDocument
+from onyx.db.models import KGUserAllowedDocumentsState
+from onyx.db.models import KGViewsUser
+from onyx.db.models import User__ExternalUserGroupId
+from onyx.db.models import User__UserGroup
+from onyx.db.models import UserGroup
+from onyx.db.models import UserGroup__ConnectorCredentialPair
+
+# The views are created by the migrations and filtered by the kg_views_user row of
+# the connection reading them (see get_kg_views_session)
+KG_RELATIONSHIPS_VIEW_NAME = "kg_relationships_with_access"
+KG_ENTITIES_VIEW_NAME = "kg_entities_with_access"
+
+# documents changed shortly before a refresh may only become visible after it, e.g.
+# entities written by a transaction that started earlier
+_CHANGED_DOCUMENTS_OVERLAP = timedelta(minutes=5)
+
+# the id of the only row of KGPublicAllowedDocumentsState
+_PUBLIC_STATE_ID = 1
+
+
+def get_kg_view_names(tenant_id: str) -> KGViewNames:
+    return KGViewNames(
+        kg_relationships_view_name=f'"{tenant_id}".{KG_RELATIONSHIPS_VIEW_NAME}',
+        kg_entity_view_name=f'"{tenant_id}".{KG_ENTITIES_VIEW_NAME}',
+    )
+
+
+@contextmanager
+def get_kg_views_session(user_id: UUID) -> Iterator[Session]:
+    """A session of the readonly user in which the KG views show the allowed documents
+    of user_id. Its transaction is read only and always rolled back, so that nothing
+    changed by the (LLM generated) SQL run in it outlives it.
+
+    The user is recorded for the backend pid of the session's connection by a regular
+    session, so nothing run by the readonly user (which can't write kg_views_user)
+    can make the views show the documents of another user."""
+    with get_db_readonly_user_session_with_current_tenant() as readonly_session:
+        readonly_session.execute(text("SET TRANSACTION READ ONLY"))
+        # the connection is kept until the transaction ends
+        backend_pid = readonly_session.scalar(text("SELECT pg_backend_pid()"))
+
+        with get_session_with_current_tenant() as db_session:
+            db_session.execute(
+                insert(KGViewsUser)
+                .values(backend_pid=backend_pid, user_id=user_id)
+                .on_conflict_do_update(
+                    index_elements=[KGViewsUser.backend_pid],
+                    set_={"user_id": user_id},
+                )
+            )
+            db_session.commit()
+
+        try:
+            yield readonly_session
+        finally:
+            readonly_session.rollback()
+            with get_session_with_current_tenant() as db_session:
+                db_session.execute(
+                    delete(KGViewsUser).where(KGViewsUser.backend_pid == backend_pid)
+                )
+                db_session.commit()
+
+
+def _fetch_cc_pairs_acl(db_session: Session) -> list[tuple]:
+    return [
+        tuple(cc_pair)
+        for cc_pair in db_session.execute(
+            select(
+                ConnectorCredentialPair.id,
+                ConnectorCredentialPair.status,
+                ConnectorCredentialPair.access_type,
+            ).order_by(ConnectorCredentialPair.id)
+        ).all()
+    ]
+
+
+def _fetch_public_acl_fingerprint(db_session: Session) -> str:
+    """Hashes everything the public documents depend on apart from the documents
+    themselves"""
+    return hashlib.sha256(repr(_fetch_cc_pairs_acl(db_session)).encode()).hexdigest()
+
+
+def _fetch_acl_fingerprint(db_session: Session, user_id: UUID, user_email: str) -> str:
+    """Hashes everything about the user that the allowed documents depend on apart
+    from the documents themselves"""
+    user_groups = db_session.execute(
+        select(UserGroup.id, UserGroup.time_last_modified_by_user)
+        .join(User__UserGroup, User__UserGroup.user_group_id == UserGroup.id)
+        .where(User__UserGroup.user_id == user_id)
+        .order_by(UserGroup.id)
+    ).all()
+    external_user_group_ids = db_session.scalars(
+        select(User__ExternalUserGroupId.external_user_group_id)
+        .where(User__ExternalUserGroupId.user_id == user_id)
+        .distinct()
+        .order_by(User__ExternalUserGroupId.external_user_group_id)
+    ).all()
+
+    acl = (
+        user_email,
+        [tuple(user_group) for user_group in user_groups],
+        list(external_user_group_ids),
+        _fetch_cc_pairs_acl(db_session),
+    )
+    return hashlib.sha256(repr(acl).encode()).hexdigest()
+
+
+def _cc_pair_documents_select() -> Select:
+    return (
+        select(DocumentByConnectorCredentialPair.id)
+        .join(
+            ConnectorCredentialPair,
+            and_(
+                DocumentByConnectorCredentialPair.connector_id
+                == ConnectorCredentialPair.connector_id,
+                DocumentByConnectorCredentialPair.credential_id
+                == ConnectorCredentialPair.credential_id,
+            ),
+        )
+        .where(ConnectorCredentialPair.status != ConnectorCredentialPairStatus.DELETING)
+    )
+
+
+def _kg_documents_select(
+    allowed_document_ids: Subquery, document_ids: Select | None
+) -> Select:
+    """The ids of allowed_document_ids which are used by the KG, out of document_ids
+    if given"""
+    kg_document_ids = select(KGEntity.document_id).where(
+        KGEntity.document_id.is_not(None)
+    )
+    kg_documents = select(allowed_document_ids.c.id).where(
+        allowed_document_ids.c.id.in_(kg_document_ids)
+    )
+    if document_ids is not None:
+        kg_documents = kg_documents.where(allowed_document_ids.c.id.in_(document_ids))
+    return kg_documents
+
+
+def _public_document_ids_select(document_ids: Select | None = None) -> Select:
+    """The documents used by the KG that every user can access, out of document_ids
+    if given: public documents and the documents of public connectors"""
+    public_document_ids = union(
+        select(Document.id).where(Document.is_public),
+        _cc_pair_documents_select().where(
+            ConnectorCredentialPair.access_type == AccessType.PUBLIC
+        ),
+    ).subquery()
+    return _kg_documents_select(public_document_ids, document_ids)
+
+
+def _allowed_document_ids_select(
+    user_id: UUID, user_email: str, document_ids: Select | None = None
+) -> Select:
+    """(user_id, document id) of the documents used by the KG that the user can
+    access apart from the public ones, out of document_ids if given: the documents of
+    the user's own credentials and of the user's groups, and the documents shared
+    with the user or their external groups"""
+    cc_pair_documents = _cc_pair_documents_select().where(
+        ConnectorCredentialPair.access_type != AccessType.SYNC
+    )
+
+    allowed_document_ids = union(
+        cc_pair_documents.join(
+            Credential, DocumentByConnectorCredentialPair.credential_id == Credential.id
+        ).where(Credential.user_id == user_id),
+        cc_pair_documents.join(
+            UserGroup__ConnectorCredentialPair,
+            UserGroup__ConnectorCredentialPair.cc_pair_id == ConnectorCredentialPair.id,
+        )
+        .join(
+            User__UserGroup,
+            User__UserGroup.user_group_id
+            == UserGroup__ConnectorCredentialPair.user_group_id,
+        )
+        .where(User__UserGroup.user_id == user_id),
+        select(Document.id).where(
+            literal(user_email) == any_(Document.external_user_emails)
+        ),
+        select(Document.id)
+        .join(
+            User__ExternalUserGroupId,
+            User__ExternalUserGroupId.external_user_group_id
+            == any_(Document.external_user_group_ids),
+        )
+        .where(User__ExternalUserGroupId.user_id == user_id),
+    ).subquery()
+
+    kg_documents = _kg_documents_select(allowed_document_ids, document_ids).subquery()
+    return select(literal(user_id, PGUUID(as_uuid=True)), kg_documents.c.id)
+
+
+def allowed_document_ids_for_user_select(user_id: UUID) -> CompoundSelect:
+    """The documents used by the KG that the user has access to, as of the last
+    refresh_kg_user_allowed_documents"""
+    return union(
+        select(KGPublicAllowedDocument.document_id),
+        select(KGUserAllowedDocument.document_id).where(
+            KGUserAllowedDocument.user_id == user_id
+        ),
+    )
+
+
+def _changed_document_ids_select(since: datetime) -> Select:
+    """Documents whose access or KG entities may have changed since"""
+    since = since - _CHANGED_DOCUMENTS_OVERLAP
+    changed_document_ids = union(
+        select(Document.id).where(Document.last_modified > since),
+        select(KGEntity.document_id).where(
+            KGEntity.time_updated > since, KGEntity.document_id.is_not(None)
+        ),
+    ).subquery()
+    return select(changed_document_ids.c.id)
+
+
+def _changed_since_last_refresh(
+    refreshed_at: datetime | None,
+    acl_fingerprint: str | None,
+    current_acl_fingerprint: str,
+    refresh_time: datetime,
+) -> Select | None:
+    """The documents to recompute: only the ones changed since the last refresh if
+    the access is unchanged since then and it isn't too old, otherwise all (None)"""
+    if (
+        refreshed_at is not None
+        and acl_fingerprint == current_acl_fingerprint
+        and refreshed_at
+        > refresh_time - timedelta(seconds=KG_ALLOWED_DOCUMENTS_MAX_AGE_SECONDS)
+    ):
+        return _changed_document_ids_select(refreshed_at)
+    return None
+
+
+def _refresh_kg_public_allowed_documents(
+    db_session: Session, refresh_time: datetime
+) -> None:
+    """Brings the public documents up to date, the same way as the allowed documents
+    of a user"""
+    db_session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": "kg_public_allowed_documents"},
+    )
+
+    acl_fingerprint = _fetch_public_acl_fingerprint(db_session)
+    state = db_session.get(KGPublicAllowedDocumentsState, _PUBLIC_STATE_ID)
+    changed_document_ids = _changed_since_last_refresh(
+        state.refreshed_at if state else None,
+        state.acl_fingerprint if state else None,
+        acl_fingerprint,
+        refresh_time,
+    )
+
+    delete_stmt = delete(KGPublicAllowedDocument)
+    if changed_document_ids is not None:
+        delete_stmt = delete_stmt.where(
+            KGPublicAllowedDocument.document_id.in_(changed_document_ids)
+        )
+    db_session.execute(delete_stmt)
+    db_session.execute(
+        insert(KGPublicAllowedDocument)
+        .from_select(["document_id"], _public_document_ids_select(changed_document_ids))
+        .on_conflict_do_nothing()
+    )
+    db_session.execute(
+        insert(KGPublicAllowedDocumentsState)
+        .values(
+            id=_PUBLIC_STATE_ID,
+            acl_fingerprint=acl_fingerprint,
+            refreshed_at=refresh_time,
+        )
+        .on_conflict_do_update(
+            index_elements=[KGPublicAllowedDocumentsState.id],
+            set_={"acl_fingerprint": acl_fingerprint, "refreshed_at": refresh_time},
+        )
+    )
+    db_session.commit()
+
+
+def refresh_kg_user_allowed_documents(
+    db_session: Session, user_id: UUID, user_email: str
+) -> None:
+    """Brings the allowed documents of the user, and the public documents, up to date.
+
+    If the access is unchanged since the last refresh, only the documents changed
+    since then are recomputed. Otherwise (and when the last refresh is older than
+    KG_ALLOWED_DOCUMENTS_MAX_AGE_SECONDS) all of them are."""
+    refresh_time = datetime.now(timezone.utc)
+
+    # committed separately, so that refreshes of different users only wait on each
+    # other for this part
+    _refresh_kg_public_allowed_documents(db_session, refresh_time)
+
+    # refreshes of the same user would otherwise insert the same rows
+    db_session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": f"kg_user_allowed_documents:{user_id}"},
+    )
+
+    acl_fingerprint = _fetch_acl_fingerprint(db_session, user_id, user_email)
+    state = db_session.get(KGUserAllowedDocumentsState, user_id)
+    changed_document_ids = _changed_since_last_refresh(
+        state.refreshed_at if state else None,
+        state.acl_fingerprint if state else None,
+        acl_fingerprint,
+        refresh_time,
+    )
+
+    delete_stmt = delete(KGUserAllowedDocument).where(
+        KGUserAllowedDocument.user_id == user_id
+    )
+    if changed_document_ids is not None:
+        delete_stmt = delete_stmt.where(
+            KGUserAllowedDocument.document_id.in_(changed_document_ids)
+        )
+
+    db_session.execute(delete_stmt)
+    db_session.execute(
+        insert(KGUserAllowedDocument)
+        .from_select(
+            ["user_id", "document_id"],
+            _allowed_document_ids_select(user_id, user_email, changed_document_ids),
+        )
+        .on_conflict_do_nothing()
+    )
+    db_session.execute(
+        insert(KGUserAllowedDocumentsState)
+        .values(
+            user_id=user_id, acl_fingerprint=acl_fingerprint, refreshed_at=refresh_time
+        )
+        .on_conflict_do_update(
+            index_elements=[KGUserAllowedDocumentsState.user_id],
+            set_={"acl_fingerprint": acl_fingerprint, "refreshed_at": refresh_time},
+        )
+    )
+    db_session.commit()
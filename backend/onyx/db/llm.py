@@ -17,6 +17,8 @@ from onyx.db.models import Tool as ToolModel
 from onyx.db.models import User
 from onyx.db.models import User__UserGroup
 from onyx.llm.utils import model_supports_image_input
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import invalidate_config_snapshot
 from onyx.server.manage.embedding.models import CloudEmbeddingProvider
 from onyx.server.manage.embedding.models import CloudEmbeddingProviderCreationRequest
 from onyx.server.manage.llm.models import LLMProviderUpsertRequest
@@ -63,6 +65,8 @@ def upsert_cloud_embedding_provider(
         db_session.add(new_provider)
         existing_provider = new_provider
     db_session.commit()
+    # search settings are cached together with their cloud provider
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
     db_session.refresh(existing_provider)
     return CloudEmbeddingProvider.from_request(existing_provider)
 
@@ -125,6 +129,7 @@ def upsert_llm_provider(
     full_llm_provider = LLMProviderView.from_model(existing_llm_provider)
 
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS)
 
     return full_llm_provider
 
@@ -263,6 +268,7 @@ def remove_embedding_provider(
     )
 
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
 
 
 def remove_llm_provider(db_session: Session, provider_id: int) -> None:
@@ -277,6 +283,7 @@ def remove_llm_provider(db_session: Session, provider_id: int) -> None:
         delete(LLMProviderModel).where(LLMProviderModel.id == provider_id)
     )
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS)
 
 
 def update_default_provider(provider_id: int, db_session: Session) -> None:
@@ -298,6 +305,7 @@ def update_default_provider(provider_id: int, db_session: Session) -> None:
 
     new_default.is_default_provider = True
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS)
 
 
 def update_default_vision_provider(
@@ -334,3 +342,4 @@ def update_default_vision_provider(
     new_default.is_default_vision_provider = True
     new_default.default_vision_model = vision_model
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS)
@@ -19,6 +19,7 @@ from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTableUUID
 from fastapi_users_db_sqlalchemy.access_token import SQLAlchemyBaseAccessTokenTableUUID
 from fastapi_users_db_sqlalchemy.generics import TIMESTAMPAware
 from sqlalchemy import Boolean
+from sqlalchemy import Date
 from sqlalchemy import DateTime
 from sqlalchemy import desc
 from sqlalchemy import Enum
@@ -913,6 +914,7 @@ class KGEntity(Base):
         DateTime(timezone=True),
         server_default=func.now(),
         onupdate=func.now(),
+        index=True,
     )
     time_created: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -1235,6 +1237,67 @@ class KGTerm(Base):
     )
 
 
+class KGUserAllowedDocument(Base):
+    """The documents used by the KG that a user has access to apart from the public
+    ones (see KGPublicAllowedDocument), maintained by
+    refresh_kg_user_allowed_documents so that KG queries don't need to resolve the
+    user's access every time"""
+
+    __tablename__ = "kg_user_allowed_document"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    document_id: Mapped[str] = mapped_column(
+        ForeignKey("document.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+
+class KGPublicAllowedDocument(Base):
+    """The documents used by the KG that every user has access to. Kept once rather
+    than for every user in kg_user_allowed_document."""
+
+    __tablename__ = "kg_public_allowed_document"
+
+    document_id: Mapped[str] = mapped_column(
+        ForeignKey("document.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class KGViewsUser(Base):
+    """The user whose allowed documents the KG views show to a (readonly) database
+    connection, by the connection's backend pid. Written by get_kg_views_session
+    with the regular user, the readonly user can't change it."""
+
+    __tablename__ = "kg_views_user"
+
+    backend_pid: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
+
+
+class KGUserAllowedDocumentsState(Base):
+    """When the allowed documents of a user were last refreshed, and the access of the
+    user (groups, external groups, connector access types) they were refreshed for"""
+
+    __tablename__ = "kg_user_allowed_documents_state"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    acl_fingerprint: Mapped[str] = mapped_column(String)
+    refreshed_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+
+
+class KGPublicAllowedDocumentsState(Base):
+    """KGUserAllowedDocumentsState of the public documents, a single row"""
+
+    __tablename__ = "kg_public_allowed_documents_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    acl_fingerprint: Mapped[str] = mapped_column(String)
+    refreshed_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+
+
 class ChunkStats(Base):
     __tablename__ = "chunk_stats"
     # NOTE: if more sensitive data is added here for display, make sure to add user/group permission
@@ -2108,7 +2171,7 @@ class ChatMessage(Base):
     # Only applies for LLM
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     time_sent: Mapped[datetime.datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), server_default=func.now(), index=True
     )
 
     is_agentic: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -3223,6 +3286,36 @@ class UsageReport(Base):
     file = relationship("FileRecord")
 
 
+class ChatMessageDailyRollup(Base):
+    """Daily assistant message and feedback counts, maintained by the analytics rollup
+    task so that the analytics dashboards don't need to aggregate the chat messages.
+    Derived data, so there are intentionally no foreign keys.
+    """
+
+    __tablename__ = "chat_message_daily_rollup"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    date: Mapped[datetime.date] = mapped_column(Date, index=True)
+    user_id: Mapped[UUID | None] = mapped_column(PGUUID(as_uuid=True), nullable=True)
+    # the persona of the chat session
+    persona_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    alternate_assistant_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    message_count: Mapped[int] = mapped_column(Integer)
+    like_count: Mapped[int] = mapped_column(Integer)
+    dislike_count: Mapped[int] = mapped_column(Integer)
+
+
+class OnyxbotDailyRollup(Base):
+    """Daily OnyxBot session counts, see ChatMessageDailyRollup"""
+
+    __tablename__ = "onyxbot_daily_rollup"
+
+    date: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    session_count: Mapped[int] = mapped_column(Integer)
+    # negative feedback or needed additional help
+    negative_count: Mapped[int] = mapped_column(Integer)
+
+
 class InputPrompt(Base):
     __tablename__ = "inputprompt"
 
@@ -1,7 +1,10 @@
 from sqlalchemy import and_
 from sqlalchemy import delete
+from sqlalchemy import Select
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
 
 from onyx.configs.model_configs import DEFAULT_DOCUMENT_ENCODER_MODEL
 from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL
@@ -13,6 +16,10 @@ from onyx.db.models import IndexAttempt
 from onyx.db.models import IndexModelStatus
 from onyx.db.models import SearchSettings
 from onyx.natural_language_processing.search_nlp_models import warm_up_cross_encoder
+from onyx.redis.redis_config_snapshot import config_snapshot_cache_enabled
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import get_config_snapshot
+from onyx.redis.redis_config_snapshot import invalidate_config_snapshot
 from onyx.server.manage.embedding.models import (
     CloudEmbeddingProvider as ServerCloudEmbeddingProvider,
 )
@@ -66,6 +73,7 @@ def create_search_settings(
 
     db_session.add(embedding_model)
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
 
     return embedding_model
 
@@ -124,32 +132,68 @@ def delete_search_settings(db_session: Session, search_settings_id: int) -> None
 
     db_session.execute(search_settings_query)
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
 
 
-def get_current_search_settings(db_session: Session) -> SearchSettings:
-    query = (
+def _latest_search_settings_query(status: IndexModelStatus) -> Select:
+    return (
         select(SearchSettings)
-        .where(SearchSettings.status == IndexModelStatus.PRESENT)
+        .where(SearchSettings.status == status)
         .order_by(SearchSettings.id.desc())
     )
-    result = db_session.execute(query)
-    latest_settings = result.scalars().first()
 
+
+def _load_search_settings_snapshot(
+    db_session: Session, status: IndexModelStatus
+) -> SearchSettings | None:
+    """Loads the search settings (with their cloud provider) and returns a detached
+    copy that is not tied to db_session and is never modified."""
+    query = _latest_search_settings_query(status).options(
+        joinedload(SearchSettings.cloud_provider)
+    )
+    search_settings = db_session.execute(query).scalars().first()
+    if search_settings is None:
+        return None
+
+    scratch_session = Session()
+    snapshot = scratch_session.merge(search_settings, load=False)
+    scratch_session.expunge_all()
+    return snapshot
+
+
+def _get_latest_search_settings(
+    db_session: Session, status: IndexModelStatus
+) -> SearchSettings | None:
+    if not config_snapshot_cache_enabled():
+        return (
+            db_session.execute(_latest_search_settings_query(status)).scalars().first()
+        )
+
+    snapshot = get_config_snapshot(
+        ConfigSnapshotKind.SEARCH_SETTINGS,
+        status,
+        lambda: _load_search_settings_snapshot(db_session, status),
+    )
+    if snapshot is None:
+        return None
+
+    existing = db_session.identity_map.get(identity_key(instance=snapshot))
+    if existing is not None:
+        return existing
+
+    # attaches a copy of the snapshot to the session without querying the DB
+    return db_session.merge(snapshot, load=False)
+
+
+def get_current_search_settings(db_session: Session) -> SearchSettings:
+    latest_settings = _get_latest_search_settings(db_session, IndexModelStatus.PRESENT)
     if not latest_settings:
         raise RuntimeError("No search settings specified, DB is not in a valid state")
     return latest_settings
 
 
 def get_secondary_search_settings(db_session: Session) -> SearchSettings | None:
-    query = (
-        select(SearchSettings)
-        .where(SearchSettings.status == IndexModelStatus.FUTURE)
-        .order_by(SearchSettings.id.desc())
-    )
-    result = db_session.execute(query)
-    latest_settings = result.scalars().first()
-
-    return latest_settings
+    return _get_latest_search_settings(db_session, IndexModelStatus.FUTURE)
 
 
 def get_active_search_settings(db_session: Session) -> ActiveSearchSettings:
@@ -225,6 +269,7 @@ def update_current_search_settings(
 
     update_search_settings(current_settings, search_settings, preserved_fields)
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
     logger.info("Current search settings updated successfully")
 
 
@@ -242,6 +287,7 @@ def update_secondary_search_settings(
     update_search_settings(secondary_settings, search_settings, preserved_fields)
 
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
     logger.info("Secondary search settings updated successfully")
 
 
@@ -250,6 +296,7 @@ def update_search_settings_status(
 ) -> None:
     search_settings.status = new_status
     db_session.commit()
+    invalidate_config_snapshot(ConfigSnapshotKind.SEARCH_SETTINGS)
 
 
 def user_has_overridden_embedding_model() -> bool:
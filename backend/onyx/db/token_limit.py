@@ -1,4 +1,5 @@
 from collections.abc import Sequence
+from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -109,3 +110,10 @@ def delete_token_rate_limit(
 
     db_session.delete(token_limit)
     db_session.commit()
+
+
+def fetch_user_group_ids_for_token_usage(
+    db_session: Session, user_id: UUID
+) -> list[int]:
+    """User groups only exist in the Enterprise Edition"""
+    return []
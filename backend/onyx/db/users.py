@@ -1,11 +1,14 @@
+from collections.abc import Iterable
 from collections.abc import Sequence
 from typing import Any
 from uuid import UUID
+from uuid import uuid4
 
 from fastapi import HTTPException
 from fastapi_users.password import PasswordHelper
 from sqlalchemy import func
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import expression
@@ -310,6 +313,47 @@ def batch_add_ext_perm_user_if_not_exists(
     return all_users
 
 
+def batch_add_ext_perm_users_if_not_exists__no_commit(
+    db_session: Session, emails: Iterable[str]
+) -> None:
+    """Set based version of batch_add_ext_perm_user_if_not_exists for bulk permission
+    syncing. Creates all missing users with a single INSERT ... ON CONFLICT DO NOTHING
+    (so concurrent syncs creating the same users don't fail) and does not commit."""
+    lower_emails = {email.lower() for email in emails}
+    if not lower_emails:
+        return
+
+    existing_emails = set(
+        db_session.scalars(
+            select(func.lower(User.email)).where(
+                func.lower(User.email).in_(lower_emails)  # type: ignore
+            )
+        ).all()
+    )
+    missing_emails = lower_emails - existing_emails
+    if not missing_emails:
+        return
+
+    new_users = [
+        _generate_ext_permissioned_user(email=email) for email in sorted(missing_emails)
+    ]
+    db_session.execute(
+        insert(User)
+        .values(
+            [
+                {
+                    "id": uuid4(),
+                    "email": user.email,
+                    "hashed_password": user.hashed_password,
+                    "role": user.role,
+                }
+                for user in new_users
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+    )
+
+
 def delete_user_from_db(
     user_to_delete: User,
     db_session: Session,
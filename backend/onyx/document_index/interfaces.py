@@ -120,6 +120,16 @@ class VespaDocumentUserFields:
     user_folder_id: str | None = None
 
 
+@dataclass
+class DocumentFieldsUpdate:
+    """The fields to update for all chunks of a single document, used for batched
+    updates where every document gets its own values"""
+
+    doc_id: str
+    chunk_count: int | None
+    fields: VespaDocumentFields
+
+
 @dataclass
 class UpdateRequest:
     """
@@ -293,6 +303,25 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def update_multiple(
+        self,
+        document_updates: list[DocumentFieldsUpdate],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        """
+        Batched version of update_single, each document is updated with its own fields.
+        Updates are sent to the index in bulk rather than one document at a time.
+
+        A failure to update one document does not prevent the others from being updated.
+
+        Return:
+            The number of chunks updated for each document that was updated successfully.
+            Documents which failed to update are left out.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def update(self, update_requests: list[UpdateRequest], *, tenant_id: str) -> None:
         """
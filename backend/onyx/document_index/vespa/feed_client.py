@@ -0,0 +1,216 @@
+import concurrent.futures
+import random
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+from http import HTTPStatus
+from typing import Any
+
+import httpx
+
+from onyx.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
+from onyx.configs.app_configs import VESPA_FEED_MAX_RETRIES
+from onyx.configs.app_configs import VESPA_FEED_MIN_IN_FLIGHT
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+# Vespa signals that it is overloaded with these, the operation should be retried
+# after backing off rather than failed
+_THROTTLE_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+_MAX_BACKOFF_SECONDS = 10.0
+
+
+class FeedOperationType(str, Enum):
+    PUT = "put"  # full document write
+    UPDATE = "update"  # partial update
+    REMOVE = "remove"
+
+
+_OPERATION_TYPE_TO_HTTP_METHOD = {
+    FeedOperationType.PUT: "POST",
+    FeedOperationType.UPDATE: "PUT",
+    FeedOperationType.REMOVE: "DELETE",
+}
+
+
+@dataclass
+class FeedOperation:
+    operation_type: FeedOperationType
+    url: str
+    # only used for reporting, e.g. the Onyx document ID the chunk belongs to
+    document_id: str
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class FeedResult:
+    operation: FeedOperation
+    status_code: int | None
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+class _InFlightWindow:
+    """AIMD controlled number of concurrent operations, similar to the throttling done
+    by the official Vespa feed client. Grows additively while Vespa keeps up and is
+    halved whenever Vespa pushes back."""
+
+    def __init__(self, min_size: int, max_size: int) -> None:
+        self.min_size = min_size
+        self.max_size = max_size
+        self.size = float(min_size)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.size):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.size = max(float(self.min_size), self.size / 2)
+            else:
+                self.size = min(float(self.max_size), self.size + 1 / self.size)
+            self._condition.notify_all()
+
+
+class VespaFeedClient:
+    """Streams document operations to the Vespa /document/v1 API.
+
+    All operations are multiplexed over a single (HTTP/2 where available) httpx client
+    instead of one request-response cycle per worker, with the number of concurrent
+    operations adapted to how fast Vespa accepts them. Throttling responses (429/503/504),
+    other server errors and transport errors are retried with backoff. Every operation gets a FeedResult,
+    callers decide whether failures are fatal."""
+
+    def __init__(
+        self,
+        http_client: httpx.Client,
+        min_in_flight: int = VESPA_FEED_MIN_IN_FLIGHT,
+        max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+        max_retries: int = VESPA_FEED_MAX_RETRIES,
+    ) -> None:
+        self.http_client = http_client
+        self.min_in_flight = min_in_flight
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+
+    def _send(self, operation: FeedOperation) -> httpx.Response:
+        return self.http_client.request(
+            _OPERATION_TYPE_TO_HTTP_METHOD[operation.operation_type],
+            operation.url,
+            headers=(
+                {"Content-Type": "application/json"}
+                if operation.body is not None
+                else None
+            ),
+            json=operation.body,
+        )
+
+    def _execute(self, operation: FeedOperation, window: _InFlightWindow) -> FeedResult:
+        attempt = 0
+        while True:
+            window.acquire()
+            throttled = False
+            retryable = False
+            try:
+                response = self._send(operation)
+                throttled = response.status_code in _THROTTLE_STATUS_CODES
+                retryable = throttled or response.is_server_error
+                # a missing document is not an error when removing it
+                if response.is_success or (
+                    operation.operation_type == FeedOperationType.REMOVE
+                    and response.status_code == HTTPStatus.NOT_FOUND
+                ):
+                    return FeedResult(
+                        operation=operation, status_code=response.status_code
+                    )
+
+                error = f"status={response.status_code} body={response.text}"
+                status_code: int | None = response.status_code
+            except httpx.TransportError as e:
+                # includes connection resets and timeouts
+                throttled = retryable = True
+                error = f"{type(e).__name__}: {e}"
+                status_code = None
+            finally:
+                window.release(throttled)
+
+            if not retryable or attempt >= self.max_retries:
+                return FeedResult(
+                    operation=operation, status_code=status_code, error=error
+                )
+
+            attempt += 1
+            backoff = min(_MAX_BACKOFF_SECONDS, 0.1 * 2**attempt)
+            time.sleep(backoff * random.uniform(0.5, 1.0))
+
+    def feed(self, operations: Iterable[FeedOperation]) -> list[FeedResult]:
+        operations = list(operations)
+        if not operations:
+            return []
+
+        window = _InFlightWindow(
+            min_size=min(self.min_in_flight, len(operations)),
+            max_size=min(self.max_in_flight, len(operations)),
+        )
+        start = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=window.max_size
+        ) as executor:
+            results = list(
+                executor.map(lambda op: self._execute(op, window), operations)
+            )
+
+        num_failed = sum(1 for result in results if not result.success)
+        logger.debug(
+            f"Fed {len(results)} operations to Vespa in "
+            f"{time.monotonic() - start:.2f}s: failed={num_failed} "
+            f"final_window={window.size:.1f}"
+        )
+        return results
+
+
+def log_feed_failures(results: list[FeedResult], action: str) -> set[str]:
+    """Logs the failed operations and returns the IDs of the affected documents."""
+    failures = [result for result in results if not result.success]
+    for failure in failures[:10]:
+        logger.error(
+            f"Failed to {action} document '{failure.operation.document_id}' "
+            f"({failure.operation.url}): {failure.error}"
+        )
+        if failure.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+            logger.error(
+                "NOTE: HTTP Status 507 Insufficient Storage usually means "
+                "you need to allocate more memory or disk space to the "
+                "Vespa/index container."
+            )
+
+    return {failure.operation.document_id for failure in failures}
+
+
+def raise_on_feed_failures(results: list[FeedResult], action: str) -> None:
+    failed_document_ids = log_feed_failures(results, action)
+    if not failed_document_ids:
+        return
+
+    num_failures = sum(1 for result in results if not result.success)
+    raise RuntimeError(
+        f"Failed to {action} {num_failures} Vespa operations for documents: "
+        f"{sorted(failed_document_ids)[:10]}"
+    )
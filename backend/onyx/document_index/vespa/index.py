@@ -7,9 +7,12 @@ import re
 import time
 import urllib
 import zipfile
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
+from itertools import repeat
+from typing import Any
 from typing import BinaryIO
 from typing import cast
 from typing import List
@@ -22,6 +25,7 @@ from pydantic import BaseModel
 from retry import retry
 
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.configs.app_configs import ENABLE_INCREMENTAL_VESPA_INDEXING
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -31,7 +35,9 @@ from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_document_chunk_ids
+from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
+from onyx.document_index.interfaces import DocumentFieldsUpdate
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
 from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo
@@ -47,10 +53,19 @@ from onyx.document_index.vespa.chunk_retrieval import (
 )
 from onyx.document_index.vespa.chunk_retrieval import query_vespa
 from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.feed_client import FeedOperation
+from onyx.document_index.vespa.feed_client import FeedOperationType
+from onyx.document_index.vespa.feed_client import log_feed_failures
+from onyx.document_index.vespa.feed_client import raise_on_feed_failures
+from onyx.document_index.vespa.feed_client import VespaFeedClient
 from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
-from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import build_vespa_chunk_fields
+from onyx.document_index.vespa.indexing_utils import build_vespa_put_operation
+from onyx.document_index.vespa.indexing_utils import build_vespa_remove_operation
+from onyx.document_index.vespa.indexing_utils import build_vespa_update_operation
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
+from onyx.document_index.vespa.indexing_utils import get_existing_chunk_hashes
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
@@ -63,11 +78,14 @@ from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
 from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
 from onyx.document_index.vespa_constants import BATCH_SIZE
 from onyx.document_index.vespa_constants import BOOST
+from onyx.document_index.vespa_constants import CONTENT_HASH
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import DOCUMENT_SETS
 from onyx.document_index.vespa_constants import HIDDEN
+from onyx.document_index.vespa_constants import METADATA_HASH
 from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.document_index.vespa_constants import PARTIAL_UPDATE_FIELDS
 from onyx.document_index.vespa_constants import USER_FILE
 from onyx.document_index.vespa_constants import USER_FOLDER
 from onyx.document_index.vespa_constants import VESPA_APPLICATION_ENDPOINT
@@ -89,6 +107,39 @@ httpx_logger = logging.getLogger("httpx")
 httpx_logger.setLevel(logging.WARNING)
 
 
+def _build_update_dict(
+    fields: VespaDocumentFields | None,
+    user_fields: VespaDocumentUserFields | None,
+) -> dict[str, dict]:
+    update_dict: dict[str, dict] = {"fields": {}}
+
+    if fields is not None:
+        if fields.boost is not None:
+            update_dict["fields"][BOOST] = {"assign": fields.boost}
+
+        if fields.document_sets is not None:
+            update_dict["fields"][DOCUMENT_SETS] = {
+                "assign": {document_set: 1 for document_set in fields.document_sets}
+            }
+
+        if fields.access is not None:
+            update_dict["fields"][ACCESS_CONTROL_LIST] = {
+                "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
+            }
+
+        if fields.hidden is not None:
+            update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+
+    if user_fields is not None:
+        if user_fields.user_file_id is not None:
+            update_dict["fields"][USER_FILE] = {"assign": user_fields.user_file_id}
+
+        if user_fields.user_folder_id is not None:
+            update_dict["fields"][USER_FOLDER] = {"assign": user_fields.user_folder_id}
+
+    return update_dict
+
+
 @dataclass
 class _VespaUpdateRequest:
     document_id: str
@@ -478,30 +529,58 @@ class VespaIndex(DocumentIndex):
                     existing_docs.add(cleaned_doc_info.doc_id)
 
             # Now, for each doc, we know exactly where to start and end our deletion
-            # So let's generate the chunk IDs for each chunk to delete
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
-                tenant_id=tenant_id,
-                large_chunks_enabled=large_chunks_enabled,
-            )
-
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
+            # So let's generate the chunk IDs for each chunk to delete.
+            # NOTE: the stale chunk IDs never overlap with the IDs of the new chunks, so
+            # the deletes are streamed to Vespa together with the writes
+            feed_operations: list[FeedOperation] = [
+                build_vespa_remove_operation(
+                    vespa_chunk_id=doc_chunk_id,
+                    document_id=doc_info.doc_id,
                     index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
+                )
+                for doc_info in enriched_doc_infos
+                for doc_chunk_id in get_document_chunk_ids(
+                    enriched_document_info_list=[doc_info],
+                    tenant_id=tenant_id,
+                    large_chunks_enabled=large_chunks_enabled,
+                )
+            ]
+
+            chunks_to_feed = cleaned_chunks
+            if ENABLE_INCREMENTAL_VESPA_INDEXING:
+                chunks_to_feed, chunk_id_to_updated_fields = (
+                    self._diff_against_indexed_chunks(
+                        cleaned_chunks=cleaned_chunks,
+                        enriched_doc_infos=enriched_doc_infos,
+                        tenant_id=tenant_id,
+                        http_client=http_client,
+                        executor=executor,
+                    )
+                )
+                feed_operations.extend(
+                    build_vespa_update_operation(
+                        vespa_chunk_id=vespa_chunk_id,
+                        document_id=document_id,
+                        fields=fields,
+                        index_name=self.index_name,
+                    )
+                    for vespa_chunk_id, (
+                        document_id,
+                        fields,
+                    ) in chunk_id_to_updated_fields.items()
                 )
 
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
+            feed_operations.extend(
+                build_vespa_put_operation(
+                    chunk=chunk,
                     index_name=self.index_name,
-                    http_client=http_client,
                     multitenant=self.multitenant,
-                    executor=executor,
                 )
+                for chunk in chunks_to_feed
+            )
+
+            feed_results = VespaFeedClient(http_client).feed(feed_operations)
+            raise_on_feed_failures(feed_results, action="index")
 
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
@@ -513,50 +592,104 @@ class VespaIndex(DocumentIndex):
             for cleaned_doc_id in all_cleaned_doc_ids
         }
 
+    def _diff_against_indexed_chunks(
+        self,
+        cleaned_chunks: list[DocMetadataAwareIndexChunk],
+        enriched_doc_infos: list[EnrichedDocumentIndexingInfo],
+        tenant_id: str,
+        http_client: httpx.Client,
+        executor: concurrent.futures.ThreadPoolExecutor,
+    ) -> tuple[
+        list[DocMetadataAwareIndexChunk], dict[UUID, tuple[str, dict[str, Any]]]
+    ]:
+        """Compares the new chunks with the hashes stored on the currently indexed chunks.
+
+        Returns the chunks which must be fully (re-)fed and, for chunks whose content is
+        unchanged but whose partially updatable fields (ACL, document sets, boost, ...)
+        changed, their document ID and the fields to assign. Chunks that are identical are skipped entirely.
+        Stale chunks past the new chunk count are still deleted by the caller."""
+        previously_indexed_doc_ids = [
+            replace_invalid_doc_id_characters(doc_info.doc_id)
+            for doc_info in enriched_doc_infos
+            # old chunk ID system documents get entirely new chunk IDs anyways
+            if doc_info.chunk_end_index and not doc_info.old_version
+        ]
+        if not previously_indexed_doc_ids:
+            return cleaned_chunks, {}
+
+        existing_chunk_hashes: dict[UUID, tuple[str | None, str | None]] = {}
+        for chunk_hashes in executor.map(
+            lambda doc_id: get_existing_chunk_hashes(
+                document_id=doc_id,
+                index_name=self.index_name,
+                http_client=http_client,
+                tenant_id=tenant_id,
+            ),
+            previously_indexed_doc_ids,
+        ):
+            existing_chunk_hashes.update(chunk_hashes)
+
+        chunks_to_feed: list[DocMetadataAwareIndexChunk] = []
+        chunk_id_to_updated_fields: dict[UUID, tuple[str, dict[str, Any]]] = {}
+        for chunk in cleaned_chunks:
+            vespa_chunk_id = get_uuid_from_chunk(chunk)
+            existing_hashes = existing_chunk_hashes.get(vespa_chunk_id)
+            if existing_hashes is None:
+                chunks_to_feed.append(chunk)
+                continue
+
+            existing_content_hash, existing_metadata_hash = existing_hashes
+            fields = build_vespa_chunk_fields(chunk, self.multitenant)
+            if existing_content_hash != fields[CONTENT_HASH]:
+                chunks_to_feed.append(chunk)
+                continue
+
+            if existing_metadata_hash == fields[METADATA_HASH]:
+                continue
+
+            # NOTE: assigning None clears the field in Vespa
+            updated_fields = {
+                field_name: fields.get(field_name)
+                for field_name in PARTIAL_UPDATE_FIELDS
+            }
+            updated_fields[METADATA_HASH] = fields[METADATA_HASH]
+            chunk_id_to_updated_fields[vespa_chunk_id] = (
+                chunk.source_document.id,
+                updated_fields,
+            )
+
+        logger.debug(
+            f"Incremental indexing: chunks={len(cleaned_chunks)} "
+            f"feed={len(chunks_to_feed)} "
+            f"partial_update={len(chunk_id_to_updated_fields)} "
+            f"unchanged={len(cleaned_chunks) - len(chunks_to_feed) - len(chunk_id_to_updated_fields)}"
+        )
+        return chunks_to_feed, chunk_id_to_updated_fields
+
     @classmethod
     def _apply_updates_batched(
         cls,
         updates: list[_VespaUpdateRequest],
         httpx_client: httpx.Client,
-        batch_size: int = BATCH_SIZE,
     ) -> None:
-        """Runs a batch of updates in parallel via the ThreadPoolExecutor."""
-
-        def _update_chunk(
-            update: _VespaUpdateRequest, http_client: httpx.Client
-        ) -> httpx.Response:
-            logger.debug(
-                f"Updating with request to {update.url} with body {update.update_request}"
-            )
-            return http_client.put(
-                update.url,
-                headers={"Content-Type": "application/json"},
-                json=update.update_request,
+        """Streams the partial updates to Vespa via the VespaFeedClient."""
+        feed_operations = [
+            FeedOperation(
+                operation_type=FeedOperationType.UPDATE,
+                url=update.url,
+                document_id=update.document_id,
+                body=update.update_request,
             )
+            for update in updates
+        ]
 
-        # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficient for
-        # indexing / updates / deletes since we have to make a large volume of requests.
+        with httpx_client as http_client:
+            feed_results = VespaFeedClient(http_client).feed(feed_operations)
 
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            httpx_client as http_client,
-        ):
-            for update_batch in batch_generator(updates, batch_size):
-                future_to_document_id = {
-                    executor.submit(
-                        _update_chunk,
-                        update,
-                        http_client,
-                    ): update.document_id
-                    for update in update_batch
-                }
-                for future in concurrent.futures.as_completed(future_to_document_id):
-                    res = future.result()
-                    try:
-                        res.raise_for_status()
-                    except requests.HTTPError as e:
-                        failure_msg = f"Failed to update document: {future_to_document_id[future]}"
-                        raise requests.HTTPError(failure_msg) from e
+        try:
+            raise_on_feed_failures(feed_results, action="update")
+        except RuntimeError as e:
+            raise requests.HTTPError(str(e)) from e
 
     @classmethod
     def _apply_kg_chunk_updates_batched(
@@ -746,33 +879,7 @@ class VespaIndex(DocumentIndex):
         Retries if we encounter transient HTTPStatusError (e.g., overload).
         """
 
-        update_dict: dict[str, dict] = {"fields": {}}
-
-        if fields is not None:
-            if fields.boost is not None:
-                update_dict["fields"][BOOST] = {"assign": fields.boost}
-
-            if fields.document_sets is not None:
-                update_dict["fields"][DOCUMENT_SETS] = {
-                    "assign": {document_set: 1 for document_set in fields.document_sets}
-                }
-
-            if fields.access is not None:
-                update_dict["fields"][ACCESS_CONTROL_LIST] = {
-                    "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
-                }
-
-            if fields.hidden is not None:
-                update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
-
-        if user_fields is not None:
-            if user_fields.user_file_id is not None:
-                update_dict["fields"][USER_FILE] = {"assign": user_fields.user_file_id}
-
-            if user_fields.user_folder_id is not None:
-                update_dict["fields"][USER_FOLDER] = {
-                    "assign": user_fields.user_folder_id
-                }
+        update_dict = _build_update_dict(fields, user_fields)
 
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update.")
@@ -848,6 +955,87 @@ class VespaIndex(DocumentIndex):
 
         return doc_chunk_count
 
+    def update_multiple(
+        self,
+        document_updates: list[DocumentFieldsUpdate],
+        *,
+        tenant_id: str,
+    ) -> dict[str, int]:
+        update_start = time.monotonic()
+        doc_id_to_chunk_count: dict[str, int] = defaultdict(int)
+        feed_operations: list[FeedOperation] = []
+
+        with (
+            self.httpx_client_context as http_client,
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+        ):
+
+            def _enrich(
+                index_name: str, document_update: DocumentFieldsUpdate
+            ) -> EnrichedDocumentIndexingInfo:
+                return VespaIndex.enrich_basic_chunk_info(
+                    index_name=index_name,
+                    http_client=http_client,
+                    document_id=replace_invalid_doc_id_characters(
+                        document_update.doc_id
+                    ),
+                    previous_chunk_count=document_update.chunk_count,
+                    new_chunk_count=0,
+                )
+
+            for (
+                index_name,
+                large_chunks_enabled,
+            ) in self.index_to_large_chunks_enabled.items():
+                # only documents without a chunk count (old chunk ID system) need to
+                # query Vespa here
+                enriched_doc_infos = executor.map(
+                    _enrich, repeat(index_name), document_updates
+                )
+                for document_update, enriched_doc_info in zip(
+                    document_updates, enriched_doc_infos
+                ):
+                    update_dict = _build_update_dict(document_update.fields, None)
+                    if not update_dict["fields"]:
+                        logger.error(
+                            "Update request received but nothing to update. "
+                            f"doc_id={document_update.doc_id}"
+                        )
+                        continue
+
+                    doc_chunk_ids = get_document_chunk_ids(
+                        enriched_document_info_list=[enriched_doc_info],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=large_chunks_enabled,
+                    )
+                    doc_id_to_chunk_count[document_update.doc_id] += len(doc_chunk_ids)
+                    feed_operations.extend(
+                        FeedOperation(
+                            operation_type=FeedOperationType.UPDATE,
+                            url=(
+                                f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/"
+                                f"{doc_chunk_id}?create=true"
+                            ),
+                            document_id=document_update.doc_id,
+                            body=update_dict,
+                        )
+                        for doc_chunk_id in doc_chunk_ids
+                    )
+
+            feed_results = VespaFeedClient(http_client).feed(feed_operations)
+
+        failed_doc_ids = log_feed_failures(feed_results, action="update")
+        logger.debug(
+            f"Updated {len(document_updates)} documents ({len(feed_operations)} chunks) "
+            f"in Vespa in {time.monotonic() - update_start:.2f} seconds. "
+            f"failed={len(failed_doc_ids)}"
+        )
+        return {
+            doc_id: chunk_count
+            for doc_id, chunk_count in doc_id_to_chunk_count.items()
+            if doc_id not in failed_doc_ids
+        }
+
     def delete_single(
         self,
         doc_id: str,
@@ -1,4 +1,5 @@
 import concurrent.futures
+import hashlib
 import json
 import uuid
 from abc import ABC
@@ -6,7 +7,7 @@ from abc import abstractmethod
 from collections.abc import Callable
 from datetime import datetime
 from datetime import timezone
-from http import HTTPStatus
+from typing import Any
 
 import httpx
 from retry import retry
@@ -17,6 +18,8 @@ from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.vespa.feed_client import FeedOperation
+from onyx.document_index.vespa.feed_client import FeedOperationType
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -28,6 +31,7 @@ from onyx.document_index.vespa_constants import BOOST
 from onyx.document_index.vespa_constants import CHUNK_CONTEXT
 from onyx.document_index.vespa_constants import CHUNK_ID
 from onyx.document_index.vespa_constants import CONTENT
+from onyx.document_index.vespa_constants import CONTENT_HASH
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DOC_SUMMARY
 from onyx.document_index.vespa_constants import DOC_UPDATED_AT
@@ -38,9 +42,11 @@ from onyx.document_index.vespa_constants import EMBEDDINGS
 from onyx.document_index.vespa_constants import IMAGE_FILE_NAME
 from onyx.document_index.vespa_constants import LARGE_CHUNK_REFERENCE_IDS
 from onyx.document_index.vespa_constants import METADATA
+from onyx.document_index.vespa_constants import METADATA_HASH
 from onyx.document_index.vespa_constants import METADATA_LIST
 from onyx.document_index.vespa_constants import METADATA_SUFFIX
 from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.document_index.vespa_constants import PARTIAL_UPDATE_FIELDS
 from onyx.document_index.vespa_constants import PRIMARY_OWNERS
 from onyx.document_index.vespa_constants import SECONDARY_OWNERS
 from onyx.document_index.vespa_constants import SECTION_CONTINUATION
@@ -55,10 +61,14 @@ from onyx.document_index.vespa_constants import USER_FILE
 from onyx.document_index.vespa_constants import USER_FOLDER
 from onyx.indexing.models import DocMetadataAwareIndexChunk
 from onyx.utils.logger import setup_logger
+from shared_configs.configs import MULTI_TENANT
 
 
 logger = setup_logger()
 
+# embeddings are derived from the content, the hashes can't include themselves
+_NON_HASHED_FIELDS = {EMBEDDINGS, TITLE_EMBEDDING, CONTENT_HASH, METADATA_HASH}
+
 
 @retry(tries=3, delay=1, backoff=2)
 def _does_doc_chunk_exist(
@@ -126,22 +136,14 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
+def build_vespa_chunk_fields(
     chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
     multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+) -> dict[str, Any]:
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -217,55 +219,131 @@ def _index_vespa_chunk(
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
-    vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
-    logger.debug(f'Indexing to URL "{vespa_url}"')
-    res = http_client.post(
-        vespa_url, headers=json_header, json={"fields": vespa_document_fields}
+
+    content_hash, metadata_hash = get_vespa_chunk_field_hashes(vespa_document_fields)
+    vespa_document_fields[CONTENT_HASH] = content_hash
+    vespa_document_fields[METADATA_HASH] = metadata_hash
+    return vespa_document_fields
+
+
+def get_vespa_chunk_field_hashes(
+    vespa_document_fields: dict[str, Any],
+) -> tuple[str, str]:
+    """Returns (content hash, metadata hash) for the fields of a chunk.
+
+    The metadata hash covers the fields which can be changed with a partial update
+    (see PARTIAL_UPDATE_FIELDS), the content hash covers everything else except the
+    embeddings, which are derived from the content."""
+    content_fields: dict[str, Any] = {}
+    metadata_fields: dict[str, Any] = {}
+    for field_name, value in vespa_document_fields.items():
+        if field_name in _NON_HASHED_FIELDS:
+            continue
+        if field_name in PARTIAL_UPDATE_FIELDS:
+            metadata_fields[field_name] = value
+        else:
+            content_fields[field_name] = value
+
+    return _hash_fields(content_fields), _hash_fields(metadata_fields)
+
+
+def _hash_fields(fields: dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _vespa_chunk_url(vespa_chunk_id: uuid.UUID, index_name: str) -> str:
+    return f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
+
+
+def build_vespa_put_operation(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    multitenant: bool,
+) -> FeedOperation:
+    return FeedOperation(
+        operation_type=FeedOperationType.PUT,
+        url=_vespa_chunk_url(get_uuid_from_chunk(chunk), index_name),
+        document_id=chunk.source_document.id,
+        body={"fields": build_vespa_chunk_fields(chunk, multitenant)},
     )
-    try:
-        res.raise_for_status()
-    except Exception as e:
-        logger.exception(
-            f"Failed to index document: '{document.id}'. Got response: '{res.text}'"
-        )
-        if isinstance(e, httpx.HTTPStatusError):
-            if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
-                logger.error(
-                    "NOTE: HTTP Status 507 Insufficient Storage usually means "
-                    "you need to allocate more memory or disk space to the "
-                    "Vespa/index container."
-                )
 
-        raise e
 
+def build_vespa_update_operation(
+    vespa_chunk_id: uuid.UUID,
+    document_id: str,
+    fields: dict[str, Any],
+    index_name: str,
+) -> FeedOperation:
+    """Partial (assign) update of already indexed chunk fields."""
+    return FeedOperation(
+        operation_type=FeedOperationType.UPDATE,
+        url=_vespa_chunk_url(vespa_chunk_id, index_name),
+        document_id=document_id,
+        body={
+            "fields": {
+                field_name: {"assign": value} for field_name, value in fields.items()
+            }
+        },
+    )
 
-def batch_index_vespa_chunks(
-    chunks: list[DocMetadataAwareIndexChunk],
+
+def build_vespa_remove_operation(
+    vespa_chunk_id: uuid.UUID,
+    document_id: str,
+    index_name: str,
+) -> FeedOperation:
+    return FeedOperation(
+        operation_type=FeedOperationType.REMOVE,
+        url=_vespa_chunk_url(vespa_chunk_id, index_name),
+        document_id=document_id,
+    )
+
+
+@retry(tries=3, delay=1, backoff=2)
+def get_existing_chunk_hashes(
+    document_id: str,
     index_name: str,
     http_client: httpx.Client,
-    multitenant: bool,
-    executor: concurrent.futures.ThreadPoolExecutor | None = None,
-) -> None:
-    external_executor = True
+    tenant_id: str | None,
+) -> dict[uuid.UUID, tuple[str | None, str | None]]:
+    """Fetches the (content hash, metadata hash) of every chunk (including large
+    chunks) currently stored in Vespa for the document. Chunks indexed before the
+    hashes were introduced map to (None, None)."""
+    selection = f"{index_name}.document_id=='{document_id}'"
+    if MULTI_TENANT and tenant_id:
+        selection += f" and {index_name}.tenant_id=='{tenant_id}'"
+
+    params: dict[str, str | int] = {
+        "selection": selection,
+        "fieldSet": f"{index_name}:{CONTENT_HASH},{METADATA_HASH}",
+        "wantedDocumentCount": 1_000,
+    }
 
-    if not executor:
-        external_executor = False
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
+    chunk_hashes: dict[uuid.UUID, tuple[str | None, str | None]] = {}
+    while True:
+        response = http_client.get(
+            DOCUMENT_ID_ENDPOINT.format(index_name=index_name), params=params
+        )
+        response.raise_for_status()
+        response_data = response.json()
+
+        for document in response_data.get("documents", []):
+            # ids look like id:default:<index_name>::<chunk uuid>
+            vespa_chunk_id = uuid.UUID(document["id"].split("::", 1)[-1])
+            fields = document.get("fields", {})
+            chunk_hashes[vespa_chunk_id] = (
+                fields.get(CONTENT_HASH),
+                fields.get(METADATA_HASH),
+            )
 
-    try:
-        chunk_index_future = {
-            executor.submit(
-                _index_vespa_chunk, chunk, index_name, http_client, multitenant
-            ): chunk
-            for chunk in chunks
-        }
-        for future in concurrent.futures.as_completed(chunk_index_future):
-            # Will raise exception if any indexing raised an exception
-            future.result()
+        continuation = response_data.get("continuation")
+        if not continuation:
+            break
+        params["continuation"] = continuation
 
-    finally:
-        if not external_executor:
-            executor.shutdown(wait=True)
+    return chunk_hashes
 
 
 def clean_chunk_id_copy(
@@ -70,6 +70,23 @@ RECENCY_BIAS = "recency_bias"
 HIDDEN = "hidden"
 # for legacy reasons, called `name` in Vespa despite it really being an ID
 IMAGE_FILE_NAME = "image_file_name"
+# used by incremental indexing to detect which chunks actually changed
+CONTENT_HASH = "content_hash"
+METADATA_HASH = "metadata_hash"
+
+# Fields that incremental indexing updates in place (partial update) rather than
+# re-feeding the whole chunk when nothing else about the chunk changed
+PARTIAL_UPDATE_FIELDS = {
+    ACCESS_CONTROL_LIST,
+    DOCUMENT_SETS,
+    BOOST,
+    AGGREGATED_CHUNK_BOOST_FACTOR,
+    DOC_UPDATED_AT,
+    PRIMARY_OWNERS,
+    SECONDARY_OWNERS,
+    USER_FILE,
+    USER_FOLDER,
+}
 
 # Specific to Vespa, needed for highlighting matching keywords / section
 CONTENT_SUMMARY = "content_summary"
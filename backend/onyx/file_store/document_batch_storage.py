@@ -1,24 +1,38 @@
 import json
+import os
+import struct
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterator
 from enum import Enum
-from io import StringIO
+from io import BytesIO
+from typing import IO
 from typing import List
 from typing import Optional
 from typing import TypeAlias
 
+import zstandard
 from pydantic import BaseModel
 
 from onyx.configs.constants import FileOrigin
 from onyx.connectors.models import DocExtractionContext
 from onyx.connectors.models import DocIndexingContext
 from onyx.connectors.models import Document
+from onyx.db.file_record import FileRecordNotFoundError
 from onyx.file_store.file_store import FileStore
 from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Batches are stored as this header followed by a zstd stream of length prefixed
+# records, one compact JSON encoded document per record. Batches written by older
+# versions are a single (indented) JSON array and are still readable.
+_BATCH_FORMAT_HEADER = b"ONYXDOCBATCH\x01"
+_RECORD_LENGTH = struct.Struct(">I")
+_BATCH_COMPRESSION_LEVEL = 3
+_BATCH_READ_CHUNK_SIZE = 1024 * 1024
+
 
 class DocumentBatchStorageStateType(str, Enum):
     EXTRACTION = "extraction"
@@ -83,15 +97,51 @@ class DocumentBatchStorage(ABC):
     def extract_path_info(self, path: str) -> BatchStoragePathInfo | None:
         """Extract path info from a path."""
 
-    def _serialize_documents(self, documents: list[Document]) -> str:
-        """Serialize documents to JSON string."""
-        # Use mode='json' to properly serialize datetime and other complex types
-        return json.dumps([doc.model_dump(mode="json") for doc in documents], indent=2)
+    def _serialize_documents(self, documents: list[Document]) -> bytes:
+        """Serialize documents to the compressed batch format."""
+        compressor = zstandard.ZstdCompressor(
+            level=_BATCH_COMPRESSION_LEVEL
+        ).compressobj()
+        parts = [_BATCH_FORMAT_HEADER]
+        for doc in documents:
+            record = doc.model_dump_json().encode("utf-8")
+            parts.append(compressor.compress(_RECORD_LENGTH.pack(len(record))))
+            parts.append(compressor.compress(record))
+        parts.append(compressor.flush())
+        return b"".join(parts)
+
+    def _deserialize_documents(self, data: IO[bytes]) -> Iterator[Document]:
+        """Deserialize documents one at a time, without decompressing (or parsing)
+        the whole batch up front."""
+        header = data.read(len(_BATCH_FORMAT_HEADER))
+        if header != _BATCH_FORMAT_HEADER:
+            # batch written by an older version
+            doc_dicts = json.loads(header + data.read())
+            for doc_dict in doc_dicts:
+                yield Document.model_validate(doc_dict)
+            return
+
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        buffer = bytearray()
+        while chunk := data.read(_BATCH_READ_CHUNK_SIZE):
+            buffer += decompressor.decompress(chunk)
+
+            offset = 0
+            while len(buffer) - offset >= _RECORD_LENGTH.size:
+                (record_length,) = _RECORD_LENGTH.unpack_from(buffer, offset)
+                record_end = offset + _RECORD_LENGTH.size + record_length
+                if len(buffer) < record_end:
+                    break
+                yield Document.model_validate_json(
+                    buffer[offset + _RECORD_LENGTH.size : record_end]
+                )
+                offset = record_end
+
+            # drop the consumed records so the buffer stays small
+            del buffer[:offset]
 
-    def _deserialize_documents(self, data: str) -> list[Document]:
-        """Deserialize documents from JSON string."""
-        doc_dicts = json.loads(data)
-        return [Document.model_validate(doc_dict) for doc_dict in doc_dicts]
+        if buffer or not decompressor.eof:
+            raise ValueError("Document batch is truncated")
 
     def _per_cc_pair_base_path(self) -> str:
         """Get the base path for the cc pair."""
@@ -106,7 +156,9 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         self.file_store = file_store
 
     def _get_batch_file_name(self, batch_num: int) -> str:
-        """Generate file name for a document batch."""
+        """Generate file name for a document batch.
+        The .json extension is kept so that batches written by older versions (which
+        use the same names) are still found."""
         return f"{self.base_path}/{batch_num}.json"
 
     def store_batch(self, batch_num: int, documents: list[Document]) -> None:
@@ -114,14 +166,13 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         file_name = self._get_batch_file_name(batch_num)
         try:
             data = self._serialize_documents(documents)
-            content = StringIO(data)
 
             self.file_store.save_file(
                 file_id=file_name,
-                content=content,
+                content=BytesIO(data),
                 display_name=f"Document Batch {batch_num}",
                 file_origin=FileOrigin.OTHER,
-                file_type="application/json",
+                file_type="application/octet-stream",
                 file_metadata={
                     "batch_num": batch_num,
                     "document_count": str(len(documents)),
@@ -139,21 +190,23 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         """Retrieve a batch of documents from FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            # Check if file exists
-            if not self.file_store.has_file(
-                file_id=file_name,
-                file_origin=FileOrigin.OTHER,
-                file_type="application/json",
-            ):
+            try:
+                # read from a temporary file so the compressed batch is not kept in
+                # memory next to the documents being deserialized from it
+                content_io = self.file_store.read_file(file_name, use_tempfile=True)
+            except FileRecordNotFoundError:
+                # no need to check for the file record first
                 logger.warning(
                     f"Batch {batch_num} not found in FileStore with name {file_name}"
                 )
                 return None
 
-            content_io = self.file_store.read_file(file_name)
-            data = content_io.read().decode("utf-8")
-
-            documents = self._deserialize_documents(data)
+            try:
+                documents = list(self._deserialize_documents(content_io))
+            finally:
+                content_io.close()
+                # the file store does not delete the temporary file itself
+                os.unlink(content_io.name)
             logger.debug(
                 f"Retrieved batch {batch_num} with {len(documents)} documents from FileStore"
             )
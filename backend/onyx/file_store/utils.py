@@ -7,6 +7,8 @@ from uuid import UUID
 import requests
 from sqlalchemy.orm import Session
 
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_MAX_BYTES
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_TTL_SECONDS
 from onyx.configs.constants import FileOrigin
 from onyx.db.models import ChatMessage
 from onyx.db.models import UserFile
@@ -19,11 +21,24 @@ from onyx.server.query_and_chat.chat_utils import mime_type_to_chat_file_type
 from onyx.utils.b64 import get_image_type
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
 RECENT_FOLDER_ID = -1
 
+# Uploaded files are never overwritten, so they are kept in memory across the turns of
+# a conversation instead of being read from the file store every time. This does not
+# hold for the plaintext of user files, which is rewritten whenever the file is
+# reindexed (in another process), so that is always read from the file store.
+# Half of the cache budget goes to the text extracted from PDFs (see onyx.llm.utils).
+_FILE_CONTENT_CACHE: TTLLRUCache[tuple[str, str], bytes] = TTLLRUCache(
+    max_size=CHAT_FILE_CACHE_MAX_BYTES // 2,
+    ttl=CHAT_FILE_CACHE_TTL_SECONDS,
+    weigh=len,
+)
+
 
 def user_file_id_to_plaintext_file_name(user_file_id: int) -> str:
     """Generate a consistent file name for storing plaintext content of a user file."""
@@ -64,11 +79,20 @@ def store_user_file_plaintext(user_file_id: int, plaintext_content: str) -> bool
         return False
 
 
+def _read_file_content(file_id: str) -> bytes:
+    """Reads the file from the file store, or the in-memory cache if it was read recently"""
+    cache_key = (get_current_tenant_id(), file_id)
+    content = _FILE_CONTENT_CACHE.get(cache_key)
+    if content is None:
+        content = get_default_file_store().read_file(file_id, mode="b").read()
+        _FILE_CONTENT_CACHE.set(cache_key, content)
+    return content
+
+
 def load_chat_file(file_descriptor: FileDescriptor) -> InMemoryChatFile:
-    file_io = get_default_file_store().read_file(file_descriptor["id"], mode="b")
     return InMemoryChatFile(
         file_id=file_descriptor["id"],
-        content=file_io.read(),
+        content=_read_file_content(file_descriptor["id"]),
         file_type=file_descriptor["type"],
         filename=file_descriptor.get("name"),
     )
@@ -83,16 +107,36 @@ def load_all_chat_files(
         if chat_message.files:
             file_descriptors_for_history.extend(chat_message.files)
 
-    files = cast(
-        list[InMemoryChatFile],
+    all_file_descriptors = file_descriptors + file_descriptors_for_history
+
+    # only the files which were not loaded on a previous turn need to be fetched
+    tenant_id = get_current_tenant_id()
+    contents: dict[str, bytes] = {}
+    ids_to_fetch: list[str] = []
+    for file_id in dict.fromkeys(file["id"] for file in all_file_descriptors):
+        content = _FILE_CONTENT_CACHE.get((tenant_id, file_id))
+        if content is None:
+            ids_to_fetch.append(file_id)
+        else:
+            contents[file_id] = content
+
+    fetched_contents = cast(
+        list[bytes],
         run_functions_tuples_in_parallel(
-            [
-                (load_chat_file, (file,))
-                for file in file_descriptors + file_descriptors_for_history
-            ]
+            [(_read_file_content, (file_id,)) for file_id in ids_to_fetch]
         ),
     )
-    return files
+    contents.update(zip(ids_to_fetch, fetched_contents))
+
+    return [
+        InMemoryChatFile(
+            file_id=file["id"],
+            content=contents[file["id"]],
+            file_type=file["type"],
+            filename=file.get("name"),
+        )
+        for file in all_file_descriptors
+    ]
 
 
 def load_user_folder(folder_id: int, db_session: Session) -> list[InMemoryChatFile]:
@@ -122,7 +166,7 @@ def load_user_file(file_id: int, db_session: Session) -> InMemoryChatFile:
 
     # check for plain text normalized version first, then use original file otherwise
     try:
-        file_io = file_store.read_file(plaintext_file_name, mode="b")
+        plaintext_content = file_store.read_file(plaintext_file_name, mode="b").read()
         # For plaintext versions, use PLAIN_TEXT type (unless it's an image which doesn't have plaintext)
         plaintext_chat_file_type = (
             ChatFileType.PLAIN_TEXT
@@ -131,7 +175,7 @@ def load_user_file(file_id: int, db_session: Session) -> InMemoryChatFile:
         )
         chat_file = InMemoryChatFile(
             file_id=str(user_file.file_id),
-            content=file_io.read(),
+            content=plaintext_content,
             file_type=plaintext_chat_file_type,
             filename=user_file.name,
         )
@@ -140,11 +184,9 @@ def load_user_file(file_id: int, db_session: Session) -> InMemoryChatFile:
     except Exception as e:
         logger.warning(f"Failed to load plaintext for user file {user_file.id}: {e}")
         # Fall back to original file if plaintext not available
-        file_io = file_store.read_file(user_file.file_id, mode="b")
-
         chat_file = InMemoryChatFile(
             file_id=str(user_file.file_id),
-            content=file_io.read(),
+            content=_read_file_content(user_file.file_id),
             file_type=chat_file_type,
             filename=user_file.name,
         )
@@ -1,9 +1,16 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
 from typing import cast
 
 from chonkie import SentenceChunker
 
 from onyx.configs.app_configs import AVERAGE_SUMMARY_EMBEDDINGS
 from onyx.configs.app_configs import BLURB_SIZE
+from onyx.configs.app_configs import INDEXING_CHUNKER_NUM_PROCESSES
 from onyx.configs.app_configs import LARGE_CHUNK_RATIO
 from onyx.configs.app_configs import MINI_CHUNK_SIZE
 from onyx.configs.app_configs import SKIP_METADATA_IN_CHUNK
@@ -37,6 +44,28 @@ CHUNK_MIN_CONTENT = 256
 
 logger = setup_logger()
 
+# Process pools for parallel chunking, keyed by the chunker settings (incl. tokenizer)
+# the workers of a pool were initialized with. Pools are reused across batches so the
+# (spawn) startup and tokenizer loading cost is only paid once per process.
+_CHUNKING_POOLS: dict[tuple, ProcessPoolExecutor] = {}
+_CHUNKING_POOLS_LOCK = threading.Lock()
+
+# the Chunker of a pool worker process, see _init_chunking_worker
+_WORKER_CHUNKER: "Chunker | None" = None
+
+
+def shutdown_chunking_pools() -> None:
+    """Stops the worker processes of all chunking pools, so that worker restarts don't
+    leave them behind. Pools are recreated on the next use."""
+    with _CHUNKING_POOLS_LOCK:
+        pools = list(_CHUNKING_POOLS.values())
+        _CHUNKING_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_chunking_pools)
+
 
 def _get_metadata_suffix_for_document_index(
     metadata: dict[str, str | list[str]], include_separator: bool = False
@@ -138,7 +167,21 @@ class Chunker:
         chunk_overlap: int = CHUNK_OVERLAP,
         mini_chunk_size: int = MINI_CHUNK_SIZE,
         callback: IndexingHeartbeatInterface | None = None,
+        num_processes: int = INDEXING_CHUNKER_NUM_PROCESSES,
     ) -> None:
+        # everything needed to build an equivalent Chunker in a pool worker process
+        self._worker_init_kwargs: dict[str, Any] = dict(
+            tokenizer=tokenizer,
+            enable_multipass=enable_multipass,
+            enable_large_chunks=enable_large_chunks,
+            enable_contextual_rag=enable_contextual_rag,
+            blurb_size=blurb_size,
+            include_metadata=include_metadata,
+            chunk_token_limit=chunk_token_limit,
+            chunk_overlap=chunk_overlap,
+            mini_chunk_size=mini_chunk_size,
+        )
+        self.num_processes = num_processes
         self.include_metadata = include_metadata
         self.chunk_token_limit = chunk_token_limit
         self.enable_multipass = enable_multipass
@@ -157,9 +200,13 @@ class Chunker:
         self.max_context = 0
         self.prompt_tokens = 0
 
+        # token counts of the strings seen while chunking the current document, the
+        # same strings (separators, title, sentences, splits) are counted many times
+        self._token_counts: dict[str, int] = {}
+
         # Create a token counter function that returns the count instead of the tokens
         def token_counter(text: str) -> int:
-            return len(tokenizer.encode(text))
+            return self._count_tokens(text)
 
         self.blurb_splitter = SentenceChunker(
             tokenizer_or_token_counter=token_counter,
@@ -186,6 +233,13 @@ class Chunker:
             else None
         )
 
+    def _count_tokens(self, text: str) -> int:
+        token_count = self._token_counts.get(text)
+        if token_count is None:
+            token_count = len(self.tokenizer.encode(text))
+            self._token_counts[text] = token_count
+        return token_count
+
     def _split_oversized_chunk(self, text: str, content_token_limit: int) -> list[str]:
         """
         Splits the text into smaller chunks based on token count to ensure
@@ -273,6 +327,8 @@ class Chunker:
         chunks: list[DocAwareChunk] = []
         link_offsets: dict[int, str] = {}
         chunk_text = ""
+        # kept up to date with chunk_text instead of re-tokenizing it for every section
+        chunk_token_count = 0
 
         for section_idx, section in enumerate(sections):
             # Get section text and other attributes
@@ -303,6 +359,7 @@ class Chunker:
                         metadata_suffix_keyword=metadata_suffix_keyword,
                     )
                     chunk_text = ""
+                    chunk_token_count = 0
                     link_offsets = {}
 
                 # Create a chunk specifically for this image section
@@ -321,7 +378,7 @@ class Chunker:
                 continue
 
             # CASE 2: Normal text section
-            section_token_count = len(self.tokenizer.encode(section_text))
+            section_token_count = self._count_tokens(section_text)
 
             # If the section is large on its own, split it separately
             if section_token_count > content_token_limit:
@@ -337,6 +394,7 @@ class Chunker:
                         metadata_suffix_keyword,
                     )
                     chunk_text = ""
+                    chunk_token_count = 0
                     link_offsets = {}
 
                 # chunker is in `text` mode
@@ -345,7 +403,7 @@ class Chunker:
                     # If even the split_text is bigger than strict limit, further split
                     if (
                         STRICT_CHUNK_TOKEN_LIMIT
-                        and len(self.tokenizer.encode(split_text)) > content_token_limit
+                        and self._count_tokens(split_text) > content_token_limit
                     ):
                         smaller_chunks = self._split_oversized_chunk(
                             split_text, content_token_limit
@@ -375,16 +433,16 @@ class Chunker:
                 continue
 
             # If we can still fit this section into the current chunk, do so
-            current_token_count = len(self.tokenizer.encode(chunk_text))
             current_offset = len(shared_precompare_cleanup(chunk_text))
-            next_section_tokens = (
-                len(self.tokenizer.encode(SECTION_SEPARATOR)) + section_token_count
-            )
+            separator_token_count = self._count_tokens(SECTION_SEPARATOR)
+            next_section_tokens = separator_token_count + section_token_count
 
-            if next_section_tokens + current_token_count <= content_token_limit:
+            if next_section_tokens + chunk_token_count <= content_token_limit:
                 if chunk_text:
                     chunk_text += SECTION_SEPARATOR
+                    chunk_token_count += separator_token_count
                 chunk_text += section_text
+                chunk_token_count += section_token_count
                 link_offsets[current_offset] = section_link_text
             else:
                 # finalize the existing chunk
@@ -401,6 +459,7 @@ class Chunker:
                 # start a new chunk
                 link_offsets = {0: section_link_text}
                 chunk_text = section_text
+                chunk_token_count = section_token_count
 
         # finalize any leftover text chunk
         if chunk_text.strip() or not chunks:
@@ -423,10 +482,13 @@ class Chunker:
         if document.source == DocumentSource.GMAIL:
             logger.debug(f"Chunking {document.semantic_identifier}")
 
+        # token counts are only reused within a document to keep the cache bounded
+        self._token_counts = {}
+
         # Title prep
         title = self._extract_blurb(document.get_title_for_document_index() or "")
         title_prefix = title + RETURN_SEPARATOR if title else ""
-        title_tokens = len(self.tokenizer.encode(title_prefix))
+        title_tokens = self._count_tokens(title_prefix)
 
         # Metadata prep
         metadata_suffix_semantic = ""
@@ -439,7 +501,7 @@ class Chunker:
             ) = _get_metadata_suffix_for_document_index(
                 document.metadata, include_separator=True
             )
-            metadata_tokens = len(self.tokenizer.encode(metadata_suffix_semantic))
+            metadata_tokens = self._count_tokens(metadata_suffix_semantic)
 
         # If metadata is too large, skip it in the semantic content
         if metadata_tokens >= self.chunk_token_limit * MAX_METADATA_PERCENTAGE:
@@ -450,8 +512,7 @@ class Chunker:
         doc_token_count = 0
         if self.enable_contextual_rag:
             doc_content = document.get_text_content()
-            tokenized_doc = self.tokenizer.tokenize(doc_content)
-            doc_token_count = len(tokenized_doc)
+            doc_token_count = self._count_tokens(doc_content)
 
             # check if doc + title + metadata fits in a single chunk. If so, no need for contextual RAG
             single_chunk_fits = (
@@ -509,15 +570,70 @@ class Chunker:
         for chunk in normal_chunks:
             chunk.contextual_rag_reserved_tokens = context_size
 
+        self._token_counts = {}
         return normal_chunks
 
+    def _get_chunking_pool(self) -> ProcessPoolExecutor:
+        pool_key = (
+            id(self._worker_init_kwargs["tokenizer"]),
+            *(
+                (key, value)
+                for key, value in self._worker_init_kwargs.items()
+                if key != "tokenizer"
+            ),
+            self.num_processes,
+        )
+        with _CHUNKING_POOLS_LOCK:
+            pool = _CHUNKING_POOLS.get(pool_key)
+            if pool is None:
+                # spawn rather than fork, the indexing workers are multithreaded
+                pool = ProcessPoolExecutor(
+                    max_workers=self.num_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_chunking_worker,
+                    initargs=(self._worker_init_kwargs,),
+                )
+                _CHUNKING_POOLS[pool_key] = pool
+            return pool
+
+    def _chunk_in_pool(self, documents: list[IndexingDocument]) -> list[DocAwareChunk]:
+        pool = self._get_chunking_pool()
+        futures: list[Future[list[DocAwareChunk]]] = [
+            pool.submit(_chunk_document_in_worker, document) for document in documents
+        ]
+
+        final_chunks: list[DocAwareChunk] = []
+        try:
+            for document, future in zip(documents, futures):
+                if self.callback and self.callback.should_stop():
+                    raise RuntimeError("Chunker.chunk: Stop signal detected")
+
+                chunks = future.result()
+                # point back to the original document rather than the unpickled copy
+                for chunk in chunks:
+                    chunk.source_document = document
+                final_chunks.extend(chunks)
+
+                if self.callback:
+                    self.callback.progress("Chunker.chunk", len(chunks))
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return final_chunks
+
     def chunk(self, documents: list[IndexingDocument]) -> list[DocAwareChunk]:
         """
         Takes in a list of documents and chunks them into smaller chunks for indexing
         while persisting the document metadata.
 
         Works with both standard Document objects and IndexingDocument objects with processed_sections.
+
+        With num_processes > 1 the documents are chunked in parallel in a process pool.
         """
+        if self.num_processes > 1 and len(documents) > 1:
+            return self._chunk_in_pool(documents)
+
         final_chunks: list[DocAwareChunk] = []
         for document in documents:
             if self.callback and self.callback.should_stop():
@@ -530,3 +646,14 @@ class Chunker:
                 self.callback.progress("Chunker.chunk", len(chunks))
 
         return final_chunks
+
+
+def _init_chunking_worker(init_kwargs: dict[str, Any]) -> None:
+    global _WORKER_CHUNKER
+    _WORKER_CHUNKER = Chunker(**init_kwargs, num_processes=1)
+
+
+def _chunk_document_in_worker(document: IndexingDocument) -> list[DocAwareChunk]:
+    if _WORKER_CHUNKER is None:
+        raise RuntimeError("Chunking worker was not initialized")
+    return _WORKER_CHUNKER._handle_single_document(document)
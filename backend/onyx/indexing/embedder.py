@@ -2,7 +2,9 @@ import time
 from abc import ABC
 from abc import abstractmethod
 from collections import defaultdict
+from typing import cast
 
+from onyx.configs.app_configs import ENABLE_INDEXING_EMBEDDING_CACHE
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import ConnectorStopSignal
 from onyx.connectors.models import DocumentFailure
@@ -11,11 +13,16 @@ from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
+from onyx.natural_language_processing.embedding_cache import (
+    build_embedding_model_key,
+)
+from onyx.natural_language_processing.embedding_cache import RedisEmbeddingCache
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
+from shared_configs.contextvars import get_current_tenant_id
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
@@ -41,6 +48,7 @@ class IndexingEmbedder(ABC):
         deployment_name: str | None,
         reduced_dimension: int | None,
         callback: IndexingHeartbeatInterface | None,
+        use_embedding_cache: bool = ENABLE_INDEXING_EMBEDDING_CACHE,
     ):
         self.model_name = model_name
         self.normalize = normalize
@@ -51,6 +59,15 @@ class IndexingEmbedder(ABC):
         self.api_url = api_url
         self.api_version = api_version
         self.deployment_name = deployment_name
+        self.use_embedding_cache = use_embedding_cache
+        self.embedding_model_key = build_embedding_model_key(
+            model_name=model_name,
+            provider_type=provider_type,
+            normalize=normalize,
+            query_prefix=query_prefix,
+            passage_prefix=passage_prefix,
+            reduced_dimension=reduced_dimension,
+        )
 
         self.embedding_model = EmbeddingModel(
             model_name=model_name,
@@ -94,6 +111,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
         callback: IndexingHeartbeatInterface | None = None,
+        use_embedding_cache: bool = ENABLE_INDEXING_EMBEDDING_CACHE,
     ):
         super().__init__(
             model_name,
@@ -107,7 +125,59 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             deployment_name,
             reduced_dimension,
             callback,
+            use_embedding_cache,
+        )
+
+    def _encode_passages(
+        self,
+        texts: list[str],
+        large_chunks_present: bool = False,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[Embedding]:
+        """Encodes the texts, only sending the ones without a cached embedding to
+        the embedding model. Duplicate texts within the batch are only embedded once."""
+        if not self.use_embedding_cache:
+            return self.embedding_model.encode(
+                texts=texts,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+
+        embedding_cache = RedisEmbeddingCache(
+            model_key=self.embedding_model_key,
+            tenant_id=tenant_id or get_current_tenant_id(),
+        )
+        embeddings = embedding_cache.get_many(texts, EmbedTextType.PASSAGE)
+
+        missing_texts = list(
+            dict.fromkeys(
+                text for text, embedding in zip(texts, embeddings) if embedding is None
+            )
+        )
+        logger.debug(
+            f"Embedding cache: hits={len(texts) - embeddings.count(None)} "
+            f"misses={len(missing_texts)} total={len(texts)}"
         )
+        if not missing_texts:
+            return cast(list[Embedding], embeddings)
+
+        new_embeddings = self.embedding_model.encode(
+            texts=missing_texts,
+            text_type=EmbedTextType.PASSAGE,
+            large_chunks_present=large_chunks_present,
+            tenant_id=tenant_id,
+            request_id=request_id,
+        )
+        embedding_cache.set_many(missing_texts, new_embeddings, EmbedTextType.PASSAGE)
+
+        text_to_new_embedding = dict(zip(missing_texts, new_embeddings))
+        return [
+            (embedding if embedding is not None else text_to_new_embedding[text])
+            for text, embedding in zip(texts, embeddings)
+        ]
 
     @log_function_time()
     def embed_chunks(
@@ -144,9 +214,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
+        embeddings = self._encode_passages(
             texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
             large_chunks_present=large_chunks_present,
             tenant_id=tenant_id,
             request_id=request_id,
@@ -164,9 +233,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Cache the Title embeddings to only have to do it once
         title_embed_dict: dict[str, Embedding] = {}
         if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
-                chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
+            title_embeddings = self._encode_passages(
+                texts=chunk_titles_list,
                 tenant_id=tenant_id,
                 request_id=request_id,
             )
@@ -1,5 +1,7 @@
 from collections import defaultdict
 from collections.abc import Callable
+from collections.abc import Generator
+from contextlib import closing
 from typing import Protocol
 
 from pydantic import BaseModel
@@ -11,6 +13,8 @@ from onyx.access.models import DocumentAccess
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
+from onyx.configs.app_configs import INDEXING_PIPELINE_MAX_AHEAD
+from onyx.configs.app_configs import INDEXING_PIPELINE_SUB_BATCH_SIZE
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
 from onyx.configs.app_configs import USE_CHUNK_SUMMARY
@@ -82,6 +86,7 @@ from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT1
 from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
 from onyx.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import map_in_background
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import (
@@ -95,7 +100,15 @@ logger = setup_logger()
 class DocumentBatchPrepareContext(BaseModel):
     updatable_docs: list[Document]
     id_to_db_doc_map: dict[str, DBDocument]
-    indexable_docs: list[IndexingDocument] = []
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class EmbeddedDocumentBatch(BaseModel):
+    documents: list[Document]
+    chunks_with_embeddings: list[IndexChunk]
+    # one per chunk in chunks_with_embeddings
+    chunk_content_scores: list[float]
+    embedding_failures: list[ConnectorFailure]
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
@@ -223,6 +236,15 @@ def _get_aggregated_chunk_boost_factor(
         return chunk_content_scores
 
 
+def group_chunks_by_document(chunks: list[IndexChunk]) -> dict[str, list[IndexChunk]]:
+    """Groups the chunks by document in a single pass, keeping their order. Documents
+    without chunks are not in the result."""
+    doc_id_to_chunks: dict[str, list[IndexChunk]] = defaultdict(list)
+    for chunk in chunks:
+        doc_id_to_chunks[chunk.source_document.id].append(chunk)
+    return dict(doc_id_to_chunks)
+
+
 def get_doc_ids_to_update(
     documents: list[Document], db_docs: list[DBDocument]
 ) -> list[Document]:
@@ -329,7 +351,7 @@ def index_doc_batch_prepare(
         else documents
     )
     if len(updatable_docs) != len(documents):
-        updatable_doc_ids = [doc.id for doc in updatable_docs]
+        updatable_doc_ids = {doc.id for doc in updatable_docs}
         skipped_doc_ids = [
             doc.id for doc in documents if doc.id not in updatable_doc_ids
         ]
@@ -695,15 +717,6 @@ def index_doc_batch(
 
     Returns a tuple where the first element is the number of new docs and the
     second element is the number of chunks."""
-
-    no_access = DocumentAccess.build(
-        user_emails=[],
-        user_groups=[],
-        external_user_emails=[],
-        external_user_group_ids=[],
-        is_public=False,
-    )
-
     filtered_documents = filter_fnc(document_batch)
 
     ctx = index_doc_batch_prepare(
@@ -730,24 +743,113 @@ def index_doc_batch(
             failures=[],
         )
 
+    # Documents are embedded and written in sub-batches. A document is never split
+    # across sub-batches, so each one is written to Vespa and committed to Postgres as
+    # a whole, exactly as if it was indexed alone. In pipelined mode, the next
+    # sub-batch is embedded in the background while the current one is being written.
+    sub_batch_size = INDEXING_PIPELINE_SUB_BATCH_SIZE or len(ctx.updatable_docs)
+    sub_batches = [
+        ctx.updatable_docs[i : i + sub_batch_size]
+        for i in range(0, len(ctx.updatable_docs), sub_batch_size)
+    ]
+
+    def _embed(documents: list[Document]) -> EmbeddedDocumentBatch:
+        return _embed_documents(
+            documents=documents,
+            chunker=chunker,
+            embedder=embedder,
+            information_content_classification_model=information_content_classification_model,
+            tenant_id=tenant_id,
+            request_id=index_attempt_metadata.request_id,
+            enable_contextual_rag=enable_contextual_rag,
+            llm=llm,
+        )
+
+    embedded_batches: Generator[EmbeddedDocumentBatch, None, None] = (
+        map_in_background(_embed, sub_batches, max_ahead=INDEXING_PIPELINE_MAX_AHEAD)
+        if len(sub_batches) > 1
+        else (_embed(sub_batch) for sub_batch in sub_batches)
+    )
+
+    token_count_tokenizer: BaseTokenizer | None
+    try:
+        default_llm, _ = get_default_llms()
+
+        token_count_tokenizer = get_tokenizer(
+            model_name=default_llm.config.model_name,
+            provider_type=default_llm.config.model_provider,
+        )
+    except Exception as e:
+        logger.error(f"Error getting tokenizer: {e}")
+        token_count_tokenizer = None
+
+    updatable_ids = {doc.id for doc in ctx.updatable_docs}
+    skipped_ids = [doc.id for doc in filtered_documents if doc.id not in updatable_ids]
+
+    new_docs = 0
+    total_chunks = 0
+    failures: list[ConnectorFailure] = []
+    # stops the background embedding if writing fails
+    with closing(embedded_batches):
+        for sub_batch_num, embedded_batch in enumerate(embedded_batches):
+            # NOTE: even documents we skipped since they were already up to date are
+            # marked as indexed (together with the last sub-batch) in order to maintain
+            # parity between CC Pair and index attempt counts
+            is_last = sub_batch_num == len(sub_batches) - 1
+            sub_batch_result = _write_embedded_documents(
+                embedded_batch=embedded_batch,
+                indexed_doc_ids=[doc.id for doc in embedded_batch.documents]
+                + (skipped_ids if is_last else []),
+                id_to_db_doc_map=ctx.id_to_db_doc_map,
+                index_attempt_metadata=index_attempt_metadata,
+                document_index=document_index,
+                large_chunks_enabled=chunker.enable_large_chunks,
+                token_count_tokenizer=token_count_tokenizer,
+                db_session=db_session,
+                tenant_id=tenant_id,
+            )
+            new_docs += sub_batch_result.new_docs
+            total_chunks += sub_batch_result.total_chunks
+            failures.extend(sub_batch_result.failures)
+
+    return IndexingPipelineResult(
+        new_docs=new_docs,
+        total_docs=len(filtered_documents),
+        total_chunks=total_chunks,
+        failures=failures,
+    )
+
+
+def _embed_documents(
+    *,
+    documents: list[Document],
+    chunker: Chunker,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    tenant_id: str,
+    request_id: str | None,
+    enable_contextual_rag: bool,
+    llm: LLM | None,
+) -> EmbeddedDocumentBatch:
+    """Processes images, chunks, embeds and scores the documents. Does not touch the
+    caller's db session, so that it can run in the background."""
     # Convert documents to IndexingDocument objects with processed section
     # logger.debug("Processing image sections")
-    ctx.indexable_docs = process_image_sections(ctx.updatable_docs)
+    indexable_docs = process_image_sections(documents)
 
     doc_descriptors = [
         {
             "doc_id": doc.id,
             "doc_length": doc.get_total_char_length(),
         }
-        for doc in ctx.indexable_docs
+        for doc in indexable_docs
     ]
     logger.debug(f"Starting indexing process for documents: {doc_descriptors}")
 
     logger.debug("Starting chunking")
     # NOTE: no special handling for failures here, since the chunker is not
     # a common source of failure for the indexing pipeline
-    chunks: list[DocAwareChunk] = chunker.chunk(ctx.indexable_docs)
-    llm_tokenizer: BaseTokenizer | None = None
+    chunks: list[DocAwareChunk] = chunker.chunk(indexable_docs)
 
     # contextual RAG
     if enable_contextual_rag:
@@ -772,7 +874,7 @@ def index_doc_batch(
             chunks=chunks,
             embedder=embedder,
             tenant_id=tenant_id,
-            request_id=index_attempt_metadata.request_id,
+            request_id=request_id,
         )
         if chunks
         else ([], [])
@@ -786,7 +888,42 @@ def index_doc_batch(
         else [1.0] * len(chunks_with_embeddings)
     )
 
-    updatable_ids = [doc.id for doc in ctx.updatable_docs]
+    return EmbeddedDocumentBatch(
+        documents=documents,
+        chunks_with_embeddings=chunks_with_embeddings,
+        chunk_content_scores=chunk_content_scores,
+        embedding_failures=embedding_failures,
+    )
+
+
+def _write_embedded_documents(
+    *,
+    embedded_batch: EmbeddedDocumentBatch,
+    indexed_doc_ids: list[str],
+    id_to_db_doc_map: dict[str, DBDocument],
+    index_attempt_metadata: IndexAttemptMetadata,
+    document_index: DocumentIndex,
+    large_chunks_enabled: bool,
+    token_count_tokenizer: BaseTokenizer | None,
+    db_session: Session,
+    tenant_id: str,
+) -> IndexingPipelineResult:
+    """Writes the embedded documents to the document index and records the result in
+    Postgres, all while holding the locks on the documents. Commits once at the end.
+    indexed_doc_ids are the documents to mark as indexed for the CC Pair."""
+    no_access = DocumentAccess.build(
+        user_emails=[],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=False,
+    )
+
+    chunks_with_embeddings = embedded_batch.chunks_with_embeddings
+    chunk_content_scores = embedded_batch.chunk_content_scores
+    embedding_failures = embedded_batch.embedding_failures
+
+    updatable_ids = [doc.id for doc in embedded_batch.documents]
     updatable_chunk_data = [
         UpdatableChunkData(
             chunk_id=chunk.chunk_id,
@@ -827,28 +964,12 @@ def index_doc_batch(
             )
         }
 
+        doc_id_to_chunks = group_chunks_by_document(chunks_with_embeddings)
         doc_id_to_new_chunk_cnt: dict[str, int] = {
-            document_id: len(
-                [
-                    chunk
-                    for chunk in chunks_with_embeddings
-                    if chunk.source_document.id == document_id
-                ]
-            )
+            document_id: len(doc_id_to_chunks.get(document_id, []))
             for document_id in updatable_ids
         }
 
-        try:
-            llm, _ = get_default_llms()
-
-            llm_tokenizer = get_tokenizer(
-                model_name=llm.config.model_name,
-                provider_type=llm.config.model_provider,
-            )
-        except Exception as e:
-            logger.error(f"Error getting tokenizer: {e}")
-            llm_tokenizer = None
-
         # Calculate token counts for each document by combining all its chunks' content
         user_file_id_to_token_count: dict[int, int | None] = {}
         user_file_id_to_raw_text: dict[int, str] = {}
@@ -859,17 +980,15 @@ def index_doc_batch(
             if user_file_id is None:
                 continue
 
-            document_chunks = [
-                chunk
-                for chunk in chunks_with_embeddings
-                if chunk.source_document.id == document_id
-            ]
+            document_chunks = doc_id_to_chunks.get(document_id)
             if document_chunks:
                 combined_content = " ".join(
                     [chunk.content for chunk in document_chunks]
                 )
                 token_count = (
-                    len(llm_tokenizer.encode(combined_content)) if llm_tokenizer else 0
+                    len(token_count_tokenizer.encode(combined_content))
+                    if token_count_tokenizer
+                    else 0
                 )
                 user_file_id_to_token_count[user_file_id] = token_count
                 user_file_id_to_raw_text[user_file_id] = combined_content
@@ -893,8 +1012,8 @@ def index_doc_batch(
                     chunk.source_document.id, None
                 ),
                 boost=(
-                    ctx.id_to_db_doc_map[chunk.source_document.id].boost
-                    if chunk.source_document.id in ctx.id_to_db_doc_map
+                    id_to_db_doc_map[chunk.source_document.id].boost
+                    if chunk.source_document.id in id_to_db_doc_map
                     else DEFAULT_BOOST
                 ),
                 tenant_id=tenant_id,
@@ -922,7 +1041,7 @@ def index_doc_batch(
                 doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
                 doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
                 tenant_id=tenant_id,
-                large_chunks_enabled=chunker.enable_large_chunks,
+                large_chunks_enabled=large_chunks_enabled,
             ),
         )
 
@@ -953,7 +1072,7 @@ def index_doc_batch(
 
         last_modified_ids = []
         ids_to_new_updated_at = {}
-        for doc in ctx.updatable_docs:
+        for doc in embedded_batch.documents:
             last_modified_ids.append(doc.id)
             # doc_updated_at is the source's idea (on the other end of the connector)
             # of when the doc was last modified
@@ -991,13 +1110,10 @@ def index_doc_batch(
 
         # these documents can now be counted as part of the CC Pairs
         # document count, so we need to mark them as indexed
-        # NOTE: even documents we skipped since they were already up
-        # to date should be counted here in order to maintain parity
-        # between CC Pair and index attempt counts
         mark_document_as_indexed_for_cc_pair__no_commit(
             connector_id=index_attempt_metadata.connector_id,
             credential_id=index_attempt_metadata.credential_id,
-            document_ids=[doc.id for doc in filtered_documents],
+            document_ids=indexed_doc_ids,
             db_session=db_session,
         )
 
@@ -1011,15 +1127,13 @@ def index_doc_batch(
 
         db_session.commit()
 
-    result = IndexingPipelineResult(
+    return IndexingPipelineResult(
         new_docs=len([r for r in insertion_records if not r.already_existed]),
-        total_docs=len(filtered_documents),
+        total_docs=len(indexed_doc_ids),
         total_chunks=len(access_aware_chunks),
         failures=vector_db_write_failures + embedding_failures,
     )
 
-    return result
-
 
 def run_indexing_pipeline(
     *,
@@ -1,6 +1,7 @@
 import re
 from collections import defaultdict
 from typing import cast
+from uuid import UUID
 
 import numpy as np
 from nltk import ngrams  # type: ignore
@@ -8,10 +9,8 @@ from rapidfuzz.distance.DamerauLevenshtein import normalized_similarity
 from sqlalchemy import desc
 from sqlalchemy import Float
 from sqlalchemy import func
-from sqlalchemy import MetaData
 from sqlalchemy import select
 from sqlalchemy import String
-from sqlalchemy import Table
 from sqlalchemy.dialects.postgresql import ARRAY
 
 from onyx.configs.kg_configs import KG_NORMALIZATION_RERANK_LEVENSHTEIN_WEIGHT
@@ -19,6 +18,7 @@ from onyx.configs.kg_configs import KG_NORMALIZATION_RERANK_NGRAM_WEIGHTS
 from onyx.configs.kg_configs import KG_NORMALIZATION_RERANK_THRESHOLD
 from onyx.configs.kg_configs import KG_NORMALIZATION_RETRIEVE_ENTITIES_LIMIT
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.kg_allowed_documents import allowed_document_ids_for_user_select
 from onyx.db.models import KGEntity
 from onyx.db.relationships import get_relationships_for_entity_type_pairs
 from onyx.kg.models import NormalizedEntities
@@ -57,7 +57,7 @@ def _clean_name(entity_name: str) -> str:
 def _normalize_one_entity(
     entity: str,
     attributes: dict[str, str],
-    allowed_docs_temp_view_name: str | None = None,
+    user_id: UUID | None = None,
 ) -> str | None:
     """
     Matches a single entity to the best matching entity of the same type.
@@ -79,19 +79,10 @@ def _normalize_one_entity(
     with get_session_with_current_tenant() as db_session:
 
         # get allowed documents
-        metadata = MetaData()
-        if allowed_docs_temp_view_name is None:
-            raise ValueError("allowed_docs_temp_view_name is not available")
+        if user_id is None:
+            raise ValueError("user_id is not available")
 
-        effective_schema_allowed_docs_temp_view_name = (
-            allowed_docs_temp_view_name.split(".")[-1]
-        )
-
-        allowed_docs_temp_view = Table(
-            effective_schema_allowed_docs_temp_view_name,
-            metadata,
-            autoload_with=db_session.get_bind(),
-        )
+        allowed_document_ids = allowed_document_ids_for_user_select(user_id)
 
         # generate trigrams of the queried entity Q
         query_trigrams = db_session.query(
@@ -127,17 +118,13 @@ def _normalize_one_entity(
                 ).label("score"),
             )
             .select_from(KGEntity, query_trigrams)
-            .outerjoin(
-                allowed_docs_temp_view,
-                KGEntity.document_id == allowed_docs_temp_view.c.allowed_doc_id,
-            )
             .filter(
                 *type_filters,
                 KGEntity.name_trigrams.overlap(query_trigrams.c.trigrams),
                 # Add filter for allowed docs - either document_id is NULL or it's in allowed_docs
                 (
                     KGEntity.document_id.is_(None)
-                    | allowed_docs_temp_view.c.allowed_doc_id.isnot(None)
+                    | KGEntity.document_id.in_(allowed_document_ids)
                 ),
             )
             .order_by(desc("score"))
@@ -227,7 +214,7 @@ def _get_existing_normalized_relationships(
 def normalize_entities(
     raw_entities: list[str],
     raw_entities_w_attributes: list[str],
-    allowed_docs_temp_view_name: str | None = None,
+    user_id: UUID | None = None,
 ) -> NormalizedEntities:
     """
     Match each entity against a list of normalized entities using fuzzy matching.
@@ -236,6 +223,7 @@ def normalize_entities(
     Args:
         raw_entities: list of entity strings to normalize, w/o attributes
         raw_entities_w_attributes: list of entity strings to normalize, w/ attributes
+        user_id: only entities of documents the user can access are matched
 
     Returns:
         list of normalized entity strings
@@ -250,7 +238,7 @@ def normalize_entities(
 
     mapping: list[str | None] = run_functions_tuples_in_parallel(
         [
-            (_normalize_one_entity, (entity, attributes, allowed_docs_temp_view_name))
+            (_normalize_one_entity, (entity, attributes, user_id))
             for entity, attributes in zip(raw_entities, entity_attributes)
         ]
     )
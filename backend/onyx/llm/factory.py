@@ -16,6 +16,8 @@ from onyx.llm.interfaces import LLM
 from onyx.llm.override_models import LLMOverride
 from onyx.llm.utils import get_max_input_tokens_from_llm_provider
 from onyx.llm.utils import model_supports_image_input
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import get_config_snapshot
 from onyx.server.manage.llm.models import LLMProviderView
 from onyx.utils.headers import build_llm_extra_headers
 from onyx.utils.logger import setup_logger
@@ -33,6 +35,22 @@ def _build_extra_model_kwargs(provider: str) -> dict[str, Any]:
     return {"num_ctx": GEN_AI_MODEL_FALLBACK_MAX_TOKENS} if provider == "ollama" else {}
 
 
+def _get_default_provider() -> LLMProviderView | None:
+    def _load() -> LLMProviderView | None:
+        with get_session_with_current_tenant() as db_session:
+            return fetch_default_provider(db_session)
+
+    return get_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS, None, _load)
+
+
+def _get_provider_by_name(provider_name: str) -> LLMProviderView | None:
+    def _load() -> LLMProviderView | None:
+        with get_session_with_current_tenant() as db_session:
+            return fetch_llm_provider_view(db_session, provider_name)
+
+    return get_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS, provider_name, _load)
+
+
 def get_main_llm_from_tuple(
     llms: tuple[LLM, LLM],
 ) -> LLM:
@@ -61,9 +79,7 @@ def get_llms_for_persona(
             long_term_logger=long_term_logger,
         )
 
-    with get_session_with_current_tenant() as db_session:
-        llm_provider = fetch_llm_provider_view(db_session, provider_name)
-
+    llm_provider = _get_provider_by_name(provider_name)
     if not llm_provider:
         raise ValueError("No LLM provider found")
 
@@ -209,8 +225,7 @@ def llm_from_provider(
 
 
 def get_llm_for_contextual_rag(model_name: str, model_provider: str) -> LLM:
-    with get_session_with_current_tenant() as db_session:
-        llm_provider = fetch_llm_provider_view(db_session, model_provider)
+    llm_provider = _get_provider_by_name(model_provider)
     if not llm_provider:
         raise ValueError("No LLM provider with name {} found".format(model_provider))
     return llm_from_provider(
@@ -228,9 +243,7 @@ def get_default_llms(
     if DISABLE_GENERATIVE_AI:
         raise GenAIDisabledException()
 
-    with get_session_with_current_tenant() as db_session:
-        llm_provider = fetch_default_provider(db_session)
-
+    llm_provider = _get_default_provider()
     if not llm_provider:
         raise ValueError("No default LLM provider found")
 
@@ -35,6 +35,8 @@ from onyx.configs.app_configs import LITELLM_CUSTOM_ERROR_MESSAGE_MAPPINGS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
 from onyx.configs.app_configs import USE_CHUNK_SUMMARY
 from onyx.configs.app_configs import USE_DOCUMENT_SUMMARY
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_MAX_BYTES
+from onyx.configs.chat_configs import CHAT_FILE_CACHE_TTL_SECONDS
 from onyx.configs.constants import MessageType
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.configs.model_configs import GEN_AI_MAX_TOKENS
@@ -50,7 +52,9 @@ from onyx.prompts.constants import CODE_BLOCK_PAT
 from onyx.utils.b64 import get_image_type
 from onyx.utils.b64 import get_image_type_from_bytes
 from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
 from shared_configs.configs import LOG_LEVEL
+from shared_configs.contextvars import get_current_tenant_id
 
 
 if TYPE_CHECKING:
@@ -59,6 +63,13 @@ if TYPE_CHECKING:
 
 logger = setup_logger()
 
+# shares CHAT_FILE_CACHE_MAX_BYTES with the file contents (see onyx.file_store.utils)
+_PDF_TEXT_CACHE: TTLLRUCache[tuple[str, str], str] = TTLLRUCache(
+    max_size=CHAT_FILE_CACHE_MAX_BYTES - CHAT_FILE_CACHE_MAX_BYTES // 2,
+    ttl=CHAT_FILE_CACHE_TTL_SECONDS,
+    weigh=lambda text: len(text.encode()),
+)
+
 MAX_CONTEXT_TOKENS = 100
 ONE_MILLION = 1_000_000
 CHUNKS_PER_DOC_ESTIMATE = 5
@@ -128,6 +139,17 @@ def litellm_exception_to_error_msg(
     return error_msg
 
 
+def _extract_pdf_text(file: InMemoryChatFile) -> str:
+    """The files of a conversation are included again on every turn, so the extracted
+    text is cached (chat files don't change once uploaded)"""
+    cache_key = (get_current_tenant_id(), file.file_id)
+    text = _PDF_TEXT_CACHE.get(cache_key)
+    if text is None:
+        text, _, _ = read_pdf_file(io.BytesIO(file.content))
+        _PDF_TEXT_CACHE.set(cache_key, text)
+    return text
+
+
 def _build_content(
     message: str,
     files: list[InMemoryChatFile] | None = None,
@@ -148,7 +170,7 @@ def _build_content(
         except UnicodeDecodeError:
             # Try to decode as binary
             try:
-                file_content, _, _ = read_pdf_file(io.BytesIO(file.content))
+                file_content = _extract_pdf_text(file)
             except Exception:
                 file_content = f"[Binary file content - {file.file_type} format]"
                 logger.exception(
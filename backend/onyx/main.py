@@ -52,6 +52,7 @@ from onyx.db.engine.connection_warmup import warm_up_connections
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.engine.sql_engine import SqlEngine
 from onyx.file_store.file_store import get_default_file_store
+from onyx.redis.redis_config_snapshot import start_config_snapshot_listener
 from onyx.server.api_key.api import router as api_key_router
 from onyx.server.auth_check import check_router_auth
 from onyx.server.documents.cc_pair import router as cc_pair_router
@@ -272,6 +273,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if AUTH_RATE_LIMITING_ENABLED:
         await setup_auth_limiter()
 
+    # cache slow changing configuration in memory, invalidated over Redis pub/sub
+    start_config_snapshot_listener()
+
     yield
 
     SqlEngine.reset_engine()
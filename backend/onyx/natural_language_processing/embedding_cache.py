@@ -0,0 +1,147 @@
+import hashlib
+import struct
+import unicodedata
+from typing import cast
+
+from prometheus_client import Counter
+from redis.client import Redis
+
+from onyx.configs.app_configs import INDEXING_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+
+EMBEDDING_CACHE_HITS = Counter(
+    "onyx_embedding_cache_hits_total",
+    "Number of texts whose embedding was served from the embedding cache",
+    ["text_type"],
+)
+EMBEDDING_CACHE_MISSES = Counter(
+    "onyx_embedding_cache_misses_total",
+    "Number of texts whose embedding had to be computed by the embedding model",
+    ["text_type"],
+)
+
+
+def normalize_text_for_embedding_cache(text: str) -> str:
+    """Only applies normalization that cannot change what the model sees in a
+    meaningful way (unicode form + surrounding whitespace)."""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def build_embedding_model_key(
+    model_name: str | None,
+    provider_type: EmbeddingProvider | None,
+    normalize: bool,
+    query_prefix: str | None,
+    passage_prefix: str | None,
+    reduced_dimension: int | None,
+) -> str:
+    """Identifies everything about the embedding model that influences the output vector.
+    The model name is kept readable, the rest of the settings are folded into a short hash.
+    """
+    settings = "|".join(
+        [
+            provider_type.value if provider_type else "",
+            str(normalize),
+            query_prefix or "",
+            passage_prefix or "",
+            str(reduced_dimension or ""),
+        ]
+    )
+    settings_hash = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:12]
+    return f"{model_name}:{settings_hash}"
+
+
+def _serialize_embedding(embedding: Embedding) -> bytes:
+    return struct.pack(f"<{len(embedding)}f", *embedding)
+
+
+def _deserialize_embedding(raw: bytes) -> Embedding:
+    return list(struct.unpack(f"<{len(raw) // 4}f", raw))
+
+
+class RedisEmbeddingCache:
+    """Content addressed embedding cache keyed by (model, text type, normalized text hash).
+
+    Entries expire after the configured TTL (refreshed when written) so that texts
+    which are no longer indexed are eventually evicted. Redis failures are logged and
+    treated as cache misses, the cache must never break indexing.
+
+    NOTE: mget and pipelines are not auto-prefixed by TenantRedis, so the tenant
+    prefix is applied explicitly to every key."""
+
+    PREFIX = "embedding_cache"
+
+    def __init__(
+        self,
+        model_key: str,
+        tenant_id: str,
+        redis_client: Redis | None = None,
+        ttl: int = INDEXING_EMBEDDING_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.model_key = model_key
+        self.tenant_id = tenant_id
+        self.redis = redis_client or get_redis_client(tenant_id=tenant_id)
+        self.ttl = ttl
+
+    def _key(self, text: str, text_type: EmbedTextType) -> str:
+        text_hash = hashlib.sha256(
+            normalize_text_for_embedding_cache(text).encode("utf-8")
+        ).hexdigest()
+        return (
+            f"{self.tenant_id}:{self.PREFIX}:{self.model_key}:"
+            f"{text_type.value}:{text_hash}"
+        )
+
+    def get_many(
+        self, texts: list[str], text_type: EmbedTextType
+    ) -> list[Embedding | None]:
+        if not texts:
+            return []
+
+        try:
+            raw_values = cast(
+                list[bytes | None],
+                self.redis.mget([self._key(text, text_type) for text in texts]),
+            )
+        except Exception:
+            logger.exception("Failed to read from the embedding cache")
+            raw_values = [None] * len(texts)
+
+        embeddings: list[Embedding | None] = [
+            _deserialize_embedding(raw) if raw else None for raw in raw_values
+        ]
+
+        num_hits = sum(1 for embedding in embeddings if embedding is not None)
+        EMBEDDING_CACHE_HITS.labels(text_type=text_type.value).inc(num_hits)
+        EMBEDDING_CACHE_MISSES.labels(text_type=text_type.value).inc(
+            len(texts) - num_hits
+        )
+        return embeddings
+
+    def set_many(
+        self,
+        texts: list[str],
+        embeddings: list[Embedding],
+        text_type: EmbedTextType,
+    ) -> None:
+        if not texts:
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for text, embedding in zip(texts, embeddings):
+                pipe.set(
+                    self._key(text, text_type),
+                    _serialize_embedding(embedding),
+                    ex=self.ttl,
+                )
+            pipe.execute()
+        except Exception:
+            logger.exception("Failed to write to the embedding cache")
@@ -31,10 +31,16 @@ from onyx.natural_language_processing.exceptions import (
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.utils.logger import setup_logger
+from shared_configs.configs import EMBEDDING_TRANSPORT
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import EMBEDDING_DTYPE_HEADER
+from shared_configs.embedding_transport import EMBEDDING_SHAPE_HEADER
+from shared_configs.embedding_transport import EMBEDDINGS_MEDIA_TYPE
+from shared_configs.embedding_transport import EmbeddingTransport
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
@@ -116,6 +122,40 @@ class EmbeddingModel:
         model_server_url = build_model_server_url(server_host, server_port)
         self.embed_server_endpoint = f"{model_server_url}/encoder/bi-encoder-embed"
 
+        try:
+            self.embedding_transport = EmbeddingTransport(EMBEDDING_TRANSPORT)
+        except ValueError:
+            logger.warning(
+                f"Unknown EMBEDDING_TRANSPORT '{EMBEDDING_TRANSPORT}', using JSON"
+            )
+            self.embedding_transport = EmbeddingTransport.JSON
+
+    def _transport_headers(self) -> dict[str, str]:
+        if self.embedding_transport == EmbeddingTransport.JSON:
+            return {}
+
+        # the JSON fallback keeps this working against model servers that predate
+        # the binary format
+        return {
+            "Accept": f"{EMBEDDINGS_MEDIA_TYPE}, application/json;q=0.5",
+            EMBEDDING_DTYPE_HEADER: self.embedding_transport.value,
+        }
+
+    @staticmethod
+    def _parse_embed_response(response: Response) -> EmbedResponse:
+        content_type = response.headers.get("content-type", "")
+        if not content_type.startswith(EMBEDDINGS_MEDIA_TYPE):
+            return EmbedResponse(**response.json())
+
+        embeddings = decode_embeddings(
+            response.content,
+            dtype_header=response.headers.get(EMBEDDING_DTYPE_HEADER),
+            shape_header=response.headers.get(EMBEDDING_SHAPE_HEADER),
+        )
+        # the values come straight out of a typed buffer, no need to validate each
+        # float again
+        return EmbedResponse.model_construct(embeddings=embeddings.tolist())
+
     def _make_model_server_request(
         self,
         embed_request: EmbedRequest,
@@ -123,7 +163,7 @@ class EmbeddingModel:
         request_id: str | None = None,
     ) -> EmbedResponse:
         def _make_request() -> Response:
-            headers = {}
+            headers = self._transport_headers()
             if tenant_id:
                 headers["X-Onyx-Tenant-ID"] = tenant_id
 
@@ -161,7 +201,7 @@ class EmbeddingModel:
 
         try:
             response = final_make_request_func()
-            return EmbedResponse(**response.json())
+            return self._parse_embed_response(response)
         except requests.HTTPError as e:
             if not response:
                 raise HTTPError("HTTP error occurred - response is None.") from e
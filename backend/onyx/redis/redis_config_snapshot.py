@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from enum import Enum
+from typing import Any
+from typing import TypeVar
+
+from onyx.configs.app_configs import CONFIG_SNAPSHOT_CACHE_MAX_SIZE
+from onyx.configs.app_configs import CONFIG_SNAPSHOT_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_raw_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+V = TypeVar("V")
+
+CONFIG_SNAPSHOT_INVALIDATION_CHANNEL = "onyx:config_snapshot:invalidate"
+
+_LISTENER_RECONNECT_DELAY_SECONDS = 5.0
+
+
+class ConfigSnapshotKind(str, Enum):
+    SEARCH_SETTINGS = "search_settings"
+    LLM_PROVIDERS = "llm_providers"
+    CENSORING_SOURCES = "censoring_sources"
+
+
+# Values are wrapped in a tuple so that a cached None can be told apart from a miss.
+# The generation is part of the key, invalidating a kind for a tenant bumps it so
+# that all of its entries become unreachable at once (they then age out of the LRU).
+_SNAPSHOT_CACHE: TTLLRUCache[
+    tuple[str, ConfigSnapshotKind, int, Hashable], tuple[Any]
+] = TTLLRUCache(
+    max_size=CONFIG_SNAPSHOT_CACHE_MAX_SIZE, ttl=CONFIG_SNAPSHOT_CACHE_TTL_SECONDS
+)
+_generations: dict[tuple[str, ConfigSnapshotKind], int] = {}
+_generations_lock = threading.Lock()
+
+_listener_thread: threading.Thread | None = None
+_listener_lock = threading.Lock()
+# only cache while we are subscribed, otherwise we could miss invalidations
+_listener_subscribed = threading.Event()
+
+
+def config_snapshot_cache_enabled() -> bool:
+    return CONFIG_SNAPSHOT_CACHE_TTL_SECONDS > 0 and _listener_subscribed.is_set()
+
+
+def _bump_generation(tenant_id: str, kind: ConfigSnapshotKind) -> None:
+    with _generations_lock:
+        _generations[(tenant_id, kind)] = _generations.get((tenant_id, kind), 0) + 1
+
+
+def get_config_snapshot(
+    kind: ConfigSnapshotKind, key: Hashable, load: Callable[[], V]
+) -> V:
+    """Returns the cached value for (current tenant, kind, key), calling load on a miss.
+    Cached values are shared between requests and must not be mutated.
+
+    If the cache is disabled, or this process is not listening for invalidations, this
+    simply calls load."""
+    if not config_snapshot_cache_enabled():
+        return load()
+
+    tenant_id = get_current_tenant_id()
+    generation = _generations.get((tenant_id, kind), 0)
+    cache_key = (tenant_id, kind, generation, key)
+
+    cached = _SNAPSHOT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached[0]
+
+    # if the kind is invalidated while loading, the value is stored under the old
+    # generation and will never be read
+    value = load()
+    _SNAPSHOT_CACHE.set(cache_key, (value,))
+    return value
+
+
+def invalidate_config_snapshot(
+    kind: ConfigSnapshotKind, tenant_id: str | None = None
+) -> None:
+    """Drops the cached values of kind for the tenant in every API server process.
+    Must be called after the write has been committed."""
+    tenant_id = tenant_id or get_current_tenant_id()
+    _bump_generation(tenant_id, kind)
+
+    try:
+        get_raw_redis_client().publish(
+            CONFIG_SNAPSHOT_INVALIDATION_CHANNEL,
+            json.dumps({"tenant_id": tenant_id, "kind": kind.value}),
+        )
+    except Exception:
+        # the other processes will pick up the change once their entries expire
+        logger.exception(
+            f"Failed to publish config snapshot invalidation: "
+            f"tenant_id={tenant_id} kind={kind.value}"
+        )
+
+
+def _handle_invalidation_message(data: bytes | str) -> None:
+    try:
+        message = json.loads(data)
+        _bump_generation(message["tenant_id"], ConfigSnapshotKind(message["kind"]))
+    except Exception:
+        # unknown messages may come from a newer version, drop everything to be safe
+        logger.warning(f"Unexpected config snapshot invalidation message: {data!r}")
+        _SNAPSHOT_CACHE.clear()
+
+
+def _listen_for_invalidations() -> None:
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_raw_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CONFIG_SNAPSHOT_INVALIDATION_CHANNEL)
+            # anything published while we were not subscribed is lost
+            _SNAPSHOT_CACHE.clear()
+            _listener_subscribed.set()
+
+            for message in pubsub.listen():
+                if message["type"] == "message":
+                    _handle_invalidation_message(message["data"])
+        except Exception:
+            logger.exception("Config snapshot invalidation listener failed")
+        finally:
+            _listener_subscribed.clear()
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+        time.sleep(_LISTENER_RECONNECT_DELAY_SECONDS)
+
+
+def start_config_snapshot_listener() -> None:
+    """Starts listening for invalidations, which also turns on the cache for this
+    process. Only meant for long running processes like the API server."""
+    global _listener_thread
+
+    if CONFIG_SNAPSHOT_CACHE_TTL_SECONDS <= 0:
+        return
+
+    with _listener_lock:
+        if _listener_thread is not None and _listener_thread.is_alive():
+            return
+
+        _listener_thread = threading.Thread(
+            target=_listen_for_invalidations,
+            name="config-snapshot-listener",
+            daemon=True,
+        )
+        _listener_thread.start()
@@ -1,4 +1,5 @@
 import time
+from collections.abc import Iterable
 from datetime import datetime
 from logging import Logger
 from typing import Any
@@ -9,6 +10,7 @@ from pydantic import BaseModel
 from redis.lock import Lock as RedisLock
 
 from onyx.access.models import DocExternalAccess
+from onyx.configs.app_configs import PERMISSION_SYNC_DB_BATCH_SIZE
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PERMISSIONS_SYNC_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxRedisConstants
@@ -154,21 +156,39 @@ class RedisConnectorPermissionSync:
     def update_db(
         self,
         lock: RedisLock | None,
-        new_permissions: list[DocExternalAccess],
+        new_permissions: Iterable[DocExternalAccess],
         source_string: str,
         connector_id: int,
         credential_id: int,
         task_logger: Logger | None = None,
-    ) -> int | None:
+    ) -> int:
+        """Writes the permissions to the DB in batches of PERMISSION_SYNC_DB_BATCH_SIZE
+        documents, one transaction per batch. Returns the number of documents whose
+        permissions were synced."""
         last_lock_time = time.monotonic()
 
-        document_update_permissions_fn = fetch_versioned_implementation(
+        document_update_permissions_batch_fn = fetch_versioned_implementation(
             "onyx.background.celery.tasks.doc_permission_syncing.tasks",
-            "document_update_permissions",
+            "document_update_permissions_batch",
         )
 
         num_permissions = 0
-        # Create a task for each document permission sync
+        num_changed = 0
+        batch: list[DocExternalAccess] = []
+
+        def _flush() -> None:
+            nonlocal num_changed
+
+            # NOTE(rkuo): this used to fire a task instead of directly writing to the
+            # DB, but the permissions can be excessively large if sent over the wire.
+            # On the other hand, the downside of doing db updates here is that we can
+            # block and fail if we can't make the calls to the DB ... but that's
+            # probably a rare enough case to be acceptable.
+            num_changed += document_update_permissions_batch_fn(
+                self.tenant_id, batch, source_string, connector_id, credential_id
+            )
+            batch.clear()
+
         for permissions in new_permissions:
             current_time = time.monotonic()
             if lock and current_time - last_lock_time >= (
@@ -194,19 +214,20 @@ class RedisConnectorPermissionSync:
                     )
                 continue
 
-            # NOTE(rkuo): this used to fire a task instead of directly writing to the DB,
-            # but the permissions can be excessively large if sent over the wire.
-            # On the other hand, the downside of doing db updates here is that we can
-            # block and fail if we can't make the calls to the DB ... but that's probably
-            # a rare enough case to be acceptable.
+            batch.append(permissions)
+            num_permissions += 1
+            if len(batch) >= PERMISSION_SYNC_DB_BATCH_SIZE:
+                _flush()
 
-            # This can internally exception due to db issues but still continue
-            # we may want to change this
-            document_update_permissions_fn(
-                self.tenant_id, permissions, source_string, connector_id, credential_id
-            )
+        if batch:
+            _flush()
 
-            num_permissions += 1
+        if task_logger:
+            task_logger.info(
+                f"Permissions synced to the DB: "
+                f"{num_permissions=} {num_changed=} "
+                f"unchanged={num_permissions - num_changed}"
+            )
 
         return num_permissions
 
@@ -0,0 +1,232 @@
+from collections import defaultdict
+from collections.abc import Callable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from enum import Enum
+from typing import cast
+from uuid import UUID
+
+from redis.client import Redis
+
+from onyx.configs.app_configs import TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS
+from onyx.configs.app_configs import TOKEN_USAGE_REDIS_COUNTERS_ENABLED
+from onyx.configs.app_configs import TOKEN_USAGE_RETENTION_HOURS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# (start of the minute, tokens used in that minute)
+TokenUsage = Sequence[tuple[datetime, int]]
+
+GLOBAL_TOKEN_USAGE_SCOPE_ID = "all"
+
+_BUCKETS_KEY_PREFIX = "token_usage"
+_RECONCILED_KEY_PREFIX = "token_usage_reconciled_since"
+_BUCKETS_TTL_SECONDS = (TOKEN_USAGE_RETENTION_HOURS + 1) * 60 * 60
+
+
+class TokenUsageScope(str, Enum):
+    GLOBAL = "global"
+    USER = "user"
+    USER_GROUP = "user_group"
+
+
+# Token usage is counted per minute, one Redis hash per (scope, id, hour) holds the
+# buckets of that hour. Reading a window is a single pipeline of one HGETALL per hour.
+#
+# The counters of a (scope, id) are only trusted once they have been rebuilt from the
+# chat messages in Postgres ("reconciled") for the whole window being checked. The
+# marker recording that expires after TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS, so drift
+# (deleted messages, evicted keys, group membership changes) is corrected periodically.
+#
+# NOTE: pipelines are not auto-prefixed by TenantRedis, so the tenant prefix is applied
+# explicitly to every key.
+
+
+def _buckets_key(
+    tenant_id: str, scope: TokenUsageScope, scope_id: str, hour: int
+) -> str:
+    return f"{tenant_id}:{_BUCKETS_KEY_PREFIX}:{scope.value}:{scope_id}:{hour}"
+
+
+def _reconciled_key(tenant_id: str, scope: TokenUsageScope, scope_id: str) -> str:
+    return f"{tenant_id}:{_RECONCILED_KEY_PREFIX}:{scope.value}:{scope_id}"
+
+
+def _to_minute(time: datetime) -> int:
+    return int(time.timestamp()) // 60
+
+
+def record_token_usage(
+    token_count: int,
+    user_id: UUID | None,
+    user_group_ids: Sequence[int],
+    time_sent: datetime | None = None,
+) -> None:
+    """Adds token_count to the current minute of the global, user and user group
+    counters. Failures are only logged, the next reconciliation corrects the counts."""
+    if not TOKEN_USAGE_REDIS_COUNTERS_ENABLED or token_count == 0:
+        return
+
+    scopes = [(TokenUsageScope.GLOBAL, GLOBAL_TOKEN_USAGE_SCOPE_ID)]
+    if user_id is not None:
+        scopes.append((TokenUsageScope.USER, str(user_id)))
+    scopes.extend(
+        (TokenUsageScope.USER_GROUP, str(user_group_id))
+        for user_group_id in user_group_ids
+    )
+
+    tenant_id = get_current_tenant_id()
+    minute = _to_minute(time_sent or datetime.now(tz=timezone.utc))
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for scope, scope_id in scopes:
+            key = _buckets_key(tenant_id, scope, scope_id, minute // 60)
+            pipe.hincrby(key, str(minute), token_count)
+            pipe.expire(key, _BUCKETS_TTL_SECONDS)
+        pipe.execute()
+    except Exception:
+        logger.exception("Failed to record token usage")
+
+
+def fetch_token_usage(
+    scope: TokenUsageScope,
+    scope_ids: Sequence[str],
+    cutoff_time: datetime,
+    fetch_from_db: Callable[[Sequence[str]], Mapping[str, TokenUsage]],
+) -> dict[str, TokenUsage]:
+    """Returns the usage since cutoff_time of each of the scope_ids, grouped by minute.
+
+    fetch_from_db must return the same from the chat messages in Postgres, it is used
+    to reconcile the counters and whenever they can't be used."""
+    if not scope_ids:
+        return {}
+
+    now = datetime.now(tz=timezone.utc)
+    if not TOKEN_USAGE_REDIS_COUNTERS_ENABLED or cutoff_time < now - timedelta(
+        hours=TOKEN_USAGE_RETENTION_HOURS
+    ):
+        return dict(fetch_from_db(scope_ids))
+
+    tenant_id = get_current_tenant_id()
+    redis_client = get_redis_client()
+    try:
+        reconciled_since = cast(
+            list[bytes | None],
+            redis_client.mget(
+                [_reconciled_key(tenant_id, scope, scope_id) for scope_id in scope_ids]
+            ),
+        )
+    except Exception:
+        logger.exception("Failed to read the token usage counters")
+        return dict(fetch_from_db(scope_ids))
+
+    cutoff_timestamp = cutoff_time.timestamp()
+    stale_ids = [
+        scope_id
+        for scope_id, since in zip(scope_ids, reconciled_since)
+        if since is None or float(since) > cutoff_timestamp
+    ]
+    reconciled_ids = [scope_id for scope_id in scope_ids if scope_id not in stale_ids]
+
+    usage: dict[str, TokenUsage] = {}
+    if stale_ids:
+        db_usage = fetch_from_db(stale_ids)
+        usage.update({scope_id: db_usage.get(scope_id, []) for scope_id in stale_ids})
+        _reconcile(
+            redis_client,
+            tenant_id,
+            scope,
+            {scope_id: usage[scope_id] for scope_id in stale_ids},
+            cutoff_time,
+            now,
+        )
+
+    if reconciled_ids:
+        try:
+            usage.update(
+                _read_buckets(
+                    redis_client, tenant_id, scope, reconciled_ids, cutoff_time, now
+                )
+            )
+        except Exception:
+            logger.exception("Failed to read the token usage counters")
+            usage.update(fetch_from_db(reconciled_ids))
+
+    return usage
+
+
+def _read_buckets(
+    redis_client: Redis,
+    tenant_id: str,
+    scope: TokenUsageScope,
+    scope_ids: Sequence[str],
+    cutoff_time: datetime,
+    now: datetime,
+) -> dict[str, TokenUsage]:
+    first_minute = _to_minute(cutoff_time)
+    hours = range(first_minute // 60, _to_minute(now) // 60 + 1)
+
+    pipe = redis_client.pipeline(transaction=False)
+    for scope_id in scope_ids:
+        for hour in hours:
+            pipe.hgetall(_buckets_key(tenant_id, scope, scope_id, hour))
+    results = cast(list[dict[bytes, bytes]], pipe.execute())
+
+    usage: dict[str, TokenUsage] = {}
+    for i, scope_id in enumerate(scope_ids):
+        usage[scope_id] = [
+            (datetime.fromtimestamp(int(minute) * 60, tz=timezone.utc), int(tokens))
+            for buckets in results[i * len(hours) : (i + 1) * len(hours)]
+            for minute, tokens in buckets.items()
+            if int(minute) >= first_minute
+        ]
+    return usage
+
+
+def _reconcile(
+    redis_client: Redis,
+    tenant_id: str,
+    scope: TokenUsageScope,
+    db_usage: Mapping[str, TokenUsage],
+    cutoff_time: datetime,
+    now: datetime,
+) -> None:
+    """Overwrites the buckets since cutoff_time with the usage from Postgres. The
+    current minute is left alone, messages of it may still be saved (and counted)
+    while Postgres is being read."""
+    current_minute = _to_minute(now)
+    current_hour = current_minute // 60
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for scope_id, usage in db_usage.items():
+            buckets: dict[int, dict[str, int]] = defaultdict(dict)
+            for time_sent, token_count in usage:
+                minute = _to_minute(time_sent)
+                if minute < current_minute:
+                    buckets[minute // 60][str(minute)] = int(token_count)
+
+            for hour in range(_to_minute(cutoff_time) // 60, current_hour + 1):
+                key = _buckets_key(tenant_id, scope, scope_id, hour)
+                if hour < current_hour:
+                    pipe.delete(key)
+                elif current_minute > hour * 60:
+                    pipe.hdel(key, *(str(m) for m in range(hour * 60, current_minute)))
+                if buckets.get(hour):
+                    pipe.hset(key, mapping=buckets[hour])
+                    pipe.expire(key, _BUCKETS_TTL_SECONDS)
+
+            pipe.set(
+                _reconciled_key(tenant_id, scope, scope_id),
+                str(cutoff_time.timestamp()),
+                ex=TOKEN_USAGE_RECONCILE_INTERVAL_SECONDS,
+            )
+        pipe.execute()
+    except Exception:
+        logger.exception("Failed to reconcile the token usage counters")
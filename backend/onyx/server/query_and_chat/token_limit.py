@@ -18,6 +18,9 @@ from onyx.db.models import ChatSession
 from onyx.db.models import TokenRateLimit
 from onyx.db.models import User
 from onyx.db.token_limit import fetch_all_global_token_rate_limits
+from onyx.redis.redis_token_usage import fetch_token_usage
+from onyx.redis.redis_token_usage import GLOBAL_TOKEN_USAGE_SCOPE_ID
+from onyx.redis.redis_token_usage import TokenUsageScope
 from onyx.utils.logger import setup_logger
 from onyx.utils.variable_functionality import fetch_versioned_implementation
 
@@ -59,7 +62,16 @@ def _user_is_rate_limited_by_global() -> None:
 
         if global_rate_limits:
             global_cutoff_time = _get_cutoff_time(global_rate_limits)
-            global_usage = _fetch_global_usage(global_cutoff_time, db_session)
+            global_usage = fetch_token_usage(
+                TokenUsageScope.GLOBAL,
+                [GLOBAL_TOKEN_USAGE_SCOPE_ID],
+                global_cutoff_time,
+                lambda scope_ids: {
+                    GLOBAL_TOKEN_USAGE_SCOPE_ID: _fetch_global_usage(
+                        global_cutoff_time, db_session
+                    )
+                },
+            )[GLOBAL_TOKEN_USAGE_SCOPE_ID]
 
             if _is_rate_limited(global_rate_limits, global_usage):
                 raise HTTPException(
@@ -72,7 +84,8 @@ def _fetch_global_usage(
     cutoff_time: datetime, db_session: Session
 ) -> Sequence[tuple[datetime, int]]:
     """
-    Fetch global token usage within the cutoff time, grouped by minute
+    Fetch global token usage within the cutoff time, grouped by minute.
+    Used to reconcile the token usage counters in Redis.
     """
     result = db_session.execute(
         select(
@@ -0,0 +1,94 @@
+import heapq
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from types import TracebackType
+
+
+class SortedStringSpill:
+    """Collects an arbitrary number of strings with bounded memory. Strings are buffered
+    until there are run_size of them, then the buffer is sorted and written to a temp
+    file (a "sorted run"). iter_sorted_unique merges the runs back together.
+
+    Strings are sorted by code point, which matches byte order of their UTF-8 encoding
+    (i.e. Postgres' "C" collation)."""
+
+    def __init__(self, run_size: int) -> None:
+        self.run_size = run_size
+        self._buffer: list[str] = []
+        self._temp_dir: tempfile.TemporaryDirectory | None = None
+        self._run_paths: list[str] = []
+
+    def __enter__(self) -> "SortedStringSpill":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.cleanup()
+
+    @property
+    def num_runs(self) -> int:
+        return len(self._run_paths)
+
+    def add(self, values: Iterable[str]) -> None:
+        for value in values:
+            self._buffer.append(value)
+            if len(self._buffer) >= self.run_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix="onyx_sorted_spill_")
+
+        run_path = os.path.join(self._temp_dir.name, f"run_{len(self._run_paths)}")
+        with open(run_path, "w", encoding="utf-8") as run_file:
+            # one JSON string per line so that values can contain newlines
+            for value in sorted(set(self._buffer)):
+                run_file.write(json.dumps(value))
+                run_file.write("\n")
+        self._run_paths.append(run_path)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(run_path: str) -> Iterator[str]:
+        with open(run_path, encoding="utf-8") as run_file:
+            for line in run_file:
+                yield json.loads(line)
+
+    def iter_sorted_unique(self) -> Iterator[str]:
+        """Yields every added string once, in sorted order. Only the current line of
+        each run is held in memory."""
+        self._flush()
+
+        previous: str | None = None
+        for value in heapq.merge(*(self._read_run(path) for path in self._run_paths)):
+            if value != previous:
+                yield value
+                previous = value
+
+    def cleanup(self) -> None:
+        self._buffer = []
+        self._run_paths = []
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+
+def sorted_difference(left: Iterator[str], right: Iterator[str]) -> Iterator[str]:
+    """Yields the values of left that are not in right. Both inputs must be sorted
+    (by code point) and free of duplicates."""
+    right_value = next(right, None)
+    for left_value in left:
+        while right_value is not None and right_value < left_value:
+            right_value = next(right, None)
+        if right_value != left_value:
+            yield left_value
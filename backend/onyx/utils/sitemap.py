@@ -6,9 +6,12 @@ from urllib.parse import urljoin
 import requests
 
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
+_MAX_CONCURRENT_SITEMAP_FETCHES = 8
+
 
 def _get_sitemap_locations_from_robots(base_url: str) -> Set[str]:
     """Extract sitemap URLs from robots.txt"""
@@ -42,11 +45,17 @@ def _extract_urls_from_sitemap(sitemap_url: str) -> Set[str]:
         ns = namespace.group(0) if namespace else ""
 
         if root.tag == f"{ns}sitemapindex":
-            # This is a sitemap index
-            for sitemap in root.findall(f".//{ns}loc"):
-                if sitemap.text:
-                    sub_urls = _extract_urls_from_sitemap(sitemap.text)
-                    urls.update(sub_urls)
+            # This is a sitemap index, fetch the sitemaps in it concurrently
+            urls.update(
+                *run_functions_tuples_in_parallel(
+                    [
+                        (_extract_urls_from_sitemap, (sitemap.text,))
+                        for sitemap in root.findall(f".//{ns}loc")
+                        if sitemap.text
+                    ],
+                    max_workers=_MAX_CONCURRENT_SITEMAP_FETCHES,
+                )
+            )
         else:
             # This is a regular sitemap
             for url in root.findall(f".//{ns}loc"):
@@ -62,17 +71,23 @@ def _extract_urls_from_sitemap(sitemap_url: str) -> Set[str]:
 def list_pages_for_site(site: str) -> list[str]:
     """Get list of pages from a site's sitemaps"""
     site = site.rstrip("/")
-    all_urls = set()
+    all_urls: set[str] = set()
 
     # Try both common sitemap locations
     sitemap_paths = ["/sitemap.xml", "/sitemap_index.xml"]
-    for path in sitemap_paths:
-        sitemap_url = urljoin(site, path)
-        all_urls.update(_extract_urls_from_sitemap(sitemap_url))
+    sitemap_urls = {urljoin(site, path) for path in sitemap_paths}
 
     # Check robots.txt for additional sitemaps
-    sitemap_locations = _get_sitemap_locations_from_robots(site)
-    for sitemap_url in sitemap_locations:
-        all_urls.update(_extract_urls_from_sitemap(sitemap_url))
+    sitemap_urls.update(_get_sitemap_locations_from_robots(site))
+
+    all_urls.update(
+        *run_functions_tuples_in_parallel(
+            [
+                (_extract_urls_from_sitemap, (sitemap_url,))
+                for sitemap_url in sitemap_urls
+            ],
+            max_workers=_MAX_CONCURRENT_SITEMAP_FETCHES,
+        )
+    )
 
     return list(all_urls)
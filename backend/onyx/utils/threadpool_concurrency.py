@@ -1,9 +1,11 @@
 import collections.abc
 import contextvars
 import copy
+import queue
 import threading
 import uuid
 from collections.abc import Callable
+from collections.abc import Generator
 from collections.abc import Iterator
 from collections.abc import MutableMapping
 from collections.abc import Sequence
@@ -29,6 +31,7 @@ logger = setup_logger()
 R = TypeVar("R")
 KT = TypeVar("KT")  # Key type
 VT = TypeVar("VT")  # Value type
+IT = TypeVar("IT")  # Input type
 _T = TypeVar("_T")  # Default type
 
 
@@ -405,3 +408,52 @@ def parallel_yield_from_funcs(
     yield from parallel_yield(
         [func_wrapper(func) for func in funcs], max_workers=max_workers
     )
+
+
+def map_in_background(
+    func: Callable[[IT], R], items: Sequence[IT], max_ahead: int = 1
+) -> Generator[R, None, None]:
+    """
+    Yields func(item) for each item, in order. The calls are made one after the other
+    in a background thread, which works up to max_ahead results ahead of the consumer.
+    This lets the consumer work on one result while the next one is being produced,
+    while the number of results held in memory stays bounded.
+
+    An exception raised by func is re-raised to the consumer. If the consumer stops
+    early (or closes the generator), the background thread stops after its current
+    call.
+    """
+    results: queue.Queue[tuple[R | None, Exception | None]] = queue.Queue(
+        maxsize=max(max_ahead, 1)
+    )
+    stopped = threading.Event()
+
+    def _put(result: R | None, exception: Exception | None) -> bool:
+        while not stopped.is_set():
+            try:
+                results.put((result, exception), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        for item in items:
+            try:
+                result = func(item)
+            except Exception as e:
+                _put(None, e)
+                return
+            if not _put(result, None):
+                return
+
+    task = run_in_background(_produce)
+    try:
+        for _ in items:
+            result, exception = results.get()
+            if exception is not None:
+                raise exception
+            yield cast(R, result)
+    finally:
+        stopped.set()
+        task.join()
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from typing import Generic
+from typing import TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLLRUCache(Generic[K, V]):
+    """Thread safe, in-process LRU cache where every entry also expires after a fixed
+    TTL. Expired entries are dropped lazily when they are looked up or evicted.
+
+    A max_size of 0 disables the cache, every lookup is then a miss.
+
+    If weigh is given, the size of an entry is weigh(value) instead of 1. This allows
+    bounding e.g. the total number of bytes cached, values heavier than max_size on
+    their own are never cached."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        weigh: Callable[[V], int] | None = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._weigh = weigh
+        self._entries: OrderedDict[K, tuple[float, V, int]] = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_size(self) -> int:
+        return self._total_size
+
+    def _pop(self, key: K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_size -= entry[2]
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.max_size <= 0:
+            return
+
+        size = self._weigh(value) if self._weigh else 1
+        with self._lock:
+            self._pop(key)
+            if size > self.max_size:
+                return
+
+            self._entries[key] = (time.monotonic() + self.ttl, value, size)
+            self._total_size += size
+            while self._total_size > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_size = 0
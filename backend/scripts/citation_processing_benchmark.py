@@ -0,0 +1,102 @@
+"""Microbenchmark for streaming long answers through the CitationProcessor.
+
+Usage (from the backend directory):
+
+python -m scripts.citation_processing_benchmark --num-tokens 20000
+
+Streams synthetic answers (prose with citations and code blocks) through the processor
+and reports the total time as well as the time per token for the first and last
+thousand tokens. With constant work per token both should be about the same.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from onyx.chat.models import LlmDoc
+from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
+from onyx.configs.constants import DocumentSource
+
+NUM_DOCS = 20
+WINDOW = 1000
+
+_WORDS = ["the", "answer", "is", "based", "on", "these", "documents", "and", "more"]
+
+
+def _build_docs() -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{i}",
+            content="content",
+            blurb="blurb",
+            semantic_identifier=f"Doc {i}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://example.com/{i}",
+            source_links=None,
+            match_highlights=[],
+        )
+        for i in range(NUM_DOCS)
+    ]
+
+
+def _build_tokens(num_tokens: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        roll = rng.random()
+        if roll < 0.05:
+            tokens.extend(["[", str(rng.randint(1, NUM_DOCS)), "]"])
+        elif roll < 0.07:
+            tokens.extend(["[", "1", ",", " ", str(rng.randint(2, NUM_DOCS)), "]"])
+        elif roll < 0.075:
+            tokens.extend(["```", "\n", "x = arr[0]", "\n", "```", "\n"])
+        else:
+            tokens.append(" " + rng.choice(_WORDS))
+    return tokens[:num_tokens]
+
+
+def run_benchmark(num_tokens: int, runs: int) -> None:
+    docs = _build_docs()
+    mapping = DocumentIdOrderMapping(
+        order_mapping={doc.document_id: i + 1 for i, doc in enumerate(docs)}
+    )
+
+    for run in range(runs):
+        tokens = _build_tokens(num_tokens, seed=run)
+        processor = CitationProcessor(
+            context_docs=docs,
+            final_doc_id_to_rank_map=mapping,
+            display_doc_id_to_rank_map=mapping,
+            stop_stream=None,
+        )
+
+        token_times: list[float] = []
+        start = time.perf_counter()
+        for token in tokens:
+            token_start = time.perf_counter()
+            for _ in processor.process_token(token):
+                pass
+            token_times.append(time.perf_counter() - token_start)
+        for _ in processor.process_token(None):
+            pass
+        total = time.perf_counter() - start
+
+        first = sum(token_times[:WINDOW]) / WINDOW * 1e6
+        last = sum(token_times[-WINDOW:]) / WINDOW * 1e6
+        print(
+            f"run={run} tokens={num_tokens} total={total * 1000:.1f}ms "
+            f"first_{WINDOW}={first:.2f}us/token last_{WINDOW}={last:.2f}us/token"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-tokens", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args.num_tokens, args.runs)
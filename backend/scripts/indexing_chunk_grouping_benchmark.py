@@ -0,0 +1,121 @@
+"""Microbenchmark for grouping embedded chunks by document after embedding.
+
+Usage (from the backend directory):
+
+python -m scripts.indexing_chunk_grouping_benchmark --total-chunks 20000
+
+Builds batches with the same number of chunks but different distributions over
+documents, then times computing the per-document chunk counts and combined text the
+way index_doc_batch does (single grouping pass) against scanning all chunks once per
+document. The grouping pass should take about the same time for every distribution.
+"""
+
+import argparse
+import time
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.indexing.indexing_pipeline import group_chunks_by_document
+from onyx.indexing.models import ChunkEmbedding
+from onyx.indexing.models import IndexChunk
+
+
+def _build_chunks(chunks_per_doc: list[int]) -> list[IndexChunk]:
+    chunks: list[IndexChunk] = []
+    for doc_num, num_chunks in enumerate(chunks_per_doc):
+        doc = Document(
+            id=f"doc_{doc_num}",
+            semantic_identifier=f"Doc {doc_num}",
+            sections=[],
+            source=DocumentSource.FILE,
+            metadata={},
+        )
+        for chunk_id in range(num_chunks):
+            chunks.append(
+                IndexChunk(
+                    chunk_id=chunk_id,
+                    content=f"row {chunk_id} of doc {doc_num}",
+                    source_document=doc,
+                    blurb="",
+                    source_links=None,
+                    section_continuation=False,
+                    title_prefix="",
+                    metadata_suffix_semantic="",
+                    metadata_suffix_keyword="",
+                    mini_chunk_texts=None,
+                    large_chunk_id=None,
+                    large_chunk_reference_ids=[],
+                    embeddings=ChunkEmbedding(
+                        full_embedding=[], mini_chunk_embeddings=[]
+                    ),
+                    title_embedding=None,
+                    image_file_id=None,
+                    chunk_context="",
+                    doc_summary="",
+                    contextual_rag_reserved_tokens=0,
+                )
+            )
+    return chunks
+
+
+def _distributions(total_chunks: int) -> dict[str, list[int]]:
+    return {
+        # a single large spreadsheet
+        "one_doc": [total_chunks],
+        # one large spreadsheet among many small documents
+        "skewed": [total_chunks // 2] + [1] * (total_chunks // 2),
+        "uniform_16": [total_chunks // 16] * 16,
+        "one_chunk_each": [1] * total_chunks,
+    }
+
+
+def _grouped(chunks: list[IndexChunk], doc_ids: list[str]) -> None:
+    doc_id_to_chunks = group_chunks_by_document(chunks)
+    for doc_id in doc_ids:
+        document_chunks = doc_id_to_chunks.get(doc_id, [])
+        len(document_chunks)
+        " ".join(chunk.content for chunk in document_chunks)
+
+
+def _scan_per_document(chunks: list[IndexChunk], doc_ids: list[str]) -> None:
+    for doc_id in doc_ids:
+        len([chunk for chunk in chunks if chunk.source_document.id == doc_id])
+        document_chunks = [
+            chunk for chunk in chunks if chunk.source_document.id == doc_id
+        ]
+        " ".join(chunk.content for chunk in document_chunks)
+
+
+def run_benchmark(total_chunks: int, runs: int, skip_scan: bool) -> None:
+    for name, chunks_per_doc in _distributions(total_chunks).items():
+        chunks = _build_chunks(chunks_per_doc)
+        doc_ids = [f"doc_{doc_num}" for doc_num in range(len(chunks_per_doc))]
+
+        timings = {"grouped": _grouped}
+        if not skip_scan:
+            timings["scan_per_document"] = _scan_per_document
+
+        for label, func in timings.items():
+            best = float("inf")
+            for _ in range(runs):
+                start = time.perf_counter()
+                func(chunks, doc_ids)
+                best = min(best, time.perf_counter() - start)
+            print(
+                f"{name:<15} docs={len(doc_ids):<6} chunks={len(chunks):<6} "
+                f"{label:<18} {best * 1000:.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--total-chunks", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--skip-scan",
+        action="store_true",
+        help="only time the grouping pass (scanning is quadratic in the batch size)",
+    )
+    args = parser.parse_args()
+
+    run_benchmark(args.total_chunks, args.runs, args.skip_scan)
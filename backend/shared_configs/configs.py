@@ -80,6 +80,36 @@ OPENAI_EMBEDDING_TIMEOUT = int(
     os.environ.get("OPENAI_EMBEDDING_TIMEOUT", API_BASED_EMBEDDING_TIMEOUT)
 )
 
+# Concurrent requests to the same local embedding / reranking model are merged into
+# batches of up to this many texts. A request waits at most this long for others to
+# join its batch.
+LOCAL_MODEL_MAX_BATCH_SIZE = int(os.environ.get("LOCAL_MODEL_MAX_BATCH_SIZE") or 32)
+LOCAL_MODEL_BATCH_MAX_WAIT_MS = float(
+    os.environ.get("LOCAL_MODEL_BATCH_MAX_WAIT_MS") or 5
+)
+
+# Clients for API based embedding providers are kept around (and reused across
+# requests) until they have been idle for this long
+CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT = float(
+    os.environ.get("CLOUD_EMBEDDING_CLIENT_IDLE_TIMEOUT") or 300
+)
+CLOUD_EMBEDDING_MAX_POOLED_CLIENTS = int(
+    os.environ.get("CLOUD_EMBEDDING_MAX_POOLED_CLIENTS") or 64
+)
+# Limits on the requests the model server sends to each embedding provider, 0 means
+# no limit
+CLOUD_EMBEDDING_MAX_CONCURRENT_REQUESTS = int(
+    os.environ.get("CLOUD_EMBEDDING_MAX_CONCURRENT_REQUESTS") or 64
+)
+CLOUD_EMBEDDING_REQUESTS_PER_SECOND = float(
+    os.environ.get("CLOUD_EMBEDDING_REQUESTS_PER_SECOND") or 0
+)
+
+# How embeddings are sent back from the model server: "float32" or "float16" use a raw
+# binary buffer (falling back to JSON if the model server does not support it), "json"
+# always uses JSON float arrays
+EMBEDDING_TRANSPORT = (os.environ.get("EMBEDDING_TRANSPORT") or "float32").lower()
+
 # Whether or not to strictly enforce token limit for chunking.
 STRICT_CHUNK_TOKEN_LIMIT = (
     os.environ.get("STRICT_CHUNK_TOKEN_LIMIT", "").lower() == "true"
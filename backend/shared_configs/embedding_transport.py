@@ -0,0 +1,85 @@
+"""Binary wire format for embeddings sent from the model server.
+
+Clients opt in by listing EMBEDDINGS_MEDIA_TYPE in their Accept header and naming the
+dtype they want in EMBEDDING_DTYPE_HEADER. The model server then answers with the raw
+little-endian buffer of the (num_texts, dim) matrix and describes it in the response
+headers. Servers that do not know about the format keep answering with JSON and
+clients that do not ask for it keep getting JSON, so either side can be upgraded first.
+"""
+
+from enum import Enum
+
+import numpy as np
+
+from shared_configs.model_server_models import Embedding
+
+EMBEDDINGS_MEDIA_TYPE = "application/vnd.onyx.embeddings"
+EMBEDDING_DTYPE_HEADER = "X-Onyx-Embedding-Dtype"
+EMBEDDING_SHAPE_HEADER = "X-Onyx-Embedding-Shape"
+
+
+class EmbeddingTransport(str, Enum):
+    JSON = "json"
+    FLOAT32 = "float32"
+    # halves the payload again but only keeps ~3 significant decimal digits
+    FLOAT16 = "float16"
+
+
+_TRANSPORT_TO_NUMPY_DTYPE: dict[EmbeddingTransport, np.dtype] = {
+    EmbeddingTransport.FLOAT32: np.dtype("<f4"),
+    EmbeddingTransport.FLOAT16: np.dtype("<f2"),
+}
+
+
+def binary_transport_from_headers(
+    accept: str | None, requested_dtype: str | None
+) -> EmbeddingTransport | None:
+    """Returns the binary transport the client asked for, or None if it wants JSON."""
+    if not accept or EMBEDDINGS_MEDIA_TYPE not in accept:
+        return None
+
+    try:
+        transport = EmbeddingTransport((requested_dtype or "").lower())
+    except ValueError:
+        transport = EmbeddingTransport.FLOAT32
+
+    if transport == EmbeddingTransport.JSON:
+        return None
+    return transport
+
+
+def encode_embeddings(
+    embeddings: list[Embedding] | np.ndarray, transport: EmbeddingTransport
+) -> tuple[bytes, dict[str, str]]:
+    """Serializes the embeddings to the raw buffer plus the headers describing it."""
+    matrix = np.asarray(embeddings, dtype=_TRANSPORT_TO_NUMPY_DTYPE[transport])
+    if matrix.shape == (0,):
+        # an empty list has no rows to take the dimension from
+        matrix = matrix.reshape(0, 0)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2D embedding matrix, got shape {matrix.shape}")
+
+    headers = {
+        EMBEDDING_DTYPE_HEADER: transport.value,
+        EMBEDDING_SHAPE_HEADER: f"{matrix.shape[0]},{matrix.shape[1]}",
+    }
+    return matrix.tobytes(), headers
+
+
+def decode_embeddings(
+    content: bytes, dtype_header: str | None, shape_header: str | None
+) -> np.ndarray:
+    """Reads a buffer produced by encode_embeddings without copying it. The returned
+    array is read-only as it shares memory with the response body."""
+    if not dtype_header or not shape_header:
+        raise ValueError("Binary embedding response is missing its dtype or shape")
+
+    dtype = _TRANSPORT_TO_NUMPY_DTYPE[EmbeddingTransport(dtype_header)]
+    num_rows, dim = (int(value) for value in shape_header.split(","))
+    if len(content) != num_rows * dim * dtype.itemsize:
+        raise ValueError(
+            f"Binary embedding response has {len(content)} bytes, "
+            f"expected {num_rows}x{dim} {dtype_header} values"
+        )
+
+    return np.frombuffer(content, dtype=dtype).reshape(num_rows, dim)
@@ -0,0 +1,81 @@
+from collections.abc import Generator
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from onyx.db.kg_allowed_documents import get_kg_view_names
+from onyx.db.kg_allowed_documents import get_kg_views_session
+from onyx.db.models import Document
+from onyx.db.models import KGEntity
+from onyx.db.models import KGEntityType
+from onyx.db.models import KGUserAllowedDocument
+from onyx.db.models import User
+from tests.external_dependency_unit.conftest import create_test_user
+from tests.external_dependency_unit.constants import TEST_TENANT_ID
+
+KG_VIEWS = get_kg_view_names(TEST_TENANT_ID)
+
+
+@pytest.fixture
+def other_users_entity(
+    db_session: Session, tenant_context: None
+) -> Generator[tuple[User, User, str], None, None]:
+    """A KG entity of a document only the second user has access to"""
+    user = create_test_user(db_session, "kg_views_user")
+    other_user = create_test_user(db_session, "kg_views_other_user")
+
+    suffix = uuid4().hex[:8]
+    entity_type = KGEntityType(id_name=f"TEST_{suffix}", grounding="grounded")
+    document = Document(id=f"kg_views_doc_{suffix}", semantic_id="kg views doc")
+    entity = KGEntity(
+        id_name=f"TEST_{suffix}::secret",
+        name="secret",
+        entity_type_id_name=entity_type.id_name,
+        document_id=document.id,
+    )
+    db_session.add_all([entity_type, document])
+    db_session.flush()
+    db_session.add_all(
+        [
+            entity,
+            KGUserAllowedDocument(user_id=other_user.id, document_id=document.id),
+        ]
+    )
+    db_session.commit()
+
+    yield user, other_user, entity.id_name
+
+    for obj in (entity, document, entity_type, user, other_user):
+        db_session.delete(obj)
+    db_session.commit()
+
+
+def _visible_entities(user: User, sql_statement: str) -> list[str]:
+    with get_kg_views_session(user.id) as db_session:
+        return list(db_session.scalars(text(sql_statement)).all())
+
+
+@pytest.mark.parametrize(
+    "sql_statement",
+    [
+        f"SELECT entity FROM {KG_VIEWS.kg_entity_view_name}",
+        # the views used to be filtered by this setting, changing it (however the
+        # function and the setting name are spelled) must not change the user
+        "WITH s AS MATERIALIZED (SELECT set_config('onyx.kg_user_id', "
+        "':other_user_id', true)) "
+        f"SELECT e.entity FROM s, {KG_VIEWS.kg_entity_view_name} e",
+        'WITH s AS MATERIALIZED (SELECT U&"\\0073et_config"('
+        "'onyx.kg' || '_user_id', ':other_user_id', true)) "
+        f"SELECT e.entity FROM s, {KG_VIEWS.kg_entity_view_name} e",
+    ],
+)
+def test_kg_views_only_show_the_documents_of_the_session_user(
+    other_users_entity: tuple[User, User, str], sql_statement: str
+) -> None:
+    user, other_user, entity = other_users_entity
+    sql_statement = sql_statement.replace(":other_user_id", str(other_user.id))
+
+    assert entity not in _visible_entities(user, sql_statement)
+    assert entity in _visible_entities(other_user, sql_statement)
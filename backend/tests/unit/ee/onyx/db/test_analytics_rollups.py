@@ -0,0 +1,93 @@
+import datetime
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert
+
+from ee.onyx.db import analytics
+from ee.onyx.db.analytics import _split_time_range
+from ee.onyx.db.analytics import roll_up_analytics
+from onyx.db.models import ChatMessageDailyRollup
+
+UTC = datetime.timezone.utc
+
+
+def _split(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    rolled_up_until: datetime.date | None,
+) -> tuple[
+    list[tuple[datetime.datetime, datetime.datetime]],
+    tuple[datetime.date, datetime.date] | None,
+]:
+    with patch.object(
+        analytics, "fetch_analytics_rolled_up_until", return_value=rolled_up_until
+    ):
+        return _split_time_range(start, end)
+
+
+def test_split_time_range() -> None:
+    start = datetime.datetime(2025, 1, 1, 15, 30, tzinfo=UTC)
+    end = datetime.datetime(2025, 1, 31, 10, tzinfo=UTC)
+    first_midnight = datetime.datetime(2025, 1, 2, tzinfo=UTC)
+    microsecond = datetime.timedelta(microseconds=1)
+
+    # nothing rolled up yet
+    assert _split(start, end, None) == ([(start, end)], None)
+    assert _split(start, end, datetime.date(2025, 1, 2)) == ([(start, end)], None)
+
+    # the partial first day and the days after the rollups are read from the messages
+    assert _split(start, end, datetime.date(2025, 1, 20)) == (
+        [
+            (start, first_midnight - microsecond),
+            (datetime.datetime(2025, 1, 20, tzinfo=UTC), end),
+        ],
+        (datetime.date(2025, 1, 2), datetime.date(2025, 1, 20)),
+    )
+
+    # whole days only come from the rollups
+    assert _split(
+        first_midnight,
+        datetime.datetime(2025, 1, 5, tzinfo=UTC) - microsecond,
+        datetime.date(2025, 1, 20),
+    ) == ([], (datetime.date(2025, 1, 2), datetime.date(2025, 1, 5)))
+
+    # naive bounds are in UTC, timezone aware bounds are compared in UTC
+    assert _split(start.replace(tzinfo=None), end, None) == ([(start, end)], None)
+    aware_start = datetime.datetime(
+        2025, 1, 2, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=1))
+    )
+    assert _split(aware_start, end, datetime.date(2025, 1, 3))[1] == (
+        datetime.date(2025, 1, 2),
+        datetime.date(2025, 1, 3),
+    )
+
+
+def test_roll_up_analytics_buckets_messages_by_utc_day() -> None:
+    db_session = MagicMock()
+    with patch.object(
+        analytics, "_fetch_onyxbot_analytics_from_messages", return_value=[]
+    ) as fetch_onyxbot_analytics:
+        roll_up_analytics(
+            db_session, datetime.date(2025, 1, 1), datetime.date(2025, 1, 3)
+        )
+
+    # the whole UTC days, whatever the time zone of the database session
+    fetch_onyxbot_analytics.assert_called_once_with(
+        datetime.datetime(2025, 1, 1, tzinfo=UTC),
+        datetime.datetime(2025, 1, 3, tzinfo=UTC) - datetime.timedelta(microseconds=1),
+        db_session,
+    )
+    statements: list[Any] = [call.args[0] for call in db_session.execute.call_args_list]
+    (rollup_insert,) = [
+        statement
+        for statement in statements
+        if isinstance(statement, Insert)
+        and str(statement.table) == ChatMessageDailyRollup.__tablename__
+    ]
+    compiled = rollup_insert.compile(dialect=postgresql.dialect())
+    assert "date(timezone(%(timezone_1)s, chat_message.time_sent))" in str(compiled)
+    assert compiled.params["timezone_1"] == "UTC"
+    db_session.commit.assert_called_once()
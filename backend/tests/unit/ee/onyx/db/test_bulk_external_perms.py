@@ -0,0 +1,56 @@
+from unittest.mock import MagicMock
+
+from ee.onyx.db.document import bulk_upsert_document_external_perms__no_commit
+from onyx.access.models import DocExternalAccess
+from onyx.access.models import ExternalAccess
+from onyx.configs.constants import DocumentSource
+
+
+def _access(doc_id: str, emails: set[str], groups: set[str]) -> DocExternalAccess:
+    return DocExternalAccess(
+        external_access=ExternalAccess(
+            external_user_emails=emails,
+            external_user_group_ids=groups,
+            is_public=False,
+        ),
+        doc_id=doc_id,
+    )
+
+
+def test_bulk_upsert_skips_unchanged_permissions() -> None:
+    db_session = MagicMock()
+    # stored permissions, group IDs are already prefixed with the source
+    db_session.execute.return_value = [
+        ("unchanged", ["b@test.com", "a@test.com"], ["google_drive_eng"], False),
+        ("changed", ["a@test.com"], [], False),
+    ]
+
+    changed, new_doc_ids = bulk_upsert_document_external_perms__no_commit(
+        db_session=db_session,
+        doc_external_accesses=[
+            _access("unchanged", {"a@test.com", "b@test.com"}, {"ENG"}),
+            _access("changed", {"a@test.com", "c@test.com"}, set()),
+            _access("new", {"d@test.com"}, set()),
+        ],
+        source_type=DocumentSource.GOOGLE_DRIVE,
+    )
+
+    assert [access.doc_id for access in changed] == ["changed", "new"]
+    assert new_doc_ids == ["new"]
+    # one select for the whole batch and one upsert for the changed documents
+    assert db_session.execute.call_count == 2
+
+
+def test_bulk_upsert_does_not_write_if_nothing_changed() -> None:
+    db_session = MagicMock()
+    db_session.execute.return_value = [("doc", ["a@test.com"], [], False)]
+
+    changed, new_doc_ids = bulk_upsert_document_external_perms__no_commit(
+        db_session=db_session,
+        doc_external_accesses=[_access("doc", {"a@test.com"}, set())],
+        source_type=DocumentSource.GOOGLE_DRIVE,
+    )
+
+    assert changed == []
+    assert new_doc_ids == []
+    assert db_session.execute.call_count == 1
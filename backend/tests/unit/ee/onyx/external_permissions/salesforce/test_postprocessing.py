@@ -1,5 +1,8 @@
 from datetime import datetime
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
+from ee.onyx.external_permissions.salesforce import postprocessing
 from ee.onyx.external_permissions.salesforce.postprocessing import (
     censor_salesforce_chunks,
 )
@@ -201,3 +204,53 @@ def test_validate_salesforce_access_blurb_update() -> None:
     assert len(filtered_chunks) == 1
     assert len(filtered_chunks[0].blurb) <= BLURB_SIZE
     assert filtered_chunks[0].blurb.startswith(section)
+
+
+def test_salesforce_object_access_cached_per_user() -> None:
+    """Only objects whose access is not cached for the user are sent to Salesforce"""
+    postprocessing._OBJECT_ACCESS_CACHE.clear()
+    chunks = [
+        create_test_chunk(
+            doc_id="doc1",
+            chunk_id=1,
+            content="First part. Second part.",
+            source_links={
+                0: "https://salesforce.com/object1",
+                12: "https://salesforce.com/object2",
+            },
+        )
+    ]
+
+    def _access(client: object, user_id: str, record_ids: list[str]) -> dict:
+        # object3 is unknown to Salesforce
+        return {
+            record_id: record_id == "object1"
+            for record_id in record_ids
+            if record_id != "object3"
+        }
+
+    mock_access = MagicMock(side_effect=_access)
+    with patch.object(
+        postprocessing, "get_any_salesforce_client_for_doc_id"
+    ), patch.object(
+        postprocessing, "get_salesforce_user_id_from_email", return_value="user1"
+    ), patch.object(
+        postprocessing, "get_objects_access_for_user_id", mock_access
+    ), patch.object(
+        postprocessing, "get_session_with_current_tenant"
+    ):
+        for _ in range(2):
+            censored_chunks = censor_salesforce_chunks(chunks, "test@example.com")
+            assert [chunk.content for chunk in censored_chunks] == ["First part. "]
+        assert mock_access.call_count == 1
+
+        chunks[0].source_links = {
+            0: "https://salesforce.com/object2",
+            12: "https://salesforce.com/object3",
+        }
+        assert censor_salesforce_chunks(chunks, "test@example.com") == []
+        assert mock_access.call_args.args[2] == ["object3"]
+
+        # other users don't share the cached decisions
+        censor_salesforce_chunks(chunks, "other@example.com")
+        assert sorted(mock_access.call_args.args[2]) == ["object2", "object3"]
@@ -0,0 +1,81 @@
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from ee.onyx.external_permissions import post_query_censoring
+from ee.onyx.external_permissions.post_query_censoring import (
+    _post_query_chunk_censoring,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.db.models import User
+
+
+def _chunk(doc_id: str, source: DocumentSource) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=doc_id,
+        chunk_id=0,
+        blurb=doc_id,
+        content=doc_id,
+        source_links=None,
+        section_continuation=False,
+        source_type=source,
+        semantic_identifier=doc_id,
+        title=doc_id,
+        boost=1,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=datetime.now(),
+        image_file_id=None,
+        doc_summary="",
+        chunk_context="",
+    )
+
+
+def test_sources_censored_in_parallel() -> None:
+    # both censoring functions have to run at the same time to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _keep_first(
+        chunks: list[InferenceChunk], user_email: str
+    ) -> list[InferenceChunk]:
+        barrier.wait()
+        return chunks[:1]
+
+    def _fail(chunks: list[InferenceChunk], user_email: str) -> list[InferenceChunk]:
+        barrier.wait()
+        raise RuntimeError("permission check failed")
+
+    censor_funcs = {
+        DocumentSource.SALESFORCE: _keep_first,
+        DocumentSource.CONFLUENCE: _fail,
+    }
+
+    def _sync_config(source: DocumentSource) -> MagicMock:
+        return MagicMock(
+            censoring_config=MagicMock(chunk_censoring_func=censor_funcs[source])
+        )
+
+    chunks = [
+        _chunk("sf1", DocumentSource.SALESFORCE),
+        _chunk("web1", DocumentSource.WEB),
+        _chunk("conf1", DocumentSource.CONFLUENCE),
+        _chunk("sf2", DocumentSource.SALESFORCE),
+    ]
+    with patch.object(
+        post_query_censoring,
+        "_get_all_censoring_enabled_sources",
+        return_value=set(censor_funcs),
+    ), patch.object(
+        post_query_censoring, "get_source_perm_sync_config", side_effect=_sync_config
+    ):
+        censored_chunks = _post_query_chunk_censoring(
+            chunks, User(id=1, email="test@example.com")
+        )
+
+    # failed sources are dropped entirely, the original order is kept
+    assert [chunk.document_id for chunk in censored_chunks] == ["sf1", "web1"]
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import pytest
+
+from model_server.client_pool import AsyncClientPool
+from model_server.client_pool import AsyncTokenBucket
+from model_server.client_pool import RequestLimiter
+from model_server.encoders import _CLOUD_EMBEDDING_POOL
+from model_server.encoders import CloudEmbedding
+from model_server.encoders import embed_text
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbedTextType
+
+
+class _FakeClient:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.closed = False
+
+
+async def _close(client: _FakeClient) -> None:
+    client.closed = True
+
+
+@pytest.mark.asyncio
+async def test_client_pool_reuses_and_evicts_idle_clients() -> None:
+    pool: AsyncClientPool[str, _FakeClient] = AsyncClientPool(
+        close_client=_close, max_idle_seconds=0.05, max_size=10
+    )
+
+    async with pool.acquire("a", lambda: _FakeClient("a")) as first:
+        pass
+    async with pool.acquire("a", lambda: _FakeClient("a")) as second:
+        pass
+    assert first is second
+
+    await asyncio.sleep(0.1)
+    async with pool.acquire("b", lambda: _FakeClient("b")):
+        pass
+
+    assert first.closed
+    assert len(pool) == 1
+
+
+def test_client_pool_closes_clients_of_previous_event_loop() -> None:
+    pool: AsyncClientPool[str, _FakeClient] = AsyncClientPool(
+        close_client=_close, max_idle_seconds=60, max_size=10
+    )
+
+    async def _acquire() -> _FakeClient:
+        async with pool.acquire("a", lambda: _FakeClient("a")) as client:
+            return client
+
+    first = asyncio.run(_acquire())
+    second = asyncio.run(_acquire())
+
+    assert first is not second
+    assert first.closed
+    assert not second.closed
+    assert len(pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_pool_does_not_evict_clients_in_use() -> None:
+    pool: AsyncClientPool[str, _FakeClient] = AsyncClientPool(
+        close_client=_close, max_idle_seconds=60, max_size=1
+    )
+
+    async with pool.acquire("a", lambda: _FakeClient("a")) as client_a:
+        async with pool.acquire("b", lambda: _FakeClient("b")):
+            assert not client_a.closed
+            assert len(pool) == 2
+
+        # over capacity, the least recently used idle client goes
+        async with pool.acquire("c", lambda: _FakeClient("c")):
+            pass
+        assert not client_a.closed
+        assert len(pool) == 2
+
+    await pool.aclose()
+    assert client_a.closed
+    assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate() -> None:
+    bucket = AsyncTokenBucket(rate=20, capacity=2)
+
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+
+    # 2 from the initial burst, the remaining 4 at 20 per second
+    assert time.monotonic() - start >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_request_limiter_caps_concurrency() -> None:
+    limiter = RequestLimiter(max_concurrency=2, requests_per_second=0)
+    running = 0
+    max_running = 0
+
+    async def _request() -> None:
+        nonlocal running, max_running
+        async with limiter.limit():
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(_request() for _ in range(10)))
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_embed_text_reuses_cloud_embedding() -> None:
+    created: list[CloudEmbedding] = []
+    original_init = CloudEmbedding.__init__
+
+    def _tracking_init(self: CloudEmbedding, *args: object, **kwargs: object) -> None:
+        original_init(self, *args, **kwargs)  # type: ignore[arg-type]
+        created.append(self)
+
+    with patch.object(CloudEmbedding, "__init__", _tracking_init), patch.object(
+        CloudEmbedding, "embed", AsyncMock(return_value=[[0.1, 0.2]])
+    ):
+        for api_key in ["key-1", "key-1", "key-2"]:
+            await embed_text(
+                texts=["test"],
+                text_type=EmbedTextType.QUERY,
+                model_name="fake-model",
+                deployment_name=None,
+                max_context_length=512,
+                normalize_embeddings=True,
+                api_key=api_key,
+                provider_type=EmbeddingProvider.OPENAI,
+                prefix=None,
+                api_url=None,
+                api_version=None,
+                reduced_dimension=None,
+            )
+
+    # one client per API key, kept open between requests
+    assert len(created) == 2
+    assert not any(client._closed for client in created)
+
+    await _CLOUD_EMBEDDING_POOL.aclose()
+    assert all(client._closed for client in created)
@@ -1,22 +1,38 @@
 import asyncio
 import time
 from collections.abc import AsyncGenerator
+from collections.abc import Generator
 from typing import Any
+from typing import cast
 from typing import List
 from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
 from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
+from requests import Response
 
+from model_server.encoders import close_cloud_embedding_clients
 from model_server.encoders import CloudEmbedding
 from model_server.encoders import embed_text
 from model_server.encoders import local_rerank
 from model_server.encoders import process_embed_request
+from model_server.encoders import router
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.embedding_transport import decode_embeddings
+from shared_configs.embedding_transport import EMBEDDING_DTYPE_HEADER
+from shared_configs.embedding_transport import EMBEDDING_SHAPE_HEADER
+from shared_configs.embedding_transport import EMBEDDINGS_MEDIA_TYPE
+from shared_configs.embedding_transport import EmbeddingTransport
+from shared_configs.embedding_transport import encode_embeddings
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
 
 
@@ -30,6 +46,12 @@ async def mock_http_client() -> AsyncGenerator[AsyncMock, None]:
             yield c
 
 
+@pytest.fixture(autouse=True)
+def close_pooled_clients() -> Generator[None, None, None]:
+    yield
+    asyncio.run(close_cloud_embedding_clients())
+
+
 @pytest.fixture
 def sample_embeddings() -> List[List[float]]:
     return [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
@@ -165,9 +187,9 @@ async def test_rate_limit_handling() -> None:
 
 @pytest.mark.asyncio
 async def test_concurrent_embeddings() -> None:
-    def mock_encode(*args: Any, **kwargs: Any) -> List[List[float]]:
+    def mock_encode(texts: list[str], *args: Any, **kwargs: Any) -> List[List[float]]:
         time.sleep(5)
-        return [[0.1, 0.2, 0.3]]
+        return [[0.1, 0.2, 0.3] for _ in texts]
 
     test_req = EmbedRequest(
         texts=["test"],
@@ -200,3 +222,106 @@ async def test_concurrent_embeddings() -> None:
         # However, the developer may still introduce unnecessary blocking above the mock and this test will
         # still pass as long as it's less than (7 - 5) / 5 seconds
         assert end_time - start_time < 7
+
+
+def _binary_embed_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.state.gpu_type = "UNKNOWN"
+    return app
+
+
+@pytest.mark.parametrize("transport", [EmbeddingTransport.FLOAT32, "float16"])
+def test_bi_encoder_embed_binary_transport(transport: str) -> None:
+    embeddings = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+    test_req = EmbedRequest(
+        texts=["test1", "test2"],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.PASSAGE,
+    )
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode.return_value = embeddings
+        mock_get_model.return_value = mock_model
+
+        client = TestClient(_binary_embed_app())
+        binary_response = client.post(
+            "/encoder/bi-encoder-embed",
+            json=test_req.model_dump(),
+            headers={
+                "Accept": f"{EMBEDDINGS_MEDIA_TYPE}, application/json;q=0.5",
+                EMBEDDING_DTYPE_HEADER: transport,
+            },
+        )
+        json_response = client.post(
+            "/encoder/bi-encoder-embed", json=test_req.model_dump()
+        )
+
+    assert binary_response.status_code == 200
+    assert binary_response.headers[EMBEDDING_SHAPE_HEADER] == "2,3"
+    assert len(binary_response.content) == 6 * (2 if transport == "float16" else 4)
+    assert json_response.headers["content-type"] == "application/json"
+
+    # both formats decode to the same embeddings on the client side
+    parsed_binary = EmbeddingModel._parse_embed_response(
+        cast(Response, binary_response)
+    )
+    parsed_json = EmbeddingModel._parse_embed_response(cast(Response, json_response))
+    assert parsed_json.embeddings == embeddings
+    assert np.allclose(parsed_binary.embeddings, embeddings, atol=1e-3)
+
+
+def test_bi_encoder_embed_binary_transport_without_texts() -> None:
+    test_req = EmbedRequest(
+        texts=[],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.PASSAGE,
+    )
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        client = TestClient(_binary_embed_app())
+        response = client.post(
+            "/encoder/bi-encoder-embed",
+            json=test_req.model_dump(),
+            headers={
+                "Accept": EMBEDDINGS_MEDIA_TYPE,
+                EMBEDDING_DTYPE_HEADER: EmbeddingTransport.FLOAT32.value,
+            },
+        )
+
+    assert response.status_code == 400
+    mock_get_model.assert_not_called()
+
+
+@pytest.mark.parametrize("embeddings", [[], np.empty((0, 8), dtype=np.float32)])
+def test_encode_empty_embeddings(embeddings: list[Embedding] | np.ndarray) -> None:
+    content, headers = encode_embeddings(embeddings, EmbeddingTransport.FLOAT16)
+    assert content == b""
+
+    decoded = decode_embeddings(
+        content, headers[EMBEDDING_DTYPE_HEADER], headers[EMBEDDING_SHAPE_HEADER]
+    )
+    assert decoded.shape == (0, 8 if isinstance(embeddings, np.ndarray) else 0)
+    assert decoded.tolist() == []
+
+
+def test_decode_embeddings_rejects_truncated_buffer() -> None:
+    content, headers = encode_embeddings(
+        np.ones((4, 8), dtype=np.float32), EmbeddingTransport.FLOAT32
+    )
+    decoded = decode_embeddings(
+        content, headers[EMBEDDING_DTYPE_HEADER], headers[EMBEDDING_SHAPE_HEADER]
+    )
+    assert decoded.shape == (4, 8)
+
+    with pytest.raises(ValueError):
+        decode_embeddings(
+            content[:-4],
+            headers[EMBEDDING_DTYPE_HEADER],
+            headers[EMBEDDING_SHAPE_HEADER],
+        )
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from model_server.micro_batching import MicroBatcher
+
+
+def _make_batcher(
+    calls: list[tuple[bool, list[str]]], max_batch_size: int = 8
+) -> MicroBatcher[bool, str, str]:
+    def _process(upper: bool, items: list[str]) -> list[str]:
+        calls.append((upper, items))
+        if "boom" in items:
+            raise RuntimeError("boom")
+        return [item.upper() if upper else item for item in items]
+
+    return MicroBatcher(
+        name="test",
+        process_batch=_process,
+        item_length=len,
+        max_batch_size=max_batch_size,
+        max_wait_seconds=0.05,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched_per_group() -> None:
+    calls: list[tuple[bool, list[str]]] = []
+    batcher = _make_batcher(calls)
+
+    results = await asyncio.gather(
+        batcher.submit(True, ["a", "bbb"]),
+        batcher.submit(True, ["cc"]),
+        batcher.submit(False, ["d"]),
+    )
+
+    assert list(results) == [["A", "BBB"], ["CC"], ["d"]]
+    # one call per group, the items sorted by length
+    assert sorted(calls) == [(False, ["d"]), (True, ["a", "cc", "bbb"])]
+
+
+@pytest.mark.asyncio
+async def test_large_requests_are_split_into_length_buckets() -> None:
+    calls: list[tuple[bool, list[str]]] = []
+    batcher = _make_batcher(calls, max_batch_size=2)
+
+    items = ["aaaa", "b", "ccc", "dd", "e"]
+    assert await batcher.submit(False, items) == items
+    assert [batch for _, batch in calls] == [["b", "e"], ["dd", "ccc"], ["aaaa"]]
+
+
+@pytest.mark.asyncio
+async def test_failing_request_does_not_fail_the_batch() -> None:
+    calls: list[tuple[bool, list[str]]] = []
+    batcher = _make_batcher(calls)
+
+    results = await asyncio.gather(
+        batcher.submit(True, ["ok"]),
+        batcher.submit(True, ["boom"]),
+        return_exceptions=True,
+    )
+
+    assert results[0] == ["OK"]
+    assert isinstance(results[1], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_model_is_only_used_from_one_thread() -> None:
+    threads: set[int] = set()
+
+    def _process(_: None, items: list[int]) -> list[int]:
+        threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return items
+
+    batcher: MicroBatcher[None, int, int] = MicroBatcher(
+        name="test-threads",
+        process_batch=_process,
+        item_length=lambda _: 1,
+        max_batch_size=4,
+        max_wait_seconds=0,
+    )
+
+    results = await asyncio.gather(*(batcher.submit(None, [i]) for i in range(20)))
+
+    assert results == [[i] for i in range(20)]
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
@@ -0,0 +1,53 @@
+import pytest
+
+from onyx.agents.agent_search.kb_search.nodes.a3_generate_simple_sql import (
+    _raise_error_if_sql_fails_problem_test,
+)
+from onyx.db.kg_allowed_documents import get_kg_view_names
+
+KG_VIEWS = get_kg_view_names("tenant_a")
+
+
+def _check(sql_statement: str) -> bool:
+    return _raise_error_if_sql_fails_problem_test(
+        sql_statement,
+        KG_VIEWS.kg_relationships_view_name,
+        KG_VIEWS.kg_entity_view_name,
+    )
+
+
+def test_sql_on_own_views_passes() -> None:
+    assert _check(
+        f"SELECT COUNT(*) FROM {KG_VIEWS.kg_relationships_view_name} r "
+        f"JOIN {KG_VIEWS.kg_entity_view_name} e ON e.entity = r.source_entity "
+        "ORDER BY r.source_date OFFSET 5;"
+    )
+    assert _check(
+        f"WITH accounts AS (SELECT * FROM {KG_VIEWS.kg_entity_view_name}) "
+        "SELECT entity FROM accounts"
+    )
+
+
+@pytest.mark.parametrize(
+    "sql_statement",
+    [
+        # the views of another tenant
+        'SELECT * FROM "tenant_b".kg_entities_with_access;',
+        # changing settings
+        "SELECT set_config('onyx.kg_user_id', '1', true);",
+        f"DELETE FROM {KG_VIEWS.kg_entity_view_name};",
+        # only a single query may be run
+        f"SELECT * FROM {KG_VIEWS.kg_entity_view_name}; SELECT 1;",
+        "SET onyx.kg_user_id = '1';",
+        "set local statement_timeout = 0;",
+        f"RESET ALL; SELECT * FROM {KG_VIEWS.kg_entity_view_name};",
+        # quoted forms
+        f"WITH x AS (SELECT \"set_config\"('onyx.kg_user_id', '1', true)) "
+        f"SELECT * FROM {KG_VIEWS.kg_entity_view_name}, x;",
+        'SET "onyx"."kg_user_id" = \'1\';',
+        'RESET "onyx".kg_user_id;',
+    ],
+)
+def test_unauthorized_sql_is_rejected(sql_statement: str) -> None:
+    with pytest.raises(ValueError):
+        _check(sql_statement)
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+import httpx
+from tenacity import Future
+from tenacity import RetryError
+
+from onyx.background.celery.tasks.vespa import tasks as vespa_tasks
+from onyx.background.celery.tasks.vespa.tasks import vespa_metadata_sync_batch_task
+
+
+def test_bad_request_after_retries_is_not_retried() -> None:
+    response = httpx.Response(400, request=httpx.Request("PUT", "http://vespa"))
+    bad_request = httpx.HTTPStatusError(
+        "bad request", request=response.request, response=response
+    )
+    retry_error = RetryError(
+        Future.construct(attempt_number=3, value=bad_request, has_exception=True)
+    )
+
+    with (
+        patch.object(
+            vespa_tasks, "get_session_with_current_tenant", side_effect=retry_error
+        ),
+        patch.object(vespa_metadata_sync_batch_task, "retry") as mock_retry,
+    ):
+        result = vespa_metadata_sync_batch_task.apply(
+            args=(["doc"],), kwargs={"tenant_id": "public"}
+        )
+
+    assert result.get() is False
+    mock_retry.assert_not_called()
@@ -5,9 +5,11 @@ import pytest
 from onyx.chat.models import CitationInfo
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
+from onyx.chat.stream_processing.citation_processing import _CodeFenceTracker
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
+from onyx.prompts.constants import TRIPLE_BACKTICK
 
 
 """
@@ -537,3 +539,25 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+def test_code_fence_tracker_matches_full_count() -> None:
+    text = "a ```py\nx = [1]\n```` b `` c ``` d ```\n[2] `````` e ```"
+    for split in range(1, 7):
+        tracker = _CodeFenceTracker()
+        for i in range(0, len(text), split):
+            tracker.feed(text[i : i + split])
+            assert tracker.in_code_block == (
+                text[: i + split].count(TRIPLE_BACKTICK) % 2 != 0
+            )
+
+
+def test_citation_extraction_long_stream(
+    mock_data: tuple[list[LlmDoc], dict[str, int]],
+) -> None:
+    tokens = [" word"] * 20_000 + [" [", "1", "]", "\n```\n", "x[1]", "\n```\n"]
+    final_answer_text, citations = process_text(tokens, mock_data)
+    assert final_answer_text.endswith(
+        " word [[1]](https://0.com)\n```plaintext\nx[1]\n```\n"
+    )
+    assert [citation.document_id for citation in citations] == ["doc_0"]
@@ -465,3 +465,39 @@ def test_checkpoint_progress(
     assert isinstance(outputs_with_checkpoint[0].items[0], Document)
     assert outputs_with_checkpoint[0].items[0].semantic_identifier == "Page 3"
     assert not outputs_with_checkpoint[-1].next_checkpoint.has_more
+
+
+def test_pages_converted_concurrently_in_order(
+    confluence_connector: ConfluenceConnector,
+    create_mock_page: Callable[..., dict[str, Any]],
+) -> None:
+    pages = [create_mock_page(id=str(i), title=f"Page {i}") for i in range(4)]
+    in_flight = 0
+    max_in_flight = 0
+
+    def mock_convert(page: dict[str, Any]) -> Document:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # the first page finishes last
+        time.sleep(0.2 if page["id"] == "0" else 0.05)
+        in_flight -= 1
+        return Document(
+            id=page["id"],
+            sections=[],
+            source=DocumentSource.CONFLUENCE,
+            semantic_identifier=page["title"],
+            metadata={},
+        )
+
+    with (
+        patch.object(confluence_connector, "_convert_page", side_effect=mock_convert),
+        patch(
+            "onyx.connectors.confluence.connector.CONFLUENCE_CONNECTOR_FETCH_CONCURRENCY",
+            2,
+        ),
+    ):
+        results = list(confluence_connector._convert_pages(pages))
+
+    assert [cast(Document, result).id for result in results] == ["0", "1", "2", "3"]
+    assert max_in_flight == 2
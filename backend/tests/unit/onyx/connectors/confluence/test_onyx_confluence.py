@@ -9,8 +9,13 @@ from requests import HTTPError
 from onyx.connectors.confluence.onyx_confluence import (
     _DEFAULT_PAGINATION_LIMIT,
 )
+from onyx.connectors.confluence.onyx_confluence import _get_users
+from onyx.connectors.confluence.onyx_confluence import (
+    extract_text_from_confluence_html,
+)
 from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
 from onyx.connectors.interfaces import CredentialsProviderInterface
+from onyx.utils.ttl_lru_cache import TTLLRUCache
 
 
 # Helper to create mock responses
@@ -765,3 +770,47 @@ def test_paginated_cql_retrieval_cloud_no_retry_on_error(
     # Verify only two calls were made (page 1 success, page 2 fail)
     # Crucially, no retry attempts with different limits should exist.
     assert mock_get_call_paths == [page1_path, page2_path]
+
+
+def test_user_mentions_resolved_in_bulk(
+    mock_credentials_provider: mock.Mock,
+) -> None:
+    confluence = OnyxConfluence(
+        is_cloud=True,
+        url="https://fake.atlassian.net/wiki",
+        credentials_provider=mock_credentials_provider,
+    )
+    mock_internal_client = mock.Mock()
+    confluence._confluence = mock_internal_client
+    mock_internal_client.get.return_value = {
+        "results": [
+            {"accountId": "a1", "displayName": "Alice"},
+            {"accountId": "a2", "displayName": "Bob"},
+        ]
+    }
+    # a3 is not returned by the bulk lookup (e.g. deactivated)
+    mock_internal_client.get_user_details_by_userkey.side_effect = Exception("404")
+    mock_internal_client.get_user_details_by_accountid.side_effect = Exception("404")
+
+    mentions = "".join(
+        f'<ac:link><ri:user ri:account-id="{account_id}" /></ac:link>'
+        for account_id in ["a1", "a2", "a1", "a3"]
+    )
+    page = {"body": {"storage": {"value": f"<p>{mentions}</p>"}}}
+
+    with mock.patch(
+        "onyx.connectors.confluence.onyx_confluence._USER_ID_TO_DISPLAY_NAME_CACHE",
+        TTLLRUCache(max_size=10, ttl=60),
+    ):
+        text = extract_text_from_confluence_html(confluence, page, set())
+        assert mock_internal_client.get.call_count == 1
+        assert mock_internal_client.get.call_args.kwargs["params"]["accountId"] == [
+            "a1",
+            "a2",
+            "a3",
+        ]
+        assert "@Alice @Bob @Alice @Unknown Confluence User" in text
+
+        # resolved users are not looked up again
+        _get_users(confluence, ["a1", "a2"])
+        assert mock_internal_client.get.call_count == 1
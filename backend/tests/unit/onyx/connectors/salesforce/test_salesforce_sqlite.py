@@ -813,6 +813,126 @@ def test_salesforce_sqlite() -> None:
         _clear_sf_db(directory)
 
 
+def _write_csv(directory: str, filename: str, records: list[dict]) -> str:
+    csv_path = os.path.join(directory, filename)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=sorted({k for r in records for k in r}))
+        writer.writeheader()
+        writer.writerows(records)
+    return csv_path
+
+
+def _dump_sf_db(sf_db: OnyxSalesforceSQLite) -> dict[str, list[tuple]]:
+    cursor = sf_db.cursor()
+    return {
+        table: sorted(cursor.execute(f"SELECT {columns} FROM {table}").fetchall())
+        for table, columns in [
+            # without last_modified, which is the time of the insert
+            ("salesforce_objects", "id, object_type, data"),
+            ("relationships", "*"),
+            ("relationship_types", "*"),
+            ("user_email_map", "*"),
+        ]
+    }
+
+
+def test_salesforce_sqlite_bulk_update_from_csvs() -> None:
+    account_id, other_account_id = _VALID_SALESFORCE_IDS[0], _VALID_SALESFORCE_IDS[1]
+    contact_ids = _VALID_SALESFORCE_IDS[40:46]
+    user_id = _VALID_SALESFORCE_IDS[50]
+
+    with tempfile.TemporaryDirectory() as directory:
+        object_type_to_csv_paths: dict[str, list[str] | None] = {
+            # children before their parents
+            "Contact": [
+                _write_csv(
+                    directory,
+                    "Contact.0.csv",
+                    [
+                        {"Id": contact_id, "AccountId": account_id, "LastName": "Doe"}
+                        for contact_id in contact_ids
+                    ],
+                ),
+                # a later file moves one contact to another account
+                _write_csv(
+                    directory,
+                    "Contact.1.csv",
+                    [
+                        {
+                            "Id": contact_ids[0],
+                            "AccountId": other_account_id,
+                            "LastName": "Moved",
+                        }
+                    ],
+                ),
+            ],
+            ACCOUNT_OBJECT_TYPE: [
+                _write_csv(
+                    directory,
+                    "Account.csv",
+                    [
+                        {"Id": account_id, "Name": "Acme Inc."},
+                        {"Id": other_account_id, "Name": "Globex Corp"},
+                    ],
+                )
+            ],
+            USER_OBJECT_TYPE: [
+                _write_csv(
+                    directory,
+                    "User.csv",
+                    [{"Id": user_id, "Email": "user@acme.com"}],
+                )
+            ],
+            "Opportunity": None,
+        }
+
+        bulk_db = OnyxSalesforceSQLite(os.path.join(directory, "bulk.sqlite"))
+        bulk_db.connect()
+        bulk_db.apply_schema()
+        loaded = list(
+            bulk_db.bulk_update_from_csvs(
+                object_type_to_csv_paths, num_workers=3, batch_size=2
+            )
+        )
+        assert sorted((object_type, len(ids)) for object_type, _, ids in loaded) == [
+            (ACCOUNT_OBJECT_TYPE, 2),
+            ("Contact", 1),
+            ("Contact", 6),
+            (USER_OBJECT_TYPE, 1),
+        ]
+
+        # the parents are loaded first, so every relationship gets its type
+        serial_db = OnyxSalesforceSQLite(os.path.join(directory, "serial.sqlite"))
+        serial_db.connect()
+        serial_db.apply_schema()
+        for object_type in [ACCOUNT_OBJECT_TYPE, USER_OBJECT_TYPE, "Contact"]:
+            for csv_path in object_type_to_csv_paths[object_type] or []:
+                serial_db.update_from_csv(object_type, csv_path)
+
+        bulk_dump = _dump_sf_db(bulk_db)
+        assert bulk_dump == _dump_sf_db(serial_db)
+        assert len(bulk_dump["relationship_types"]) == len(contact_ids)
+        assert bulk_db.get_child_ids(other_account_id) == {contact_ids[0]}
+        assert bulk_db.get_user_id_by_email("user@acme.com") == user_id
+
+        # the deferred indexes are back
+        index_names = {
+            row[0]
+            for row in bulk_db.cursor().execute(
+                "SELECT name FROM sqlite_master WHERE type='index'"
+            )
+        }
+        assert {
+            "idx_object_type",
+            "idx_parent_id",
+            "idx_child_parent",
+            "idx_relationship_types_lookup",
+        } <= index_names
+
+        bulk_db.close()
+        serial_db.close()
+
+
 @pytest.mark.skip(reason="Enable when credentials are available")
 def test_salesforce_bulk_retrieve() -> None:
 
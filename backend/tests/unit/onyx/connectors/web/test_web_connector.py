@@ -0,0 +1,191 @@
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from onyx.connectors.web import connector as web_connector
+from onyx.connectors.web.connector import HostThrottle
+from onyx.connectors.web.connector import ScrapeResult
+from onyx.connectors.web.connector import ScrapeSessionContext
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from onyx.connectors.web.connector import WebConnector
+from shared_configs.contextvars import get_current_tenant_id
+
+BASE_URL = "https://docs.example.com/"
+LONG_TEXT = "Some documentation text. " * 20
+
+
+def _html(title: str, links: list[str], text: str = LONG_TEXT) -> str:
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return f"<html><head><title>{title}</title></head><body><p>{text}</p>{anchors}</body></html>"
+
+
+# "js" has almost no text in its static HTML and has to be rendered
+SITE = {
+    BASE_URL: _html("home", ["/a", "/js"]),
+    f"{BASE_URL}a": _html("a", ["/b", "/"]),
+    f"{BASE_URL}b": _html("b", []),
+    f"{BASE_URL}js": _html("js", [], text="Loading..."),
+}
+
+
+@pytest.fixture
+def mock_site() -> Iterator[tuple[list[httpx.Request], MagicMock, MagicMock]]:
+    requests_seen: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        if "If-Modified-Since" in request.headers and str(request.url) != (
+            f"{BASE_URL}b"
+        ):
+            return httpx.Response(304)
+        body = SITE.get(str(request.url))
+        if body is None:
+            return httpx.Response(404, text="not found")
+        return httpx.Response(
+            200, text=body, headers={"content-type": "text/html; charset=utf-8"}
+        )
+
+    def _render_page(
+        self: WebConnector,
+        context: Any,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult:
+        result = ScrapeResult(initial_url)
+        result.doc = MagicMock(id=initial_url)
+        return result
+
+    mock_redis = MagicMock()
+    mock_redis.smembers.return_value = set()
+    with (
+        patch.object(web_connector, "check_internet_connection"),
+        patch.object(
+            web_connector,
+            "build_http_client",
+            side_effect=lambda: httpx.Client(
+                transport=httpx.MockTransport(_handler), follow_redirects=True
+            ),
+        ),
+        patch.object(
+            web_connector, "start_playwright", return_value=(MagicMock(), MagicMock())
+        ) as mock_start_playwright,
+        patch.object(WebConnector, "_render_page", _render_page),
+        patch.object(web_connector, "get_redis_client", return_value=mock_redis),
+    ):
+        yield requests_seen, mock_start_playwright, mock_redis
+
+
+def _doc_ids(batches: Iterator[list[Any]]) -> list[str]:
+    return sorted(doc.id for batch in batches for doc in batch)
+
+
+def test_recursive_crawl_uses_fast_path_and_browser_fallback(
+    mock_site: tuple[list[httpx.Request], MagicMock, MagicMock],
+) -> None:
+    requests_seen, mock_start_playwright, mock_redis = mock_site
+    connector = WebConnector(
+        base_url=BASE_URL,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        batch_size=2,
+    )
+
+    assert _doc_ids(connector.load_from_state()) == [
+        BASE_URL,
+        f"{BASE_URL}a",
+        f"{BASE_URL}b",
+        f"{BASE_URL}js",
+    ]
+    # every page is fetched once, only the one without static text is rendered
+    assert sorted(str(request.url) for request in requests_seen) == sorted(SITE)
+    assert mock_start_playwright.call_count == 1
+    assert not any("If-Modified-Since" in request.headers for request in requests_seen)
+
+    # the pages are remembered for later polls
+    saved_urls = {
+        url
+        for call in mock_redis.pipeline().sadd.call_args_list
+        for url in call.args[1:]
+    }
+    assert saved_urls == set(SITE)
+    # pipelines don't add the tenant prefix by themselves
+    saved_key = mock_redis.pipeline().sadd.call_args.args[0]
+    assert saved_key.startswith(f"{get_current_tenant_id()}:")
+
+
+def test_poll_skips_unmodified_pages(
+    mock_site: tuple[list[httpx.Request], MagicMock, MagicMock],
+) -> None:
+    requests_seen, mock_start_playwright, mock_redis = mock_site
+    # the home page and "a" are unchanged, so "b" can only be found through the
+    # urls remembered from the previous crawl
+    mock_redis.smembers.return_value = {f"{BASE_URL}b".encode(), BASE_URL.encode()}
+    connector = WebConnector(
+        base_url=BASE_URL,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+    )
+
+    assert _doc_ids(connector.poll_source(start=1_700_000_000, end=1_800_000_000)) == [
+        f"{BASE_URL}b"
+    ]
+    assert {str(request.url) for request in requests_seen} == {
+        BASE_URL,
+        f"{BASE_URL}b",
+    }
+    assert all(
+        request.headers["If-Modified-Since"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+        for request in requests_seen
+    )
+    mock_start_playwright.assert_not_called()
+
+    # nothing changed at all is not an error
+    mock_redis.smembers.return_value = set()
+    assert _doc_ids(connector.poll_source(start=1_700_000_000, end=1_800_000_000)) == []
+
+
+def test_host_throttle_limits_concurrency_per_host() -> None:
+    throttle = HostThrottle(max_concurrency=2, min_delay=0.02)
+    lock = threading.Lock()
+    running: dict[str, int] = {}
+    max_running: dict[str, int] = {}
+    starts: dict[str, list[float]] = {}
+
+    def _fetch(url: str) -> Callable[[], None]:
+        def _run() -> None:
+            host = url.split("/")[2]
+            with throttle.slot(url):
+                with lock:
+                    starts.setdefault(host, []).append(time.monotonic())
+                    running[host] = running.get(host, 0) + 1
+                    max_running[host] = max(max_running.get(host, 0), running[host])
+                time.sleep(0.05)
+                with lock:
+                    running[host] -= 1
+
+        return _run
+
+    threads = [
+        threading.Thread(target=_fetch(f"https://{host}/{i}"))
+        for host in ("a.com", "b.com")
+        for i in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_running == {"a.com": 2, "b.com": 2}
+    for host_starts in starts.values():
+        assert len(host_starts) == 5
+        # requests to the same host start at least min_delay apart
+        assert all(
+            later - earlier >= 0.019
+            for earlier, later in zip(host_starts, host_starts[1:])
+        )
@@ -0,0 +1,70 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.context.search import utils
+from onyx.context.search.utils import get_query_embeddings
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+def test_ttl_lru_cache() -> None:
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    # "b" is the least recently used entry
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    with patch("onyx.utils.ttl_lru_cache.time.monotonic", return_value=1e12):
+        assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_get_query_embeddings_cached() -> None:
+    search_settings = Mock(
+        id=1,
+        model_name="test-model",
+        provider_type=None,
+        normalize=True,
+        query_prefix="",
+        passage_prefix="",
+        reduced_dimension=None,
+    )
+
+    embedding_model = Mock()
+    embedding_model.encode.side_effect = lambda texts, text_type: [
+        [float(len(text))] for text in texts
+    ]
+
+    with (
+        patch.object(
+            utils,
+            "_QUERY_EMBEDDING_CACHE",
+            TTLLRUCache(max_size=16, ttl=60),
+        ),
+        patch.object(
+            utils, "get_current_search_settings", return_value=search_settings
+        ),
+        patch.object(
+            utils.EmbeddingModel, "from_db_model", return_value=embedding_model
+        ),
+    ):
+        assert get_query_embeddings(["hello", " hello ", "hi"], Mock()) == [
+            [5.0],
+            [5.0],
+            [2.0],
+        ]
+        # whitespace only differences are embedded once
+        embedding_model.encode.assert_called_once()
+        assert embedding_model.encode.call_args.args[0] == ["hello", "hi"]
+
+        # served from the cache without calling the model
+        embedding_model.encode.reset_mock()
+        assert get_query_embeddings(["hi", "hello"], Mock()) == [[2.0], [5.0]]
+        embedding_model.encode.assert_not_called()
+
+        assert get_query_embeddings(["hi", "new query"], Mock()) == [[2.0], [9.0]]
+        assert embedding_model.encode.call_args.args[0] == ["new query"]
@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.connectors.models import IndexingDocument
+from onyx.connectors.models import TextSection
+from onyx.context.search.federated import slack_search
+from onyx.context.search.federated.models import SlackMessage
+from onyx.context.search.federated.slack_search import _chunk_with_cache
+from onyx.context.search.federated.slack_search import get_contextualized_thread_text
+from onyx.db.document import DocumentSource
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+
+
+def _slack_message(message_id: str) -> SlackMessage:
+    return SlackMessage(
+        document_id=f"C1_{message_id}",
+        channel_id="C1",
+        message_id=message_id,
+        thread_id="100.0",
+        link="https://slack.com/archives/C1/p1?thread_ts=100.0",
+        metadata={},
+        timestamp=datetime.now(),
+        recency_bias=1.0,
+        semantic_identifier="someone in #general: hi",
+        text="someone: hi",
+        highlighted_texts=set(),
+        slack_score=1.0,
+    )
+
+
+def _mock_slack_client(latest_reply: str) -> MagicMock:
+    def _conversations_replies(**kwargs: Any) -> MagicMock:
+        response = MagicMock()
+        messages = [
+            {
+                "ts": "100.0",
+                "user": "U1",
+                "text": "question",
+                "latest_reply": latest_reply,
+            },
+            {"ts": "101.0", "user": "U2", "text": "answer"},
+        ]
+        response.get.return_value = messages[: kwargs.get("limit") or len(messages)]
+        return response
+
+    def _users_profile_get(user: str) -> MagicMock:
+        response = MagicMock()
+        response.get.return_value = {"real_name": f"name-{user}"}
+        return response
+
+    slack_client = MagicMock()
+    slack_client.conversations_replies.side_effect = _conversations_replies
+    slack_client.users_profile_get.side_effect = _users_profile_get
+    return slack_client
+
+
+def test_thread_text_cached_until_latest_reply_changes() -> None:
+    slack_search._THREAD_TEXT_CACHE.clear()
+    slack_search._USER_NAME_CACHE.clear()
+    slack_client = _mock_slack_client(latest_reply="101.0")
+    message = _slack_message("101.0")
+
+    with patch.object(slack_search, "_get_slack_client", return_value=slack_client):
+        text = get_contextualized_thread_text(message, "token")
+        assert text == "name-U1: question\n\nReplies:\nname-U2: answer"
+        assert slack_client.conversations_replies.call_count == 1
+        assert slack_client.users_profile_get.call_count == 2
+
+        # reused without asking Slack while fresh
+        assert get_contextualized_thread_text(message, "token") == text
+        assert slack_client.conversations_replies.call_count == 1
+
+        with patch.object(slack_search, "SLACK_FEDERATED_THREAD_REVALIDATE_SECONDS", 0):
+            # unchanged latest reply: only the parent message is fetched
+            assert get_contextualized_thread_text(message, "token") == text
+            assert slack_client.conversations_replies.call_count == 2
+            assert slack_client.conversations_replies.call_args.kwargs["limit"] == 1
+
+            # new reply: the thread is fetched again, user names are still cached
+            slack_client.conversations_replies.side_effect = _mock_slack_client(
+                latest_reply="102.0"
+            ).conversations_replies.side_effect
+            get_contextualized_thread_text(message, "token")
+            assert slack_client.conversations_replies.call_count == 4
+            assert slack_client.users_profile_get.call_count == 2
+
+
+def test_chunks_reused_for_unchanged_documents() -> None:
+    slack_search._CHUNK_CACHE.clear()
+
+    def _index_doc(doc_id: str, text: str) -> IndexingDocument:
+        section = TextSection(text=text, link=None)
+        return IndexingDocument(
+            id=doc_id,
+            sections=[section],
+            processed_sections=[section],
+            source=DocumentSource.SLACK,
+            semantic_identifier=doc_id,
+            metadata={},
+        )
+
+    def _chunk(docs: list[IndexingDocument]) -> list[MagicMock]:
+        return [
+            MagicMock(source_document=doc, content=f"{doc.id}-{i}")
+            for doc in docs
+            for i in range(2)
+        ]
+
+    chunker = MagicMock(enable_contextual_rag=False)
+    chunker.chunk.side_effect = _chunk
+
+    first = _chunk_with_cache(chunker, [_index_doc("a", "x"), _index_doc("b", "y")], 1)
+    second = _chunk_with_cache(
+        chunker, [_index_doc("c", "z"), _index_doc("a", "x"), _index_doc("b", "new")], 1
+    )
+
+    assert [chunk.content for chunk in first] == ["a-0", "a-1", "b-0", "b-1"]
+    assert [chunk.content for chunk in second] == [
+        "c-0",
+        "c-1",
+        "a-0",
+        "a-1",
+        "b-0",
+        "b-1",
+    ]
+    assert second[2] is first[0]
+    # only the new and the changed documents are chunked again
+    assert [doc.id for doc in chunker.chunk.call_args.args[0]] == ["c", "b"]
+
+    # search settings ids are reused across tenants
+    token = CURRENT_TENANT_ID_CONTEXTVAR.set("other_tenant")
+    try:
+        other_tenant = _chunk_with_cache(chunker, [_index_doc("a", "x")], 1)
+    finally:
+        CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+    assert other_tenant[0] is not first[0]
+    assert [doc.id for doc in chunker.chunk.call_args.args[0]] == ["a"]
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from onyx.configs.constants import MessageType
+from onyx.db import chat
+from onyx.db.chat import create_new_chat_message
+from onyx.server.query_and_chat import token_limit
+
+
+def _save_message(db_session: MagicMock) -> None:
+    create_new_chat_message(
+        chat_session_id=uuid4(),
+        parent_message=MagicMock(id=1),
+        message="answer",
+        prompt_id=None,
+        token_count=42,
+        message_type=MessageType.ASSISTANT,
+        db_session=db_session,
+    )
+
+
+def test_token_usage_recorded_when_rate_limit_cache_is_stale() -> None:
+    """A rate limit created through another process isn't known to this one, its
+    messages must still be counted"""
+    chat._USER_GROUP_IDS_CACHE.clear()
+    user_id = uuid4()
+    db_session = MagicMock()
+    db_session.get.return_value = MagicMock(user_id=user_id)
+    fetch_user_group_ids = MagicMock(return_value=[7])
+
+    with (
+        patch.object(token_limit, "any_rate_limit_exists", return_value=False),
+        patch.object(
+            chat,
+            "fetch_versioned_implementation",
+            return_value=fetch_user_group_ids,
+        ),
+        patch.object(chat, "record_token_usage") as record_token_usage,
+    ):
+        _save_message(db_session)
+        _save_message(db_session)
+
+    assert record_token_usage.call_count == 2
+    record_token_usage.assert_called_with(42, user_id, [7])
+    # the groups of the user are only looked up once
+    fetch_user_group_ids.assert_called_once_with(db_session, user_id)
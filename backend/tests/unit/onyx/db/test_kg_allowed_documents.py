@@ -0,0 +1,178 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Delete
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import TextClause
+
+from onyx.db import kg_allowed_documents
+from onyx.db.kg_allowed_documents import get_kg_views_session
+from onyx.db.kg_allowed_documents import refresh_kg_user_allowed_documents
+from onyx.db.models import KGPublicAllowedDocument
+from onyx.db.models import KGPublicAllowedDocumentsState
+from onyx.db.models import KGUserAllowedDocument
+from onyx.db.models import KGUserAllowedDocumentsState
+
+
+State = KGUserAllowedDocumentsState | KGPublicAllowedDocumentsState
+
+
+def _refresh(
+    user_state: KGUserAllowedDocumentsState | None,
+    public_state: KGPublicAllowedDocumentsState | None = None,
+) -> dict[str, list[str]]:
+    """Runs a refresh and returns the statements it modified the allowed documents
+    with, by table"""
+    db_session = MagicMock()
+    states: dict[type, State | None] = {
+        KGUserAllowedDocumentsState: user_state,
+        KGPublicAllowedDocumentsState: public_state,
+    }
+    db_session.get.side_effect = lambda model, _id: states[model]
+    with (
+        patch.object(
+            kg_allowed_documents, "_fetch_acl_fingerprint", return_value="acl"
+        ),
+        patch.object(
+            kg_allowed_documents, "_fetch_public_acl_fingerprint", return_value="acl"
+        ),
+    ):
+        refresh_kg_user_allowed_documents(db_session, uuid4(), "user@example.com")
+
+    # the public documents are committed on their own
+    assert db_session.commit.call_count == 2
+    statements: list[Any] = [call.args[0] for call in db_session.execute.call_args_list]
+    table_names = [
+        KGUserAllowedDocument.__tablename__,
+        KGPublicAllowedDocument.__tablename__,
+    ]
+    return {
+        table_name: [
+            str(statement.compile(dialect=postgresql.dialect()))
+            for statement in statements
+            if isinstance(statement, (Delete, Insert))
+            and str(statement.table) == table_name
+        ]
+        for table_name in table_names
+    }
+
+
+def _recent() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def _too_old() -> datetime:
+    return datetime.now(tz=timezone.utc) - timedelta(days=30)
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        None,
+        # the access of the user changed
+        KGUserAllowedDocumentsState(acl_fingerprint="old acl", refreshed_at=_recent()),
+        # too old to be trusted
+        KGUserAllowedDocumentsState(acl_fingerprint="acl", refreshed_at=_too_old()),
+    ],
+)
+def test_refresh_rebuilds_all_allowed_documents(
+    state: KGUserAllowedDocumentsState | None,
+) -> None:
+    delete_stmt, insert_stmt = _refresh(state)[KGUserAllowedDocument.__tablename__]
+    assert "last_modified" not in delete_stmt
+    assert "last_modified" not in insert_stmt
+    # the public documents are kept once, not for every user
+    assert "is_public" not in insert_stmt
+
+
+def test_refresh_only_recomputes_changed_documents() -> None:
+    delete_stmt, insert_stmt = _refresh(
+        KGUserAllowedDocumentsState(acl_fingerprint="acl", refreshed_at=_recent())
+    )[KGUserAllowedDocument.__tablename__]
+    for statement in (delete_stmt, insert_stmt):
+        assert "document.last_modified >" in statement
+        assert "kg_entity.time_updated >" in statement
+
+
+@pytest.mark.parametrize(
+    "public_state,only_changed",
+    [
+        (None, False),
+        (
+            KGPublicAllowedDocumentsState(
+                acl_fingerprint="old acl", refreshed_at=_recent()
+            ),
+            False,
+        ),
+        (
+            KGPublicAllowedDocumentsState(
+                acl_fingerprint="acl", refreshed_at=_too_old()
+            ),
+            False,
+        ),
+        (
+            KGPublicAllowedDocumentsState(
+                acl_fingerprint="acl", refreshed_at=_recent()
+            ),
+            True,
+        ),
+    ],
+)
+def test_refresh_public_documents(
+    public_state: KGPublicAllowedDocumentsState | None, only_changed: bool
+) -> None:
+    user_state = KGUserAllowedDocumentsState(
+        acl_fingerprint="acl", refreshed_at=_recent()
+    )
+    delete_stmt, insert_stmt = _refresh(user_state, public_state)[
+        KGPublicAllowedDocument.__tablename__
+    ]
+    assert "is_public" in insert_stmt
+    for statement in (delete_stmt, insert_stmt):
+        assert ("document.last_modified >" in statement) == only_changed
+
+
+def test_kg_views_session_is_read_only_and_rolled_back() -> None:
+    readonly_session = MagicMock()
+    readonly_session.scalar.return_value = 4242
+    db_session = MagicMock()
+    user_id = uuid4()
+    with (
+        patch.object(
+            kg_allowed_documents, "get_db_readonly_user_session_with_current_tenant"
+        ) as get_readonly_session,
+        patch.object(
+            kg_allowed_documents, "get_session_with_current_tenant"
+        ) as get_session,
+    ):
+        get_readonly_session.return_value.__enter__.return_value = readonly_session
+        get_session.return_value.__enter__.return_value = db_session
+        with pytest.raises(RuntimeError):
+            with get_kg_views_session(user_id):
+                raise RuntimeError("generated SQL failed")
+
+    # the readonly session doesn't choose the user of the views itself
+    (read_only,) = [call.args[0] for call in readonly_session.execute.call_args_list]
+    assert isinstance(read_only, TextClause)
+    assert read_only.text == "SET TRANSACTION READ ONLY"
+    readonly_session.rollback.assert_called_once()
+    readonly_session.commit.assert_not_called()
+
+    # the user is recorded for the connection by a regular session, and removed after
+    set_user, unset_user = [
+        call.args[0].compile(dialect=postgresql.dialect())
+        for call in db_session.execute.call_args_list
+    ]
+    assert str(set_user).startswith("INSERT INTO kg_views_user")
+    assert set_user.params["backend_pid"] == 4242
+    assert set_user.params["user_id"] == user_id
+    assert str(unset_user).startswith("DELETE FROM kg_views_user")
+    assert unset_user.params["backend_pid_1"] == 4242
+    assert db_session.commit.call_count == 2
@@ -0,0 +1,91 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import httpx
+
+from onyx.document_index.vespa.feed_client import FeedOperation
+from onyx.document_index.vespa.feed_client import FeedOperationType
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+
+
+def _op(
+    document_id: str, operation_type: FeedOperationType = FeedOperationType.PUT
+) -> FeedOperation:
+    return FeedOperation(
+        operation_type=operation_type,
+        url=f"http://vespa/document/v1/{document_id}",
+        document_id=document_id,
+        body={"fields": {}} if operation_type != FeedOperationType.REMOVE else None,
+    )
+
+
+def _response(status_code: int) -> httpx.Response:
+    return httpx.Response(status_code, request=httpx.Request("POST", "http://vespa"))
+
+
+def test_feed_client_results() -> None:
+    attempts: dict[str, int] = {}
+
+    def _request(method: str, url: str, **kwargs: object) -> httpx.Response:
+        document_id = url.rsplit("/", 1)[-1]
+        attempts[document_id] = attempts.get(document_id, 0) + 1
+        if document_id == "throttled" and attempts[document_id] < 3:
+            return _response(429)
+        if document_id == "server_error" and attempts[document_id] < 2:
+            return _response(502)
+        if document_id == "reset" and attempts[document_id] < 2:
+            raise httpx.ReadError("connection reset by peer")
+        if document_id == "missing":
+            return _response(404)
+        if document_id == "bad":
+            return _response(400)
+        return _response(200)
+
+    http_client = Mock()
+    http_client.request.side_effect = _request
+
+    operations = [
+        _op("ok"),
+        _op("throttled"),
+        _op("server_error"),
+        _op("reset"),
+        _op("missing", FeedOperationType.REMOVE),
+        _op("bad"),
+    ]
+    with patch("onyx.document_index.vespa.feed_client.time.sleep"):
+        results = VespaFeedClient(http_client, max_retries=5).feed(operations)
+
+    # one result per operation, in order
+    assert [result.operation for result in results] == operations
+    assert [result.success for result in results] == [True] * 5 + [False]
+
+    # throttled operations, server and transport errors are retried, client errors
+    # are not
+    assert attempts == {
+        "ok": 1,
+        "throttled": 3,
+        "server_error": 2,
+        "reset": 2,
+        "missing": 1,
+        "bad": 1,
+    }
+    assert results[5].status_code == 400
+
+    methods = {
+        call.args[1].rsplit("/", 1)[-1]: call.args[0]
+        for call in http_client.request.call_args_list
+    }
+    assert methods["missing"] == "DELETE"
+    assert methods["ok"] == "POST"
+
+
+def test_feed_client_gives_up_after_max_retries() -> None:
+    http_client = Mock()
+    http_client.request.side_effect = httpx.ConnectError("connection refused")
+
+    with patch("onyx.document_index.vespa.feed_client.time.sleep"):
+        results = VespaFeedClient(http_client, max_retries=2).feed([_op("doc")])
+
+    assert http_client.request.call_count == 3
+    assert not results[0].success
+    assert results[0].status_code is None
@@ -0,0 +1,161 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.access.models import DocumentAccess
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.document_index.document_index_utils import get_uuid_from_chunk
+from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo
+from onyx.document_index.vespa.index import VespaIndex
+from onyx.document_index.vespa.indexing_utils import build_vespa_chunk_fields
+from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
+from onyx.document_index.vespa_constants import CONTENT_HASH
+from onyx.document_index.vespa_constants import DOCUMENT_SETS
+from onyx.document_index.vespa_constants import METADATA_HASH
+from onyx.indexing.models import ChunkEmbedding
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+
+
+def _make_chunk(
+    chunk_id: int, content: str, document_sets: set[str]
+) -> DocMetadataAwareIndexChunk:
+    document = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        sections=[TextSection(text=content, link="link")],
+    )
+    return DocMetadataAwareIndexChunk(
+        chunk_id=chunk_id,
+        blurb=content,
+        content=content,
+        source_links={0: "link"},
+        section_continuation=False,
+        source_document=document,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_reference_ids=[],
+        large_chunk_id=None,
+        image_file_id=None,
+        chunk_context="",
+        doc_summary="",
+        contextual_rag_reserved_tokens=0,
+        embeddings=ChunkEmbedding(full_embedding=[0.1, 0.2], mini_chunk_embeddings=[]),
+        title_embedding=[0.3, 0.4],
+        tenant_id="public",
+        access=DocumentAccess.build(
+            user_emails=["a@example.com"],
+            user_groups=[],
+            external_user_emails=[],
+            external_user_group_ids=[],
+            is_public=False,
+        ),
+        document_sets=document_sets,
+        user_file=None,
+        user_folder=None,
+        boost=0,
+        aggregated_chunk_boost_factor=1.0,
+    )
+
+
+def test_chunk_field_hashes() -> None:
+    chunk = _make_chunk(0, "some content", {"set_a"})
+    fields = build_vespa_chunk_fields(chunk, multitenant=False)
+
+    # embeddings don't contribute to the hash
+    different_embedding = chunk.model_copy(
+        update={
+            "embeddings": ChunkEmbedding(
+                full_embedding=[0.5, 0.6], mini_chunk_embeddings=[]
+            )
+        }
+    )
+    assert build_vespa_chunk_fields(different_embedding, multitenant=False) == {
+        **fields,
+        "embeddings": {"full_chunk": [0.5, 0.6]},
+    }
+
+    # metadata only changes keep the content hash
+    new_doc_set_fields = build_vespa_chunk_fields(
+        _make_chunk(0, "some content", {"set_b"}), multitenant=False
+    )
+    assert new_doc_set_fields[CONTENT_HASH] == fields[CONTENT_HASH]
+    assert new_doc_set_fields[METADATA_HASH] != fields[METADATA_HASH]
+
+    new_content_fields = build_vespa_chunk_fields(
+        _make_chunk(0, "other content", {"set_a"}), multitenant=False
+    )
+    assert new_content_fields[CONTENT_HASH] != fields[CONTENT_HASH]
+    assert new_content_fields[METADATA_HASH] == fields[METADATA_HASH]
+
+
+def test_diff_against_indexed_chunks() -> None:
+    previous_chunks = [
+        _make_chunk(0, "unchanged", {"set_a"}),
+        _make_chunk(1, "edited paragraph", {"set_a"}),
+        _make_chunk(2, "metadata only", {"set_a"}),
+    ]
+    existing_hashes = {}
+    for chunk in previous_chunks:
+        fields = build_vespa_chunk_fields(chunk, multitenant=False)
+        existing_hashes[get_uuid_from_chunk(chunk)] = (
+            fields[CONTENT_HASH],
+            fields[METADATA_HASH],
+        )
+
+    new_chunks = [
+        _make_chunk(0, "unchanged", {"set_a"}),
+        _make_chunk(1, "edited paragraph, now longer", {"set_a"}),
+        _make_chunk(2, "metadata only", {"set_b"}),
+        _make_chunk(3, "brand new chunk", {"set_a"}),
+    ]
+
+    vespa_index = VespaIndex(
+        index_name="test_index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+    )
+    executor = Mock()
+    executor.map.side_effect = lambda func, items: [func(item) for item in items]
+    with patch(
+        "onyx.document_index.vespa.index.get_existing_chunk_hashes",
+        return_value=existing_hashes,
+    ) as mock_get_hashes:
+        chunks_to_feed, chunk_id_to_updated_fields = (
+            vespa_index._diff_against_indexed_chunks(
+                cleaned_chunks=new_chunks,
+                enriched_doc_infos=[
+                    EnrichedDocumentIndexingInfo(
+                        doc_id="test_doc",
+                        chunk_start_index=4,
+                        chunk_end_index=3,
+                        old_version=False,
+                    )
+                ],
+                tenant_id="public",
+                http_client=Mock(),
+                executor=executor,
+            )
+        )
+
+    mock_get_hashes.assert_called_once()
+    assert [chunk.chunk_id for chunk in chunks_to_feed] == [1, 3]
+
+    assert list(chunk_id_to_updated_fields.keys()) == [
+        get_uuid_from_chunk(new_chunks[2])
+    ]
+    document_id, updated_fields = chunk_id_to_updated_fields[
+        get_uuid_from_chunk(new_chunks[2])
+    ]
+    assert document_id == "test_doc"
+    assert updated_fields[DOCUMENT_SETS] == {"set_b": 1}
+    assert updated_fields[ACCESS_CONTROL_LIST] == {"user_email:a@example.com": 1}
+    assert (
+        updated_fields[METADATA_HASH]
+        == build_vespa_chunk_fields(new_chunks[2], multitenant=False)[METADATA_HASH]
+    )
@@ -0,0 +1,73 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from onyx.document_index.interfaces import DocumentFieldsUpdate
+from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.vespa.feed_client import FeedOperation
+from onyx.document_index.vespa.feed_client import FeedResult
+from onyx.document_index.vespa.index import VespaIndex
+from onyx.document_index.vespa_constants import DOCUMENT_SETS
+from onyx.document_index.vespa_constants import HIDDEN
+
+
+def test_update_multiple() -> None:
+    vespa_index = VespaIndex(
+        index_name="test_index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+        httpx_client=Mock(),
+    )
+
+    fed_operations: list[FeedOperation] = []
+
+    def _feed(operations: list[FeedOperation]) -> list[FeedResult]:
+        fed_operations.extend(operations)
+        return [
+            FeedResult(
+                operation=operation,
+                status_code=500 if operation.document_id == "doc_2" else 200,
+                error="boom" if operation.document_id == "doc_2" else None,
+            )
+            for operation in operations
+        ]
+
+    with patch("onyx.document_index.vespa.index.VespaFeedClient") as mock_client:
+        mock_client.return_value.feed.side_effect = _feed
+        doc_id_to_chunk_count = vespa_index.update_multiple(
+            [
+                DocumentFieldsUpdate(
+                    doc_id="doc_1",
+                    chunk_count=3,
+                    fields=VespaDocumentFields(document_sets={"set_a"}),
+                ),
+                DocumentFieldsUpdate(
+                    doc_id="doc_2",
+                    chunk_count=2,
+                    fields=VespaDocumentFields(hidden=True),
+                ),
+                DocumentFieldsUpdate(
+                    doc_id="doc_3",
+                    chunk_count=0,
+                    fields=VespaDocumentFields(hidden=False),
+                ),
+            ],
+            tenant_id="public",
+        )
+
+    # all updates go out in a single feed
+    mock_client.return_value.feed.assert_called_once()
+    assert [operation.document_id for operation in fed_operations] == [
+        "doc_1",
+        "doc_1",
+        "doc_1",
+        "doc_2",
+        "doc_2",
+    ]
+    assert fed_operations[0].body == {
+        "fields": {DOCUMENT_SETS: {"assign": {"set_a": 1}}}
+    }
+    assert fed_operations[3].body == {"fields": {HIDDEN: {"assign": True}}}
+
+    # the failed document is left out
+    assert doc_id_to_chunk_count == {"doc_1": 3, "doc_3": 0}
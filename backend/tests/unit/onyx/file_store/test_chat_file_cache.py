@@ -0,0 +1,95 @@
+import io
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.file_store import utils as file_store_utils
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.models import FileDescriptor
+from onyx.file_store.utils import load_all_chat_files
+from onyx.file_store.utils import load_user_file
+from onyx.file_store.utils import store_user_file_plaintext
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+def _descriptor(file_id: str) -> FileDescriptor:
+    return {"id": file_id, "type": ChatFileType.PLAIN_TEXT, "name": f"{file_id}.txt"}
+
+
+def test_chat_files_only_loaded_once_per_conversation() -> None:
+    file_store_utils._FILE_CONTENT_CACHE.clear()
+    file_store = MagicMock()
+    file_store.read_file.side_effect = lambda file_id, mode: io.BytesIO(
+        f"content of {file_id}".encode()
+    )
+
+    def _message(*file_ids: str) -> Any:
+        return MagicMock(files=[_descriptor(file_id) for file_id in file_ids])
+
+    with patch.object(
+        file_store_utils, "get_default_file_store", return_value=file_store
+    ):
+        first_turn = load_all_chat_files([], [_descriptor("a"), _descriptor("b")])
+        assert [file.content for file in first_turn] == [
+            b"content of a",
+            b"content of b",
+        ]
+
+        # later turns include the files of the whole history again
+        second_turn = load_all_chat_files(
+            [_message("a", "b"), _message("a")], [_descriptor("c")]
+        )
+
+    assert [file.file_id for file in second_turn] == ["c", "a", "b", "a"]
+    assert second_turn[1].content == b"content of a"
+    assert second_turn[1].filename == "a.txt"
+    assert sorted(call.args[0] for call in file_store.read_file.call_args_list) == [
+        "a",
+        "b",
+        "c",
+    ]
+
+
+def test_user_file_plaintext_is_reloaded_after_reindexing() -> None:
+    file_store_utils._FILE_CONTENT_CACHE.clear()
+    files: dict[str, bytes] = {}
+    file_store = MagicMock()
+    file_store.read_file_record.return_value = MagicMock(file_type="application/pdf")
+    file_store.read_file.side_effect = lambda file_id, mode: io.BytesIO(files[file_id])
+    file_store.save_file.side_effect = lambda content, file_id, **kwargs: (
+        files.__setitem__(file_id, content.read())
+    )
+    user_file = MagicMock(id=1, file_id="upload")
+    user_file.name = "report.pdf"
+    db_session = MagicMock()
+    db_session.query.return_value.filter.return_value.first.return_value = user_file
+
+    with patch.object(
+        file_store_utils, "get_default_file_store", return_value=file_store
+    ):
+        assert store_user_file_plaintext(1, "first version")
+        assert load_user_file(1, db_session).content == b"first version"
+
+        # reindexing the file overwrites its plaintext
+        assert store_user_file_plaintext(1, "second version")
+        chat_file = load_user_file(1, db_session)
+
+    assert chat_file.content == b"second version"
+    assert chat_file.file_type == ChatFileType.PLAIN_TEXT
+
+
+def test_weighted_cache_evicts_least_recently_used() -> None:
+    cache: TTLLRUCache[str, bytes] = TTLLRUCache(max_size=10, ttl=60, weigh=len)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+
+    cache.set("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == b"1234"
+    assert cache.total_size == 8
+
+    # too large to ever be cached
+    cache.set("d", b"12345678901")
+    assert cache.get("d") is None
+    assert len(cache) == 2
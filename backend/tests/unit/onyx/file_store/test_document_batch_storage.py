@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from io import BytesIO
+from typing import IO
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.db.file_record import FileRecordNotFoundError
+from onyx.file_store.document_batch_storage import FileStoreDocumentBatchStorage
+
+
+def _file_store(
+    files: dict[str, bytes], temp_files: list[str] | None = None
+) -> MagicMock:
+    temp_files = temp_files if temp_files is not None else []
+
+    def _save_file(content: IO, file_id: str, **kwargs: object) -> str:
+        files[file_id] = content.read()
+        return file_id
+
+    def _read_file(
+        file_id: str, use_tempfile: bool = False, **kwargs: object
+    ) -> IO[bytes]:
+        if file_id not in files:
+            raise FileRecordNotFoundError(
+                f"File by id {file_id} does not exist or was deleted"
+            )
+        if not use_tempfile:
+            return BytesIO(files[file_id])
+        temp_file = tempfile.NamedTemporaryFile(mode="w+b", delete=False)
+        temp_file.write(files[file_id])
+        temp_file.seek(0)
+        temp_files.append(temp_file.name)
+        return temp_file
+
+    file_store = MagicMock()
+    file_store.save_file.side_effect = _save_file
+    file_store.read_file.side_effect = _read_file
+    return file_store
+
+
+def _document(doc_id: str) -> Document:
+    return Document(
+        id=doc_id,
+        sections=[TextSection(text=f"text of {doc_id} " * 100, link=None)],
+        source=DocumentSource.WEB,
+        semantic_identifier=doc_id,
+        metadata={"tag": ["a", "b"]},
+    )
+
+
+def test_batch_round_trip() -> None:
+    files: dict[str, bytes] = {}
+    temp_files: list[str] = []
+    storage = FileStoreDocumentBatchStorage(1, 2, _file_store(files, temp_files))
+    documents = [_document(f"doc-{i}") for i in range(50)]
+
+    storage.store_batch(0, documents)
+
+    (data,) = files.values()
+    assert len(data) < len(
+        json.dumps([doc.model_dump(mode="json") for doc in documents])
+    )
+    assert storage.get_batch(0) == documents
+    assert storage.get_batch(1) is None
+
+    # the batch is read through a temporary file, which is cleaned up afterwards
+    assert len(temp_files) == 1
+    assert not os.path.exists(temp_files[0])
+
+
+def test_other_read_errors_are_raised() -> None:
+    file_store = MagicMock()
+    file_store.read_file.side_effect = RuntimeError("S3 bucket name is required")
+    storage = FileStoreDocumentBatchStorage(1, 2, file_store)
+
+    with pytest.raises(RuntimeError):
+        storage.get_batch(0)
+
+
+def test_reads_legacy_json_batch() -> None:
+    files: dict[str, bytes] = {}
+    storage = FileStoreDocumentBatchStorage(1, 2, _file_store(files))
+    documents = [_document("doc-1"), _document("doc-2")]
+    files[storage._get_batch_file_name(0)] = json.dumps(
+        [doc.model_dump(mode="json") for doc in documents], indent=2
+    ).encode("utf-8")
+
+    assert storage.get_batch(0) == documents
+
+
+def test_truncated_batch_raises() -> None:
+    storage = FileStoreDocumentBatchStorage(1, 2, _file_store({}))
+    data = storage._serialize_documents([_document("doc-1"), _document("doc-2")])
+    with pytest.raises(ValueError):
+        list(storage._deserialize_documents(BytesIO(data[: len(data) - 8])))
@@ -8,7 +8,9 @@ from onyx.configs.app_configs import USE_DOCUMENT_SUMMARY
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
+from onyx.indexing import chunker as chunker_module
 from onyx.indexing.chunker import Chunker
+from onyx.indexing.chunker import shutdown_chunking_pools
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_pipeline import process_image_sections
 from onyx.llm.utils import MAX_CONTEXT_TOKENS
@@ -105,3 +107,48 @@ def test_chunker_heartbeat(
 
     assert mock_heartbeat.call_count == 1
     assert len(chunks) > 0
+
+
+def test_chunk_documents_in_process_pool(embedder: DefaultIndexingEmbedder) -> None:
+    documents = [
+        Document(
+            id=f"test_doc_{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Test Document {i}",
+            metadata={"tags": ["tag1", "tag2"]},
+            doc_updated_at=None,
+            sections=[
+                TextSection(text=f"Short section {i}.", link="link1"),
+                TextSection(
+                    text="A long section that gets split. " * (50 * i), link="link2"
+                ),
+                TextSection(text="Final short section.", link="link3"),
+            ],
+        )
+        for i in range(4)
+    ]
+    indexing_documents = process_image_sections(documents)
+
+    serial_chunker = Chunker(
+        tokenizer=embedder.embedding_model.tokenizer, num_processes=1
+    )
+    parallel_chunker = Chunker(
+        tokenizer=embedder.embedding_model.tokenizer,
+        num_processes=2,
+        callback=MockHeartbeat(),
+    )
+
+    serial_chunks = serial_chunker.chunk(indexing_documents)
+    parallel_chunks = parallel_chunker.chunk(indexing_documents)
+
+    assert len(parallel_chunks) == len(serial_chunks)
+    for serial_chunk, parallel_chunk in zip(serial_chunks, parallel_chunks):
+        assert parallel_chunk.model_dump() == serial_chunk.model_dump()
+    # chunks reference the original document objects
+    assert parallel_chunks[0].source_document is indexing_documents[0]
+
+    # the pools are stopped on shutdown and recreated when needed again
+    shutdown_chunking_pools()
+    assert not chunker_module._CHUNKING_POOLS
+    assert len(parallel_chunker.chunk(indexing_documents)) == len(serial_chunks)
+    shutdown_chunking_pools()
@@ -1,4 +1,5 @@
 from collections.abc import Generator
+from typing import Any
 from unittest.mock import Mock
 from unittest.mock import patch
 
@@ -98,8 +99,104 @@ def test_default_indexing_embedder_embed_chunks(
     )
     # Same for title only embedding call
     mock_embedding_model.return_value.encode.assert_any_call(
-        ["Test Document"],
+        texts=["Test Document"],
         text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
         tenant_id=None,
         request_id=None,
     )
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.store[key] = value
+
+    def pipeline(self, transaction: bool = True) -> "_FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+
+def _make_chunk(doc: Document, chunk_id: int, content: str) -> DocAwareChunk:
+    return DocAwareChunk(
+        chunk_id=chunk_id,
+        blurb=content,
+        content=content,
+        source_links={0: "link1"},
+        section_continuation=False,
+        source_document=doc,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_reference_ids=[],
+        large_chunk_id=None,
+        image_file_id=None,
+        chunk_context="",
+        doc_summary="",
+        contextual_rag_reserved_tokens=0,
+    )
+
+
+def test_default_indexing_embedder_embedding_cache(mock_embedding_model: Mock) -> None:
+    fake_redis = _FakeRedis()
+
+    def fake_encode(texts: list[str], **kwargs: Any) -> list[list[float]]:
+        return [[float(len(text)), 1.0] for text in texts]
+
+    mock_embedding_model.return_value.encode.side_effect = fake_encode
+
+    embedder = DefaultIndexingEmbedder(
+        model_name="test-model",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        provider_type=EmbeddingProvider.OPENAI,
+        use_embedding_cache=True,
+    )
+    doc = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text="irrelevant", link="link1")],
+    )
+
+    with patch(
+        "onyx.natural_language_processing.embedding_cache.get_redis_client",
+        return_value=fake_redis,
+    ):
+        first = embedder.embed_chunks(
+            [_make_chunk(doc, 0, "unchanged"), _make_chunk(doc, 1, "unchanged")],
+            tenant_id="tenant",
+        )
+        # chunk text + title, duplicate chunk text only embedded once
+        assert len(fake_redis.store) == 2
+        mock_embedding_model.return_value.encode.reset_mock()
+
+        second = embedder.embed_chunks(
+            [_make_chunk(doc, 0, "unchanged"), _make_chunk(doc, 1, "new text")],
+            tenant_id="tenant",
+        )
+
+    # Only the changed chunk text reaches the embedding model
+    mock_embedding_model.return_value.encode.assert_called_once_with(
+        texts=["new text"],
+        text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
+        tenant_id="tenant",
+        request_id=None,
+    )
+    assert first[0].embeddings.full_embedding == [9.0, 1.0]
+    assert first[1].embeddings.full_embedding == [9.0, 1.0]
+    assert second[0].embeddings == first[0].embeddings
+    assert second[1].embeddings.full_embedding == [8.0, 1.0]
+    assert second[1].title_embedding == first[1].title_embedding == [13.0, 1.0]
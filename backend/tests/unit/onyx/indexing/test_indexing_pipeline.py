@@ -1,3 +1,5 @@
+import threading
+import time
 from typing import Any
 from typing import cast
 from typing import List
@@ -15,7 +17,12 @@ from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_pipeline import _get_aggregated_chunk_boost_factor
 from onyx.indexing.indexing_pipeline import add_contextual_summaries
+from onyx.indexing.indexing_pipeline import DocumentBatchPrepareContext
+from onyx.indexing.indexing_pipeline import EmbeddedDocumentBatch
 from onyx.indexing.indexing_pipeline import filter_documents
+from onyx.indexing.indexing_pipeline import group_chunks_by_document
+from onyx.indexing.indexing_pipeline import index_doc_batch
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
 from onyx.indexing.indexing_pipeline import process_image_sections
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import IndexChunk
@@ -338,3 +345,92 @@ def test_contextual_rag(
             count += 1
         assert chunk.doc_summary == doc_summary
         assert chunk.chunk_context == chunk_context
+
+
+def test_index_doc_batch_pipelined_sub_batches() -> None:
+    """Sub-batches are embedded ahead of the writes, every document is written as
+    part of exactly one sub-batch and skipped documents are marked with the last."""
+    documents = [create_test_document(doc_id=f"doc_{i}") for i in range(5)]
+    skipped = create_test_document(doc_id="up_to_date")
+    events: list[str] = []
+    first_write_started = threading.Event()
+
+    def fake_embed(documents: list[Document], **kwargs: Any) -> EmbeddedDocumentBatch:
+        if documents[0].id == "doc_2":
+            # the second sub-batch is embedded while the first one is written
+            assert first_write_started.wait(timeout=5)
+        events.append(f"embed {[doc.id for doc in documents]}")
+        return EmbeddedDocumentBatch(
+            documents=documents,
+            chunks_with_embeddings=[],
+            chunk_content_scores=[],
+            embedding_failures=[],
+        )
+
+    def fake_write(
+        embedded_batch: EmbeddedDocumentBatch,
+        indexed_doc_ids: list[str],
+        **kwargs: Any,
+    ) -> IndexingPipelineResult:
+        first_write_started.set()
+        time.sleep(0.2)
+        events.append(f"write {indexed_doc_ids}")
+        return IndexingPipelineResult(
+            new_docs=1,
+            total_docs=len(indexed_doc_ids),
+            total_chunks=len(embedded_batch.documents),
+            failures=[],
+        )
+
+    ctx = DocumentBatchPrepareContext(updatable_docs=documents, id_to_db_doc_map={})
+    with (
+        patch(
+            "onyx.indexing.indexing_pipeline.index_doc_batch_prepare",
+            return_value=ctx,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.get_default_llms",
+            side_effect=Exception("no LLM"),
+        ),
+        patch("onyx.indexing.indexing_pipeline._embed_documents", fake_embed),
+        patch("onyx.indexing.indexing_pipeline._write_embedded_documents", fake_write),
+        patch("onyx.indexing.indexing_pipeline.INDEXING_PIPELINE_SUB_BATCH_SIZE", 2),
+    ):
+        result = index_doc_batch(
+            document_batch=documents + [skipped],
+            chunker=Mock(),
+            embedder=Mock(),
+            information_content_classification_model=Mock(),
+            document_index=Mock(),
+            index_attempt_metadata=Mock(),
+            db_session=Mock(),
+            tenant_id="tenant",
+        )
+
+    writes = [event for event in events if event.startswith("write")]
+    assert writes == [
+        "write ['doc_0', 'doc_1']",
+        "write ['doc_2', 'doc_3']",
+        "write ['doc_4', 'up_to_date']",
+    ]
+    assert events.index("embed ['doc_2', 'doc_3']") < events.index(writes[0])
+    assert result.new_docs == 3
+    assert result.total_docs == 6
+    assert result.total_chunks == 5
+
+
+def test_group_chunks_by_document() -> None:
+    chunks = [
+        create_test_chunk("a0", 0, doc_id="a"),
+        create_test_chunk("b0", 0, doc_id="b"),
+        create_test_chunk("a1", 1, doc_id="a"),
+        create_test_chunk("a2", 2, doc_id="a"),
+    ]
+
+    grouped = group_chunks_by_document(chunks)
+
+    assert {
+        doc_id: [chunk.content for chunk in doc_chunks]
+        for doc_id, doc_chunks in grouped.items()
+    } == {"a": ["a0", "a1", "a2"], "b": ["b0"]}
+    assert "c" not in grouped
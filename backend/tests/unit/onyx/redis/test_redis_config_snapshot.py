@@ -0,0 +1,119 @@
+import json
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm import Session
+
+from onyx.db.models import IndexModelStatus
+from onyx.db.models import SearchSettings
+from onyx.db.search_settings import get_current_search_settings
+from onyx.redis import redis_config_snapshot
+from onyx.redis.redis_config_snapshot import _handle_invalidation_message
+from onyx.redis.redis_config_snapshot import CONFIG_SNAPSHOT_INVALIDATION_CHANNEL
+from onyx.redis.redis_config_snapshot import ConfigSnapshotKind
+from onyx.redis.redis_config_snapshot import get_config_snapshot
+from onyx.redis.redis_config_snapshot import invalidate_config_snapshot
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
+
+
+@pytest.fixture
+def listening_cache() -> Iterator[None]:
+    """Behaves as if this process was subscribed to invalidations."""
+    redis_config_snapshot._SNAPSHOT_CACHE.clear()
+    redis_config_snapshot._listener_subscribed.set()
+    try:
+        yield
+    finally:
+        redis_config_snapshot._listener_subscribed.clear()
+        redis_config_snapshot._SNAPSHOT_CACHE.clear()
+
+
+def test_snapshot_cached_per_tenant_until_invalidated(listening_cache: None) -> None:
+    calls: list[str] = []
+
+    def _load() -> str | None:
+        tenant_id = CURRENT_TENANT_ID_CONTEXTVAR.get()
+        calls.append(str(tenant_id))
+        return None if tenant_id == "tenant_b" else f"value-{tenant_id}"
+
+    def _get() -> str | None:
+        return get_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS, "default", _load)
+
+    token = CURRENT_TENANT_ID_CONTEXTVAR.set("tenant_a")
+    try:
+        assert _get() == "value-tenant_a"
+        assert _get() == "value-tenant_a"
+
+        CURRENT_TENANT_ID_CONTEXTVAR.set("tenant_b")
+        # None is cached too
+        assert _get() is None
+        assert _get() is None
+        assert calls == ["tenant_a", "tenant_b"]
+
+        # a message from another process only drops the entries of that tenant
+        _handle_invalidation_message(
+            json.dumps({"tenant_id": "tenant_a", "kind": "llm_providers"})
+        )
+        assert _get() is None
+        CURRENT_TENANT_ID_CONTEXTVAR.set("tenant_a")
+        assert _get() == "value-tenant_a"
+        assert calls == ["tenant_a", "tenant_b", "tenant_a"]
+
+        mock_redis = MagicMock()
+        with patch(
+            "onyx.redis.redis_config_snapshot.get_raw_redis_client",
+            return_value=mock_redis,
+        ):
+            invalidate_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS)
+        mock_redis.publish.assert_called_once_with(
+            CONFIG_SNAPSHOT_INVALIDATION_CHANNEL,
+            json.dumps({"tenant_id": "tenant_a", "kind": "llm_providers"}),
+        )
+        assert _get() == "value-tenant_a"
+        assert calls == ["tenant_a", "tenant_b", "tenant_a", "tenant_a"]
+    finally:
+        CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+
+
+def test_snapshot_not_cached_without_listener() -> None:
+    load = MagicMock(return_value="value")
+    for _ in range(2):
+        get_config_snapshot(ConfigSnapshotKind.LLM_PROVIDERS, "default", load)
+    assert load.call_count == 2
+
+
+def test_search_settings_snapshot_attached_without_query(
+    listening_cache: None,
+) -> None:
+    snapshot = SearchSettings(
+        id=7,
+        model_name="model",
+        model_dim=768,
+        status=IndexModelStatus.PRESENT,
+        index_name="index",
+        provider_type=None,
+    )
+    make_transient_to_detached(snapshot)
+
+    with patch(
+        "onyx.db.search_settings._load_search_settings_snapshot",
+        return_value=snapshot,
+    ) as mock_load:
+        # unbound sessions, any query would fail
+        first_session = Session()
+        first = get_current_search_settings(first_session)
+        assert get_current_search_settings(first_session) is first
+
+        second = get_current_search_settings(Session())
+
+    assert mock_load.call_count == 1
+    assert first is not snapshot and second is not first
+    assert first in first_session
+    assert first.model_name == second.model_name == "model"
+
+    # changes made by one request don't leak into the cache
+    first.model_name = "changed"
+    assert second.model_name == snapshot.model_name == "model"
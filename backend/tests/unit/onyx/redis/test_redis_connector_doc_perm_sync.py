@@ -0,0 +1,55 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.access.models import DocExternalAccess
+from onyx.access.models import ExternalAccess
+from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
+
+
+def test_update_db_writes_permissions_in_batches() -> None:
+    batches: list[list[str]] = []
+
+    def _update_batch(
+        tenant_id: str,
+        permissions: list[DocExternalAccess],
+        source_type_str: str,
+        connector_id: int,
+        credential_id: int,
+    ) -> int:
+        batches.append([permission.doc_id for permission in permissions])
+        return len(permissions) - 1
+
+    too_many_emails = {
+        f"user{i}@test.com" for i in range(ExternalAccess.MAX_NUM_ENTRIES + 1)
+    }
+    permissions = (
+        DocExternalAccess(
+            external_access=ExternalAccess(
+                external_user_emails=too_many_emails if i == 3 else {"a@test.com"},
+                external_user_group_ids=set(),
+                is_public=False,
+            ),
+            doc_id=f"doc_{i}",
+        )
+        for i in range(6)
+    )
+
+    with patch(
+        "onyx.redis.redis_connector_doc_perm_sync.fetch_versioned_implementation",
+        return_value=_update_batch,
+    ), patch(
+        "onyx.redis.redis_connector_doc_perm_sync.PERMISSION_SYNC_DB_BATCH_SIZE", 2
+    ):
+        num_permissions = RedisConnectorPermissionSync(
+            tenant_id="tenant", id=1, redis=MagicMock()
+        ).update_db(
+            lock=None,
+            new_permissions=permissions,
+            source_string="google_drive",
+            connector_id=1,
+            credential_id=1,
+        )
+
+    # doc_3 has too many entries and is skipped
+    assert batches == [["doc_0", "doc_1"], ["doc_2", "doc_4"], ["doc_5"]]
+    assert num_permissions == 5
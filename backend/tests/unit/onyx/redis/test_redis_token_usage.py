@@ -0,0 +1,152 @@
+from collections.abc import Iterator
+from collections.abc import Sequence
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from onyx.redis import redis_token_usage
+from onyx.redis.redis_token_usage import fetch_token_usage
+from onyx.redis.redis_token_usage import record_token_usage
+from onyx.redis.redis_token_usage import TokenUsage
+from onyx.redis.redis_token_usage import TokenUsageScope
+
+
+class _FakeRedis:
+    """Just enough of a Redis client for the token counters, hash fields are bytes like
+    the real client returns them."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+    def hincrby(self, key: str, field: str, amount: int) -> None:
+        buckets = self.values.setdefault(key, {})
+        buckets[field.encode()] = str(int(buckets.get(field.encode(), 0)) + amount)
+
+    def hset(self, key: str, mapping: dict[str, int]) -> None:
+        buckets = self.values.setdefault(key, {})
+        buckets.update({field.encode(): str(v) for field, v in mapping.items()})
+
+    def hdel(self, key: str, *fields: str) -> None:
+        for field in fields:
+            self.values.get(key, {}).pop(field.encode(), None)
+
+    def hgetall(self, key: str) -> dict[bytes, str]:
+        return dict(self.values.get(key, {}))
+
+    def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+    def expire(self, key: str, seconds: int) -> None:
+        pass
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value.encode()
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(key) for key in keys]
+
+
+class _FakePipeline:
+    def __init__(self, redis_client: _FakeRedis) -> None:
+        self.redis_client = redis_client
+        self.commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        def _queue(*args: Any, **kwargs: Any) -> None:
+            self.commands.append((name, args, kwargs))
+
+        return _queue
+
+    def execute(self) -> list[Any]:
+        return [
+            getattr(self.redis_client, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+@pytest.fixture
+def fake_redis() -> Iterator[_FakeRedis]:
+    redis_client = _FakeRedis()
+    with patch.object(redis_token_usage, "get_redis_client", return_value=redis_client):
+        yield redis_client
+
+
+def _minute(time: datetime) -> datetime:
+    return time.replace(second=0, microsecond=0)
+
+
+def test_usage_read_from_counters_once_reconciled(fake_redis: _FakeRedis) -> None:
+    user_id = uuid4()
+    now = datetime.now(tz=timezone.utc)
+    cutoff_time = now - timedelta(hours=3)
+    earlier = _minute(now - timedelta(hours=2))
+
+    # counted before the counters were ever reconciled
+    record_token_usage(100, user_id, [7])
+
+    db_usage: list[tuple[datetime, int]] = [(earlier, 500), (_minute(now), 100)]
+    fetch_from_db = MagicMock(
+        side_effect=lambda scope_ids: {scope_id: db_usage for scope_id in scope_ids}
+    )
+
+    def _fetch(cutoff: datetime = cutoff_time) -> Sequence[tuple[datetime, int]]:
+        return fetch_token_usage(
+            TokenUsageScope.USER, [str(user_id)], cutoff, fetch_from_db
+        )[str(user_id)]
+
+    # the first check reconciles the counters from Postgres
+    assert _fetch() == db_usage
+    assert fetch_from_db.call_count == 1
+
+    # later ones only read Redis, and see usage recorded since
+    record_token_usage(50, user_id, [7])
+    assert sorted(_fetch()) == [(earlier, 500), (_minute(now), 150)]
+    assert fetch_from_db.call_count == 1
+
+    # the group counters were recorded too, but have not been reconciled yet
+    group_usage = fetch_token_usage(
+        TokenUsageScope.USER_GROUP, ["7"], cutoff_time, fetch_from_db
+    )
+    assert group_usage == {"7": db_usage}
+    assert fetch_from_db.call_count == 2
+
+    # a longer window than the one reconciled goes back to Postgres
+    _fetch(cutoff=now - timedelta(hours=5))
+    assert fetch_from_db.call_count == 3
+
+
+def test_usage_falls_back_to_postgres() -> None:
+    db_usage: dict[str, TokenUsage] = {"all": [(datetime.now(tz=timezone.utc), 1)]}
+    fetch_from_db = MagicMock(return_value=db_usage)
+    broken_redis = MagicMock()
+    broken_redis.mget.side_effect = ConnectionError()
+
+    with patch.object(redis_token_usage, "get_redis_client", return_value=broken_redis):
+        cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+        assert (
+            fetch_token_usage(
+                TokenUsageScope.GLOBAL, ["all"], cutoff_time, fetch_from_db
+            )
+            == db_usage
+        )
+
+        # windows longer than what is kept in Redis are never read from it
+        broken_redis.reset_mock()
+        fetch_token_usage(
+            TokenUsageScope.GLOBAL,
+            ["all"],
+            cutoff_time
+            - timedelta(hours=redis_token_usage.TOKEN_USAGE_RETENTION_HOURS),
+            fetch_from_db,
+        )
+        broken_redis.mget.assert_not_called()
+        assert fetch_from_db.call_count == 2
@@ -0,0 +1,48 @@
+import os
+import random
+
+from onyx.utils.external_sort import sorted_difference
+from onyx.utils.external_sort import SortedStringSpill
+
+
+def _random_ids(rng: random.Random, count: int) -> list[str]:
+    alphabet = "abcXYZ019_-/:é日\n"
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+        for _ in range(count)
+    ]
+
+
+def test_sorted_spill_matches_in_memory_sort() -> None:
+    rng = random.Random(0)
+    ids = _random_ids(rng, 5000)
+
+    with SortedStringSpill(run_size=300) as spill:
+        for start in range(0, len(ids), 128):
+            spill.add(ids[start : start + 128])
+
+        assert spill.num_runs > 1
+        assert list(spill.iter_sorted_unique()) == sorted(set(ids))
+
+        temp_dir = spill._temp_dir
+        assert temp_dir is not None
+
+    # the runs are removed once done
+    assert not os.path.exists(temp_dir.name)
+
+
+def test_sorted_difference_matches_set_difference() -> None:
+    rng = random.Random(1)
+    for _ in range(20):
+        indexed = set(_random_ids(rng, rng.randint(0, 300)))
+        source = set(_random_ids(rng, rng.randint(0, 300))) | set(
+            rng.sample(sorted(indexed), len(indexed) // 2)
+        )
+
+        with SortedStringSpill(run_size=50) as spill:
+            spill.add(source)
+            to_remove = list(
+                sorted_difference(iter(sorted(indexed)), spill.iter_sorted_unique())
+            )
+
+        assert to_remove == sorted(indexed - source)
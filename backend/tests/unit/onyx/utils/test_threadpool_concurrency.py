@@ -7,6 +7,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from onyx.utils.threadpool_concurrency import map_in_background
 from onyx.utils.threadpool_concurrency import parallel_yield
 from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.threadpool_concurrency import run_with_timeout
@@ -389,3 +390,51 @@ def test_parallel_yield_non_blocking() -> None:
     # Verify no values are missing
     assert len(results) == 300  # Should have all values from 0 to 299
     assert sorted(results) == list(range(300))
+
+
+def test_map_in_background_overlaps_with_consumer() -> None:
+    """The next item is produced while the consumer works on the current one, but
+    never more than max_ahead results are buffered."""
+    produced: list[int] = []
+
+    def produce(x: int) -> int:
+        produced.append(x)
+        return x * 2
+
+    results = map_in_background(produce, [1, 2, 3, 4], max_ahead=1)
+    assert next(results) == 2
+
+    # 2 is buffered, 3 is produced and waits for room in the buffer
+    deadline = time.time() + 2
+    while len(produced) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert produced == [1, 2, 3]
+
+    assert list(results) == [4, 6, 8]
+
+
+def test_map_in_background_propagates_exceptions() -> None:
+    def produce(x: int) -> int:
+        if x == 2:
+            raise ValueError("bad item")
+        return x
+
+    results = map_in_background(produce, [1, 2, 3])
+    assert next(results) == 1
+    with pytest.raises(ValueError, match="bad item"):
+        next(results)
+
+
+def test_map_in_background_stops_when_consumer_stops() -> None:
+    produced: list[int] = []
+
+    def produce(x: int) -> int:
+        produced.append(x)
+        return x
+
+    results = map_in_background(produce, list(range(100)), max_ahead=1)
+    assert next(results) == 0
+    results.close()
+
+    assert len(produced) <= 3